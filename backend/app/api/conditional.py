@@ -0,0 +1,71 @@
+# backend/app/api/conditional.py
+"""
+Conditional GET for the detail endpoints.
+
+A document's weak ETag is derived from its _id and updated_at (which every
+write path maintains, see CRUDBase.update). When the request carries
+If-None-Match, `not_modified` compares it against a projection-only lookup
+of updated_at, so an unchanged document costs one _id index lookup and no
+body is read, serialized or sent.
+"""
+import calendar
+from datetime import datetime
+from typing import Optional
+from uuid import UUID
+
+from fastapi import Request, Response, status
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+from app.core.config import settings
+
+
+def weak_etag(item_id: UUID, updated_at: Optional[datetime]) -> str:
+    """W/"<id>-<updated_at in ms>"; Mongo stores datetimes with ms precision."""
+    millis = 0
+    if updated_at is not None:
+        # Naive datetimes from Mongo are UTC
+        millis = calendar.timegm(updated_at.utctimetuple()) * 1000
+        millis += updated_at.microsecond // 1000
+    return f'W/"{item_id}-{millis}"'
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """Weak comparison against an If-None-Match list (or "*")."""
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or etag.removeprefix("W/") in [
+        tag.removeprefix("W/") for tag in candidates
+    ]
+
+
+def set_etag(response: Response, item_id: UUID, updated_at: Optional[datetime]):
+    response.headers["ETag"] = weak_etag(item_id, updated_at)
+    response.headers["Cache-Control"] = settings.RESPONSE_CACHE_CONTROL
+
+
+async def not_modified(
+    request: Request,
+    db: AsyncIOMotorDatabase,
+    collection_name: str,
+    *,
+    item_id: UUID,
+    user_id: str,
+) -> Optional[Response]:
+    """
+    304 response if If-None-Match still matches the stored document, else
+    None (no header, changed or not found: the endpoint answers as usual).
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return None
+    doc = await db[collection_name].find_one(
+        {"_id": item_id, "user_id": user_id}, projection={"updated_at": 1}
+    )
+    if not doc:
+        return None
+    etag = weak_etag(item_id, doc.get("updated_at"))
+    if not etag_matches(if_none_match, etag):
+        return None
+    return Response(
+        status_code=status.HTTP_304_NOT_MODIFIED,
+        headers={"ETag": etag, "Cache-Control": settings.RESPONSE_CACHE_CONTROL},
+    )
@@ -1,8 +1,12 @@
+import secrets
 from typing import Generator, Dict, Any
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from motor.motor_asyncio import AsyncIOMotorDatabase
 
-from app.core.db import get_database
+from app.core.config import settings
+from app.core.db import get_database, read_preference
+from app.core.rate_limit import rate_limiter
+from app.core.request_context import RequestContext
 from app.core.security import get_current_user  # Import the actual dependency
 
 # Re-export for easier access in endpoint files
@@ -14,6 +18,16 @@ async def get_db() -> AsyncIOMotorDatabase:
     return await get_database()
 
 
+# Dependency for read-only dashboard/report queries; MONGODB_ANALYTICS_READ_PREFERENCE
+# can send these to secondaries while writes stay on the primary
+async def get_analytics_db(
+    database: AsyncIOMotorDatabase = Depends(get_db),
+) -> AsyncIOMotorDatabase:
+    return database.with_options(
+        read_preference=read_preference(settings.MONGODB_ANALYTICS_READ_PREFERENCE)
+    )
+
+
 # Placeholder for current active user (can add checks like is_active here later)
 async def get_current_active_user(
     current_user_payload: Dict[str, Any] = Depends(get_current_user),
@@ -22,3 +36,64 @@ async def get_current_active_user(
     # if not current_user_payload.get("is_active"): # Assuming an 'is_active' field
     #     raise HTTPException(status_code=400, detail="Inactive user")
     return current_user_payload
+
+
+# DB handle, verified user and identity map of one request (core/request_context.py).
+# FastAPI resolves it once per request, so every dependency/service shares it
+async def get_request_context(
+    database: AsyncIOMotorDatabase = Depends(get_db),
+    current_user: Dict[str, Any] = Depends(get_current_active_user),
+) -> RequestContext:
+    if not current_user.get("sub"):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Invalid user")
+    return RequestContext(database, current_user)
+
+
+# Current user, restricted to the subs listed in ADMIN_USER_IDS
+async def get_current_admin_user(
+    current_user: Dict[str, Any] = Depends(get_current_active_user),
+) -> Dict[str, Any]:
+    admin_ids = {
+        sub.strip() for sub in settings.ADMIN_USER_IDS.split(",") if sub.strip()
+    }
+    if current_user.get("sub") not in admin_ids:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN, detail="Admin access required"
+        )
+    return current_user
+
+
+LOOPBACK_HOSTS = {"127.0.0.1", "::1", "localhost"}
+
+
+# Prometheus scrapes: the METRICS_TOKEN bearer token, or without one only
+# clients on this host (the metrics expose routes, collections and traffic)
+async def require_metrics_access(request: Request) -> None:
+    if settings.METRICS_TOKEN:
+        scheme, _, token = request.headers.get("authorization", "").partition(" ")
+        if scheme.lower() != "bearer" or not secrets.compare_digest(
+            token.encode(), settings.METRICS_TOKEN.encode()
+        ):
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Metrics token required",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        return
+    if not request.client or request.client.host not in LOOPBACK_HOSTS:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Metrics are only served locally without METRICS_TOKEN",
+        )
+
+
+# Per-user rate limit and concurrency cap of a route (policy names in
+# RATE_LIMITS, see core/rate_limit.py), e.g. dependencies=[rate_limit("dashboard")]
+def rate_limit(route: str):
+    async def limited(
+        current_user: Dict[str, Any] = Depends(get_current_active_user),
+    ):
+        async with rate_limiter.limit(route, current_user.get("sub")):
+            yield
+
+    return Depends(limited)
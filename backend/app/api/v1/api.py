@@ -1,7 +1,20 @@
 from fastapi import APIRouter
 
+from app.api import deps
+
 # Import endpoint routers
-from .endpoints import clients, auth, projects, workItems, invoices, dashboard, events
+from .endpoints import (
+    clients,
+    auth,
+    projects,
+    workItems,
+    invoices,
+    dashboard,
+    events,
+    system,
+    admin,
+    live,
+)
 
 
 api_router = APIRouter()
@@ -15,9 +28,16 @@ api_router.include_router(
     projects.router, prefix="/projects", tags=["Projects"]
 )  # Add projects
 api_router.include_router(
-    dashboard.router, prefix="/dashboard", tags=["Dashboard"]
+    dashboard.router,
+    prefix="/dashboard",
+    tags=["Dashboard"],
+    # All dashboard aggregations share one per-user budget
+    dependencies=[deps.rate_limit("dashboard")],
 )  # Add
 api_router.include_router(events.router, prefix="/events", tags=["Events"])
+api_router.include_router(system.router, prefix="/system", tags=["System"])
+api_router.include_router(admin.router, prefix="/admin", tags=["Admin"])
+api_router.include_router(live.router, prefix="/live", tags=["Live updates"])
 # api_router.include_router(projects.router, prefix="/projects", tags=["Projects"])
 # api_router.include_router(invoices.router, prefix="/invoices", tags=["Invoices"])
 # Add authentication routes if needed (e.g., /auth for token info or logout)
@@ -0,0 +1,53 @@
+# backend/app/api/v1/endpoints/admin.py
+import logging
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi.responses import PlainTextResponse
+from typing import List, Annotated
+
+from app.api import deps
+from app.core.profiling import profile_store
+
+logger = logging.getLogger(__name__)
+router = APIRouter()
+
+AdminUser = Annotated[dict, Depends(deps.get_current_admin_user)]
+
+
+@router.get(
+    "/profiles",
+    response_model=List[dict],
+    summary="List stored request profiles of this process (newest first)",
+)
+async def read_profiles(*, current_user: AdminUser):
+    return profile_store.list()
+
+
+@router.get(
+    "/profiles/{profile_id}",
+    summary="Get one request profile: Mongo command trace and wall-clock profile",
+)
+async def read_profile(
+    *,
+    profile_id: str,
+    current_user: AdminUser,
+    format: str = Query("json", pattern="^(json|text)$"),
+):
+    artifact = profile_store.get(profile_id)
+    if not artifact:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Profile not found"
+        )
+    if format == "text":
+        # Profiler output as-is, for reading in a terminal
+        return PlainTextResponse(artifact["profile"] or "")
+    return artifact
+
+
+@router.delete(
+    "/profiles",
+    status_code=status.HTTP_204_NO_CONTENT,
+    summary="Drop all stored request profiles",
+)
+async def delete_profiles(*, current_user: AdminUser):
+    logger.info(f"Admin {current_user.get('sub')} cleared stored request profiles")
+    profile_store.clear()
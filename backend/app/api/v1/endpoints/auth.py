@@ -1,4 +1,3 @@
-import httpx
 from fastapi import APIRouter, Depends, HTTPException, status, Body
 from typing import Annotated  # Use Annotated for Body
 
@@ -14,6 +13,8 @@ router = APIRouter()
 async def exchange_token(
     payload: Annotated[TokenExchangeRequest, Body(alias="payload")],
 ):
+    import httpx  # Only the token exchange needs it; keeps it out of app startup
+
     token_url = settings.AUTHENTIK_TOKEN_URL
     if not token_url:
         logger.error("AUTHENTIK_TOKEN_URL is not configured.")
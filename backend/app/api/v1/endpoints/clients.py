@@ -1,10 +1,12 @@
 # backend/app/api/v1/endpoints/clients.py
-from fastapi import APIRouter, Depends, HTTPException, status, Query, Body
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Body, Request, Response
 from typing import List, Optional, Annotated
 from uuid import UUID
 from motor.motor_asyncio import AsyncIOMotorDatabase
 
 from app.api import deps
+from app.api.conditional import not_modified, set_etag
+from app.core.response_cache import response_cache
 from app.models.client import Client, ClientCreate, ClientUpdate  # Use correct schemas
 from app.crud.crud_client import crud_client
 import logging
@@ -62,6 +64,7 @@ async def create_client_endpoint(
 )
 async def read_clients_endpoint(
     *,
+    request: Request,
     db: Database,
     current_user: CurrentUser,
     skip: int = Query(0, ge=0, description="Number of records to skip for pagination"),
@@ -85,10 +88,16 @@ async def read_clients_endpoint(
     logger.info(
         f"User {user_id} fetching clients. Skip: {skip}, Limit: {limit}, Search: '{search}'"
     )
-    clients = await crud_client.get_multi_by_owner(
-        db=db, user_id=user_id, skip=skip, limit=limit, search=search
+    # Served from the response cache until one of the user's clients changes
+    return await response_cache.respond(
+        request,
+        user_id=user_id,
+        tags=(crud_client.collection_name,),
+        build=lambda: crud_client.get_multi_by_owner(
+            db=db, user_id=user_id, skip=skip, limit=limit, search=search
+        ),
+        response_model=List[Client],
     )
-    return clients
 
 
 @router.get(
@@ -100,6 +109,8 @@ async def read_clients_endpoint(
 async def read_client_by_id_endpoint(
     *,
     client_id: UUID,  # Use UUID type hint for automatic validation
+    request: Request,
+    response: Response,
     db: Database,
     current_user: CurrentUser,
 ):
@@ -114,12 +125,18 @@ async def read_client_by_id_endpoint(
         )
 
     logger.info(f"User {user_id} fetching client with ID: {client_id}")
+    unchanged = await not_modified(
+        request, db, crud_client.collection_name, item_id=client_id, user_id=user_id
+    )
+    if unchanged:
+        return unchanged
     client = await crud_client.get(db=db, id=client_id, user_id=user_id)
     if not client:
         logger.warning(f"Client {client_id} not found for user {user_id}")
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Client not found"
         )
+    set_etag(response, client.id, client.updated_at)
     return client
 
 
@@ -153,7 +170,7 @@ async def update_client_endpoint(
 
     # The crud update function now handles the check for existence and returns None if not found/owned
     updated_client = await crud_client.update(
-        db=db, client_id=client_id, user_id=user_id, obj_in=client_in
+        db=db, item_id=client_id, user_id=user_id, obj_in=client_in
     )
 
     if updated_client is None:
@@ -1,44 +1,56 @@
 # backend/app/api/v1/endpoints/dashboard.py
 import logging
-from fastapi import APIRouter, Depends, HTTPException, status
-from typing import List, Dict, Annotated  # Added Dict
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from typing import List, Dict, Annotated, Literal, Optional  # Added Dict
 from datetime import datetime, date, timedelta, timezone  # Ensure all are imported
 
+from app.core.response_cache import response_cache
 from app.crud.crud_workItem import crud_workItem
+from app.crud.work_item_totals import ITEM_TOTAL_CENTS
+from app.crud import invoice_analytics
 from app.api import deps  # Your dependencies (get_db, get_current_active_user)
 from app.models.dashboard import (
     HoursSummaryResponse,
     DailyHours,
+    RevenueReport,
+    ReceivablesReport,
+    PaymentTimeReport,
 )  # Import your response model
 from app.utils.date_utils import get_month_range  # Import helper
+from app.utils.money import from_cents
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
 # Dependencies
 CurrentUser = Annotated[dict, Depends(deps.get_current_active_user)]
-Database = Annotated[deps.AsyncIOMotorDatabase, Depends(deps.get_db)]
+# Read-only aggregations, may be served by a secondary
+Database = Annotated[deps.AsyncIOMotorDatabase, Depends(deps.get_analytics_db)]
+# Cached responses are built from the primary: a write's invalidation must
+# not be followed by a rebuild from a secondary that hasn't seen the write
+PrimaryDatabase = Annotated[deps.AsyncIOMotorDatabase, Depends(deps.get_db)]
 
 # Collection name for work items/time entries
 WORK_ITEM_COLLECTION = "workItems"  # Or "time_entries"
 
+# "YYYY-MM" month filters of the invoice analytics endpoints
+Month = Annotated[Optional[str], Query(pattern=r"^\d{4}-(0[1-9]|1[0-2])$")]
 
-@router.get(
-    "/summary/hours-this-month",
-    response_model=HoursSummaryResponse,
-    summary="Get Summary of Hours Logged (Current & Previous Month, Daily for Current)",
-)
-async def get_hours_summary(*, db: Database, current_user: CurrentUser):
-    user_id = current_user.get("sub")
-    if not user_id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN, detail="Invalid user"
-        )
 
-    logger.info(f"User {user_id} fetching hours summary for dashboard.")
+def _month_range(from_month: Optional[str], to_month: Optional[str]):
+    """Defaults: January of last year up to this month (year over year)."""
+    now_utc = datetime.now(timezone.utc)
+    return (
+        from_month or f"{now_utc.year - 1}-01",
+        to_month or now_utc.strftime("%Y-%m"),
+    )
+
+
+async def _build_hours_summary(
+    db, user_id: str, now_utc: datetime
+) -> HoursSummaryResponse:
     collection = db[WORK_ITEM_COLLECTION]
 
-    now_utc = datetime.now(timezone.utc)
     current_year = now_utc.year
     current_month = now_utc.month
     # --- 1. Total hours for the current month ---
@@ -51,22 +63,19 @@ async def get_hours_summary(*, db: Database, current_user: CurrentUser):
         {
             "$match": {
                 "user_id": user_id,
-                "date": {
+                "work_date": {
                     "$gte": current_month_start,
                     "$lt": next_month_start,
                 },
             }
         },
-        {"$unwind": "$timeEntries"},
         {
             "$group": {
-                "_id": None,  # Group all matched (and unwound) documents
-                "total_hours": {
-                    "$sum": "$timeEntries.duration"
-                },  # Sum the nested duration
-                "total_revenue": {
-                    "$sum": "$timeEntries.calculatedAmount"
-                },  # Sum the nested duration
+                "_id": None,  # Group all matched documents
+                # Per-item totals stored by CRUDWorkItem, no $unwind needed
+                "total_hours": {"$sum": "$total_hours"},
+                # Integer cents: exact however many items are summed
+                "total_revenue_cents": {"$sum": ITEM_TOTAL_CENTS},
             }
         },
     ]
@@ -80,7 +89,9 @@ async def get_hours_summary(*, db: Database, current_user: CurrentUser):
     )
 
     current_month_total_revenue = (
-        current_month_result[0]["total_revenue"] if current_month_result else 0.0
+        from_cents(current_month_result[0]["total_revenue_cents"])
+        if current_month_result
+        else 0.0
     )
     # --- 2. Total hours for the previous month ---
     if current_month == 1:
@@ -98,22 +109,19 @@ async def get_hours_summary(*, db: Database, current_user: CurrentUser):
         {
             "$match": {
                 "user_id": user_id,
-                "date": {
+                "work_date": {
                     "$gte": prev_month_start,
                     "$lt": current_month_start_for_prev_calc,
                 },
             }
         },
-        {"$unwind": "$timeEntries"},
         {
             "$group": {
-                "_id": None,  # Group all matched (and unwound) documents
-                "total_hours": {
-                    "$sum": "$timeEntries.duration"
-                },  # Sum the nested duration
-                "total_revenue": {
-                    "$sum": "$timeEntries.calculatedAmount"
-                },  # Sum the nested duration
+                "_id": None,  # Group all matched documents
+                # Per-item totals stored by CRUDWorkItem, no $unwind needed
+                "total_hours": {"$sum": "$total_hours"},
+                # Integer cents: exact however many items are summed
+                "total_revenue_cents": {"$sum": ITEM_TOTAL_CENTS},
             }
         },
     ]
@@ -124,7 +132,9 @@ async def get_hours_summary(*, db: Database, current_user: CurrentUser):
         prev_month_result[0]["total_hours"] if prev_month_result else 0.0
     )
     previous_month_total_revenue = (
-        prev_month_result[0]["total_revenue"] if prev_month_result else 0.0
+        from_cents(prev_month_result[0]["total_revenue_cents"])
+        if prev_month_result
+        else 0.0
     )
 
     # --- 3. Daily hours for the current month ---
@@ -133,19 +143,14 @@ async def get_hours_summary(*, db: Database, current_user: CurrentUser):
         {
             "$match": {
                 "user_id": user_id,
-                "date": {"$gte": current_month_start, "$lt": next_month_start},
+                "work_date": {"$gte": current_month_start, "$lt": next_month_start},
             }
         },
-        {"$unwind": "$timeEntries"},
         {
             "$group": {
-                # Group by the date part only (year, month, day)
-                "_id": {
-                    "year": {"$year": {"date": "$date", "timezone": "UTC"}},
-                    "month": {"$month": {"date": "$date", "timezone": "UTC"}},
-                    "day": {"$dayOfMonth": {"date": "$date", "timezone": "UTC"}},
-                },
-                "daily_total_hours": {"$sum": "$timeEntries.duration"},
+                # work_date is already the UTC day
+                "_id": "$work_date",
+                "daily_total_hours": {"$sum": "$total_hours"},
             }
         },
         {"$sort": {"_id": 1}},  # Sort by date
@@ -157,8 +162,7 @@ async def get_hours_summary(*, db: Database, current_user: CurrentUser):
         f"Previous month query range: {prev_month_start} to {current_month_start_for_prev_calc}"
     )
     async for doc in daily_results_cursor:
-        # Construct date object from grouped components
-        day_date = date(doc["_id"]["year"], doc["_id"]["month"], doc["_id"]["day"])
+        day_date = doc["_id"].date()
         daily_hours_list.append(
             DailyHours(day=day_date, hours=doc.get("daily_total_hours", 0.0))
         )
@@ -167,36 +171,15 @@ async def get_hours_summary(*, db: Database, current_user: CurrentUser):
         {
             "$match": {
                 "user_id": user_id,
-                "date": {
+                "work_date": {
                     "$gte": current_month_start,
                     "$lt": next_month_start,
                 },  # Match WorkItems in current month
             }
         },
-        {
-            "$group": {
-                # Group by the date part only to get distinct dates
-                "_id": {
-                    "year": {"$year": {"date": "$date", "timezone": "UTC"}},
-                    "month": {"$month": {"date": "$date", "timezone": "UTC"}},
-                    "day": {"$dayOfMonth": {"date": "$date", "timezone": "UTC"}},
-                }
-            }
-        },
-        {
-            "$project": {
-                "_id": 0,  # Exclude the default _id from group stage
-                # Reconstruct the date object or string
-                "work_date": {
-                    "$dateFromParts": {  # For MongoDB 3.6+
-                        "year": "$_id.year",
-                        "month": "$_id.month",
-                        "day": "$_id.day",
-                        "timezone": "UTC",  # Output as UTC datetime at midnight
-                    }
-                },
-            }
-        },
+        # work_date is already the UTC day, so grouping on it gives distinct dates
+        {"$group": {"_id": "$work_date"}},
+        {"$project": {"_id": 0, "work_date": "$_id"}},
         {"$sort": {"work_date": 1}},  # Sort the dates
     ]
     distinct_dates_cursor = collection.aggregate(
@@ -224,3 +207,100 @@ async def get_hours_summary(*, db: Database, current_user: CurrentUser):
         daily_hours_current_month=daily_hours_list,  # or daily_hours_dict
         active_work_dates_current_month=active_work_dates_current_month,
     )
+
+
+@router.get(
+    "/summary/hours-this-month",
+    response_model=HoursSummaryResponse,
+    summary="Get Summary of Hours Logged (Current & Previous Month, Daily for Current)",
+)
+async def get_hours_summary(
+    *, request: Request, db: PrimaryDatabase, current_user: CurrentUser
+):
+    user_id = current_user.get("sub")
+    if not user_id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN, detail="Invalid user"
+        )
+
+    logger.info(f"User {user_id} fetching hours summary for dashboard.")
+    now_utc = datetime.now(timezone.utc)
+    # Cached per user and month until the user's work items change
+    return await response_cache.respond(
+        request,
+        user_id=user_id,
+        tags=(WORK_ITEM_COLLECTION,),
+        build=lambda: _build_hours_summary(db, user_id, now_utc),
+        response_model=HoursSummaryResponse,
+        vary=(now_utc.strftime("%Y-%m"),),
+    )
+
+
+# --- Invoice analytics, served from the precomputed store ---
+@router.get(
+    "/revenue",
+    response_model=RevenueReport,
+    summary="Invoiced net revenue by month, client or project",
+)
+async def get_revenue_report(
+    *,
+    db: Database,
+    current_user: CurrentUser,
+    group_by: Literal["month", "client", "project"] = "month",
+    from_month: Month = None,
+    to_month: Month = None,
+):
+    user_id = current_user.get("sub")
+    if not user_id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN, detail="Invalid user"
+        )
+    from_month, to_month = _month_range(from_month, to_month)
+    return await invoice_analytics.revenue_report(
+        db,
+        user_id=user_id,
+        group_by=group_by,
+        from_month=from_month,
+        to_month=to_month,
+    )
+
+
+@router.get(
+    "/receivables",
+    response_model=ReceivablesReport,
+    summary="Outstanding invoice amounts by days overdue",
+)
+async def get_receivables_report(
+    *, db: Database, current_user: CurrentUser, as_of: Optional[date] = None
+):
+    user_id = current_user.get("sub")
+    if not user_id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN, detail="Invalid user"
+        )
+    return await invoice_analytics.receivables_report(
+        db, user_id=user_id, as_of=as_of or datetime.now(timezone.utc).date()
+    )
+
+
+@router.get(
+    "/days-to-payment",
+    response_model=PaymentTimeReport,
+    summary="Average days from invoice issue to payment",
+)
+async def get_payment_time_report(
+    *,
+    db: Database,
+    current_user: CurrentUser,
+    from_month: Month = None,
+    to_month: Month = None,
+):
+    user_id = current_user.get("sub")
+    if not user_id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN, detail="Invalid user"
+        )
+    from_month, to_month = _month_range(from_month, to_month)
+    return await invoice_analytics.payment_time_report(
+        db, user_id=user_id, from_month=from_month, to_month=to_month
+    )
@@ -2,19 +2,30 @@
 import logging
 from uuid import UUID
 from typing import List, Annotated
-from fastapi import APIRouter, Depends, HTTPException, status, Body, BackgroundTasks
+from fastapi import (
+    APIRouter,
+    Depends,
+    HTTPException,
+    status,
+    Body,
+    BackgroundTasks,
+    Request,
+)
 from fastapi.responses import Response  # For returning PDF directly
 
 from app.api import deps
+from app.api.conditional import not_modified, set_etag
 from app.models.invoice import (
     Invoice,
     InvoiceCreateRequest,
     InvoiceInDB,
     InvoiceEmailRequest,
 )
-from app.crud.crud_invoice import crud_invoice
+from app.crud.crud_invoice import crud_invoice, InvoiceUpdate
 from app.services import pdf_generator, email_service  # Import services
 from app.core.config import settings  # For potentially getting 'your_details'
+from app.core.rate_limit import rate_limiter
+from app.core.request_context import RequestContext
 
 from datetime import date, datetime
 
@@ -24,6 +35,7 @@ router = APIRouter()
 # Dependencies
 CurrentUser = Annotated[dict, Depends(deps.get_current_active_user)]
 Database = Annotated[deps.AsyncIOMotorDatabase, Depends(deps.get_db)]
+Context = Annotated[RequestContext, Depends(deps.get_request_context)]
 
 
 # --- Endpoint to Create an Invoice ---
@@ -32,21 +44,19 @@ Database = Annotated[deps.AsyncIOMotorDatabase, Depends(deps.get_db)]
     response_model=Invoice,  # Returns the created invoice details (not PDF)
     status_code=status.HTTP_201_CREATED,
     summary="Create a new Invoice from Time Entries",
+    dependencies=[deps.rate_limit("invoice_create")],
 )
 async def create_invoice_endpoint(
     *,
     request_body: InvoiceCreateRequest,
-    db: Database,
-    current_user: CurrentUser,
+    context: Context,
     background_tasks: BackgroundTasks,
 ):
     """
     Generates a new invoice based on selected client, projects, and time entries.
     Marks the included time entries as invoiced.
     """
-    user_id = current_user.get("sub")
-    if not user_id:
-        raise HTTPException(status_code=403, detail="Invalid user")
+    user_id = context.user_id
 
     logger.info(
         f"User {user_id} requesting invoice creation for client {request_body.client_id}"
@@ -54,13 +64,12 @@ async def create_invoice_endpoint(
     try:
         # Call the custom create method in CRUD
         created_invoice_db = await crud_invoice.create_from_request(
-            db=db, user_id=user_id, request=request_body
+            db=context.db, user_id=user_id, request=request_body
         )
-        background_tasks.add_task(
-            pdf_generator.generate_and_store_invoice_pdf,
-            db=db,  # Pass DB connection if task needs it (or create new one)
-            invoice_id=created_invoice_db.id,
-            user_id=user_id,  # Pass user_id for fetching your_details if needed
+        # The PDF job renders this invoice instead of loading it again
+        context.remember(crud_invoice, created_invoice_db)
+        pdf_generator.schedule_invoice_pdf(
+            background_tasks, context=context, invoice_id=created_invoice_db.id
         )
         logger.info(
             f"Scheduled PDF generation task for invoice {created_invoice_db.invoice_number}"
@@ -104,13 +113,59 @@ async def read_invoices_endpoint(
 # --- Endpoint to Get Single Invoice Details ---
 @router.get("/{invoice_id}", response_model=Invoice)
 async def read_invoice_by_id_endpoint(
-    *, invoice_id: UUID, db: Database, current_user: CurrentUser
+    *,
+    invoice_id: UUID,
+    request: Request,
+    response: Response,
+    context: Context,
 ):
     """Get details for a specific invoice."""
+    # Skips loading the invoice (and its stored PDF) when the client is current
+    unchanged = await not_modified(
+        request,
+        context.db,
+        crud_invoice.collection_name,
+        item_id=invoice_id,
+        user_id=context.user_id,
+    )
+    if unchanged:
+        return unchanged
+    invoice = await context.get(crud_invoice, invoice_id)
+    if not invoice:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Invoice not found"
+        )
+    set_etag(response, invoice.id, invoice.updated_at)
+    return Invoice(**invoice.model_dump())
+
+
+# --- Endpoint to Update Invoice Status ---
+@router.patch(
+    "/{invoice_id}",
+    response_model=Invoice,
+    summary="Update invoice status, payment date or notes",
+)
+async def update_invoice_endpoint(
+    *,
+    invoice_id: UUID,
+    invoice_in: InvoiceUpdate,
+    db: Database,
+    current_user: CurrentUser,
+):
+    """
+    Marks an invoice as sent, paid, overdue or void (setting status to paid
+    without a payment_date uses today). Keeps the revenue/receivables
+    analytics up to date.
+    """
     user_id = current_user.get("sub")
     if not user_id:
         raise HTTPException(status_code=403, detail="Invalid user")
-    invoice = await crud_invoice.get(db=db, id=invoice_id, user_id=user_id)
+    try:
+        invoice = await crud_invoice.update(
+            db=db, item_id=invoice_id, user_id=user_id, obj_in=invoice_in
+        )
+    except ValueError as ve:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(ve))
     if not invoice:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Invoice not found"
@@ -126,40 +181,26 @@ async def read_invoice_by_id_endpoint(
 async def download_invoice_pdf_endpoint(
     *,
     invoice_id: UUID,
-    db: Database,
-    current_user: CurrentUser,
+    context: Context,
     background_tasks: BackgroundTasks,
 ):
     """
     Returns the stored PDF for the invoice.
     If not stored yet, generates it, saves it (via background task), and returns it.
     """
-    user_id = current_user.get("sub")
-    if not user_id:
-        raise HTTPException(status_code=403, detail="Invalid user")
-
-    # 1. Fetch Invoice Data (including pdf_content field)
-    # Ensure your 'get' method retrieves the pdf_content field
-    invoice_collection = crud_invoice._get_collection(db)
-    invoice_doc = await invoice_collection.find_one(
-        {"_id": invoice_id, "user_id": user_id},
-        projection={
-            "pdf_content": 1,
-            "invoice_number": 1,
-            "issue_date": 1,
-        },  # Fetch needed fields
-    )
+    user_id = context.user_id
 
-    if not invoice_doc:
+    # 1. Fetch Invoice Data (including pdf_content field); loaded once, the
+    # on-the-fly render below reuses it
+    invoice_db = await context.get(crud_invoice, invoice_id)
+    if not invoice_db:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Invoice not found"
         )
 
-    pdf_bytes = invoice_doc.get("pdf_content")
-    invoice_number = invoice_doc.get("invoice_number", "UnknownInvoice")
-    issue_date_str = invoice_doc.get("issue_date", datetime.utcnow()).strftime(
-        "%Y-%m-%d"
-    )
+    pdf_bytes = invoice_db.pdf_content
+    invoice_number = invoice_db.invoice_number or "UnknownInvoice"
+    issue_date_str = (invoice_db.issue_date or datetime.utcnow()).strftime("%Y-%m-%d")
 
     # 2. If PDF is stored, return it
     if pdf_bytes:
@@ -175,13 +216,6 @@ async def download_invoice_pdf_endpoint(
         logger.warning(
             f"Stored PDF not found for invoice {invoice_number}. Generating on-the-fly."
         )
-        # Fetch full invoice data needed for generation
-        invoice_db = await crud_invoice.get(db=db, id=invoice_id, user_id=user_id)
-        if not invoice_db:  # Should not happen if doc was found above, but check again
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Invoice not found (consistency issue).",
-            )
 
         # Get Your Details
         your_details = {
@@ -197,36 +231,37 @@ async def download_invoice_pdf_endpoint(
             # Add other fields used in template
         }
 
-        # Generate PDF
-        try:
-            pdf_bytes_generated = await pdf_generator.generate_invoice_pdf(
-                invoice_db, your_details
-            )
-            if not pdf_bytes_generated:
-                raise ValueError("Generated PDF content is empty.")
-
-            # Optionally: Trigger background task to save it *now* if not already scheduled
-            # This ensures it's saved even if generation failed during initial create task
-            # Be careful not to create duplicate tasks if create endpoint already scheduled it.
-            # A flag on the invoice or checking task status might be needed for robust implementation.
-            # background_tasks.add_task(generate_and_store_invoice_pdf, db, invoice_id, user_id)
-            # logger.info(f"Scheduled PDF storage task for invoice {invoice_number} after on-the-fly generation.")
-
-            # Return the newly generated PDF
-            filename = f"Rechnung_{invoice_number}_{issue_date_str}.pdf"
-            headers = {"Content-Disposition": f'inline; filename="{filename}"'}
-            return Response(
-                content=pdf_bytes_generated,
-                media_type="application/pdf",
-                headers=headers,
-            )
-
-        except Exception as e:
-            logger.error(
-                f"On-the-fly PDF generation failed for invoice {invoice_id}: {e}",
-                exc_info=True,
-            )
-            raise HTTPException(status_code=500, detail="Failed to generate PDF.")
+        # Generate PDF (expensive: per-user rate limit, see core/rate_limit.py)
+        async with rate_limiter.limit("invoice_pdf", user_id):
+            try:
+                pdf_bytes_generated = await pdf_generator.generate_invoice_pdf(
+                    invoice_db, your_details
+                )
+                if not pdf_bytes_generated:
+                    raise ValueError("Generated PDF content is empty.")
+
+                # Optionally: Trigger background task to save it *now* if not already scheduled
+                # This ensures it's saved even if generation failed during initial create task
+                # Be careful not to create duplicate tasks if create endpoint already scheduled it.
+                # A flag on the invoice or checking task status might be needed for robust implementation.
+                # background_tasks.add_task(generate_and_store_invoice_pdf, db, invoice_id, user_id)
+                # logger.info(f"Scheduled PDF storage task for invoice {invoice_number} after on-the-fly generation.")
+
+                # Return the newly generated PDF
+                filename = f"Rechnung_{invoice_number}_{issue_date_str}.pdf"
+                headers = {"Content-Disposition": f'inline; filename="{filename}"'}
+                return Response(
+                    content=pdf_bytes_generated,
+                    media_type="application/pdf",
+                    headers=headers,
+                )
+
+            except Exception as e:
+                logger.error(
+                    f"On-the-fly PDF generation failed for invoice {invoice_id}: {e}",
+                    exc_info=True,
+                )
+                raise HTTPException(status_code=500, detail="Failed to generate PDF.")
 
 
 # --- Endpoint to Generate Email Content ---
@@ -241,18 +276,14 @@ async def generate_email_preview_endpoint(
     email_request: Annotated[
         InvoiceEmailRequest, Body()
     ],  # Optional: Allow customizing template/subject via body
-    db: Database,
-    current_user: CurrentUser,
+    context: Context,
 ):
     """Generates the subject and body for an invoice email based on a template."""
 
     logger.info(f"getting email request for invoice: {invoice_id}")
-    user_id = current_user.get("sub")
-    if not user_id:
-        raise HTTPException(status_code=403, detail="Invalid user")
 
     # 1. Fetch Invoice Data
-    invoice_db = await crud_invoice.get(db=db, id=invoice_id, user_id=user_id)
+    invoice_db = await context.get(crud_invoice, invoice_id)
     if not invoice_db:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Invoice not found"
@@ -281,6 +312,5 @@ async def generate_email_preview_endpoint(
 
 
 # --- TODO: Add endpoints for ---
-# - Updating invoice status (e.g., mark as sent, paid) -> using InvoiceUpdate model
 # - Listing invoices (with filters)
 # - Getting invoice details (already added)
@@ -0,0 +1,76 @@
+# backend/app/api/v1/endpoints/live.py
+import asyncio
+import json
+import logging
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import StreamingResponse
+from typing import Annotated
+
+from app.api import deps
+from app.core.config import settings
+from app.services.live_updates import (
+    Subscriber,
+    live_update_hub,
+    live_update_watcher,
+)
+
+logger = logging.getLogger(__name__)
+router = APIRouter()
+
+CurrentUser = Annotated[dict, Depends(deps.get_current_active_user)]
+
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+async def _event_stream(subscriber: Subscriber):
+    """
+    "ready" first (with the watcher mode; null means no live updates, keep
+    polling), then one event per change named after its collection
+    ("workItems", "invoices", "events"), and "resync" if this stream fell
+    behind and messages were dropped.
+    """
+    try:
+        yield _sse("ready", {"mode": live_update_watcher.active_mode})
+        while True:
+            try:
+                message = await asyncio.wait_for(
+                    subscriber.queue.get(),
+                    timeout=settings.LIVE_UPDATES_HEARTBEAT_SECONDS,
+                )
+            except asyncio.TimeoutError:
+                yield ": keep-alive\n\n"
+                continue
+            if subscriber.overflowed:
+                while not subscriber.queue.empty():
+                    subscriber.queue.get_nowait()
+                subscriber.overflowed = False
+                yield _sse("resync", {})
+                continue
+            yield _sse(message["collection"], message)
+    finally:
+        # Runs when the client disconnects (the response cancels the generator)
+        live_update_hub.unsubscribe(subscriber)
+        logger.info(f"LiveUpdates: Stream of user {subscriber.user_id} closed")
+
+
+@router.get(
+    "/stream",
+    summary="Server-sent events for changes to work items, invoices and events",
+    response_class=StreamingResponse,
+)
+async def stream_live_updates(*, current_user: CurrentUser):
+    user_id = current_user.get("sub")
+    if not user_id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN, detail="Invalid user"
+        )
+    logger.info(f"LiveUpdates: User {user_id} opened a stream")
+    subscriber = live_update_hub.subscribe(user_id)
+    return StreamingResponse(
+        _event_stream(subscriber),
+        media_type="text/event-stream",
+        # No caching/buffering by proxies (nginx), events must arrive as sent
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -1,16 +1,20 @@
 # backend/app/api/v1/endpoints/projects.py
-from fastapi import APIRouter, Depends, HTTPException, status, Query, Body
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Body, Request, Response
 from typing import List, Optional, Annotated
 from uuid import UUID
 from motor.motor_asyncio import AsyncIOMotorDatabase
 
 from app.api import deps
+from app.api.conditional import not_modified, set_etag
+from app.core.response_cache import response_cache
 from app.models.project import (
     Project,
     ProjectCreate,
     ProjectUpdate,
+    RatePropagationResult,
 )  # Use Project models
 from app.crud.crud_project import crud_project
+from app.crud.rate_propagation import propagate_rate_changes
 import logging
 
 logger = logging.getLogger(__name__)
@@ -46,6 +50,7 @@ async def create_project_endpoint(
 @router.get("/", response_model=List[dict])  # Or keep as dict for now
 async def read_projects_endpoint(
     *,
+    request: Request,
     db: Database,
     current_user: CurrentUser,
     skip: int = Query(0, ge=0),
@@ -62,20 +67,31 @@ async def read_projects_endpoint(
     logger.info(
         f"User {user_id} fetching projects. Skip: {skip}, Limit: {limit}, Search: '{search}', ClientID: {client_id}"
     )
-    projects_with_clients = await crud_project.get_multi_with_client_info(
-        db=db,
+    # Projects embed their client, so client writes invalidate this too
+    return await response_cache.respond(
+        request,
         user_id=user_id,
-        skip=skip,
-        limit=limit,
-        search=search,
-        client_id=client_id,
+        tags=(crud_project.collection_name, "clients"),
+        build=lambda: crud_project.get_multi_with_client_info(
+            db=db,
+            user_id=user_id,
+            skip=skip,
+            limit=limit,
+            search=search,
+            client_id=client_id,
+        ),
+        response_model=List[dict],
     )
-    return projects_with_clients
 
 
 @router.get("/{project_id}", response_model=Project)
 async def read_project_by_id_endpoint(
-    *, project_id: UUID, db: Database, current_user: CurrentUser
+    *,
+    project_id: UUID,
+    request: Request,
+    response: Response,
+    db: Database,
+    current_user: CurrentUser,
 ):
     """Get a specific project by ID."""
     user_id = current_user.get("sub")
@@ -84,11 +100,17 @@ async def read_project_by_id_endpoint(
             status_code=status.HTTP_403_FORBIDDEN, detail="Invalid user"
         )
     logger.info(f"User {user_id} fetching project ID: {project_id}")
+    unchanged = await not_modified(
+        request, db, crud_project.collection_name, item_id=project_id, user_id=user_id
+    )
+    if unchanged:
+        return unchanged
     project = await crud_project.get(db=db, id=project_id, user_id=user_id)
     if not project:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Project not found"
         )
+    set_etag(response, project.id, project.updated_at)
     return project
 
 
@@ -119,6 +141,46 @@ async def update_project_endpoint(
     return updated_project
 
 
+@router.post(
+    "/{project_id}/rates/recalculate", response_model=RatePropagationResult
+)
+async def recalculate_project_rates_endpoint(
+    *,
+    project_id: UUID,
+    db: Database,
+    current_user: CurrentUser,
+    rate_name: Optional[List[str]] = Query(None),  # Default: all rates
+):
+    """
+    Reprices uninvoiced work items of the project at its current rates.
+    Rate changes made through PUT /projects/{id} are propagated automatically;
+    this repairs items written before that (or by other tools).
+    """
+    user_id = current_user.get("sub")
+    if not user_id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN, detail="Invalid user"
+        )
+    project = await crud_project.get(db=db, id=project_id, user_id=user_id)
+    if not project:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Project not found"
+        )
+    rates = {rate.name: rate.price_per_hour for rate in project.rates}
+    if rate_name:
+        unknown = set(rate_name) - set(rates)
+        if unknown:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail=f"Unknown rates for this project: {sorted(unknown)}",
+            )
+        rates = {name: rates[name] for name in rate_name}
+    logger.info(f"User {user_id} recalculating rates {list(rates)} of project {project_id}")
+    return await propagate_rate_changes(
+        db, user_id=user_id, project_id=project_id, rates=rates
+    )
+
+
 @router.delete("/{project_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_project_endpoint(
     *, project_id: UUID, db: Database, current_user: CurrentUser
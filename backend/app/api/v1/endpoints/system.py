@@ -0,0 +1,30 @@
+# backend/app/api/v1/endpoints/system.py
+import logging
+from fastapi import APIRouter, Depends
+from typing import Annotated
+
+from app.api import deps
+from app.core.db_metrics import pool_metrics
+from app.core.response_cache import response_cache
+
+logger = logging.getLogger(__name__)
+router = APIRouter()
+
+# Process internals (server addresses, per-route traffic): ADMIN_USER_IDS only
+AdminUser = Annotated[dict, Depends(deps.get_current_admin_user)]
+
+
+@router.get(
+    "/db-pool",
+    summary="MongoDB connection pool utilization of this process, per server",
+)
+async def read_db_pool_metrics(*, current_user: AdminUser):
+    return pool_metrics.snapshot()
+
+
+@router.get(
+    "/response-cache",
+    summary="Response cache requests and hit ratio of this process, per route",
+)
+async def read_response_cache_stats(*, current_user: AdminUser):
+    return response_cache.stats()
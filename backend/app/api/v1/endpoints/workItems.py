@@ -1,18 +1,25 @@
 # backend/app/api/v1/endpoints/workItems.py
-from fastapi import APIRouter, Depends, HTTPException, status, Query, Body
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Body, Request, Response
 from typing import List, Optional, Annotated
 from uuid import UUID
+from datetime import date
 from motor.motor_asyncio import AsyncIOMotorDatabase
 
 from app.api import deps
+from app.api.conditional import not_modified, set_etag
 from app.models.workItem import (
     WorkItem,
     WorkItemCreate,
     WorkItemInDB,
     WorkItemUpdate,
     WorkItemWithProjectName,
+    WorkItemBulkResult,
+    BillableSummary,
 )  # Use Project models
+from app.core.response_cache import response_cache
+from app.crud.billable import billable_summary
 from app.crud.crud_workItem import crud_workItem
+from app.services.work_item_import import WorkItemImportError, parse_import_stream
 import logging
 
 logger = logging.getLogger(__name__)
@@ -46,6 +53,57 @@ async def create_workItem_endpoint(
         raise HTTPException(status_code=500, detail="Work Item creation failed.")
 
 
+@router.post(
+    "/bulk",
+    response_model=WorkItemBulkResult,
+    status_code=status.HTTP_201_CREATED,
+    openapi_extra={
+        "requestBody": {
+            "content": {
+                "application/json": {
+                    "schema": {
+                        "type": "array",
+                        "items": {"$ref": "#/components/schemas/WorkItemCreate"},
+                    }
+                },
+                "text/csv": {"schema": {"type": "string"}},
+            },
+            "required": True,
+        }
+    },
+)
+async def bulk_create_workItems_endpoint(
+    *, request: Request, db: Database, current_user: CurrentUser
+):
+    """
+    Import many work items at once from a JSON array or a CSV body
+    (Content-Type: text/csv, one row per time entry). All rows are validated
+    first; if any is invalid nothing is written and every error is returned.
+    """
+    user_id = current_user.get("sub")
+    if not user_id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN, detail="Invalid user"
+        )
+    content_type = request.headers.get("content-type", "application/json")
+    try:
+        # Parsed while received: oversized imports stop at the item limit
+        items, rows = await parse_import_stream(request.stream(), content_type)
+        logger.info(f"User {user_id} importing {len(items)} work items ({content_type})")
+        return await crud_workItem.create_many(
+            db=db, objs_in=items, user_id=user_id, rows=rows
+        )
+    except WorkItemImportError as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=e.errors
+        )
+    except Exception as e:
+        logger.error(
+            f"Failed to import workItems for user {user_id}: {e}", exc_info=True
+        )
+        raise HTTPException(status_code=500, detail="Work Item import failed.")
+
+
 @router.get(
     "/", response_model=List[WorkItemWithProjectName]
 )  # Or keep as dict for now
@@ -57,6 +115,8 @@ async def read_workItems_endpoint(
     limit: int = Query(100, ge=1, le=500),
     search: Optional[str] = Query(None),
     project_id: Optional[UUID] = Query(None),  # Filter by client
+    date_from: Optional[date] = Query(None, description="First work_date (inclusive)"),
+    date_to: Optional[date] = Query(None, description="Last work_date (inclusive)"),
 ):
     """Retrieve workItems for the current user."""
     user_id = current_user.get("sub")
@@ -82,14 +142,47 @@ async def read_workItems_endpoint(
         limit=limit,
         search=search,
         project_id=project_id,
+        date_from=date_from,
+        date_to=date_to,
     )
     return results_from_crud
 
 
 # since this is single request, we aggregate fields from other stuff
+@router.get("/billable-summary", response_model=BillableSummary)
+async def read_billable_summary_endpoint(
+    *,
+    request: Request,
+    db: Database,
+    current_user: CurrentUser,
+    client_id: Optional[UUID] = Query(None, description="Only this client"),
+):
+    """Uninvoiced hours and amounts per client and project."""
+    user_id = current_user.get("sub")
+    if not user_id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN, detail="Invalid user"
+        )
+    logger.info(f"User {user_id} fetching billable summary. ClientID: {client_id}")
+    # Invoicing marks work items, so invoice writes invalidate "workItems" too;
+    # project/client writes change the names and client grouping
+    return await response_cache.respond(
+        request,
+        user_id=user_id,
+        tags=(crud_workItem.collection_name, "projects", "clients"),
+        build=lambda: billable_summary(db, user_id=user_id, client_id=client_id),
+        response_model=BillableSummary,
+    )
+
+
 @router.get("/{workItem_id}", response_model=WorkItemWithProjectName)
 async def read_workItem_by_id_endpoint(
-    *, workItem_id: UUID, db: Database, current_user: CurrentUser
+    *,
+    workItem_id: UUID,
+    request: Request,
+    response: Response,
+    db: Database,
+    current_user: CurrentUser,
 ):
     """Get a specific workItem by ID."""
     user_id = current_user.get("sub")
@@ -98,6 +191,17 @@ async def read_workItem_by_id_endpoint(
             status_code=status.HTTP_403_FORBIDDEN, detail="Invalid user"
         )
     logger.info(f"User {user_id} fetching workItem ID: {workItem_id}")
+    # Renames propagate onto the item (and its updated_at), so the project and
+    # client names are covered by the item's ETag too
+    unchanged = await not_modified(
+        request,
+        db,
+        crud_workItem.collection_name,
+        item_id=workItem_id,
+        user_id=user_id,
+    )
+    if unchanged:
+        return unchanged
     workItem = await crud_workItem.get_single_with_details(
         db=db, item_id=workItem_id, user_id=user_id
     )
@@ -105,6 +209,7 @@ async def read_workItem_by_id_endpoint(
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Project not found"
         )
+    set_etag(response, workItem.id, workItem.updated_at)
     return workItem
 
 
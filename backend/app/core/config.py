@@ -3,32 +3,34 @@ import os
 import logging
 from pydantic import AnyHttpUrl, EmailStr, validator
 from pydantic_settings import BaseSettings
-from typing import List, Union, Optional
+from typing import Dict, List, Union, Optional
 import json
 
+from app.models.invoice import InvoiceLineGrouping, LineGrouping
+
 logger = logging.getLogger(__name__)
 
 # --- Determine which .env file to load ---
 ENV_VAR_FOR_ENV_FILE = "APP_ENV_FILE"
 DEFAULT_ENV_FILE = ".env.local"  # Changed default for convenience
 
-env_file_path = os.getenv(ENV_VAR_FOR_ENV_FILE, DEFAULT_ENV_FILE)
 
-if not os.path.exists(env_file_path):
-    logger.warning(
-        f"Specified environment file '{env_file_path}' not found. Trying '.env' or system vars."
-    )
+def resolve_env_file() -> Optional[str]:
+    """
+    $APP_ENV_FILE (default '.env.local'), else '.env', else None (environment
+    variables only). Silent: what was chosen is logged by log_settings_summary()
+    at startup, not as a side effect of importing the app.
+    """
+    env_file_path = os.getenv(ENV_VAR_FOR_ENV_FILE, DEFAULT_ENV_FILE)
+    if os.path.exists(env_file_path):
+        return env_file_path
     # Fallback logic if needed, e.g., try plain '.env'
     if os.path.exists(".env"):
-        env_file_path = ".env"
-        logger.info("Falling back to loading settings from '.env'")
-    else:
-        env_file_path = None  # Let pydantic-settings use only system env vars
-        logger.info(
-            "No '.env' file found. Loading settings solely from environment variables."
-        )
-else:
-    logger.info(f"Loading settings from environment file: '{env_file_path}'")
+        return ".env"
+    return None  # Let pydantic-settings use only system env vars
+
+
+env_file_path = resolve_env_file()
 
 
 class Settings(BaseSettings):
@@ -65,6 +67,108 @@ class Settings(BaseSettings):
     YOUR_BANK_NAME: Optional[str] = None
 
     MONGODB_URL: str
+
+    # --- MongoDB client (passed to AsyncIOMotorClient in core/db.py) ---
+    MONGODB_MAX_POOL_SIZE: int = 100  # Per server, per process
+    MONGODB_MIN_POOL_SIZE: int = 0
+    MONGODB_MAX_IDLE_TIME_MS: Optional[int] = None  # None = keep idle connections
+    MONGODB_SERVER_SELECTION_TIMEOUT_MS: int = 30000
+    # Comma-separated wire compressors in order of preference, e.g. "zstd,snappy,zlib"
+    # (zstd needs `zstandard`, snappy needs `python-snappy`; missing ones are skipped)
+    MONGODB_COMPRESSORS: str = ""
+    MONGODB_READ_PREFERENCE: str = "primary"  # Default for all reads and writes
+    # Read preference for dashboard/report reads (see deps.get_analytics_db).
+    # Opt in to e.g. "secondaryPreferred" to offload them; secondaries may lag,
+    # so those reads can miss the latest writes
+    MONGODB_ANALYTICS_READ_PREFERENCE: str = "primary"
+
+    # --- Work item listing ---
+    # How project/client names are attached to work item listings:
+    # "cache"  -> plain find + in-memory join from the per-user name cache
+    # "lookup" -> $lookup aggregation into projects/clients on every request
+    # "denormalized" -> names stored on each work item (see scripts/check_name_drift.py)
+    WORK_ITEM_NAME_RESOLUTION: str = "cache"
+    NAME_CACHE_TTL_SECONDS: int = 300  # Safety net for writes from other processes
+    # Invalidations stored in Mongo, seen by every worker (set by app.server)
+    NAME_CACHE_SHARED: bool = False
+    # POST /workItems/bulk: largest accepted import and insert_many batch size
+    WORK_ITEM_IMPORT_MAX_ITEMS: int = 5000
+    # Characters one JSON work item or CSV row may take before the import fails
+    WORK_ITEM_IMPORT_MAX_ITEM_SIZE: int = 262144
+    WORK_ITEM_IMPORT_CHUNK_SIZE: int = 500
+
+    # --- Server (python -m app.server) ---
+    SERVER_HOST: str = "0.0.0.0"
+    SERVER_PORT: int = 8000
+    # Worker processes; None = one per CPU core
+    WEB_CONCURRENCY: Optional[int] = None
+
+    # --- Response cache (see core/response_cache.py) ---
+    RESPONSE_CACHE_ENABLED: bool = True
+    # "memory" (per process), "mongo" (shared by all workers) or "module:Class"
+    RESPONSE_CACHE_BACKEND: str = "memory"
+    RESPONSE_CACHE_TTL_SECONDS: int = 300  # Safety net; writes invalidate precisely
+    RESPONSE_CACHE_MAX_ENTRIES: int = 10000  # Memory backend, per process
+    # Browsers keep the body but revalidate with If-None-Match (answered with 304)
+    RESPONSE_CACHE_CONTROL: str = "private, no-cache"
+
+    # --- Rate limits (see core/rate_limit.py) ---
+    RATE_LIMIT_ENABLED: bool = True
+    # "memory" (per process) or "mongo" (token buckets shared by all workers)
+    RATE_LIMIT_BACKEND: str = "memory"
+    # Per route and user: token bucket (per_minute, burst) + requests in flight
+    # per worker (concurrency, 0 = no cap). Env: JSON, replaces the whole dict
+    RATE_LIMITS: Dict[str, Dict[str, float]] = {
+        "invoice_create": {"per_minute": 20, "burst": 5, "concurrency": 2},
+        "invoice_pdf": {"per_minute": 30, "burst": 10, "concurrency": 2},
+        "dashboard": {"per_minute": 120, "burst": 30, "concurrency": 4},
+    }
+
+    # --- Live updates (see services/live_updates.py) ---
+    LIVE_UPDATES_ENABLED: bool = True
+    # "auto" (change stream, polling on standalone mongod), "change_stream", "polling"
+    LIVE_UPDATES_MODE: str = "auto"
+    LIVE_UPDATES_POLL_SECONDS: float = 2.0
+    LIVE_UPDATES_HEARTBEAT_SECONDS: int = 15  # Keeps proxies from closing idle streams
+    LIVE_UPDATES_QUEUE_SIZE: int = 100  # Per stream; overflow makes the client resync
+
+    # --- Startup (see core/health.py) ---
+    # Import WeasyPrint and build the PDF fonts/templates in the background right
+    # after startup, so the first invoice PDF doesn't pay for it. Off: on first use
+    PDF_WARMUP_ON_STARTUP: bool = True
+
+    # --- Health probes (GET /healthz, /readyz; see services/health_checks.py) ---
+    HEALTH_CHECK_CACHE_SECONDS: float = 2.0  # At most one probe run per interval
+    HEALTH_MONGO_TIMEOUT_SECONDS: float = 1.0  # Ping slower than this = not ready
+    # Not ready while a pool has this fraction of maxPoolSize checked out
+    HEALTH_POOL_SATURATION: float = 0.9
+    HEALTH_PDF_BACKLOG_LIMIT: int = 20  # Not ready with more pending PDF jobs
+
+    # --- Invoices ---
+    # Default line item grouping: "entry", "work_item", "project_rate" or "day"
+    INVOICE_LINE_GROUPING: LineGrouping = InvoiceLineGrouping.ENTRY
+
+    # --- Instrumentation ---
+    METRICS_ENABLED: bool = True  # Prometheus /metrics, request + Mongo command metrics
+    # Scrapers send "Authorization: Bearer <token>"; unset: /metrics only answers
+    # clients on this host (sidecar, port-forward)
+    METRICS_TOKEN: str = ""
+
+    # --- Request profiling (see core/profiling.py) ---
+    PROFILING_ENABLED: bool = False
+    PROFILING_HEADER: str = "X-Profile"  # Send "X-Profile: 1" to profile a request
+    PROFILING_SAMPLE_RATE: float = 0.0  # Fraction of requests profiled at random
+    PROFILING_SLOW_REQUEST_MS: Optional[int] = 1000  # Keep traces of slower requests
+    PROFILING_MAX_ARTIFACTS: int = 50  # Per process, oldest dropped first
+    # Comma-separated JWT subs allowed on the /admin endpoints
+    ADMIN_USER_IDS: str = ""
+
+    # --- Aggregation diagnostics ---
+    # Opt-in: hint a matching app index on aggregations (overrides the planner)
+    QUERY_INDEX_HINTS: bool = False
+    # Opt-in: log executionStats for aggregations slower than this (ms)
+    QUERY_EXPLAIN_SLOW_MS: Optional[int] = None
+
     SECRET_KEY: str
     ALGORITHM: str = "RS256"  # Changed default from HS256
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
@@ -84,23 +188,39 @@ class Settings(BaseSettings):
     HTTPX_VERIFY_SSL: bool = True  # Default to True (verify SSL certs)
 
     class Config:
-        env_file = (
-            env_file_path if env_file_path and os.path.exists(env_file_path) else None
-        )
+        env_file = env_file_path
         env_file_encoding = "utf-8"
         extra = "ignore"
 
 
 settings = Settings()
 
-logger.info(f"Project Name: {settings.PROJECT_NAME}")
-logger.info(f"MongoDB URL Host: {settings.MONGODB_URL.split('@')[-1].split('/')[0]}")
-logger.info(
-    f"HTTPX SSL Verification Enabled: {settings.HTTPX_VERIFY_SSL}"
-)  # Log the setting status
-if not settings.HTTPX_VERIFY_SSL:
-    logger.warning("*****************************************************")
-    logger.warning("* WARNING: HTTPX SSL Verification is DISABLED!      *")
-    logger.warning("* This is insecure and should ONLY be used for      *")
-    logger.warning("* local development with trusted self-signed certs. *")
-    logger.warning("*****************************************************")
+
+def log_settings_summary() -> None:
+    """Logs where settings came from and the security-relevant ones (startup)."""
+    requested = os.getenv(ENV_VAR_FOR_ENV_FILE, DEFAULT_ENV_FILE)
+    if env_file_path is None:
+        logger.warning(
+            f"Specified environment file '{requested}' not found. "
+            "No '.env' file found. Loading settings solely from environment variables."
+        )
+    elif env_file_path != requested:
+        logger.warning(
+            f"Specified environment file '{requested}' not found. "
+            f"Falling back to loading settings from '{env_file_path}'"
+        )
+    else:
+        logger.info(f"Loading settings from environment file: '{env_file_path}'")
+    logger.info(f"Project Name: {settings.PROJECT_NAME}")
+    logger.info(
+        f"MongoDB URL Host: {settings.MONGODB_URL.split('@')[-1].split('/')[0]}"
+    )
+    logger.info(
+        f"HTTPX SSL Verification Enabled: {settings.HTTPX_VERIFY_SSL}"
+    )  # Log the setting status
+    if not settings.HTTPX_VERIFY_SSL:
+        logger.warning("*****************************************************")
+        logger.warning("* WARNING: HTTPX SSL Verification is DISABLED!      *")
+        logger.warning("* This is insecure and should ONLY be used for      *")
+        logger.warning("* local development with trusted self-signed certs. *")
+        logger.warning("*****************************************************")
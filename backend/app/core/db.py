@@ -1,11 +1,17 @@
 # backend/app/core/db.py
 from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
+from pymongo import ASCENDING, DESCENDING
 from pymongo.errors import ConnectionFailure
+from pymongo.read_preferences import make_read_preference, read_pref_mode_from_name
 
 # No need to import CodecOptions here anymore
 from pymongo.uri_parser import parse_uri  # Import the URI parser
 from .config import settings
+from .db_metrics import pool_metrics
+from .metrics import command_metrics
+from .profiling import command_recorder
 import logging
+import os
 
 logger = logging.getLogger(__name__)
 
@@ -13,22 +19,120 @@ logger = logging.getLogger(__name__)
 class DataBase:
     client: AsyncIOMotorClient = None
     db: AsyncIOMotorDatabase = None
+    # Process that opened the client; a Motor client must not cross a fork, so
+    # each worker connects in its own lifespan (see get_database)
+    pid: int = None
 
 
 db = DataBase()
 
+# Indexes backing the hot listing queries: (collection, keys, options)
+INDEXES = [
+    ("workItems", [("user_id", ASCENDING), ("created_at", DESCENDING)], {}),
+    # Date range filters and monthly/daily rollups (see crud/work_dates.py)
+    ("workItems", [("user_id", ASCENDING), ("work_date", ASCENDING)], {}),
+    ("projects", [("user_id", ASCENDING), ("name", ASCENDING)], {}),
+    ("clients", [("user_id", ASCENDING), ("name", ASCENDING)], {}),
+    # Uninvoiced work items only (crud/billable.py): what is left to bill
+    (
+        "workItems",
+        [("user_id", ASCENDING), ("project_id", ASCENDING)],
+        {
+            "partialFilterExpression": {"is_invoiced": False},
+            "name": "uninvoiced_work_items",
+        },
+    ),
+    # Invoice analytics store keys, one document per key (crud/invoice_analytics.py)
+    (
+        "analytics_revenue",
+        [
+            ("user_id", ASCENDING),
+            ("month", ASCENDING),
+            ("client_id", ASCENDING),
+            ("project_id", ASCENDING),
+        ],
+        {"unique": True},
+    ),
+    (
+        "analytics_receivables",
+        [("user_id", ASCENDING), ("due_date", ASCENDING)],
+        {"unique": True},
+    ),
+    (
+        "analytics_payments",
+        [("user_id", ASCENDING), ("month", ASCENDING)],
+        {"unique": True},
+    ),
+    # Live update polling: a user's writes since the watermark (services/live_updates.py)
+    ("workItems", [("user_id", ASCENDING), ("updated_at", ASCENDING)], {}),
+    ("invoices", [("user_id", ASCENDING), ("updated_at", ASCENDING)], {}),
+    ("events", [("user_id", ASCENDING), ("timestamp", ASCENDING)], {}),
+    # Expires entries of the shared response cache backend (core/response_cache.py)
+    ("response_cache", [("expires_at", ASCENDING)], {"expireAfterSeconds": 0}),
+    # Expires idle token buckets of the shared rate limit backend (core/rate_limit.py)
+    ("rate_limits", [("expires_at", ASCENDING)], {"expireAfterSeconds": 0}),
+]
+
+# Indexes known to exist in this process, by collection (used for query hints)
+ENSURED_INDEXES = {}
+
+
+async def ensure_indexes(database: AsyncIOMotorDatabase):
+    """Creates the application indexes (no-op for indexes that already exist)."""
+    for collection_name, keys, options in INDEXES:
+        index_name = await database[collection_name].create_index(keys, **options)
+        logger.debug(f"Ensured index '{index_name}' on '{collection_name}'")
+        known = ENSURED_INDEXES.setdefault(collection_name, [])
+        if "partialFilterExpression" not in options and keys not in known:
+            known.append(keys)
+
+
+def read_preference(mode_name: str):
+    """Parses a read preference mode name such as "secondaryPreferred"."""
+    return make_read_preference(read_pref_mode_from_name(mode_name), None)
+
+
+def mongo_client_options() -> dict:
+    """Keyword arguments for AsyncIOMotorClient, built from the settings."""
+    options = {
+        "uuidRepresentation": "standard",
+        "maxPoolSize": settings.MONGODB_MAX_POOL_SIZE,
+        "minPoolSize": settings.MONGODB_MIN_POOL_SIZE,
+        "serverSelectionTimeoutMS": settings.MONGODB_SERVER_SELECTION_TIMEOUT_MS,
+        "read_preference": read_preference(settings.MONGODB_READ_PREFERENCE),
+        "event_listeners": [pool_metrics],  # Pool utilization counters
+    }
+    if settings.METRICS_ENABLED:
+        options["event_listeners"].append(command_metrics)  # Per-command latency
+    if settings.PROFILING_ENABLED:
+        options["event_listeners"].append(command_recorder)  # Per-request traces
+    if settings.MONGODB_MAX_IDLE_TIME_MS is not None:
+        options["maxIdleTimeMS"] = settings.MONGODB_MAX_IDLE_TIME_MS
+    compressors = [
+        name.strip() for name in settings.MONGODB_COMPRESSORS.split(",") if name.strip()
+    ]
+    if compressors:
+        # pymongo warns about and skips compressors whose library is missing
+        options["compressors"] = compressors
+    return options
+
 
 async def connect_to_mongo():
     logger.info("Connecting to MongoDB...")
     try:
-        uuid_representation = "standard"
+        client_options = mongo_client_options()
         logger.info(
-            f"Configuring MongoDB client with uuidRepresentation='{uuid_representation}'"
+            "Configuring MongoDB client with "
+            + ", ".join(
+                f"{key}={value}"
+                for key, value in client_options.items()
+                if key != "event_listeners"
+            )
         )
 
-        db.client = AsyncIOMotorClient(
-            settings.MONGODB_URL, uuidRepresentation=uuid_representation
-        )
+        pool_metrics.max_pool_size = settings.MONGODB_MAX_POOL_SIZE
+        db.client = AsyncIOMotorClient(settings.MONGODB_URL, **client_options)
+        db.pid = os.getpid()
 
         # --- Get Database Name from URI or Default ---
         # Method 1: Use pymongo's URI parser (more robust)
@@ -61,6 +165,8 @@ async def connect_to_mongo():
         await db.client.admin.command("ping")
         logger.info(f"Successfully connected to MongoDB database '{db_name}'.")
 
+        await ensure_indexes(db.db)
+
     except ConnectionFailure as e:
         logger.error(f"MongoDB connection failed: {e}")
         raise
@@ -76,9 +182,15 @@ async def close_mongo_connection():
     if db.client:
         db.client.close()
         logger.info("MongoDB connection closed.")
+    db.client = db.db = db.pid = None
 
 
 async def get_database() -> AsyncIOMotorDatabase:
+    if db.db is not None and db.pid != os.getpid():
+        # Inherited from the parent process: drop it without closing (closing
+        # would act on the parent's sockets) and connect from this worker
+        logger.warning(f"MongoDB client was opened in process {db.pid}, reconnecting")
+        db.client = db.db = db.pid = None
     if db.db is None:
         logger.warning(
             "Database not initialized. Attempting connection (this shouldn't happen in normal flow)."
@@ -0,0 +1,141 @@
+# backend/app/core/db_metrics.py
+import threading
+from typing import Callable, Dict, List
+from pymongo import monitoring
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class _PoolStats:
+    def __init__(self):
+        self.open = 0  # Connections created and not yet closed
+        self.checked_out = 0  # Connections currently lent to operations
+        self.waiting = 0  # Operations waiting for a connection
+        self.checkouts = 0
+        self.checkout_failures = 0
+        self.clears = 0
+        self.checkout_wait_seconds = 0.0
+
+
+class PoolMetrics(monitoring.ConnectionPoolListener):
+    """
+    Connection pool listener keeping per-server utilization counters.
+
+    Registered on the Motor client in connect_to_mongo(); pymongo calls the
+    handlers from its own threads, hence the lock.
+    """
+
+    def __init__(self, max_pool_size: int = 0):
+        self.max_pool_size = max_pool_size
+        self._stats: Dict[str, _PoolStats] = {}
+        self._lock = threading.Lock()
+        # Called with snapshot() after every change (multiprocess metrics)
+        self.observers: List[Callable[[Dict[str, dict]], None]] = []
+
+    def _changed(self) -> None:
+        if self.observers:
+            snapshot = self.snapshot()
+            for observer in self.observers:
+                observer(snapshot)
+
+    @staticmethod
+    def _key(event) -> str:
+        host, port = event.address
+        return f"{host}:{port}"
+
+    def _pool(self, event) -> _PoolStats:
+        return self._stats.setdefault(self._key(event), _PoolStats())
+
+    # --- Pool lifecycle ---
+    def pool_created(self, event):
+        with self._lock:
+            self._pool(event)
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        with self._lock:
+            self._pool(event).clears += 1
+
+    def pool_closed(self, event):
+        with self._lock:
+            self._stats.pop(self._key(event), None)
+        self._changed()
+
+    # --- Connections ---
+    def connection_created(self, event):
+        with self._lock:
+            self._pool(event).open += 1
+        self._changed()
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        with self._lock:
+            pool = self._pool(event)
+            pool.open = max(pool.open - 1, 0)
+        self._changed()
+
+    # --- Checkouts ---
+    def connection_check_out_started(self, event):
+        with self._lock:
+            self._pool(event).waiting += 1
+        self._changed()
+
+    def connection_checked_out(self, event):
+        with self._lock:
+            pool = self._pool(event)
+            pool.waiting = max(pool.waiting - 1, 0)
+            pool.checked_out += 1
+            pool.checkouts += 1
+            # Time spent waiting for the connection (seconds, pymongo >= 4.7)
+            pool.checkout_wait_seconds += getattr(event, "duration", None) or 0.0
+        self._changed()
+
+    def connection_check_out_failed(self, event):
+        with self._lock:
+            pool = self._pool(event)
+            pool.waiting = max(pool.waiting - 1, 0)
+            pool.checkout_failures += 1
+        self._changed()
+
+    def connection_checked_in(self, event):
+        with self._lock:
+            pool = self._pool(event)
+            pool.checked_out = max(pool.checked_out - 1, 0)
+        self._changed()
+
+    # --- Reading ---
+    def snapshot(self) -> Dict[str, dict]:
+        """Per-server pool utilization, keyed by "host:port"."""
+        with self._lock:
+            result = {}
+            for address, pool in self._stats.items():
+                result[address] = {
+                    "max_pool_size": self.max_pool_size,
+                    "open": pool.open,
+                    "checked_out": pool.checked_out,
+                    "waiting": pool.waiting,
+                    "utilization": (
+                        pool.checked_out / self.max_pool_size
+                        if self.max_pool_size
+                        else 0.0
+                    ),
+                    "checkouts": pool.checkouts,
+                    "checkout_failures": pool.checkout_failures,
+                    "avg_checkout_wait_ms": (
+                        pool.checkout_wait_seconds * 1000 / pool.checkouts
+                        if pool.checkouts
+                        else 0.0
+                    ),
+                    "clears": pool.clears,
+                }
+            return result
+
+
+# Single instance shared by the Motor client and the metrics endpoint
+pool_metrics = PoolMetrics()
@@ -0,0 +1,85 @@
+# backend/app/core/health.py
+"""
+Liveness vs. readiness of this worker process.
+
+GET /healthz (liveness) answers as soon as the process serves requests and
+never fails on dependencies: restarting a worker because Mongo is slow only
+makes things worse. GET /readyz answers 503 until the lifespan startup (Mongo
+client, background tasks) has finished, and afterwards while a dependency
+check fails (services/health_checks.py), so a load balancer or orchestrator
+only sends traffic to workers that can serve it.
+
+Optional warm-ups (e.g. importing WeasyPrint for the first invoice PDF) run in
+the background after startup; they are reported by /readyz but never gate it.
+"""
+import asyncio
+import logging
+import time
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class StartupState:
+    def __init__(self):
+        self.started_at = time.monotonic()
+        self.ready_at: Optional[float] = None
+        # Warm-up name -> "running", "done" or "failed"
+        self.warmups: Dict[str, str] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+    @property
+    def ready(self) -> bool:
+        return self.ready_at is not None
+
+    def begin(self) -> None:
+        """Start of the lifespan: not ready until mark_ready()."""
+        self.started_at = time.monotonic()
+        self.ready_at = None
+
+    def mark_ready(self) -> None:
+        self.ready_at = time.monotonic()
+        logger.info(
+            f"Startup complete in {self.ready_at - self.started_at:.2f}s, ready"
+        )
+
+    def mark_stopping(self) -> None:
+        """Shutdown: fail readiness so traffic drains before the pool closes."""
+        self.ready_at = None
+
+    def warm_up(self, name: str, func: Callable[[], Any]) -> None:
+        """Runs the blocking `func` in a thread without delaying readiness."""
+
+        async def run():
+            self.warmups[name] = "running"
+            start = time.perf_counter()
+            try:
+                await asyncio.to_thread(func)
+            except Exception as e:
+                self.warmups[name] = "failed"
+                logger.warning(f"Warm-up '{name}' failed: {e}")
+                return
+            self.warmups[name] = "done"
+            logger.info(f"Warm-up '{name}' done in {time.perf_counter() - start:.2f}s")
+
+        self._tasks[name] = asyncio.create_task(run())
+
+    async def cancel_warmups(self) -> None:
+        for task in self._tasks.values():
+            task.cancel()  # Only stops waiting; the thread finishes on its own
+        await asyncio.gather(*self._tasks.values(), return_exceptions=True)
+        self._tasks.clear()
+
+    def report(self) -> Dict[str, Any]:
+        if self.ready:
+            startup = {"seconds": round(self.ready_at - self.started_at, 3)}
+        else:
+            startup = {"waiting_seconds": round(time.monotonic() - self.started_at, 3)}
+        return {
+            "status": "ready" if self.ready else "starting",
+            "startup": startup,
+            "warmups": dict(self.warmups),
+        }
+
+
+startup_state = StartupState()
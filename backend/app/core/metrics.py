@@ -0,0 +1,281 @@
+# backend/app/core/metrics.py
+import os
+import threading
+import time
+from typing import Dict, Tuple
+from prometheus_client import (
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    REGISTRY,
+    generate_latest,
+    multiprocess,
+)
+from prometheus_client.core import GaugeMetricFamily
+from pymongo import monitoring
+from starlette.routing import Match
+
+from .db_metrics import pool_metrics
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Several workers (app/server.py): every process writes its samples to files in
+# this directory and a scrape of any worker aggregates them. Gauges declare how
+# the workers' values are combined.
+MULTIPROCESS = bool(os.environ.get("PROMETHEUS_MULTIPROC_DIR"))
+
+# --- HTTP ---
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template",
+    ["method", "route", "status"],
+)
+HTTP_REQUESTS_IN_PROGRESS = Gauge(
+    "http_requests_in_progress",
+    "HTTP requests currently being served",
+    ["method"],
+    multiprocess_mode="livesum",
+)
+
+# --- MongoDB commands ---
+MONGO_COMMAND_DURATION = Histogram(
+    "mongo_command_duration_seconds",
+    "MongoDB command latency by collection and command",
+    ["collection", "command"],
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5),
+)
+MONGO_COMMAND_DOCUMENTS = Counter(
+    "mongo_command_documents",
+    "Documents returned (reads) or affected (writes) by MongoDB commands",
+    ["collection", "command"],
+)
+MONGO_COMMAND_FAILURES = Counter(
+    "mongo_command_failures",
+    "Failed MongoDB commands",
+    ["collection", "command"],
+)
+
+# --- Application ---
+PDF_RENDERS = Counter("pdf_renders", "Invoice PDF renders", ["outcome"])
+PDF_RENDER_DURATION = Histogram(
+    "pdf_render_duration_seconds",
+    "Invoice PDF render time",
+    buckets=(0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+)
+JWKS_FETCHES = Counter(
+    "jwks_fetches", "JWKS fetches from the identity provider", ["outcome"]
+)
+EVENT_FLUSHES = Counter(
+    "event_flushes", "Event documents written to the events collection", ["outcome"]
+)
+LIVE_UPDATE_SUBSCRIBERS = Gauge(
+    "live_update_subscribers",
+    "Open live update streams (GET /live/stream)",
+    multiprocess_mode="livesum",
+)
+LIVE_UPDATE_MESSAGES = Counter(
+    "live_update_messages", "Changes published to live update streams", ["collection"]
+)
+RATE_LIMIT_DECISIONS = Counter(
+    "rate_limit_decisions",
+    "Rate limited route requests by outcome (allowed, rate_limited, concurrency_limited)",
+    ["route", "outcome"],
+)
+RATE_LIMIT_IN_FLIGHT = Gauge(
+    "rate_limit_in_flight",
+    "Requests holding a rate limited route slot",
+    ["route"],
+    multiprocess_mode="livesum",
+)
+RESPONSE_CACHE_REQUESTS = Counter(
+    "response_cache_requests",
+    "Cached endpoint requests by outcome (hit, miss, not_modified)",
+    ["route", "outcome"],
+)
+
+
+def is_event_stream(message) -> bool:
+    """
+    Whether an http.response.start message starts a server-sent events stream
+    (GET /live/stream): open for as long as the client listens, so its
+    duration says nothing about how fast the request was served.
+    """
+    for name, value in message.get("headers", []):
+        if name.lower() == b"content-type":
+            return value.split(b";")[0].strip().lower() == b"text/event-stream"
+    return False
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording request latency per route template
+    (e.g. /api/v1/workItems/{item_id}), so IDs don't blow up the label set.
+    Event streams are left out of the latency histogram.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status_holder = {"status": 500}  # Unhandled exceptions count as 500
+        stream_holder = {"event_stream": False}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status_holder["status"] = message["status"]
+                stream_holder["event_stream"] = is_event_stream(message)
+            await send(message)
+
+        HTTP_REQUESTS_IN_PROGRESS.labels(method).inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            HTTP_REQUESTS_IN_PROGRESS.labels(method).dec()
+            if not stream_holder["event_stream"]:
+                HTTP_REQUEST_DURATION.labels(
+                    method, route_template(scope), str(status_holder["status"])
+                ).observe(elapsed)
+
+
+def route_template(scope) -> str:
+    """Path template of the route matching the request, "<unmatched>" if none."""
+    app = scope.get("app")
+    router = getattr(app, "router", None)
+    for route in getattr(router, "routes", []):
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return getattr(route, "path", scope["path"])
+    return "<unmatched>"
+
+
+class CommandMetrics(monitoring.CommandListener):
+    """
+    pymongo command listener feeding the mongo_command_* metrics.
+
+    Registered on the Motor client in connect_to_mongo() (see
+    core/db.mongo_client_options).
+    """
+
+    def __init__(self):
+        self._collections: Dict[Tuple[int, object], str] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(event) -> Tuple[int, object]:
+        return event.request_id, event.connection_id
+
+    def started(self, event):
+        collection = command_collection(event)
+        with self._lock:
+            self._collections[self._key(event)] = collection
+
+    def succeeded(self, event):
+        with self._lock:
+            collection = self._collections.pop(self._key(event), "")
+        labels = (collection, event.command_name)
+        MONGO_COMMAND_DURATION.labels(*labels).observe(event.duration_micros / 1e6)
+        documents = reply_document_count(event.reply)
+        if documents:
+            MONGO_COMMAND_DOCUMENTS.labels(*labels).inc(documents)
+
+    def failed(self, event):
+        with self._lock:
+            collection = self._collections.pop(self._key(event), "")
+        labels = (collection, event.command_name)
+        MONGO_COMMAND_DURATION.labels(*labels).observe(event.duration_micros / 1e6)
+        MONGO_COMMAND_FAILURES.labels(*labels).inc()
+
+
+def command_collection(event) -> str:
+    """Collection a CommandStartedEvent targets ("" for database-level commands)."""
+    command = event.command
+    # getMore carries the collection separately; other commands name it as the value
+    if event.command_name == "getMore":
+        target = command.get("collection")
+    else:
+        target = command.get(event.command_name)
+    return target if isinstance(target, str) else ""
+
+
+def reply_document_count(reply) -> int:
+    """Documents returned by a cursor reply or affected by a write reply."""
+    cursor = reply.get("cursor")
+    if isinstance(cursor, dict):
+        batch = cursor.get("firstBatch", cursor.get("nextBatch", []))
+        return len(batch)
+    n = reply.get("n")
+    return n if isinstance(n, int) else 0
+
+
+POOL_FIELDS = ("open", "checked_out", "waiting", "utilization")
+
+
+class PoolCollector:
+    """Exposes the connection pool counters of core/db_metrics as gauges."""
+
+    def collect(self):
+        families = {
+            field: GaugeMetricFamily(
+                f"mongo_pool_{field}",
+                f"MongoDB connection pool {field}",
+                labels=["server"],
+            )
+            for field in POOL_FIELDS
+        }
+        for server, stats in pool_metrics.snapshot().items():
+            for field in POOL_FIELDS:
+                families[field].add_metric([server], stats[field])
+        return list(families.values())
+
+
+# Multiprocess mode: collectors only see the scraped process, so each worker
+# publishes its pool as gauges (one series per worker pid) on every change
+POOL_GAUGES = {
+    field: Gauge(
+        f"mongo_pool_{field}",
+        f"MongoDB connection pool {field}",
+        ["server"],
+        registry=None,  # Read through the multiprocess files only
+        multiprocess_mode="liveall",
+    )
+    for field in POOL_FIELDS
+}
+
+
+def publish_pool_gauges(snapshot: Dict[str, dict]) -> None:
+    for server, stats in snapshot.items():
+        for field in POOL_FIELDS:
+            POOL_GAUGES[field].labels(server).set(stats[field])
+
+
+def render_metrics() -> bytes:
+    """Exposition of this process, or of all workers in multiprocess mode."""
+    if not MULTIPROCESS:
+        return generate_latest()
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return generate_latest(registry)
+
+
+def mark_worker_stopped() -> None:
+    """Drops this worker's live gauges from the aggregate (lifespan shutdown)."""
+    if MULTIPROCESS:
+        multiprocess.mark_process_dead(os.getpid())
+
+
+# Single listener instance registered on the Motor client
+command_metrics = CommandMetrics()
+if MULTIPROCESS:
+    pool_metrics.observers.append(publish_pool_gauges)
+else:
+    REGISTRY.register(PoolCollector())
@@ -0,0 +1,79 @@
+# backend/app/core/process_state.py
+"""
+Per-process state for multi-worker deployments (see app/server.py).
+
+Objects that must not be shared across a fork (network clients, caches
+filled from the network, template/font environments) are wrapped in
+ProcessLocal: built lazily on first use, rebuilt when used from another
+process than the one that built them, and dropped for the whole app by
+reset_process_state() at the start of each worker's lifespan. Importing
+the app before forking (e.g. gunicorn --preload) is therefore safe.
+"""
+import logging
+import os
+import threading
+import time
+from typing import Callable, Generic, List, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+_registry: List["ProcessLocal"] = []
+
+
+class ProcessLocal(Generic[T]):
+    """Lazily built value owned by the process that built it."""
+
+    def __init__(self, factory: Callable[[], T], name: str):
+        self.factory = factory
+        self.name = name
+        self._value: Optional[T] = None
+        self._pid: Optional[int] = None
+        # Wall-clock time of the last build (e.g. JWKS freshness on /readyz)
+        self.built_at: Optional[float] = None
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def get(self) -> T:
+        pid = os.getpid()
+        if self._pid != pid:
+            with self._lock:
+                if self._pid != pid:
+                    # A failing factory (e.g. JWKS fetch) leaves nothing cached
+                    self._value = self.factory()
+                    self._pid = pid
+                    self.built_at = time.time()
+        return self._value
+
+    @property
+    def is_set(self) -> bool:
+        return self._pid == os.getpid()
+
+    def reset(self) -> None:
+        with self._lock:
+            self._value = None
+            self._pid = None
+            self.built_at = None
+
+
+def _after_fork_in_child() -> None:
+    # Locks may have been held by a parent thread at fork time: replace them
+    for local in _registry:
+        local._lock = threading.Lock()
+        local._value = None
+        local._pid = None
+        local.built_at = None
+
+
+os.register_at_fork(after_in_child=_after_fork_in_child)
+
+
+def reset_process_state() -> None:
+    """Drops every ProcessLocal value; called once per worker on startup."""
+    for local in _registry:
+        local.reset()
+    logger.info(
+        f"Process state reset in worker {os.getpid()}: "
+        + ", ".join(local.name for local in _registry)
+    )
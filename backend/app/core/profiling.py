@@ -0,0 +1,252 @@
+# backend/app/core/profiling.py
+import contextvars
+import cProfile
+import io
+import pstats
+import random
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+from pymongo import monitoring
+
+from .config import settings
+from .metrics import (
+    command_collection,
+    is_event_stream,
+    reply_document_count,
+    route_template,
+)
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+try:  # Optional: async-aware wall-clock profiler, falls back to cProfile
+    from pyinstrument import Profiler as _Pyinstrument
+except ImportError:  # pragma: no cover - depends on the environment
+    _Pyinstrument = None
+
+
+class RequestTrace:
+    """Mongo commands issued while serving one request."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.commands: List[dict] = []
+        self._pending: Dict[tuple, tuple] = {}
+
+    def command_started(self, event):
+        self._pending[(event.request_id, event.connection_id)] = (
+            command_collection(event),
+            time.perf_counter(),
+        )
+
+    def command_finished(self, event, documents: int, failed: bool):
+        collection, started = self._pending.pop(
+            (event.request_id, event.connection_id), ("", time.perf_counter())
+        )
+        self.commands.append(
+            {
+                "collection": collection,
+                "command": event.command_name,
+                "offset_ms": round((started - self.started) * 1000, 3),
+                "duration_ms": round(event.duration_micros / 1000, 3),
+                "documents": documents,
+                "failed": failed,
+            }
+        )
+
+
+# Trace of the request being served; Motor copies the context into its
+# executor threads, so the command listener sees the right trace
+_current_trace: contextvars.ContextVar[Optional[RequestTrace]] = contextvars.ContextVar(
+    "request_trace", default=None
+)
+
+
+class CommandRecorder(monitoring.CommandListener):
+    """Appends Mongo commands to the trace of the current request, if any."""
+
+    def started(self, event):
+        trace = _current_trace.get()
+        if trace is not None:
+            trace.command_started(event)
+
+    def succeeded(self, event):
+        trace = _current_trace.get()
+        if trace is not None:
+            trace.command_finished(event, reply_document_count(event.reply), False)
+
+    def failed(self, event):
+        trace = _current_trace.get()
+        if trace is not None:
+            trace.command_finished(event, 0, True)
+
+
+class ProfileStore:
+    """Bounded in-memory store of profiling artifacts (oldest dropped first)."""
+
+    def __init__(self, max_items: int):
+        self.max_items = max_items
+        self._items: "OrderedDict[str, dict]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(self, artifact: dict):
+        with self._lock:
+            self._items[artifact["id"]] = artifact
+            while len(self._items) > self.max_items:
+                self._items.popitem(last=False)
+
+    def list(self) -> List[dict]:
+        """Artifact summaries, newest first (without the profile text)."""
+        with self._lock:
+            items = list(self._items.values())
+        return [
+            {key: value for key, value in item.items() if key != "profile"}
+            | {"mongo_commands": len(item["mongo_commands"])}
+            for item in reversed(items)
+        ]
+
+    def get(self, artifact_id: str) -> Optional[dict]:
+        with self._lock:
+            return self._items.get(artifact_id)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+
+class _RequestProfiler:
+    """Wall-clock profile of one request (pyinstrument if installed, else cProfile)."""
+
+    # Only one profiler can hook the interpreter at a time
+    _busy = threading.Lock()
+
+    def __init__(self):
+        self.engine = "pyinstrument" if _Pyinstrument else "cProfile"
+        self._profiler = None
+
+    def start(self) -> bool:
+        if not self._busy.acquire(blocking=False):
+            return False  # Another request is being profiled, keep the trace only
+        if _Pyinstrument:
+            self._profiler = _Pyinstrument(async_mode="enabled")
+            self._profiler.start()
+        else:
+            # perf_counter timer: wall time between call and return
+            self._profiler = cProfile.Profile(time.perf_counter)
+            self._profiler.enable()
+        return True
+
+    def stop(self) -> str:
+        try:
+            if _Pyinstrument:
+                self._profiler.stop()
+                return self._profiler.output_text(unicode=False, color=False)
+            self._profiler.disable()
+            output = io.StringIO()
+            stats = pstats.Stats(self._profiler, stream=output)
+            stats.sort_stats("cumulative").print_stats(40)
+            return output.getvalue()
+        finally:
+            self._busy.release()
+
+
+class ProfilingMiddleware:
+    """
+    Opt-in (PROFILING_ENABLED) request profiler.
+
+    Every request records its Mongo commands. Requests flagged with the
+    PROFILING_HEADER header, or sampled at PROFILING_SAMPLE_RATE, are also
+    profiled; requests slower than PROFILING_SLOW_REQUEST_MS are kept even
+    when not profiled. Artifacts are served by the /admin/profiles endpoints.
+    Event streams (/live/stream) are never kept: the profiler is released
+    when their response starts, and their lifetime isn't a slow request.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.header = settings.PROFILING_HEADER.lower().encode()
+
+    def _reason(self, scope) -> Optional[str]:
+        for name, value in scope.get("headers", []):
+            if name == self.header and value not in (b"", b"0", b"false"):
+                return "header"
+        sample_rate = settings.PROFILING_SAMPLE_RATE
+        if sample_rate and random.random() < sample_rate:
+            return "sampled"
+        return None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        artifact_id = uuid.uuid4().hex
+        reason = self._reason(scope)
+        profiler = _RequestProfiler() if reason else None
+        if profiler and not profiler.start():
+            profiler = None
+        status_holder = {"status": 500, "event_stream": False}
+
+        async def send_wrapper(message):
+            nonlocal profiler
+            if message["type"] == "http.response.start":
+                status_holder["status"] = message["status"]
+                if is_event_stream(message):
+                    status_holder["event_stream"] = True
+                    # Don't hold the interpreter-wide profiler for hours
+                    if profiler:
+                        profiler.stop()
+                        profiler = None
+                elif reason:
+                    headers = list(message.get("headers", []))
+                    headers.append((b"x-profile-id", artifact_id.encode()))
+                    message = {**message, "headers": headers}
+            await send(message)
+
+        trace = RequestTrace()
+        token = _current_trace.set(trace)
+        started_at = datetime.now(timezone.utc)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current_trace.reset(token)
+            duration_ms = (time.perf_counter() - trace.started) * 1000
+            profile_text = profiler.stop() if profiler else None
+
+            slow_ms = settings.PROFILING_SLOW_REQUEST_MS
+            if not reason and slow_ms is not None and duration_ms >= slow_ms:
+                reason = "slow"
+            if reason and not status_holder["event_stream"]:
+                profile_store.add(
+                    {
+                        "id": artifact_id,
+                        "reason": reason,
+                        "method": scope["method"],
+                        "path": scope["path"],
+                        "route": route_template(scope),
+                        "status": status_holder["status"],
+                        "started_at": started_at.isoformat(),
+                        "duration_ms": round(duration_ms, 3),
+                        "mongo_time_ms": round(
+                            sum(c["duration_ms"] for c in trace.commands), 3
+                        ),
+                        "mongo_commands": trace.commands,
+                        "profiler": profiler.engine if profiler else None,
+                        "profile": profile_text,
+                    }
+                )
+                logger.info(
+                    f"Profiling: stored {reason} artifact {artifact_id} for "
+                    f"{scope['method']} {scope['path']} ({duration_ms:.1f} ms, "
+                    f"{len(trace.commands)} Mongo commands)"
+                )
+
+
+# Single instances shared by the middleware, the Motor client and the admin endpoints
+command_recorder = CommandRecorder()
+profile_store = ProfileStore(settings.PROFILING_MAX_ARTIFACTS)
@@ -0,0 +1,207 @@
+# backend/app/core/rate_limit.py
+"""
+Per-user rate limits and concurrency caps for expensive endpoints.
+
+Each limited route has a policy in RATE_LIMITS (name -> per_minute, burst,
+concurrency), applied per JWT `sub`:
+  - a token bucket of `burst` requests, refilled at `per_minute`
+  - at most `concurrency` requests of that user in flight in this worker
+Requests over a limit get 429 with Retry-After.
+
+Limits are applied after authentication (deps.rate_limit, or rate_limiter.limit
+around the expensive part of an endpoint), so the key is a verified user id:
+keying a middleware on an unverified token would let anyone drain another
+user's budget.
+
+Bucket backends (RATE_LIMIT_BACKEND):
+  "memory" -> per-process buckets (default)
+  "mongo"  -> shared by all workers/instances (`rate_limits` collection)
+Concurrency caps are always per worker: they protect that worker's event loop
+and connection pool.
+"""
+import logging
+import math
+import threading
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import AsyncIterator, Dict, Optional, Tuple
+
+from fastapi import HTTPException, status
+from pymongo import ReturnDocument
+
+from app.core.config import settings
+from app.core.db import get_database
+from app.core.metrics import RATE_LIMIT_DECISIONS, RATE_LIMIT_IN_FLIGHT
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class RateLimitPolicy:
+    per_minute: float
+    burst: int
+    concurrency: int
+
+    @property
+    def per_second(self) -> float:
+        return self.per_minute / 60
+
+
+class MemoryBuckets:
+    """Token buckets of this process: key -> (tokens, time.monotonic())."""
+
+    def __init__(self):
+        self._buckets: Dict[str, Tuple[float, float]] = {}
+        self._lock = threading.Lock()
+
+    async def take(self, key: str, policy: RateLimitPolicy) -> float:
+        """Takes a token; returns 0 or the seconds until one is available."""
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.get(key, (policy.burst, now))
+            tokens = min(policy.burst, tokens + (now - updated) * policy.per_second)
+            if tokens >= 1:
+                self._buckets[key] = (tokens - 1, now)
+                return 0.0
+            self._buckets[key] = (tokens, now)
+            return (1 - tokens) / policy.per_second
+
+    async def clear(self) -> None:
+        with self._lock:
+            self._buckets.clear()
+
+
+class MongoBuckets:
+    """
+    Buckets shared by all workers: one document per key in `rate_limits`,
+    refilled and taken from in a single atomic pipeline update (server clock).
+    Idle buckets expire via the TTL index on expires_at (core/db.py).
+    """
+
+    COLLECTION = "rate_limits"
+
+    async def take(self, key: str, policy: RateLimitPolicy) -> float:
+        db = await get_database()
+        elapsed_ms = {"$subtract": ["$$NOW", {"$ifNull": ["$updated_at", "$$NOW"]}]}
+        refilled = {
+            "$min": [
+                policy.burst,
+                {
+                    "$add": [
+                        {"$ifNull": ["$tokens", policy.burst]},
+                        {"$multiply": [elapsed_ms, policy.per_second / 1000]},
+                    ]
+                },
+            ]
+        }
+        # A full refill takes burst / rate; the document is useless after that
+        idle_ms = math.ceil(policy.burst / policy.per_second * 1000)
+        doc = await db[self.COLLECTION].find_one_and_update(
+            {"_id": key},
+            [
+                {"$set": {"tokens": refilled, "updated_at": "$$NOW"}},
+                {"$set": {"allowed": {"$gte": ["$tokens", 1]}}},
+                {
+                    "$set": {
+                        "tokens": {
+                            "$cond": [
+                                "$allowed",
+                                {"$subtract": ["$tokens", 1]},
+                                "$tokens",
+                            ]
+                        },
+                        "expires_at": {"$add": ["$$NOW", idle_ms]},
+                    }
+                },
+            ],
+            upsert=True,
+            return_document=ReturnDocument.AFTER,
+        )
+        if doc["allowed"]:
+            return 0.0
+        return (1 - doc["tokens"]) / policy.per_second
+
+    async def clear(self) -> None:
+        db = await get_database()
+        await db[self.COLLECTION].delete_many({})
+
+
+def load_policies(raw: Dict[str, Dict[str, float]]) -> Dict[str, RateLimitPolicy]:
+    return {
+        name: RateLimitPolicy(
+            per_minute=float(limits["per_minute"]),
+            burst=int(limits.get("burst", 1)),
+            concurrency=int(limits.get("concurrency", 0)),  # 0 = no cap
+        )
+        for name, limits in raw.items()
+    }
+
+
+class RateLimiter:
+    def __init__(self, buckets, policies: Dict[str, RateLimitPolicy], enabled=True):
+        self.buckets = buckets
+        self.policies = policies
+        self.enabled = enabled
+        # (user_id, route) -> requests in flight in this worker
+        self._in_flight: Dict[Tuple[str, str], int] = {}
+
+    def _reject(self, route: str, outcome: str, retry_after: float) -> HTTPException:
+        RATE_LIMIT_DECISIONS.labels(route, outcome).inc()
+        seconds = max(1, math.ceil(retry_after))
+        return HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=f"Too many requests ({outcome.replace('_', ' ')}), "
+            f"retry in {seconds}s",
+            headers={"Retry-After": str(seconds)},
+        )
+
+    @asynccontextmanager
+    async def limit(self, route: str, user_id: Optional[str]) -> AsyncIterator[None]:
+        """
+        Holds one of the user's `route` slots for the duration of the block,
+        or raises 429 (HTTPException with Retry-After).
+        """
+        policy = self.policies.get(route)
+        if not self.enabled or policy is None or not user_id:
+            yield
+            return
+
+        key = (user_id, route)
+        if policy.concurrency and self._in_flight.get(key, 0) >= policy.concurrency:
+            # No token taken: the client retries shortly, when a slot frees up
+            raise self._reject(route, "concurrency_limited", 1)
+        # Slot held from the check on (the Mongo bucket awaits), so concurrent
+        # requests of this worker can't all pass the check at once
+        self._in_flight[key] = self._in_flight.get(key, 0) + 1
+        RATE_LIMIT_IN_FLIGHT.labels(route).inc()
+        try:
+            retry_after = await self.buckets.take(f"{user_id}:{route}", policy)
+            if retry_after > 0:
+                logger.info(
+                    f"RateLimit: User {user_id} over the '{route}' limit, "
+                    f"retry in {retry_after:.1f}s"
+                )
+                raise self._reject(route, "rate_limited", retry_after)
+            RATE_LIMIT_DECISIONS.labels(route, "allowed").inc()
+            yield
+        finally:
+            RATE_LIMIT_IN_FLIGHT.labels(route).dec()
+            remaining = self._in_flight[key] - 1
+            if remaining:
+                self._in_flight[key] = remaining
+            else:
+                del self._in_flight[key]
+
+
+def load_buckets(name: str):
+    if name == "mongo":
+        return MongoBuckets()
+    return MemoryBuckets()
+
+
+rate_limiter = RateLimiter(
+    buckets=load_buckets(settings.RATE_LIMIT_BACKEND),
+    policies=load_policies(settings.RATE_LIMITS),
+    enabled=settings.RATE_LIMIT_ENABLED,
+)
@@ -0,0 +1,51 @@
+# backend/app/core/request_context.py
+"""
+Per-request context: the DB handle, the verified user and the documents
+loaded during the request (an identity map keyed by collection and id).
+
+Endpoints get one from deps.get_request_context (resolved once per request)
+and hand it to the services they call, so e.g. the invoice the PDF endpoint
+loaded is the one pdf_generator renders, without a second find_one. Anything
+written through the context is dropped from the map (`forget`) or replaced
+(`remember`), so later reads in the same request see the write.
+"""
+from typing import Any, Dict, Optional, Tuple
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+
+class RequestContext:
+    def __init__(self, db: AsyncIOMotorDatabase, user: Dict[str, Any]):
+        self.db = db
+        self.user = user
+        # (collection name, _id) -> model loaded during this request
+        self._loaded: Dict[Tuple[str, Any], Any] = {}
+        self.lookups = 0  # find_one calls made through the context
+
+    @classmethod
+    def for_user(cls, db: AsyncIOMotorDatabase, user_id: str) -> "RequestContext":
+        """Context outside an HTTP request (background jobs, scripts)."""
+        return cls(db, {"sub": user_id})
+
+    @property
+    def user_id(self) -> str:
+        return self.user["sub"]
+
+    async def get(self, crud, item_id) -> Optional[Any]:
+        """`crud.get` for the current user, loaded at most once per request."""
+        key = (crud.collection_name, item_id)
+        if key not in self._loaded:
+            self.lookups += 1
+            item = await crud.get(db=self.db, id=item_id, user_id=self.user_id)
+            if item is None:
+                return None  # Not cached: it may be created later in the request
+            self._loaded[key] = item
+        return self._loaded[key]
+
+    def remember(self, crud, item) -> None:
+        """Adds a model this request created or updated."""
+        self._loaded[(crud.collection_name, item.id)] = item
+
+    def forget(self, crud, item_id) -> None:
+        """Drops a document this request changed behind the model's back."""
+        self._loaded.pop((crud.collection_name, item_id), None)
@@ -0,0 +1,241 @@
+# backend/app/core/response_cache.py
+"""
+Per-user cache of serialized responses for read-mostly endpoints.
+
+Entries are keyed by user, route, query string and the *generation* of every
+collection the response is built from ("tags"). The CRUD write methods bump
+the generation of the collection they wrote (`invalidate`), which makes all
+older entries of that user unreachable at once; they age out via the TTL.
+A response built while a write was in flight is stored under the generation
+read before building, so it can never shadow the write.
+
+Backends (RESPONSE_CACHE_BACKEND):
+  "memory" -> per-process LRU (default)
+  "mongo"  -> shared by all workers/instances (response_cache* collections)
+  "package.module:ClassName" -> any class with the CacheBackend methods
+"""
+import hashlib
+import importlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timedelta, UTC
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional, Sequence, Tuple
+
+from fastapi import Request, Response
+from pydantic import TypeAdapter
+
+from app.core.config import settings
+from app.core.metrics import RESPONSE_CACHE_REQUESTS
+from app.core.db import get_database
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class CachedResponse:
+    body: bytes
+    etag: str
+
+
+class MemoryBackend:
+    """Per-process LRU with TTL; generations live in a plain dict."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        # key -> (monotonic expiry, entry), least recently used first
+        self._entries: OrderedDict = OrderedDict()
+        self._generations: Dict[Tuple[str, str], int] = {}
+        self._lock = threading.Lock()
+
+    async def get(self, key: str) -> Optional[CachedResponse]:
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                return None
+            expires_at, entry = item
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    async def set(self, key: str, entry: CachedResponse, ttl_seconds: int) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl_seconds, entry)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    async def generations(self, user_id: str, tags: Sequence[str]) -> Tuple[int, ...]:
+        with self._lock:
+            return tuple(self._generations.get((user_id, tag), 0) for tag in tags)
+
+    async def bump(self, user_id: str, tags: Sequence[str]) -> None:
+        with self._lock:
+            for tag in tags:
+                key = (user_id, tag)
+                self._generations[key] = self._generations.get(key, 0) + 1
+
+    async def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+class MongoBackend:
+    """
+    Shared backend: entries in `response_cache` (TTL index on expires_at, see
+    core/db.py), generations in `response_cache_generations`.
+    """
+
+    ENTRIES = "response_cache"
+    GENERATIONS = "response_cache_generations"
+
+    async def get(self, key: str) -> Optional[CachedResponse]:
+        db = await get_database()
+        doc = await db[self.ENTRIES].find_one(
+            {"_id": key, "expires_at": {"$gt": datetime.now(UTC)}}
+        )
+        return CachedResponse(body=doc["body"], etag=doc["etag"]) if doc else None
+
+    async def set(self, key: str, entry: CachedResponse, ttl_seconds: int) -> None:
+        db = await get_database()
+        await db[self.ENTRIES].replace_one(
+            {"_id": key},
+            {
+                "body": entry.body,
+                "etag": entry.etag,
+                "expires_at": datetime.now(UTC) + timedelta(seconds=ttl_seconds),
+            },
+            upsert=True,
+        )
+
+    async def generations(self, user_id: str, tags: Sequence[str]) -> Tuple[int, ...]:
+        db = await get_database()
+        ids = [f"{user_id}:{tag}" for tag in tags]
+        found = {
+            doc["_id"]: doc["generation"]
+            async for doc in db[self.GENERATIONS].find({"_id": {"$in": ids}})
+        }
+        return tuple(found.get(_id, 0) for _id in ids)
+
+    async def bump(self, user_id: str, tags: Sequence[str]) -> None:
+        db = await get_database()
+        for tag in tags:
+            await db[self.GENERATIONS].update_one(
+                {"_id": f"{user_id}:{tag}"}, {"$inc": {"generation": 1}}, upsert=True
+            )
+
+    async def clear(self) -> None:
+        db = await get_database()
+        await db[self.ENTRIES].delete_many({})
+
+
+def load_backend(name: str):
+    if name == "memory":
+        return MemoryBackend(max_entries=settings.RESPONSE_CACHE_MAX_ENTRIES)
+    if name == "mongo":
+        return MongoBackend()
+    module_name, _, class_name = name.partition(":")
+    return getattr(importlib.import_module(module_name), class_name)()
+
+
+class ResponseCache:
+    def __init__(self, backend, ttl_seconds: int, enabled: bool = True):
+        self.backend = backend
+        self.ttl_seconds = ttl_seconds
+        self.enabled = enabled
+        # {route: {"hit": n, "miss": n, "not_modified": n}} for hit ratios
+        self._stats: Dict[str, Dict[str, int]] = {}
+
+    def _count(self, route: str, outcome: str) -> None:
+        counts = self._stats.setdefault(
+            route, {"hit": 0, "miss": 0, "not_modified": 0}
+        )
+        counts[outcome] += 1
+        RESPONSE_CACHE_REQUESTS.labels(route, outcome).inc()
+
+    @staticmethod
+    def _key(user_id: str, route: str, query: str, generations, vary) -> str:
+        raw = "|".join([user_id, route, query, repr(generations), *vary])
+        return hashlib.sha256(raw.encode()).hexdigest()
+
+    @staticmethod
+    def _response(entry: CachedResponse, request: Request, status: str) -> Response:
+        headers = {
+            "ETag": entry.etag,
+            "Cache-Control": settings.RESPONSE_CACHE_CONTROL,
+            "X-Cache": status,
+        }
+        if entry.etag in request.headers.get("if-none-match", ""):
+            return Response(status_code=304, headers=headers)
+        return Response(
+            content=entry.body, media_type="application/json", headers=headers
+        )
+
+    async def respond(
+        self,
+        request: Request,
+        *,
+        user_id: str,
+        tags: Sequence[str],
+        build: Callable[[], Awaitable[Any]],
+        response_model: Any,
+        vary: Iterable[str] = (),
+    ) -> Response:
+        """
+        Serves the cached response for this user/route/query, or builds,
+        serializes (like FastAPI would with `response_model`) and stores it.
+        """
+        matched = request.scope.get("route")
+        route = matched.path if matched else request.url.path
+        adapter = TypeAdapter(response_model)
+        if not self.enabled:
+            value = adapter.validate_python(await build(), from_attributes=True)
+            return Response(
+                content=adapter.dump_json(value, by_alias=True),
+                media_type="application/json",
+            )
+
+        generations = await self.backend.generations(user_id, tags)
+        key = self._key(
+            user_id, route, str(request.query_params), generations, tuple(vary)
+        )
+        entry = await self.backend.get(key)
+        if entry is not None:
+            response = self._response(entry, request, "HIT")
+            outcome = "not_modified" if response.status_code == 304 else "hit"
+            self._count(route, outcome)
+            return response
+
+        value = adapter.validate_python(await build(), from_attributes=True)
+        body = adapter.dump_json(value, by_alias=True)
+        entry = CachedResponse(body=body, etag=f'"{hashlib.sha1(body).hexdigest()}"')
+        await self.backend.set(key, entry, self.ttl_seconds)
+        self._count(route, "miss")
+        return self._response(entry, request, "MISS")
+
+    async def invalidate(self, user_id: str, *tags: str) -> None:
+        """Makes every cached response of user_id built from `tags` stale."""
+        if self.enabled:
+            await self.backend.bump(user_id, tags)
+            logger.debug(f"ResponseCache: Invalidated {tags} for user {user_id}")
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """Counts and hit ratio (hits incl. 304s / requests) per route."""
+        result = {}
+        for route, counts in self._stats.items():
+            served = counts["hit"] + counts["not_modified"]
+            total = served + counts["miss"]
+            ratio = round(served / total, 3) if total else 0.0
+            result[route] = {**counts, "hit_ratio": ratio}
+        return result
+
+
+response_cache = ResponseCache(
+    backend=load_backend(settings.RESPONSE_CACHE_BACKEND),
+    ttl_seconds=settings.RESPONSE_CACHE_TTL_SECONDS,
+    enabled=settings.RESPONSE_CACHE_ENABLED,
+)
@@ -5,11 +5,11 @@ from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer  # Can adapt for Bearer token directly
 from pydantic import BaseModel
-import httpx  # For fetching JWKS
 import logging
-from functools import lru_cache  # Cache JWKS keys
 
 from .config import settings
+from .metrics import JWKS_FETCHES
+from .process_state import ProcessLocal
 
 logger = logging.getLogger(__name__)
 
@@ -26,9 +26,10 @@ oauth2_scheme_bearer = OAuth2PasswordBearer(
 
 
 # --- JWKS fetching and caching ---
-@lru_cache()
-def get_jwks() -> Dict[str, Any]:
+def fetch_jwks() -> Dict[str, Any]:
     """Fetches JWKS keys from Authentik."""
+    import httpx  # Imported on first use: it isn't needed to start the app
+
     try:
         # --- Use the setting to control SSL verification ---
         verify_ssl = settings.HTTPX_VERIFY_SSL
@@ -43,9 +44,11 @@ def get_jwks() -> Dict[str, Any]:
 
         response.raise_for_status()  # Raise exception for bad status codes
         logger.info(f"Successfully fetched JWKS from {settings.AUTHENTIK_JWKS_URI}")
+        JWKS_FETCHES.labels("success").inc()
         return response.json()
     except httpx.RequestError as e:
         logger.error(f"Error fetching JWKS: {e}")
+        JWKS_FETCHES.labels("error").inc()
         # Attempt to give a more specific error if it's an SSL issue and verification was enabled
         if (
             isinstance(e, httpx.ConnectError)
@@ -69,12 +72,21 @@ def get_jwks() -> Dict[str, Any]:
     except Exception as e:
         # Catch any other unexpected errors during JWKS fetch
         logger.error(f"Unexpected error fetching JWKS: {e}")
+        JWKS_FETCHES.labels("error").inc()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="An unexpected error occurred while fetching authentication keys.",
         )
 
 
+# Fetched once per worker process (failed fetches are retried on next use)
+jwks_keys = ProcessLocal(fetch_jwks, name="jwks")
+
+
+def get_jwks() -> Dict[str, Any]:
+    return jwks_keys.get()
+
+
 # --- Token Data Model ---
 class TokenData(BaseModel):
     sub: Optional[str] = None  # 'sub' claim usually holds the user ID
@@ -1,4 +1,5 @@
 # backend/app/crud/base.py
+from datetime import datetime, UTC
 from typing import Any, Dict, Generic, List, Optional, Type, TypeVar, Union
 from uuid import UUID
 from pydantic import BaseModel
@@ -7,6 +8,8 @@ from pymongo import ReturnDocument
 from pymongo.results import DeleteResult
 import logging
 
+from app.core.response_cache import response_cache
+
 logger = logging.getLogger(__name__)
 
 # --- Define Type Variables for Pydantic Models ---
@@ -82,10 +85,14 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
 
         # Use model_dump(by_alias=True) for MongoDB field names like _id
         insert_data = db_obj.model_dump(by_alias=True)
+        # updated_at feeds the ETags of the detail endpoints (api/conditional.py)
+        if insert_data.get("updated_at") is None:
+            insert_data["updated_at"] = datetime.now(UTC)
         logger.info(
             f"CRUD ({self.model.__name__}): Attempting to create for user {user_id}"
         )
         result = await collection.insert_one(insert_data)
+        await response_cache.invalidate(user_id, self.collection_name)
 
         # Fetch the created document to return the complete object
         created_doc = await collection.find_one({"_id": result.inserted_id})
@@ -124,6 +131,8 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
             )
             return self.model(**existing_doc) if existing_doc else None
 
+        # Every write moves updated_at, so ETags derived from it change too
+        update_data["updated_at"] = datetime.now(UTC)
         logger.info(
             f"CRUD ({self.model.__name__}): Attempting to update {item_id} for user {user_id}"
         )
@@ -134,6 +143,7 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         )
 
         if updated_doc:
+            await response_cache.invalidate(user_id, self.collection_name)
             logger.info(
                 f"CRUD ({self.model.__name__}): {item_id} updated successfully."
             )
@@ -154,6 +164,7 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
             {"_id": id, "user_id": user_id}
         )
         if result.deleted_count == 1:
+            await response_cache.invalidate(user_id, self.collection_name)
             logger.info(
                 f"CRUD ({self.model.__name__}): Successfully deleted {id} for user {user_id}"
             )
@@ -0,0 +1,200 @@
+# backend/app/crud/billable.py
+"""
+The invoiced state of work items, and what is still to be billed.
+
+`is_invoiced` is the one marker every query uses: always stored (False on
+create, True once crud_invoice.create_from_request bills the item) and
+indexed where False (partial index in core/db.py). `invoiceId` (the stored
+name of WorkItem.invoice_id) only says *which* invoice billed the item.
+Documents written before this was consistent are fixed by
+scripts/migrate_invoiced_marker.py.
+"""
+import logging
+from datetime import datetime, UTC
+from typing import Dict, List, Optional
+from uuid import UUID
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+from app.core.response_cache import response_cache
+from app.crud.name_cache import name_cache
+from app.crud.pipeline import Pipeline
+from app.crud.work_item_totals import ITEM_TOTAL_CENTS, WORK_ITEMS_COLLECTION
+from app.models.workItem import BillableClient, BillableProject, BillableSummary
+from app.utils.money import from_cents
+
+logger = logging.getLogger(__name__)
+
+PROJECTS_COLLECTION = "projects"  # Used directly (same reason as in denormalize.py)
+INVOICE_REF_FIELD = "invoiceId"  # Stored name (alias) of WorkItem.invoice_id
+UNINVOICED = {"is_invoiced": False}
+INVOICED = {"is_invoiced": True}
+# WorkItemCreate fields that only invoicing may set
+INVOICE_FIELDS = {"invoice_id", "is_invoiced"}
+# Partial index on uninvoiced work items (core/db.py): only queries containing
+# UNINVOICED can use it
+UNINVOICED_INDEX_NAME = "uninvoiced_work_items"
+
+
+def mark_invoiced(invoice_id: UUID) -> dict:
+    """$set of the work items billed by `invoice_id`."""
+    return {INVOICE_REF_FIELD: invoice_id, "is_invoiced": True}
+
+
+async def claim_for_invoice(
+    db: AsyncIOMotorDatabase,
+    *,
+    user_id: str,
+    work_item_ids: List[UUID],
+    invoice_id: UUID,
+) -> int:
+    """
+    Marks the still uninvoiced `work_item_ids` as billed by `invoice_id` in one
+    conditional update, before the invoice is built: of two concurrent
+    requests for the same item only one can claim it. Returns the number claimed.
+    """
+    result = await db[WORK_ITEMS_COLLECTION].update_many(
+        {"_id": {"$in": work_item_ids}, "user_id": user_id, **UNINVOICED},
+        {"$set": {**mark_invoiced(invoice_id), "updated_at": datetime.now(UTC)}},
+    )
+    return result.modified_count
+
+
+async def release_invoiced(
+    db: AsyncIOMotorDatabase, *, user_id: str, invoice_id: UUID
+) -> int:
+    """
+    Makes the work items billed by `invoice_id` billable again (aborted
+    invoice creation, deleted invoice). Returns the number released.
+    """
+    result = await db[WORK_ITEMS_COLLECTION].update_many(
+        {"user_id": user_id, INVOICE_REF_FIELD: invoice_id},
+        {
+            "$set": {
+                **UNINVOICED,
+                INVOICE_REF_FIELD: None,
+                "updated_at": datetime.now(UTC),
+            }
+        },
+    )
+    if result.modified_count:
+        await response_cache.invalidate(user_id, WORK_ITEMS_COLLECTION)
+        logger.info(
+            f"Billable: Released {result.modified_count} work items of invoice {invoice_id}"
+        )
+    return result.modified_count
+
+
+async def migrate_invoiced_marker(
+    db: AsyncIOMotorDatabase, *, user_id: Optional[str] = None
+) -> int:
+    """
+    Makes `is_invoiced` agree with `invoiceId` on every work item and moves
+    references stored under the field name (`invoice_id`) to the alias.
+    Safe to re-run. Returns the number of documents changed.
+    """
+    scope = {"user_id": user_id} if user_id else {}
+    collection = db[WORK_ITEMS_COLLECTION]
+    now = datetime.now(UTC)  # Representation changes: new ETags
+    moved = await collection.update_many(
+        {**scope, "invoice_id": {"$exists": True}, INVOICE_REF_FIELD: None},
+        {"$rename": {"invoice_id": INVOICE_REF_FIELD}, "$set": {"updated_at": now}},
+    )
+    # Both stored: the alias (written by the current code) wins
+    dropped = await collection.update_many(
+        {**scope, "invoice_id": {"$exists": True}},
+        {"$unset": {"invoice_id": ""}, "$set": {"updated_at": now}},
+    )
+    billed = await collection.update_many(
+        {**scope, INVOICE_REF_FIELD: {"$ne": None}, "is_invoiced": {"$ne": True}},
+        {"$set": {**INVOICED, "updated_at": now}},
+    )
+    # Missing or null: never billed (billed ones were marked just above)
+    unbilled = await collection.update_many(
+        {**scope, "is_invoiced": {"$nin": [True, False]}},
+        {"$set": {**UNINVOICED, "updated_at": now}},
+    )
+    moved_count = moved.modified_count + dropped.modified_count
+    modified = moved_count + billed.modified_count + unbilled.modified_count
+    logger.info(
+        f"Billable: Migrated invoiced marker on {modified} work items "
+        f"(references moved: {moved_count}, marked invoiced: "
+        f"{billed.modified_count}, marked uninvoiced: {unbilled.modified_count})"
+    )
+    return modified
+
+
+async def billable_summary(
+    db: AsyncIOMotorDatabase, *, user_id: str, client_id: Optional[UUID] = None
+) -> BillableSummary:
+    """
+    Uninvoiced hours and amounts per client and project: one $group over the
+    uninvoiced work items, names from the name cache. Not hinted: the match
+    contains UNINVOICED, so the planner can pick the partial index where it
+    exists, and the query still runs where it doesn't.
+    """
+    names = await name_cache.get(db, user_id)
+    match = {"user_id": user_id, **UNINVOICED}
+    if client_id is not None:
+        # Seeks the client's projects in the index instead of filtering groups.
+        # Read from projects, not the name cache: a project just created or
+        # moved may not be in this process's cached names yet
+        match["project_id"] = {
+            "$in": await db[PROJECTS_COLLECTION].distinct(
+                "_id", {"user_id": user_id, "client_id": client_id}
+            )
+        }
+    rows = await (
+        Pipeline(WORK_ITEMS_COLLECTION)
+        .match(match)
+        .stage(
+            {
+                "$group": {
+                    "_id": "$project_id",
+                    "hours": {"$sum": "$total_hours"},
+                    "amount_cents": {"$sum": ITEM_TOTAL_CENTS},
+                    "work_items": {"$sum": 1},
+                    "first_date": {"$min": "$work_date"},
+                    "last_date": {"$max": "$work_date"},
+                }
+            }
+        )
+        .execute(db)
+    )
+
+    clients: Dict[Optional[UUID], BillableClient] = {}
+    for row in rows:
+        project_client_id = names.client_id(row["_id"])
+        client = clients.get(project_client_id)
+        if client is None:
+            client = clients[project_client_id] = BillableClient(
+                client_id=project_client_id,
+                client_name=names.client_name(row["_id"]),
+            )
+        client.projects.append(
+            BillableProject(
+                project_id=row["_id"],
+                project_name=names.project_name(row["_id"]),
+                hours=round(row["hours"], 2),
+                amount=from_cents(row["amount_cents"]),
+                amount_cents=row["amount_cents"],
+                work_items=row["work_items"],
+                first_date=row["first_date"],
+                last_date=row["last_date"],
+            )
+        )
+        client.hours = round(client.hours + row["hours"], 2)
+        client.amount_cents += row["amount_cents"]
+        client.amount = from_cents(client.amount_cents)
+        client.work_items += row["work_items"]
+
+    # Most to bill first
+    result = sorted(clients.values(), key=lambda client: -client.amount_cents)
+    for client in result:
+        client.projects.sort(key=lambda project: -project.amount_cents)
+    return BillableSummary(
+        total_hours=round(sum(client.hours for client in result), 2),
+        total_amount=from_cents(sum(client.amount_cents for client in result)),
+        work_items=sum(client.work_items for client in result),
+        clients=result,
+    )
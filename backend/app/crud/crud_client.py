@@ -5,6 +5,8 @@ from motor.motor_asyncio import AsyncIOMotorDatabase
 import logging
 
 from app.crud.base import CRUDBase  # Import the base class
+from app.crud.name_cache import name_cache
+from app.crud.denormalize import propagate_client_name
 from app.models.client import (
     ClientCreate,
     ClientUpdate,
@@ -15,6 +17,44 @@ logger = logging.getLogger(__name__)
 
 
 class CRUDClient(CRUDBase[ClientInDB, ClientCreate, ClientUpdate]):
+    # --- Writes drop the cached client names for the owner ---
+    # (and renames are propagated to the names stored on work items)
+    async def create(
+        self, db: AsyncIOMotorDatabase, *, obj_in: ClientCreate, user_id: str
+    ) -> ClientInDB:
+        created = await super().create(db=db, obj_in=obj_in, user_id=user_id)
+        await name_cache.invalidate(db, user_id)
+        return created
+
+    async def update(
+        self,
+        db: AsyncIOMotorDatabase,
+        *,
+        item_id: UUID,
+        user_id: str,
+        obj_in: ClientUpdate,
+    ) -> Optional[ClientInDB]:
+        updated = await super().update(
+            db=db, item_id=item_id, user_id=user_id, obj_in=obj_in
+        )
+        await name_cache.invalidate(db, user_id)
+        # Keep the client name stored on work items in sync
+        if updated and "name" in obj_in.model_fields_set:
+            await propagate_client_name(
+                db, user_id=user_id, client_id=item_id, client_name=updated.name
+            )
+        return updated
+
+    async def remove(self, db: AsyncIOMotorDatabase, *, id: UUID, user_id: str) -> bool:
+        deleted = await super().remove(db=db, id=id, user_id=user_id)
+        await name_cache.invalidate(db, user_id)
+        # Its projects' work items stay: clear the client name they store
+        if deleted:
+            await propagate_client_name(
+                db, user_id=user_id, client_id=id, client_name=None
+            )
+        return deleted
+
     # Override methods here if specific logic is needed, e.g., complex search
     async def get_multi_by_owner(
         self,
@@ -1,8 +1,9 @@
 # backend/app/crud/crud_invoice.py
 import logging
-from uuid import UUID
+from uuid import UUID, uuid4
 from typing import List, Optional
 from motor.motor_asyncio import AsyncIOMotorDatabase, AsyncIOMotorCollection
+from pymongo import ReturnDocument
 from app.services.event_service import (
     log_event,
     EventType,
@@ -10,10 +11,13 @@ from app.services.event_service import (
 from datetime import date, timedelta, datetime, time, timezone, UTC
 
 from pydantic import BaseModel, Field, ConfigDict, EmailStr
+from app.core.config import settings
+from app.core.response_cache import response_cache
 from app.crud.base import CRUDBase
 from app.models.invoice import (  # Import Invoice models
     InvoiceCreateRequest,
     InvoiceInDB,
+    InvoiceStatus,
     Invoice,  # Need InvoiceUpdate model
     InvoiceLineItem,
     ClientInfo,
@@ -27,7 +31,18 @@ from app.models.timeEntry import TimeEntryInDB  # Assuming you have this model
 from app.models.client import ClientInDB as FullClientModel
 
 # Need Counter function
+from app.crud.billable import (
+    INVOICE_REF_FIELD,
+    UNINVOICED,
+    claim_for_invoice,
+    release_invoiced,
+)
 from app.crud.crud_counter import get_next_invoice_number
+from app.crud.work_item_totals import compute_amount_cents
+from app.crud.invoice_lines import build_line_items
+from app.crud.invoice_analytics import record_invoice_change
+from app.utils.date_utils import to_utc_midnight
+from app.utils.money import from_cents, percentage_cents
 
 logger = logging.getLogger(__name__)
 
@@ -40,6 +55,17 @@ class InvoiceUpdate(BaseModel):  # Or inherit from InvoiceBase selectively
     # Add other updatable fields
 
 
+# Values accepted by CRUDInvoice.update (new invoices start as "processed")
+INVOICE_STATUSES = (
+    InvoiceStatus.DRAFT,
+    InvoiceStatus.SENT,
+    InvoiceStatus.PAID,
+    InvoiceStatus.OVERDUE,
+    InvoiceStatus.VOID,
+    ItemStatus.PROCESSED,
+)
+
+
 class CRUDInvoice(
     CRUDBase[InvoiceInDB, InvoiceCreateRequest, InvoiceUpdate]
 ):  # Note: Create differs
@@ -85,7 +111,6 @@ class CRUDInvoice(
         """
         time_entry_collection = db["workItems"]  # Access TimeEntry collection
         client_collection = db["clients"]  # Access Client collection
-        invoice_collection = self._get_collection(db)  # Invoice collection
 
         # --- 1. Fetch Client Info (Snapshot) ---
         client_doc = await client_collection.find_one(
@@ -99,74 +124,119 @@ class CRUDInvoice(
         # Create a snapshot using a specific model if needed
         client_snapshot = ClientInfo(**FullClientModel(**client_doc).model_dump())
 
-        # --- 2. Fetch Uninvoiced Time Entries for the User/Client/Projects ---
-        time_entries_cursor = time_entry_collection.find(
+        # --- 2. Claim the Uninvoiced Work Items ---
+        # Claimed (marked with the new invoice's id) before anything is built
+        # from them, so two concurrent requests can't both bill an item
+        new_invoice_id = uuid4()
+        candidates = await time_entry_collection.find(
             {
                 "_id": {"$in": request.time_entry_ids},
                 "user_id": user_id,
                 "project_id": {"$in": request.project_ids},
-                "invoice_id": None,  # IMPORTANT: Only fetch uninvoiced entries
-            }
-        )
-        time_entries = await time_entries_cursor.to_list(
-            length=None
-        )  # Fetch all matching
-
-        if not time_entries:
+                **UNINVOICED,  # IMPORTANT: Only fetch uninvoiced entries
+            },
+            projection={"_id": 1},
+        ).to_list(length=None)
+        if not candidates:
             raise ValueError("No uninvoiced time entries found matching the criteria.")
-
-        logger.info(f"Found {len(time_entries)} time entries to include in invoice.")
-
-        # Verify all requested IDs were found and uninvoiced
-        found_ids = {te["_id"] for te in time_entries}
-        requested_ids = set(request.time_entry_ids)
-        if found_ids != requested_ids:
-            missing = requested_ids - found_ids
+        found_ids = {doc["_id"] for doc in candidates}
+        missing = set(request.time_entry_ids) - found_ids
+        if missing:
             # Check if missing IDs were already invoiced or belong elsewhere
             logger.warning(
                 f"Some requested time entries not found or already invoiced: {missing}"
             )
             # Decide whether to proceed or raise error - for now, proceed with found ones
-            # raise ValueError(f"Some requested time entries not found or already invoiced: {missing}")
 
-        # Parse fetched entries into Pydantic models
-        time_entry_models = [WorkItemInDB(**te) for te in time_entries]
+        claimed = await claim_for_invoice(
+            db,
+            user_id=user_id,
+            work_item_ids=list(found_ids),
+            invoice_id=new_invoice_id,
+        )
+        if claimed != len(found_ids):
+            # Some were billed by a concurrent invoice since the find above
+            await release_invoiced(db, user_id=user_id, invoice_id=new_invoice_id)
+            raise ValueError(
+                f"{len(found_ids) - claimed} of the time entries were invoiced "
+                f"concurrently; no invoice created."
+            )
+        try:
+            return await self._create_for_claimed(
+                db,
+                user_id=user_id,
+                request=request,
+                invoice_id=new_invoice_id,
+                client_snapshot=client_snapshot,
+            )
+        except BaseException:
+            inserted = await self._get_collection(db).find_one(
+                {"_id": new_invoice_id}, projection={"_id": 1}
+            )
+            if not inserted:
+                # Nothing was billed: the items become billable again
+                await release_invoiced(db, user_id=user_id, invoice_id=new_invoice_id)
+            raise
+
+    async def _create_for_claimed(
+        self,
+        db: AsyncIOMotorDatabase,
+        *,
+        user_id: str,
+        request: InvoiceCreateRequest,
+        invoice_id: UUID,
+        client_snapshot: ClientInfo,
+    ) -> InvoiceInDB:
+        """Builds and inserts the invoice from the work items it claimed."""
+        time_entry_collection = db["workItems"]
+        invoice_collection = self._get_collection(db)
+        claimed_filter = {"user_id": user_id, INVOICE_REF_FIELD: invoice_id}
+        # Only what the totals need; line items are built by an aggregation
+        time_entries = await time_entry_collection.find(
+            claimed_filter,
+            projection={
+                "project_id": 1,
+                "total_amount_cents": 1,
+                "timeEntries.amount_cents": 1,
+                "timeEntries.calculatedAmount": 1,
+            },
+        ).to_list(length=None)
+        found_ids = {te["_id"] for te in time_entries}
+        logger.info(f"Found {len(time_entries)} time entries to include in invoice.")
 
         # --- 3. Calculate Line Items and Totals ---
-        line_items: List[InvoiceLineItem] = []
-        subtotal = 0.0
-        # Group time entries (e.g., by project and rate) or list individually
-        # Example: List individually for simplicity
-        min_service_date = None
-        max_service_date = None
-        for workItem in time_entry_models:
-            for entry in workItem.timeEntries:
-                pricePerHour = entry.price_per_hour
-                duration = entry.duration
-                amountCalc = pricePerHour * duration
-                line = InvoiceLineItem(
-                    description=f"{workItem.created_at.strftime('%Y-%m-%d')}: {workItem.name} (Rate: {entry.rate_name})",
-                    quantity=entry.duration,
-                    unit_price=pricePerHour,
-                    amount=amountCalc,  # Use pre-calculated amount from time entry
-                    time_entry_ids=[
-                        workItem.id
-                    ],  # Link this line item back to the time entry
-                )
-                line_items.append(line)
-                logger.info(f"Calculated Amount is : {amountCalc} for rate: {entry}")
-                subtotal += amountCalc
-                # Track min/max dates for service period
-                if min_service_date is None or workItem.created_at < min_service_date:
-                    min_service_date = workItem.created_at
-                if max_service_date is None or workItem.created_at > max_service_date:
-                    max_service_date = workItem.created_at
+        # Entries are grouped (per entry, work item, project+rate or day) in one
+        # aggregation; each line keeps the IDs of the work items it covers
+        line_grouping = request.line_grouping or settings.INVOICE_LINE_GROUPING
+        line_items, min_service_date, max_service_date = await build_line_items(
+            db,
+            user_id=user_id,
+            work_item_ids=list(found_ids),
+            grouping=line_grouping,
+        )
+        # Subtotal from the per-item totals kept by CRUDWorkItem; items written
+        # before those existed (not yet backfilled) are summed from their entries
+        # Everything in integer cents (app/utils/money.py), floats only at the end
+        project_cents = {}  # Net per project, for the revenue reports
+        for doc in time_entries:
+            item_cents = (
+                doc["total_amount_cents"]
+                if "total_amount_cents" in doc
+                else compute_amount_cents(doc.get("timeEntries", []))
+            )
+            project_cents[doc["project_id"]] = (
+                project_cents.get(doc["project_id"], 0) + item_cents
+            )
+        subtotal_cents = sum(project_cents.values())
         # Tax calculation
         tax_rate = (
             request.tax_rate if request.tax_rate is not None else 19.0
         )  # Use default if needed
-        tax_amount = round(subtotal * (tax_rate / 100.0), 2)
-        total_amount = round(subtotal + tax_amount, 2)
+        tax_cents = percentage_cents(subtotal_cents, tax_rate)
+        total_cents = subtotal_cents + tax_cents
+        subtotal = from_cents(subtotal_cents)
+        tax_amount = from_cents(tax_cents)
+        total_amount = from_cents(total_cents)
 
         # --- 4. Determine Dates ---
         issue_date: date = request.issue_date or date.today()
@@ -180,6 +250,7 @@ class CRUDInvoice(
 
         # --- 6. Prepare Invoice Document ---
         invoice_data_for_model = {
+            "id": invoice_id,  # Already on the claimed work items
             "user_id": user_id,
             "invoice_number": await get_next_invoice_number(
                 db, prefix="RE-"
@@ -188,18 +259,24 @@ class CRUDInvoice(
             "project_ids": request.project_ids,
             "issue_date": issue_date,  # date object
             "due_date": due_date,  # date object
-            # "service_date_from": service_date_from, # date object (or None)
-            # "service_date_to": service_date_to,     # date object (or None)
+            "service_date_from": service_date_from,  # date object (or None)
+            "service_date_to": service_date_to,  # date object (or None)
             "line_items": [item.model_dump() for item in line_items],
             "subtotal": subtotal,
             "tax_rate": tax_rate,
             "tax_amount": tax_amount,
             "total_amount": total_amount,
+            "total_amount_cents": total_cents,
+            "project_amounts": [
+                {"project_id": project_id, "amount_cents": cents}
+                for project_id, cents in project_cents.items()
+            ],
             "status": ItemStatus.PROCESSED,
             "notes": request.notes,
             "client_snapshot": client_snapshot.model_dump(),
             "payment_date": None,  # date object (or None)
             "template_id": "default",
+            "line_grouping": line_grouping,
             # created_at/updated_at handled by model default_factory
             # id handled by model default_factory
         }
@@ -259,41 +336,22 @@ class CRUDInvoice(
         result = await invoice_collection.insert_one(
             insert_data
         )  # Insert the dict with datetimes
-        new_invoice_id = result.inserted_id
+        new_invoice_id = result.inserted_id  # == invoice_id
         logger.info(
             f"Invoice {db_invoice.invoice_number} created successfully with ID: {new_invoice_id}"
         )
+        await record_invoice_change(db, after=insert_data)
+        await response_cache.invalidate(user_id, self.collection_name)
 
-        processed_work_item_ids = [wi.id for wi in time_entry_models]
-
-        if processed_work_item_ids:  # Only update if there are items
-            update_result = await time_entry_collection.update_many(
-                {
-                    "_id": {"$in": processed_work_item_ids},
-                    "user_id": user_id,
-                },  # Ensure user ownership
-                {
-                    "$set": {
-                        "invoiceId": new_invoice_id,
-                        "is_invoiced": True,
-                        "status": ItemStatus.PROCESSED,
-                        "updated_at": datetime.now(UTC),
-                    }
-                },
-            )
-            logger.info(
-                f"Marked {update_result.modified_count} work items as invoiced with Invoice ID {new_invoice_id}"
-            )
-            if update_result.modified_count != len(processed_work_item_ids):
-                logger.warning(
-                    f"Mismatch: Expected to update {len(processed_work_item_ids)} work items, "
-                    f"but updated {update_result.modified_count}."
-                )
-                # This could happen if some items were somehow invoiced by another process
-                # between step 2 and step 7, or if user_id check failed for some.
-                # Consider how critical this is for your application.
-        else:
-            logger.info("No work items were processed to be marked as invoiced.")
+        # The items were marked invoiced when claimed; now they're processed
+        update_result = await time_entry_collection.update_many(
+            claimed_filter,
+            {"$set": {"status": ItemStatus.PROCESSED, "updated_at": datetime.now(UTC)}},
+        )
+        await response_cache.invalidate(user_id, "workItems")
+        logger.info(
+            f"Marked {update_result.modified_count} work items as invoiced with Invoice ID {new_invoice_id}"
+        )
         # ... (update time entries, return created invoice) ...
         # Fetching back will get datetime objects, Pydantic's from_attributes=True
         # should handle converting them back to 'date' for the model fields.
@@ -308,5 +366,75 @@ class CRUDInvoice(
             raise Exception("Failed to retrieve invoice after creation")
 
 
+    async def update(
+        self,
+        db: AsyncIOMotorDatabase,
+        *,
+        item_id: UUID,
+        user_id: str,
+        obj_in: InvoiceUpdate,
+    ) -> Optional[InvoiceInDB]:
+        """
+        Updates status/payment date/notes and moves the analytics store
+        (crud/invoice_analytics.py) from the old state to the new one.
+        """
+        update_data = obj_in.model_dump(exclude_unset=True)
+        status = update_data.get("status")
+        if status is not None and status not in INVOICE_STATUSES:
+            raise ValueError(f"Unknown invoice status: {status}")
+        if status == InvoiceStatus.PAID and not update_data.get("payment_date"):
+            update_data["payment_date"] = date.today()
+        if update_data.get("payment_date"):
+            # Dates are stored as UTC midnight datetimes (see create_from_request)
+            update_data["payment_date"] = to_utc_midnight(update_data["payment_date"])
+        update_data["updated_at"] = datetime.now(UTC)
+
+        collection = self._get_collection(db)
+        before = await collection.find_one_and_update(
+            {"_id": item_id, "user_id": user_id},
+            {"$set": update_data},
+            projection={"pdf_content": 0},
+            return_document=ReturnDocument.BEFORE,
+        )
+        if not before:
+            logger.warning(
+                f"CRUD (Invoice): {item_id} not found for user {user_id} during update."
+            )
+            return None
+        after = {**before, **update_data}
+        await record_invoice_change(db, before=before, after=after)
+        await response_cache.invalidate(user_id, self.collection_name)
+
+        if status is not None and status != before.get("status"):
+            await log_event(
+                db=db,
+                event_type=EventType.INVOICE_STATUS_UPDATED,
+                user_id=user_id,
+                relevant_date=date.today(),
+                description=f"Invoice {before.get('invoice_number')} marked as {status}.",
+                related_entity_id=item_id,
+                related_entity_type="Invoice",
+                details={"from_status": before.get("status"), "to_status": status},
+            )
+        logger.info(f"CRUD (Invoice): {item_id} updated successfully.")
+        return InvoiceInDB(**after)
+
+    async def remove(self, db: AsyncIOMotorDatabase, *, id: UUID, user_id: str) -> bool:
+        """
+        Deletes an invoice, takes it out of the analytics store and makes its
+        work items billable again.
+        """
+        before = await self._get_collection(db).find_one_and_delete(
+            {"_id": id, "user_id": user_id}, projection={"pdf_content": 0}
+        )
+        if not before:
+            return False
+        await record_invoice_change(db, before=before)
+        await response_cache.invalidate(user_id, self.collection_name)
+        # Invalidates "workItems" (and so the billable summary) when any changed
+        await release_invoiced(db, user_id=user_id, invoice_id=id)
+        logger.info(f"CRUD (Invoice): Deleted {id} for user {user_id}")
+        return True
+
 # Instantiate CRUD class
 crud_invoice = CRUDInvoice(InvoiceInDB, collection_name="invoices")
@@ -5,6 +5,10 @@ from motor.motor_asyncio import AsyncIOMotorDatabase
 import logging
 
 from app.crud.base import CRUDBase
+from app.crud.name_cache import name_cache
+from app.crud.denormalize import propagate_project_names
+from app.crud.rate_propagation import changed_rates, propagate_rate_changes
+from app.crud.pipeline import Pipeline
 from app.models.project import ProjectCreate, ProjectUpdate, ProjectInDB
 
 from app.models.client import Client  # Import Client model for embedding shape
@@ -13,6 +17,55 @@ logger = logging.getLogger(__name__)
 
 
 class CRUDProject(CRUDBase[ProjectInDB, ProjectCreate, ProjectUpdate]):
+    # --- Writes drop the cached project names for the owner ---
+    # (and renames are propagated to the names stored on work items)
+    async def create(
+        self, db: AsyncIOMotorDatabase, *, obj_in: ProjectCreate, user_id: str
+    ) -> ProjectInDB:
+        created = await super().create(db=db, obj_in=obj_in, user_id=user_id)
+        await name_cache.invalidate(db, user_id)
+        return created
+
+    async def update(
+        self,
+        db: AsyncIOMotorDatabase,
+        *,
+        item_id: UUID,
+        user_id: str,
+        obj_in: ProjectUpdate,
+    ) -> Optional[ProjectInDB]:
+        old_rates = None
+        if obj_in.rates is not None:
+            old_doc = await self._get_collection(db).find_one(
+                {"_id": item_id, "user_id": user_id}, projection={"rates": 1}
+            )
+            old_rates = (old_doc or {}).get("rates", [])
+        updated = await super().update(
+            db=db, item_id=item_id, user_id=user_id, obj_in=obj_in
+        )
+        await name_cache.invalidate(db, user_id)
+        # Keep the names stored on work items in sync
+        if updated and obj_in.model_fields_set & {"name", "client_id"}:
+            await propagate_project_names(db, user_id=user_id, project_id=item_id)
+        # Reprice uninvoiced work items whose rate changed
+        if updated and old_rates is not None:
+            rates = changed_rates(
+                old_rates, [rate.model_dump() for rate in updated.rates]
+            )
+            if rates:
+                await propagate_rate_changes(
+                    db, user_id=user_id, project_id=item_id, rates=rates
+                )
+        return updated
+
+    async def remove(self, db: AsyncIOMotorDatabase, *, id: UUID, user_id: str) -> bool:
+        deleted = await super().remove(db=db, id=id, user_id=user_id)
+        await name_cache.invalidate(db, user_id)
+        # Its work items stay: clear the names they store
+        if deleted:
+            await propagate_project_names(db, user_id=user_id, project_id=id)
+        return deleted
+
     # Override get_multi_by_owner for project-specific search if needed
     async def get_multi_by_owner(
         self,
@@ -61,64 +114,44 @@ class CRUDProject(CRUDBase[ProjectInDB, ProjectCreate, ProjectUpdate]):
         client_id: Optional[UUID] = None,
         # ) -> List[ProjectWithClientName]: # Return type depends on chosen model
     ) -> List[dict]:  # Return list of dicts initially for flexibility
-        collection = self._get_collection(db)
-        pipeline = []
-
         # --- Stage 1: Match projects for the user (and optionally client_id) ---
-        match_stage = {"$match": {"user_id": user_id}}
+        match_conditions = {"user_id": user_id}
         if client_id:
-            match_stage["$match"]["client_id"] = client_id
-        pipeline.append(match_stage)
+            match_conditions["client_id"] = client_id
+        pipeline = Pipeline(self.collection_name).match(match_conditions)
 
         # --- Stage 2: Optional Search (before or after lookup) ---
         # Searching on project fields is easier before lookup
+        client_search = None
         if search:
             search_regex = {"$regex": search, "$options": "i"}
-            pipeline.append(
+            pipeline.match(
                 {
-                    "$match": {
-                        "$or": [
-                            {"name": search_regex},
-                            {"description": search_regex},
-                        ]
-                    }
+                    "$or": [
+                        {"name": search_regex},
+                        {"description": search_regex},
+                    ]
                 }
             )
-
-        # --- Stage 3: Lookup Client Information ---
-        pipeline.append(
-            {
-                "$lookup": {
-                    "from": "clients",  # The collection to join with
-                    "localField": "client_id",  # Field from the projects collection
-                    "foreignField": "_id",  # Field from the clients collection (make sure clients use UUID for _id)
-                    "as": "client_info",  # Name of the new array field to add
-                }
-            }
+            # Optional search on client name, only possible after the lookup
+            client_search = {"client_info.name": search_regex}
+
+        # --- Stage 3: Lookup + unwind client information, for the page only ---
+        # (the lookup runs first only when the client name has to be matched)
+        client_join = Pipeline().lookup("clients", "client_id", "client_info")
+        pipeline.paginated_join(
+            client_join,
+            sort={"name": 1},
+            skip=skip,
+            limit=limit,
+            search_match=client_search,
         )
 
-        # --- Stage 4: Unwind the client_info array ---
-        # $lookup returns an array, even if only one match. Unwind makes it an object.
-        # Use preserveNullAndEmptyArrays if a project might not have a matching client (shouldn't happen if client_id is required)
-        pipeline.append(
-            {
-                "$unwind": {
-                    "path": "$client_info",
-                    "preserveNullAndEmptyArrays": True,  # Keep project even if client is missing (handle in code)
-                }
-            }
-        )
-
-        # --- Stage 5: Optional Search on Client Name (after lookup) ---
-        if search:  # Example if searching client name too
-            search_regex = {"$regex": search, "$options": "i"}
-            pipeline.append({"$match": {"client_info.name": search_regex}})
-
-        # --- Stage 6: Project Fields (Shape the output) ---
+        # --- Stage 4: Project Fields (Shape the output) ---
         # Select fields you want to return. Add client name.
         # This replaces parsing with Pydantic model directly, as aggregation changes structure
-        project_stage = {
-            "$project": {
+        pipeline.project(
+            {
                 # Project fields (use 1 to include)
                 "_id": 1,  # Or map id: "$_id" if needed by Pydantic later
                 "user_id": 1,
@@ -134,18 +167,9 @@ class CRUDProject(CRUDBase[ProjectInDB, ProjectCreate, ProjectUpdate]):
                 # Optionally include full client object instead/as well:
                 # "client": "$client_info"
             }
-        }
-        pipeline.append(project_stage)
-
-        # --- Stage 7: Sorting, Skipping, Limiting ---
-        pipeline.append({"$sort": {"name": 1}})  # Sort after shaping
-        pipeline.append({"$skip": skip})
-        pipeline.append({"$limit": limit})
-
-        logger.debug(f"CRUDProject Aggregation Pipeline: {pipeline}")
+        )
 
-        cursor = collection.aggregate(pipeline)
-        results = await cursor.to_list(length=limit)
+        results = await pipeline.execute(db, length=limit)
         logger.info(
             f"CRUDProject Aggregation: Found {len(results)} projects for user {user_id}"
         )
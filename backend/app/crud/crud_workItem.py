@@ -2,15 +2,22 @@
 from typing import List, Optional
 from uuid import UUID
 from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ReturnDocument
 import logging
+import re
 from datetime import datetime, UTC, date
+from app.core.config import settings
+from app.core.response_cache import response_cache
 from app.crud.base import CRUDBase
+from app.crud.name_cache import name_cache
+from app.crud.pipeline import Pipeline
 from app.models.workItem import (
     WorkItemCreate,
     WorkItemUpdate,
     TimeEntry,
     WorkItemInDB,
     WorkItemWithProjectName,
+    WorkItemBulkResult,
 )
 from app.models.client import Client  # Import Client model for embedding shape
 
@@ -18,7 +25,23 @@ from app.services.event_service import (
     log_event,
     EventType,
 )  # Import the service and enum
+from app.crud.billable import INVOICE_FIELDS, INVOICE_REF_FIELD, INVOICED, UNINVOICED
 from app.crud.crud_project import crud_project  # To use the project CRUD instance
+from app.crud.crud_client import crud_client
+from app.crud.denormalize import set_work_item_names
+from app.crud.work_item_totals import (
+    TOTALS_STAGE,
+    compute_amount_cents,
+    compute_totals,
+)
+from app.crud.work_dates import (
+    WORK_DATE_SOURCES,
+    WORK_DATE_STAGE,
+    resolve_work_date,
+    work_date_range,
+)
+from app.services.work_item_import import WorkItemImportError
+from app.utils.money import from_cents, line_amount_cents, line_amounts_cents, to_cents
 
 logger = logging.getLogger(__name__)
 
@@ -63,8 +86,10 @@ class CRUDWorkItem(CRUDBase[WorkItemInDB, WorkItemCreate, WorkItemUpdate]):
             # Get the authoritative price per hour from the project
             authoritative_price_per_hour = project_rates_map[te_in.rate_name]
 
-            # Calculate amount based on backend data
-            calculated_amount = round(te_in.duration * authoritative_price_per_hour, 2)
+            # Calculate amount based on backend data, in exact cents
+            amount_cents = line_amount_cents(
+                authoritative_price_per_hour, te_in.duration
+            )
 
             # Create a new TimeEntry object (or update existing if obj_in.timeEntries are full models)
             # Ensure the TimeEntry model in WorkItemInDB can accept all these fields.
@@ -73,7 +98,8 @@ class CRUDWorkItem(CRUDBase[WorkItemInDB, WorkItemCreate, WorkItemUpdate]):
                 rate_name=te_in.rate_name,
                 duration=te_in.duration,
                 price_per_hour=authoritative_price_per_hour,  # Use authoritative price
-                calculatedAmount=calculated_amount,  # Use backend calculated amount
+                calculatedAmount=from_cents(amount_cents),  # Use backend calculated amount
+                amount_cents=amount_cents,
             )
             processed_time_entries.append(processed_te)
             logger.debug(
@@ -82,20 +108,25 @@ class CRUDWorkItem(CRUDBase[WorkItemInDB, WorkItemCreate, WorkItemUpdate]):
 
         # --- 3. Prepare the WorkItemInDB object ---
         # Create a dictionary from the input object, then update timeEntries
-        obj_in_data = obj_in.model_dump(
-            exclude={"timeEntries"}
-        )  # Exclude original timeEntries
+        # Exclude original timeEntries; a new item is never invoiced (only
+        # crud_invoice sets the marker, see crud/billable.py)
+        obj_in_data = obj_in.model_dump(exclude={"timeEntries", *INVOICE_FIELDS})
 
+        total_hours, total_amount = compute_totals(processed_time_entries)
         db_obj_data = {
             **obj_in_data,  # Spread other fields from WorkItemCreate
             "user_id": user_id,
             "timeEntries": [
                 te.model_dump() for te in processed_time_entries
             ],  # Use processed entries
+            "total_hours": total_hours,  # Lets reports sum without $unwind
+            "total_amount": total_amount,
+            "total_amount_cents": compute_amount_cents(processed_time_entries),
             # id, created_at, updated_at will be handled by WorkItemInDB model defaults
         }
         # Instantiate the DB model
         db_obj = WorkItemInDB(**db_obj_data)
+        db_obj.work_date = resolve_work_date(db_obj)  # Needs created_at, set above
 
         # --- 4. Call the base class's standard MongoDB insertion logic ---
         # This part now essentially becomes the original CRUDBase.create logic,
@@ -104,10 +135,15 @@ class CRUDWorkItem(CRUDBase[WorkItemInDB, WorkItemCreate, WorkItemUpdate]):
 
         collection = self._get_collection(db)
         insert_data = db_obj.model_dump(by_alias=True)  # For _id alias
+        # Denormalized names so listings can skip the projects/clients join
+        client = await crud_client.get(db=db, id=project.client_id, user_id=user_id)
+        insert_data["project_name"] = project.name
+        insert_data["client_name"] = client.name if client else None
         logger.info(
             f"CRUDWorkItem ({self.model.__name__}): Attempting to insert processed data for user {user_id}"
         )
         result = await collection.insert_one(insert_data)
+        await response_cache.invalidate(user_id, self.collection_name)
         created_doc = await collection.find_one({"_id": result.inserted_id})
         if created_doc:
             await log_event(
@@ -133,6 +169,219 @@ class CRUDWorkItem(CRUDBase[WorkItemInDB, WorkItemCreate, WorkItemUpdate]):
             )
             raise Exception("Failed to retrieve WorkItem after creation")
 
+    async def create_many(
+        self,
+        db: AsyncIOMotorDatabase,
+        *,
+        objs_in: List[WorkItemCreate],
+        user_id: str,
+        chunk_size: Optional[int] = None,
+        rows: Optional[List[int]] = None,
+    ) -> WorkItemBulkResult:
+        """
+        Bulk version of create(): validates every item before writing anything.
+
+        Projects and clients are fetched once per import (not per item), amounts
+        are computed from the project's authoritative rates, documents are
+        written with insert_many in chunks and a single event is logged.
+        Raises WorkItemImportError listing every invalid row, numbered by `rows`
+        (the source row of each item, e.g. its CSV line) or else by list index.
+        """
+        if len(objs_in) > settings.WORK_ITEM_IMPORT_MAX_ITEMS:
+            raise WorkItemImportError(
+                [
+                    {
+                        "row": None,
+                        "errors": [
+                            f"Too many work items ({len(objs_in)}), the limit is {settings.WORK_ITEM_IMPORT_MAX_ITEMS}"
+                        ],
+                    }
+                ]
+            )
+
+        # --- 1. Resolve all referenced projects (and their clients) in two queries ---
+        project_ids = list({obj.project_id for obj in objs_in})
+        project_docs = await crud_project._get_collection(db).find(
+            {"_id": {"$in": project_ids}, "user_id": user_id},
+            projection={"name": 1, "client_id": 1, "rates": 1},
+        ).to_list(length=None)
+        client_ids = list({doc.get("client_id") for doc in project_docs})
+        client_names = {
+            doc["_id"]: doc.get("name")
+            async for doc in crud_client._get_collection(db).find(
+                {"_id": {"$in": client_ids}, "user_id": user_id},
+                projection={"name": 1},
+            )
+        }
+        # project_id -> (project_name, client_name, {rate_name: price_per_hour})
+        projects = {
+            doc["_id"]: (
+                doc.get("name"),
+                client_names.get(doc.get("client_id")),
+                {rate["name"]: rate["price_per_hour"] for rate in doc.get("rates", [])},
+            )
+            for doc in project_docs
+        }
+
+        # --- 2. Validate everything up front ---
+        errors = []
+        for row, obj in zip(rows or range(len(objs_in)), objs_in):
+            if obj.project_id not in projects:
+                errors.append(
+                    {"row": row, "errors": [f"Project not found: {obj.project_id}"]}
+                )
+                continue
+            rates = projects[obj.project_id][2]
+            unknown = sorted(
+                {te.rate_name for te in obj.timeEntries if te.rate_name not in rates}
+            )
+            if unknown:
+                errors.append(
+                    {
+                        "row": row,
+                        "errors": [
+                            f"Rate '{name}' not found for project '{projects[obj.project_id][0]}'"
+                            for name in unknown
+                        ],
+                    }
+                )
+        if errors:
+            logger.warning(
+                f"CRUDWorkItem: Rejected bulk import of {len(objs_in)} items for user {user_id}, {len(errors)} invalid rows"
+            )
+            raise WorkItemImportError(errors)
+
+        # --- 3. Build all documents, amounts from the project rates ---
+        # All entry amounts in one batch (exact cents, one rounding per entry)
+        amounts = iter(
+            line_amounts_cents(
+                (projects[obj.project_id][2][te.rate_name], te.duration)
+                for obj in objs_in
+                for te in obj.timeEntries
+            )
+        )
+        docs = []
+        for obj in objs_in:
+            project_name, client_name, rates = projects[obj.project_id]
+            entries = []
+            for te in obj.timeEntries:
+                amount_cents = next(amounts)
+                entries.append(
+                    TimeEntry(
+                        description=te.description,
+                        rate_name=te.rate_name,
+                        duration=te.duration,
+                        price_per_hour=rates[te.rate_name],
+                        calculatedAmount=from_cents(amount_cents),
+                        amount_cents=amount_cents,
+                        date=te.date,
+                    )
+                )
+            total_hours, total_amount = compute_totals(entries)
+            doc = WorkItemInDB(
+                **obj.model_dump(exclude={"timeEntries", *INVOICE_FIELDS}),
+                user_id=user_id,
+                timeEntries=entries,
+                total_hours=total_hours,
+                total_amount=total_amount,
+                total_amount_cents=compute_amount_cents(entries),
+            ).model_dump(by_alias=True)
+            doc["work_date"] = resolve_work_date(doc)
+            doc["project_name"] = project_name
+            doc["client_name"] = client_name
+            docs.append(doc)
+
+        # --- 4. Insert in chunks ---
+        chunk_size = chunk_size or settings.WORK_ITEM_IMPORT_CHUNK_SIZE
+        collection = self._get_collection(db)
+        for start in range(0, len(docs), chunk_size):
+            await collection.insert_many(docs[start : start + chunk_size])
+        if docs:
+            await response_cache.invalidate(user_id, self.collection_name)
+
+        entry_count = sum(len(doc["timeEntries"]) for doc in docs)
+        total_amount = from_cents(sum(doc["total_amount_cents"] for doc in docs))
+        logger.info(
+            f"CRUDWorkItem: Bulk imported {len(docs)} work items ({entry_count} time entries) for user {user_id}"
+        )
+
+        # --- 5. One event for the whole import ---
+        if docs:
+            await log_event(
+                db=db,
+                event_type=EventType.WORK_ITEMS_IMPORTED,
+                user_id=user_id,
+                relevant_date=datetime.now(UTC).date(),
+                description=f"{len(docs)} work items imported.",
+                related_entity_type="WorkItem",
+                details={
+                    "work_items": len(docs),
+                    "time_entries": entry_count,
+                    "total_amount": total_amount,
+                    "project_ids": [str(project_id) for project_id in project_ids],
+                },
+            )
+        return WorkItemBulkResult(
+            created=len(docs),
+            time_entries=entry_count,
+            total_amount=total_amount,
+            ids=[doc["_id"] for doc in docs],
+        )
+
+    async def update(
+        self,
+        db: AsyncIOMotorDatabase,
+        *,
+        item_id: UUID,
+        user_id: str,
+        obj_in: WorkItemUpdate,
+    ) -> Optional[WorkItemInDB]:
+        if obj_in.timeEntries is not None:
+            # Entries come back from the client as-is: calculatedAmount stays
+            # authoritative, rounded to cents, and amount_cents follows it
+            obj_in = obj_in.model_copy(
+                update={
+                    "timeEntries": [
+                        te.model_copy(
+                            update={
+                                "calculatedAmount": from_cents(
+                                    to_cents(te.calculatedAmount)
+                                ),
+                                "amount_cents": to_cents(te.calculatedAmount),
+                            }
+                        )
+                        for te in obj_in.timeEntries
+                    ]
+                }
+            )
+        updated = await super().update(
+            db=db, item_id=item_id, user_id=user_id, obj_in=obj_in
+        )
+        # Re-derive the stored fields that depend on what changed (server side)
+        derived_stages = []
+        if obj_in.timeEntries is not None:
+            derived_stages.append(TOTALS_STAGE)
+        if obj_in.model_fields_set & set(WORK_DATE_SOURCES):
+            derived_stages.append(WORK_DATE_STAGE)
+        if updated and derived_stages:
+            derived_stages.append({"$set": {"updated_at": "$$NOW"}})
+            updated_doc = await self._get_collection(db).find_one_and_update(
+                {"_id": item_id, "user_id": user_id},
+                derived_stages,
+                return_document=ReturnDocument.AFTER,
+            )
+            updated = WorkItemInDB(**updated_doc) if updated_doc else updated
+            await response_cache.invalidate(user_id, self.collection_name)
+        # Moving an item to another project changes its denormalized names
+        if updated and "project_id" in obj_in.model_fields_set:
+            await set_work_item_names(
+                db,
+                user_id=user_id,
+                work_item_id=item_id,
+                project_id=updated.project_id,
+            )
+        return updated
+
     # Override get_multi_by_owner for Workitem-specific search if needed
     async def get_multi_by_owner(
         self,
@@ -184,6 +433,111 @@ class CRUDWorkItem(CRUDBase[WorkItemInDB, WorkItemCreate, WorkItemUpdate]):
     # You might add other project-specific CRUD methods here,
     # e.g., find_projects_by_status, add_rate_to_project, etc.
 
+    # --- Aggregation pipeline builders ---
+    # The project join is done *after* $sort/$skip/$limit so only the requested
+    # page is joined. It stays ahead of pagination only when the search filters
+    # on a joined field, since the page can't be known before that match.
+
+    def _build_project_info_pipeline(
+        self,
+        *,
+        match_conditions: dict,
+        search: Optional[str],
+        skip: int,
+        limit: int,
+    ) -> Pipeline:
+        search_match = None
+        if search:
+            # Search time entry description OR project name
+            search_regex = {"$regex": search, "$options": "i"}
+            search_match = {
+                "$or": [
+                    {"description": search_regex},  # Search time entry description
+                    {"project_info.name": search_regex},  # Search project name
+                ]
+            }
+        return (
+            Pipeline(self.collection_name)
+            .match(match_conditions)
+            .paginated_join(
+                Pipeline().lookup("projects", "project_id", "project_info"),
+                sort={"date": -1, "created_at": -1},  # Sort by date descending typically
+                skip=skip,
+                limit=limit,
+                search_match=search_match,
+            )
+            .project(
+                {
+                    # Include fields from TimeEntry (use 1 to include)
+                    # Adjust these fields based on your TimeEntry model
+                    "_id": 1,
+                    "user_id": 1,
+                    "project_id": 1,
+                    "date": 1,
+                    "duration": 1,
+                    "description": 1,
+                    "rate_name": 1,
+                    "rate_price_per_hour": 1,
+                    "amount": 1,
+                    # Add fields from the joined project_info
+                    "project_name": "$project_info.name",  # Get project name
+                    "client_id": "$project_info.client_id",  # Get client_id from project
+                }
+            )
+        )
+
+    def _build_project_name_pipeline(
+        self,
+        *,
+        match_conditions: dict,
+        search: Optional[str],
+        skip: int,
+        limit: int,
+    ) -> Pipeline:
+        search_match = None
+        if search:
+            search_regex = {"$regex": search, "$options": "i"}
+            search_match = {
+                "$or": [
+                    {"description": search_regex},  # Search WorkItem description
+                    {"name": search_regex},  # Search WorkItem name
+                    {"project_data.name": search_regex},  # Search joined Project name
+                ]
+            }
+        return (
+            Pipeline(self.collection_name)
+            .match(match_conditions)
+            .paginated_join(
+                Pipeline().lookup("projects", "project_id", "project_data"),
+                sort={"created_at": -1},  # Sort by newest first
+                skip=skip,
+                limit=limit,
+                search_match=search_match,
+            )
+            # Add the project_name field and remove temporary lookup data
+            .add_fields({"project_name": "$project_data.name"})
+            .project({"project_data": 0})
+        )
+
+    def _build_single_with_details_pipeline(
+        self, *, item_id: UUID, user_id: str
+    ) -> Pipeline:
+        return (
+            Pipeline(self.collection_name)
+            .match({"_id": item_id, "user_id": user_id})
+            .lookup("projects", "project_id", "project_data_array")
+            .lookup("clients", "project_data_array.client_id", "client_data_array")
+            .add_fields(
+                {
+                    "project_name": "$project_data_array.name",
+                    "client_name": "$client_data_array.name",
+                }
+            )
+            # Remove the temporary lookup data
+            .project({"project_data_array": 0, "client_data_array": 0})
+            .limit(1)
+        )
+
     async def get_multi_with_project_info(
         self,
         db: AsyncIOMotorDatabase,
@@ -199,115 +553,24 @@ class CRUDWorkItem(CRUDBase[WorkItemInDB, WorkItemCreate, WorkItemUpdate]):
         date_to: Optional[datetime] = None,
         # ) -> List[TimeEntryWithProjectInfo]: # Example specific return type
     ) -> List[dict]:  # Return list of dicts for flexibility
-        collection = self._get_collection(db)  # Should be db["time_entries"]
-        pipeline = []
 
         # --- Stage 1: Match Time Entries ---
         match_conditions = {"user_id": user_id}
         if project_id:
             match_conditions["project_id"] = project_id
         if invoice_id:
-            match_conditions["invoice_id"] = invoice_id
+            match_conditions[INVOICE_REF_FIELD] = invoice_id
         if is_invoiced is True:
-            match_conditions["invoice_id"] = {"$ne": None}  # Has an invoice_id
+            match_conditions.update(INVOICED)
         elif is_invoiced is False:
-            match_conditions["invoice_id"] = None  # Does not have invoice_id
-        if date_from or date_to:
-            match_conditions["date"] = {}
-            if date_from:
-                match_conditions["date"]["$gte"] = date_from
-            if date_to:
-                match_conditions["date"]["$lte"] = date_to
-
-        match_stage = {"$match": match_conditions}
-        pipeline.append(match_stage)
-
-        # --- Stage 2: Lookup Project Information ---
-        pipeline.append(
-            {
-                "$lookup": {
-                    # *** FIX: Correct collection name ***
-                    "from": "projects",  # Collection containing projects
-                    "localField": "project_id",  # Field from time_entries
-                    "foreignField": "_id",  # Field from projects
-                    "as": "project_info",  # Alias for the joined project data
-                }
-            }
-        )
-        # --- Stage 3: Unwind the project_info array ---
-        pipeline.append(
-            {
-                "$unwind": {
-                    "path": "$project_info",
-                    # Set to True if a time entry could theoretically exist
-                    # without a matching project (e.g., project deleted)
-                    # Set to False if project_id link is always guaranteed
-                    "preserveNullAndEmptyArrays": True,
-                }
-            }
-        )
-
-        # --- Stage 4: Optional Search (after lookup) ---
-        # Search time entry description OR project name
-        if search:
-            search_regex = {"$regex": search, "$options": "i"}
-            pipeline.append(
-                {
-                    "$match": {
-                        "$or": [
-                            {
-                                "description": search_regex
-                            },  # Search time entry description
-                            {"project_info.name": search_regex},  # Search project name
-                        ]
-                    }
-                }
-            )
-
-        # --- Stage 5: Project Fields (Shape the output) ---
-        project_stage = {
-            "$project": {
-                # Include fields from TimeEntry (use 1 to include)
-                # Adjust these fields based on your TimeEntry model
-                "_id": 1,
-                "user_id": 1,
-                "project_id": 1,
-                "date": 1,
-                "duration": 1,
-                "description": 1,
-                "rate_name": 1,
-                "rate_price_per_hour": 1,
-                "amount": 1,
-                # Add fields from the joined project_info
-                "project_name": "$project_info.name",  # Get project name
-                "client_id": "$project_info.client_id",  # Get client_id from project
-                # Add other project fields if needed (e.g., status)
-                # "project_status": "$project_info.status",
-            }
-        }
-        add_fields_stage = {
-            "$addFields": {
-                # Add fields from the joined project_info
-                "project_name": "$project_info.name",
-                "client_id": "$project_info.client_id",
-                # Add other project fields if needed
-                # "project_status": "$project_info.status",
-            }
-        }
-        pipeline.append(add_fields_stage)
-        pipeline.append(project_stage)
-
-        # --- Stage 6: Sorting, Skipping, Limiting ---
-        pipeline.append(
-            {"$sort": {"date": -1, "created_at": -1}}
-        )  # Sort by date descending typically
-        pipeline.append({"$skip": skip})
-        pipeline.append({"$limit": limit})
+            match_conditions.update(UNINVOICED)  # Uses the partial index
+        match_conditions.update(work_date_range(date_from, date_to))
 
-        logger.debug(f"CRUDTimeEntry Aggregation Pipeline: {pipeline}")
+        pipeline = self._build_project_info_pipeline(
+            match_conditions=match_conditions, search=search, skip=skip, limit=limit
+        )
 
-        cursor = collection.aggregate(pipeline)
-        results = await cursor.to_list(length=limit)
+        results = await pipeline.execute(db, length=limit)
         logger.info(f"Result is: {results}")
         logger.info(
             f"CRUDTimeEntry Aggregation: Found {len(results)} time entries for user {user_id}"
@@ -315,6 +578,47 @@ class CRUDWorkItem(CRUDBase[WorkItemInDB, WorkItemCreate, WorkItemUpdate]):
 
         return results
 
+    def _build_list_match(
+        self,
+        *,
+        user_id: str,
+        project_id: Optional[UUID] = None,
+        is_invoiced: Optional[bool] = None,
+        date_from: Optional[datetime] = None,
+        date_to: Optional[datetime] = None,
+    ) -> dict:
+        """Match conditions shared by the work item listing paths."""
+        match_conditions = {"user_id": user_id}
+        if project_id:
+            match_conditions["project_id"] = project_id
+        if is_invoiced is True:
+            match_conditions.update(INVOICED)
+        elif is_invoiced is False:
+            match_conditions.update(UNINVOICED)
+        match_conditions.update(work_date_range(date_from, date_to))
+        return match_conditions
+
+    def _parse_with_project_name(
+        self, results_dicts: List[dict]
+    ) -> List[WorkItemWithProjectName]:
+        try:
+            # Use the new model that includes project_name
+            parsed_results = [WorkItemWithProjectName(**doc) for doc in results_dicts]
+            logger.info(
+                f"Successfully parsed {len(parsed_results)} results into WorkItemWithProjectName models."
+            )
+            return parsed_results
+        except Exception as parse_error:
+            logger.error(
+                f"Failed to parse aggregation results into WorkItemWithProjectName: {parse_error}",
+                exc_info=True,
+            )
+            logger.error(
+                f"Data that failed parsing (first item): {results_dicts[0] if results_dicts else 'N/A'}"
+            )
+            # Return empty list or raise an internal error
+            return []
+
     # Method to get items *with* project name included
     async def get_multi_with_project_name(
         self,
@@ -332,129 +636,153 @@ class CRUDWorkItem(CRUDBase[WorkItemInDB, WorkItemCreate, WorkItemUpdate]):
     ) -> List[WorkItemWithProjectName]:  # Return list of the new model type
         """
         Retrieves multiple WorkItems for a user, including the associated project name.
+        Names come from the per-user name cache unless
+        WORK_ITEM_NAME_RESOLUTION is set to "lookup".
         """
-        collection = self._get_collection(db)  # Gets the "work_items" collection
-        pipeline = []
+        filters = dict(
+            user_id=user_id,
+            skip=skip,
+            limit=limit,
+            search=search,
+            project_id=project_id,
+            is_invoiced=is_invoiced,
+            date_from=date_from,
+            date_to=date_to,
+        )
+        if settings.WORK_ITEM_NAME_RESOLUTION == "lookup":
+            return await self._get_multi_with_project_name_lookup(db, **filters)
+        if settings.WORK_ITEM_NAME_RESOLUTION == "denormalized":
+            return await self._get_multi_with_project_name_denormalized(db, **filters)
+        return await self._get_multi_with_project_name_cached(db, **filters)
 
-        # --- Stage 1: Match Work Items ---
-        match_conditions = {"user_id": user_id}
-        if project_id:
-            match_conditions["project_id"] = project_id
-        if is_invoiced is True:
-            match_conditions["invoice_id"] = {"$ne": None}
-        elif is_invoiced is False:
-            match_conditions["invoice_id"] = None
-        if date_from or date_to:
-            # Assuming your WorkItemBase has 'date' field, adjust if needed
-            # If you have date_from/date_to, you need a date field to match against
-            date_field_to_match = (
-                "start_date"  # Or "created_at" or specific 'date' field
-            )
-            match_conditions[date_field_to_match] = {}
-            if date_from:
-                match_conditions[date_field_to_match]["$gte"] = date_from
-            if date_to:
-                match_conditions[date_field_to_match]["$lte"] = date_to
-
-        match_stage = {"$match": match_conditions}
-        pipeline.append(match_stage)
-
-        # --- Stage 2: Lookup Project Information ---
-        pipeline.append(
-            {
-                "$lookup": {
-                    "from": "projects",  # Correct collection name
-                    "localField": "project_id",  # Field from work_items
-                    "foreignField": "_id",  # Field from projects (_id assumed UUID)
-                    "as": "project_data",  # Temporary field name for joined data
-                }
-            }
+    async def _get_multi_with_project_name_denormalized(
+        self,
+        db: AsyncIOMotorDatabase,
+        *,
+        user_id: str,
+        skip: int = 0,
+        limit: int = 100,
+        search: Optional[str] = None,
+        project_id: Optional[UUID] = None,
+        is_invoiced: Optional[bool] = None,
+        date_from: Optional[datetime] = None,
+        date_to: Optional[datetime] = None,
+    ) -> List[WorkItemWithProjectName]:
+        """Plain find; names are read from the fields stored on each work item."""
+        collection = self._get_collection(db)
+        query = self._build_list_match(
+            user_id=user_id,
+            project_id=project_id,
+            is_invoiced=is_invoiced,
+            date_from=date_from,
+            date_to=date_to,
         )
+        if search:
+            search_regex = {"$regex": search, "$options": "i"}
+            query["$or"] = [
+                {"description": search_regex},
+                {"name": search_regex},
+                {"project_name": search_regex},
+            ]
 
-        # --- Stage 3: Unwind the project_data array ---
-        pipeline.append(
-            {
-                "$unwind": {
-                    "path": "$project_data",
-                    "preserveNullAndEmptyArrays": True,  # Keep WorkItem even if project is missing
-                }
-            }
+        logger.debug(f"CRUDWorkItem denormalized query: {query}")
+        cursor = collection.find(query).sort("created_at", -1).skip(skip).limit(limit)
+        results_dicts = await cursor.to_list(length=limit)
+        logger.info(
+            f"CRUDWorkItem: Found {len(results_dicts)} raw documents for user {user_id}"
         )
+        return self._parse_with_project_name(results_dicts)
 
-        # --- Stage 4: Optional Search (on description or project name) ---
+    async def _get_multi_with_project_name_cached(
+        self,
+        db: AsyncIOMotorDatabase,
+        *,
+        user_id: str,
+        skip: int = 0,
+        limit: int = 100,
+        search: Optional[str] = None,
+        project_id: Optional[UUID] = None,
+        is_invoiced: Optional[bool] = None,
+        date_from: Optional[datetime] = None,
+        date_to: Optional[datetime] = None,
+    ) -> List[WorkItemWithProjectName]:
+        """Plain indexed find; project/client names are joined in memory."""
+        collection = self._get_collection(db)
+        names = await name_cache.get(db, user_id)
+        query = self._build_list_match(
+            user_id=user_id,
+            project_id=project_id,
+            is_invoiced=is_invoiced,
+            date_from=date_from,
+            date_to=date_to,
+        )
         if search:
             search_regex = {"$regex": search, "$options": "i"}
-            pipeline.append(
-                {
-                    "$match": {
-                        "$or": [
-                            {
-                                "description": search_regex
-                            },  # Search WorkItem description
-                            {"name": search_regex},  # Search WorkItem name
-                            {
-                                "project_data.name": search_regex
-                            },  # Search joined Project name
-                        ]
-                    }
-                }
-            )
+            # Project name search is resolved against the cache, so no join is needed
+            try:
+                name_pattern = re.compile(search, re.IGNORECASE)
+                matching_project_ids = [
+                    pid
+                    for pid, (project_name, _) in names.projects.items()
+                    if project_name and name_pattern.search(project_name)
+                ]
+            except re.error:
+                matching_project_ids = []
+            query["$or"] = [
+                {"description": search_regex},
+                {"name": search_regex},
+                {"project_id": {"$in": matching_project_ids}},
+            ]
 
-        # --- Stage 5: Add the project_name field ---
-        pipeline.append(
-            {
-                "$addFields": {
-                    "project_name": "$project_data.name"  # Extract name from joined data
-                    # You could add other project fields here if needed
-                    # "client_id_from_project": "$project_data.client_id"
-                }
-            }
+        logger.debug(f"CRUDWorkItem cached-name query: {query}")
+        cursor = collection.find(query).sort("created_at", -1).skip(skip).limit(limit)
+        results_dicts = await cursor.to_list(length=limit)
+        logger.info(
+            f"CRUDWorkItem: Found {len(results_dicts)} raw documents for user {user_id}"
         )
 
-        # --- Stage 6: Remove temporary lookup data ---
-        pipeline.append(
-            {
-                "$project": {
-                    "project_data": 0  # Exclude the temporary field
-                }
-            }
-        )
+        for doc in results_dicts:
+            doc["project_name"] = names.project_name(doc.get("project_id"))
+            doc["client_name"] = names.client_name(doc.get("project_id"))
 
-        # --- Stage 7: Sorting (e.g., by date or creation time) ---
-        # Adjust sort field based on your WorkItem model
-        pipeline.append({"$sort": {"created_at": -1}})  # Example: Sort by newest first
+        return self._parse_with_project_name(results_dicts)
+
+    async def _get_multi_with_project_name_lookup(
+        self,
+        db: AsyncIOMotorDatabase,
+        *,
+        user_id: str,
+        skip: int = 0,
+        limit: int = 100,
+        search: Optional[str] = None,
+        project_id: Optional[UUID] = None,
+        is_invoiced: Optional[bool] = None,
+        date_from: Optional[datetime] = None,
+        date_to: Optional[datetime] = None,
+    ) -> List[WorkItemWithProjectName]:
+        """$lookup-based variant, joining projects on every request."""
 
-        # --- Stage 8: Pagination ---
-        pipeline.append({"$skip": skip})
-        pipeline.append({"$limit": limit})
+        # --- Stage 1: Match Work Items ---
+        match_conditions = self._build_list_match(
+            user_id=user_id,
+            project_id=project_id,
+            is_invoiced=is_invoiced,
+            date_from=date_from,
+            date_to=date_to,
+        )
 
-        logger.debug(f"CRUDWorkItem Aggregation Pipeline: {pipeline}")
+        pipeline = self._build_project_name_pipeline(
+            match_conditions=match_conditions, search=search, skip=skip, limit=limit
+        )
 
         # --- Execute pipeline ---
-        cursor = collection.aggregate(pipeline)
-        results_dicts = await cursor.to_list(length=limit)  # Get list of dictionaries
+        results_dicts = await pipeline.execute(db, length=limit)
         logger.info(
             f"CRUDWorkItem Aggregation: Found {len(results_dicts)} raw documents for user {user_id}"
         )
 
         # --- Parse into the specific Pydantic model WITH project_name ---
-        try:
-            # Use the new model that includes project_name
-            parsed_results = [WorkItemWithProjectName(**doc) for doc in results_dicts]
-            logger.info(
-                f"Successfully parsed {len(parsed_results)} results into WorkItemWithProjectName models."
-            )
-            return parsed_results
-        except Exception as parse_error:
-            logger.error(
-                f"Failed to parse aggregation results into WorkItemWithProjectName: {parse_error}",
-                exc_info=True,
-            )
-            logger.error(
-                f"Data that failed parsing (first item): {results_dicts[0] if results_dicts else 'N/A'}"
-            )
-            # Return empty list or raise an internal error
-            return []
+        return self._parse_with_project_name(results_dicts)
 
     async def get_single_with_details(
         self,
@@ -467,88 +795,44 @@ class CRUDWorkItem(CRUDBase[WorkItemInDB, WorkItemCreate, WorkItemUpdate]):
         Retrieves a single WorkItem by its ID for a user, including
         the associated project name and the project's client name.
         """
-        collection = self._get_collection(db)  # Gets the "work_items" collection
-        pipeline = []
-
-        # --- Stage 1: Match the specific WorkItem by ID and user_id ---
-        pipeline.append({"$match": {"_id": item_id, "user_id": user_id}})
-        # --- Stage 2: Lookup Project Information ---
-        pipeline.append(
-            {
-                "$lookup": {
-                    "from": "projects",  # Projects collection
-                    "localField": "project_id",  # From work_items
-                    "foreignField": "_id",  # From projects
-                    "as": "project_data_array",  # Use a distinct name for the array
-                }
-            }
-        )
-        # --- Stage 3: Unwind the project_data_array ---
-        # (Since we matched a single WorkItem, this should at most yield one document)
-        pipeline.append(
-            {
-                "$unwind": {
-                    "path": "$project_data_array",
-                    "preserveNullAndEmptyArrays": True,  # Keep WorkItem if project somehow missing
-                }
-            }
-        )
-        # --- Stage 4: Lookup Client Information (based on project_data_array.client_id) ---
-        pipeline.append(
-            {
-                "$lookup": {
-                    "from": "clients",  # Clients collection
-                    "localField": "project_data_array.client_id",  # Field from the joined project
-                    "foreignField": "_id",  # Field from clients
-                    "as": "client_data_array",  # Temporary field name for joined client data
-                }
-            }
-        )
+        if settings.WORK_ITEM_NAME_RESOLUTION == "lookup":
+            return await self._get_single_with_details_lookup(
+                db, item_id=item_id, user_id=user_id
+            )
 
-        # --- Stage 5: Unwind the client_data_array ---
-        pipeline.append(
-            {
-                "$unwind": {
-                    "path": "$client_data_array",
-                    "preserveNullAndEmptyArrays": True,  # Keep result even if client somehow missing
-                }
-            }
-        )
-        # --- Stage 6: Add the project_name and client_name fields ---
-        pipeline.append(
-            {
-                "$addFields": {
-                    "project_name": "$project_data_array.name",
-                    "client_name": "$client_data_array.name",
-                    # You could add client_id_from_project: "$project_data_array.client_id"
-                    # if you needed it and it wasn't already on the WorkItem
-                }
-            }
-        )
-        # --- Stage 7: Project (Select final fields and remove temporary lookup data) ---
-        # This ensures the output matches your WorkItemWithProjectAndClientName model
-        pipeline.append(
-            {
-                "$project": {
-                    "project_data_array": 0,  # Exclude the temporary project array
-                    "client_data_array": 0,  # Exclude the temporary client array
-                    # All other fields from the original WorkItem (and added fields) will be kept
-                    # because $addFields doesn't remove them.
-                    # If you need to be very explicit about which WorkItem fields to keep:
-                    # "_id": 1, "user_id": 1, "name": 1, "project_id": 1, ... etc.
-                    # "project_name": 1, "client_name": 1
-                }
-            }
+        doc = await self._get_collection(db).find_one(
+            {"_id": item_id, "user_id": user_id}
         )
+        if not doc:
+            logger.debug(
+                f"CRUDWorkItem: WorkItem with ID {item_id} not found for user {user_id}."
+            )
+            return None
+        if settings.WORK_ITEM_NAME_RESOLUTION != "denormalized":
+            names = await name_cache.get(db, user_id)
+            doc["project_name"] = names.project_name(doc.get("project_id"))
+            doc["client_name"] = names.client_name(doc.get("project_id"))
+        try:
+            return WorkItemWithProjectName(**doc)
+        except Exception as parse_error:
+            logger.error(
+                f"Failed to parse WorkItem {item_id} into Pydantic model: {parse_error}",
+                exc_info=True,
+            )
+            return None
 
-        # --- Stage 8: Limit to 1 (since we matched by ID, just to be safe) ---
-        pipeline.append({"$limit": 1})
-
-        logger.debug(f"CRUDWorkItem get_single_with_details Pipeline: {pipeline}")
-
-        # --- Execute pipeline ---
-        cursor = collection.aggregate(pipeline)
-        results_list = await cursor.to_list(length=1)  # Expect 0 or 1 result
+    async def _get_single_with_details_lookup(
+        self,
+        db: AsyncIOMotorDatabase,
+        *,
+        item_id: UUID,
+        user_id: str,
+    ) -> Optional[WorkItemWithProjectName]:
+        """$lookup-based variant, joining projects and clients in Mongo."""
+        pipeline = self._build_single_with_details_pipeline(
+            item_id=item_id, user_id=user_id
+        )
+        results_list = await pipeline.execute(db, length=1)  # Expect 0 or 1 result
 
         if not results_list:
             logger.debug(
@@ -0,0 +1,191 @@
+# backend/app/crud/denormalize.py
+import logging
+from datetime import datetime, UTC
+from typing import List, Optional, Tuple
+from uuid import UUID
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+from app.core.response_cache import response_cache
+
+logger = logging.getLogger(__name__)
+
+# Collection names are used directly here so the project/client CRUD modules
+# can call into this module without importing crud_workItem (circular import).
+WORK_ITEMS_COLLECTION = "workItems"
+PROJECTS_COLLECTION = "projects"
+CLIENTS_COLLECTION = "clients"
+
+
+async def resolve_project_names(
+    db: AsyncIOMotorDatabase, *, user_id: str, project_id: UUID
+) -> Tuple[Optional[str], Optional[str]]:
+    """Returns (project_name, client_name) for a project owned by user_id."""
+    project_doc = await db[PROJECTS_COLLECTION].find_one(
+        {"_id": project_id, "user_id": user_id},
+        projection={"name": 1, "client_id": 1},
+    )
+    if not project_doc:
+        return None, None
+    client_doc = await db[CLIENTS_COLLECTION].find_one(
+        {"_id": project_doc.get("client_id"), "user_id": user_id},
+        projection={"name": 1},
+    )
+    return project_doc.get("name"), client_doc.get("name") if client_doc else None
+
+
+async def propagate_project_names(
+    db: AsyncIOMotorDatabase, *, user_id: str, project_id: UUID
+) -> int:
+    """
+    Rewrites project_name/client_name on every work item of the project
+    (both None once the project is deleted).
+    """
+    project_name, client_name = await resolve_project_names(
+        db, user_id=user_id, project_id=project_id
+    )
+    # Only items whose names differ are touched, so their updated_at (ETags)
+    # stays put otherwise
+    result = await db[WORK_ITEMS_COLLECTION].update_many(
+        {
+            "user_id": user_id,
+            "project_id": project_id,
+            "$or": [
+                {"project_name": {"$ne": project_name}},
+                {"client_name": {"$ne": client_name}},
+            ],
+        },
+        {
+            "$set": {
+                "project_name": project_name,
+                "client_name": client_name,
+                "updated_at": datetime.now(UTC),
+            }
+        },
+    )
+    await response_cache.invalidate(user_id, WORK_ITEMS_COLLECTION)
+    logger.info(
+        f"Denormalize: Updated names on {result.modified_count} work items of project {project_id}"
+    )
+    return result.modified_count
+
+
+async def set_work_item_names(
+    db: AsyncIOMotorDatabase, *, user_id: str, work_item_id: UUID, project_id: UUID
+) -> int:
+    """Writes the names of `project_id` on one work item (moved to that project)."""
+    project_name, client_name = await resolve_project_names(
+        db, user_id=user_id, project_id=project_id
+    )
+    result = await db[WORK_ITEMS_COLLECTION].update_one(
+        {
+            "_id": work_item_id,
+            "user_id": user_id,
+            "$or": [
+                {"project_name": {"$ne": project_name}},
+                {"client_name": {"$ne": client_name}},
+            ],
+        },
+        {
+            "$set": {
+                "project_name": project_name,
+                "client_name": client_name,
+                "updated_at": datetime.now(UTC),
+            }
+        },
+    )
+    if result.modified_count:
+        await response_cache.invalidate(user_id, WORK_ITEMS_COLLECTION)
+    return result.modified_count
+
+
+async def propagate_client_name(
+    db: AsyncIOMotorDatabase,
+    *,
+    user_id: str,
+    client_id: UUID,
+    client_name: Optional[str],
+) -> int:
+    """
+    Rewrites client_name on every work item of the client's projects
+    (None once the client is deleted).
+    """
+    project_ids = await db[PROJECTS_COLLECTION].distinct(
+        "_id", {"user_id": user_id, "client_id": client_id}
+    )
+    if not project_ids:
+        return 0
+    result = await db[WORK_ITEMS_COLLECTION].update_many(
+        {
+            "user_id": user_id,
+            "project_id": {"$in": project_ids},
+            "client_name": {"$ne": client_name},
+        },
+        {"$set": {"client_name": client_name, "updated_at": datetime.now(UTC)}},
+    )
+    await response_cache.invalidate(user_id, WORK_ITEMS_COLLECTION)
+    logger.info(
+        f"Denormalize: Updated client name on {result.modified_count} work items of client {client_id}"
+    )
+    return result.modified_count
+
+
+async def find_name_drift(
+    db: AsyncIOMotorDatabase, *, user_id: Optional[str] = None
+) -> List[dict]:
+    """
+    Finds work items whose stored project_name/client_name no longer match
+    the referenced project and client documents.
+    """
+    match_conditions = {"user_id": user_id} if user_id else {}
+    pipeline = [
+        {"$match": match_conditions},
+        {
+            "$lookup": {
+                "from": PROJECTS_COLLECTION,
+                "localField": "project_id",
+                "foreignField": "_id",
+                "as": "project_data",
+            }
+        },
+        {"$unwind": {"path": "$project_data", "preserveNullAndEmptyArrays": True}},
+        {
+            "$lookup": {
+                "from": CLIENTS_COLLECTION,
+                "localField": "project_data.client_id",
+                "foreignField": "_id",
+                "as": "client_data",
+            }
+        },
+        {"$unwind": {"path": "$client_data", "preserveNullAndEmptyArrays": True}},
+        {
+            "$project": {
+                "user_id": 1,
+                "project_id": 1,
+                "project_name": {"$ifNull": ["$project_name", None]},
+                "client_name": {"$ifNull": ["$client_name", None]},
+                "expected_project_name": {"$ifNull": ["$project_data.name", None]},
+                "expected_client_name": {"$ifNull": ["$client_data.name", None]},
+            }
+        },
+        {
+            "$match": {
+                "$expr": {
+                    "$or": [
+                        {"$ne": ["$project_name", "$expected_project_name"]},
+                        {"$ne": ["$client_name", "$expected_client_name"]},
+                    ]
+                }
+            }
+        },
+    ]
+    return await db[WORK_ITEMS_COLLECTION].aggregate(pipeline).to_list(length=None)
+
+
+async def repair_name_drift(db: AsyncIOMotorDatabase, drift: List[dict]) -> int:
+    """Re-propagates names for every (user, project) pair found in drift."""
+    modified = 0
+    for user_id, project_id in {(row["user_id"], row["project_id"]) for row in drift}:
+        modified += await propagate_project_names(
+            db, user_id=user_id, project_id=project_id
+        )
+    return modified
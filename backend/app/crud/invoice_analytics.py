@@ -0,0 +1,381 @@
+# backend/app/crud/invoice_analytics.py
+"""
+Incrementally maintained analytics store for invoices.
+
+Every invoice adds fixed increments to a few small rollup collections,
+depending on its state:
+
+- analytics_revenue: net cents and invoice count per (user, issue month,
+  client, project). Each invoice is recorded once per project it covers
+  and once with project_id None, the per-client rollup.
+- analytics_receivables: gross open cents per (user, due date), for
+  invoices that are not paid or void.
+- analytics_payments: paid cents and summed days-to-payment per
+  (user, payment month).
+
+On every write the old state's increments are subtracted and the new
+state's are added with one $inc upsert per key, so the rollups never need a
+scan of `invoices` or `workItems`. Reports read a few hundred small
+documents at most.
+"""
+import logging
+from collections import defaultdict
+from datetime import date, datetime, UTC
+from typing import Dict, List, Optional, Tuple
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import UpdateOne
+
+from app.crud.billable import INVOICE_REF_FIELD
+from app.crud.name_cache import name_cache
+from app.crud.work_item_totals import ITEM_TOTAL_CENTS
+from app.models.dashboard import (
+    PaymentTimeMonth,
+    PaymentTimeReport,
+    ReceivablesBucket,
+    ReceivablesReport,
+    RevenueBucket,
+    RevenueReport,
+)
+from app.models.invoice import InvoiceStatus
+from app.utils.date_utils import to_utc_midnight
+from app.utils.money import from_cents, to_cents
+
+logger = logging.getLogger(__name__)
+
+# Collection names used directly (same reason as in denormalize.py)
+INVOICES_COLLECTION = "invoices"
+WORK_ITEMS_COLLECTION = "workItems"
+REVENUE_COLLECTION = "analytics_revenue"
+RECEIVABLES_COLLECTION = "analytics_receivables"
+PAYMENTS_COLLECTION = "analytics_payments"
+STORE_COLLECTIONS = (REVENUE_COLLECTION, RECEIVABLES_COLLECTION, PAYMENTS_COLLECTION)
+
+# (collection, key fields, increments)
+Contribution = Tuple[str, Tuple[Tuple[str, object], ...], Dict[str, int]]
+
+
+def _as_date(value) -> Optional[date]:
+    if isinstance(value, datetime):
+        return value.date()
+    return value
+
+
+def month_key(value) -> str:
+    """'YYYY-MM' of a date/datetime."""
+    return _as_date(value).strftime("%Y-%m")
+
+
+def _cents(doc: dict, cents_field: str, amount_field: str) -> int:
+    cents = doc.get(cents_field)
+    return cents if cents is not None else to_cents(doc.get(amount_field) or 0)
+
+
+def _project_amounts(doc: dict) -> List[Tuple[object, int]]:
+    """(project_id, net cents) of an invoice; all on its first project if unknown."""
+    amounts = doc.get("project_amounts")
+    if amounts:
+        return [(part["project_id"], part["amount_cents"]) for part in amounts]
+    project_ids = doc.get("project_ids") or [None]
+    return [(project_ids[0], to_cents(doc.get("subtotal") or 0))]
+
+
+def contributions(doc: Optional[dict]) -> List[Contribution]:
+    """Increments an invoice in this state adds to the store (none if void)."""
+    if not doc or doc.get("status") == InvoiceStatus.VOID:
+        return []
+    user_id = doc["user_id"]
+    result: List[Contribution] = []
+
+    issue_month = month_key(doc["issue_date"])
+    parts = _project_amounts(doc)
+    client_key = (
+        ("user_id", user_id),
+        ("month", issue_month),
+        ("client_id", doc["client_id"]),
+    )
+    result.append(
+        (
+            REVENUE_COLLECTION,
+            client_key + (("project_id", None),),
+            {"net_cents": sum(cents for _, cents in parts), "invoices": 1},
+        )
+    )
+    for project_id, cents in parts:
+        result.append(
+            (
+                REVENUE_COLLECTION,
+                client_key + (("project_id", project_id),),
+                {"net_cents": cents, "invoices": 1},
+            )
+        )
+
+    gross_cents = _cents(doc, "total_amount_cents", "total_amount")
+    if doc.get("status") not in InvoiceStatus.CLOSED:
+        result.append(
+            (
+                RECEIVABLES_COLLECTION,
+                (
+                    ("user_id", user_id),
+                    ("due_date", to_utc_midnight(doc["due_date"])),
+                ),
+                {"open_cents": gross_cents, "invoices": 1},
+            )
+        )
+    elif doc.get("payment_date"):  # Paid
+        payment_date = _as_date(doc["payment_date"])
+        result.append(
+            (
+                PAYMENTS_COLLECTION,
+                (("user_id", user_id), ("month", month_key(payment_date))),
+                {
+                    "paid_cents": gross_cents,
+                    "invoices": 1,
+                    "days_to_payment": (
+                        payment_date - _as_date(doc["issue_date"])
+                    ).days,
+                },
+            )
+        )
+    return result
+
+
+async def _apply(
+    db: AsyncIOMotorDatabase, changes: Dict[Tuple[str, tuple], Dict[str, int]]
+) -> None:
+    """One unordered bulk of $inc upserts per collection, zero changes skipped."""
+    by_collection: Dict[str, List[UpdateOne]] = defaultdict(list)
+    for (collection_name, key), increments in changes.items():
+        increments = {field: value for field, value in increments.items() if value}
+        if increments:
+            by_collection[collection_name].append(
+                UpdateOne(dict(key), {"$inc": increments}, upsert=True)
+            )
+    for collection_name, operations in by_collection.items():
+        await db[collection_name].bulk_write(operations, ordered=False)
+
+
+async def record_invoice_change(
+    db: AsyncIOMotorDatabase,
+    *,
+    before: Optional[dict] = None,
+    after: Optional[dict] = None,
+) -> None:
+    """
+    Moves the store from an invoice's old state to its new one. `before` is
+    None on creation, `after` None on deletion; both are invoice documents.
+    """
+    changes: Dict[Tuple[str, tuple], Dict[str, int]] = defaultdict(
+        lambda: defaultdict(int)
+    )
+    for sign, doc in ((-1, before), (1, after)):
+        for collection_name, key, increments in contributions(doc):
+            for field, value in increments.items():
+                changes[(collection_name, key)][field] += sign * value
+    await _apply(db, changes)
+    logger.debug(
+        f"InvoiceAnalytics: Recorded change of invoice {(after or before or {}).get('_id')}"
+    )
+
+
+async def project_amounts_from_work_items(
+    db: AsyncIOMotorDatabase, *, user_id: str, invoice_id
+) -> List[dict]:
+    """Net cents per project of an invoice's work items (for older invoices)."""
+    rows = await db[WORK_ITEMS_COLLECTION].aggregate(
+        [
+            {"$match": {"user_id": user_id, INVOICE_REF_FIELD: invoice_id}},
+            {
+                "$group": {
+                    "_id": "$project_id",
+                    "amount_cents": {"$sum": ITEM_TOTAL_CENTS},
+                }
+            },
+            {"$sort": {"_id": 1}},
+        ]
+    ).to_list(length=None)
+    return [
+        {"project_id": row["_id"], "amount_cents": row["amount_cents"]}
+        for row in rows
+    ]
+
+
+async def rebuild_invoice_analytics(
+    db: AsyncIOMotorDatabase, *, user_id: Optional[str] = None
+) -> int:
+    """
+    Recomputes the store from `invoices` (for one user or everyone). Invoices
+    created before project_amounts existed get them from their work items.
+    Returns the number of invoices recorded.
+    """
+    query = {"user_id": user_id} if user_id else {}
+    for collection_name in STORE_COLLECTIONS:
+        await db[collection_name].delete_many(query)
+
+    count = 0
+    invoices = db[INVOICES_COLLECTION].find(query, projection={"pdf_content": 0})
+    async for doc in invoices:
+        if not doc.get("project_amounts"):
+            doc["project_amounts"] = await project_amounts_from_work_items(
+                db, user_id=doc["user_id"], invoice_id=doc["_id"]
+            )
+            await db[INVOICES_COLLECTION].update_one(
+                {"_id": doc["_id"]},
+                {
+                    "$set": {
+                        "project_amounts": doc["project_amounts"],
+                        "updated_at": datetime.now(UTC),
+                    }
+                },
+            )
+        await record_invoice_change(db, after=doc)
+        count += 1
+    logger.info(f"InvoiceAnalytics: Rebuilt analytics from {count} invoices")
+    return count
+
+
+# --- Reports ---
+
+REVENUE_GROUPINGS = ("month", "client", "project")
+# Receivables buckets by days overdue: (label, first day, last day)
+OVERDUE_BUCKETS = (
+    ("current", None, 0),
+    ("1-30", 1, 30),
+    ("31-60", 31, 60),
+    ("61-90", 61, 90),
+    ("90+", 91, None),
+)
+
+
+async def revenue_report(
+    db: AsyncIOMotorDatabase,
+    *,
+    user_id: str,
+    group_by: str,
+    from_month: str,
+    to_month: str,
+) -> RevenueReport:
+    """Invoiced net revenue by issue month, client or project."""
+    if group_by not in REVENUE_GROUPINGS:
+        raise ValueError(f"Unknown revenue grouping: {group_by}")
+    match = {
+        "user_id": user_id,
+        "month": {"$gte": from_month, "$lte": to_month},
+        # Project rows only when grouping by project, else the client rollups
+        "project_id": {"$ne": None} if group_by == "project" else None,
+    }
+    field = {"month": "$month", "client": "$client_id", "project": "$project_id"}
+    rows = await db[REVENUE_COLLECTION].aggregate(
+        [
+            {"$match": match},
+            {
+                "$group": {
+                    "_id": field[group_by],
+                    "net_cents": {"$sum": "$net_cents"},
+                    "invoices": {"$sum": "$invoices"},
+                }
+            },
+            {"$match": {"invoices": {"$gt": 0}}},
+            {"$sort": {"_id": 1}},
+        ]
+    ).to_list(length=None)
+
+    names = await name_cache.get(db, user_id) if group_by != "month" else None
+    buckets = []
+    for row in rows:
+        name = None
+        if group_by == "client":
+            name = names.clients.get(row["_id"])
+        elif group_by == "project":
+            name = names.project_name(row["_id"])
+        buckets.append(
+            RevenueBucket(
+                key=str(row["_id"]),
+                name=name,
+                net_amount=from_cents(row["net_cents"]),
+                invoices=row["invoices"],
+            )
+        )
+    if group_by != "month":  # Largest first
+        buckets.sort(key=lambda bucket: -bucket.net_amount)
+    return RevenueReport(
+        group_by=group_by,
+        from_month=from_month,
+        to_month=to_month,
+        total_net_amount=from_cents(sum(row["net_cents"] for row in rows)),
+        buckets=buckets,
+    )
+
+
+def overdue_bucket(days_overdue: int) -> str:
+    for label, first, last in OVERDUE_BUCKETS:
+        if (first is None or days_overdue >= first) and (
+            last is None or days_overdue <= last
+        ):
+            return label
+    return OVERDUE_BUCKETS[-1][0]
+
+
+async def receivables_report(
+    db: AsyncIOMotorDatabase, *, user_id: str, as_of: date
+) -> ReceivablesReport:
+    """Open gross amounts by days past their due date."""
+    totals = {label: [0, 0] for label, _, _ in OVERDUE_BUCKETS}
+    rows = db[RECEIVABLES_COLLECTION].find(
+        {"user_id": user_id, "invoices": {"$gt": 0}},
+        projection={"_id": 0, "due_date": 1, "open_cents": 1, "invoices": 1},
+    )
+    async for row in rows:
+        label = overdue_bucket((as_of - _as_date(row["due_date"])).days)
+        totals[label][0] += row.get("open_cents", 0)  # Zero increments are skipped
+        totals[label][1] += row["invoices"]
+    return ReceivablesReport(
+        as_of=as_of,
+        total_amount=from_cents(sum(cents for cents, _ in totals.values())),
+        buckets=[
+            ReceivablesBucket(
+                bucket=label, amount=from_cents(cents), invoices=invoices
+            )
+            for label, (cents, invoices) in totals.items()
+        ],
+    )
+
+
+async def payment_time_report(
+    db: AsyncIOMotorDatabase, *, user_id: str, from_month: str, to_month: str
+) -> PaymentTimeReport:
+    """Average days from issue to payment, overall and per payment month."""
+    rows = await (
+        db[PAYMENTS_COLLECTION]
+        .find(
+            {
+                "user_id": user_id,
+                "month": {"$gte": from_month, "$lte": to_month},
+                "invoices": {"$gt": 0},
+            },
+            projection={"_id": 0},
+        )
+        .sort("month", 1)
+        .to_list(length=None)
+    )
+    paid_invoices = sum(row["invoices"] for row in rows)
+    # Fields whose increments were all zero are missing on the row
+    total_days = sum(row.get("days_to_payment", 0) for row in rows)
+    return PaymentTimeReport(
+        from_month=from_month,
+        to_month=to_month,
+        paid_invoices=paid_invoices,
+        average_days_to_payment=(
+            round(total_days / paid_invoices, 1) if paid_invoices else None
+        ),
+        months=[
+            PaymentTimeMonth(
+                month=row["month"],
+                paid_amount=from_cents(row.get("paid_cents", 0)),
+                invoices=row["invoices"],
+                average_days_to_payment=round(
+                    row.get("days_to_payment", 0) / row["invoices"], 1
+                ),
+            )
+            for row in rows
+        ],
+    )
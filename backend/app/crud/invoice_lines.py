@@ -0,0 +1,155 @@
+# backend/app/crud/invoice_lines.py
+import logging
+from datetime import date, datetime
+from typing import Dict, List, Optional, Tuple
+from uuid import UUID
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+from app.crud.pipeline import Pipeline
+from app.crud.work_dates import WORK_DATE_STAGE
+from app.crud.work_item_totals import entry_cents_expression
+from app.models.invoice import InvoiceLineGrouping, InvoiceLineItem
+from app.utils.money import from_cents
+
+logger = logging.getLogger(__name__)
+
+# Collection names used directly (same reason as in denormalize.py)
+WORK_ITEMS_COLLECTION = "workItems"
+PROJECTS_COLLECTION = "projects"
+
+# Group keys per strategy. Rate name and price are always part of the key, so
+# every line has a single unit price and quantity x unit_price = amount.
+_PRICE_KEY = {
+    "rate_name": "$timeEntries.rate_name",
+    "unit_price": "$timeEntries.price_per_hour",
+}
+GROUP_KEYS: Dict[str, dict] = {
+    InvoiceLineGrouping.ENTRY: {"work_item_id": "$_id", "entry_index": "$entry_index"},
+    InvoiceLineGrouping.WORK_ITEM: {"work_item_id": "$_id", **_PRICE_KEY},
+    InvoiceLineGrouping.PROJECT_RATE: {"project_id": "$project_id", **_PRICE_KEY},
+    # Per project too: the line names the project
+    InvoiceLineGrouping.DAY: {
+        "work_date": "$work_date",
+        "project_id": "$project_id",
+        **_PRICE_KEY,
+    },
+}
+
+
+def line_items_pipeline(
+    *, user_id: str, work_item_ids: List[UUID], grouping: str
+) -> Pipeline:
+    """
+    One aggregation turning the selected work items into grouped lines:
+    quantity/amount sums, date span and the source work item IDs per line.
+    """
+    if grouping not in GROUP_KEYS:
+        raise ValueError(f"Unknown line item grouping: {grouping}")
+    return (
+        Pipeline(WORK_ITEMS_COLLECTION)
+        .match({"_id": {"$in": work_item_ids}, "user_id": user_id})
+        # Look the items up by _id, not by the user_id index the heuristic would pick
+        .hint([("_id", 1)])
+        # Items written before work_date existed get it derived on the fly
+        .add_fields(
+            {
+                "work_date": {
+                    "$ifNull": ["$work_date", WORK_DATE_STAGE["$set"]["work_date"]]
+                }
+            }
+        )
+        .stage(
+            {"$unwind": {"path": "$timeEntries", "includeArrayIndex": "entry_index"}}
+        )
+        .stage(
+            {
+                "$group": {
+                    "_id": GROUP_KEYS[grouping],
+                    "quantity": {"$sum": "$timeEntries.duration"},
+                    # Exact: integer cents, summed on the server
+                    "amount_cents": {"$sum": entry_cents_expression("$timeEntries")},
+                    "unit_price": {"$first": "$timeEntries.price_per_hour"},
+                    "rate_name": {"$first": "$timeEntries.rate_name"},
+                    "work_item_name": {"$first": "$name"},
+                    "project_id": {"$first": "$project_id"},
+                    "project_name": {"$first": "$project_name"},
+                    "date_from": {"$min": "$work_date"},
+                    "date_to": {"$max": "$work_date"},
+                    "work_item_ids": {"$addToSet": "$_id"},
+                    "entry_count": {"$sum": 1},
+                }
+            }
+        )
+        # The group key keeps the entries of one work item together, in order
+        .stage({"$sort": {"date_from": 1, "project_name": 1, "_id": 1}})
+    )
+
+
+def _day(value: Optional[datetime]) -> str:
+    return value.strftime("%Y-%m-%d") if value else ""
+
+
+def _span(row: dict) -> str:
+    start, end = _day(row["date_from"]), _day(row["date_to"])
+    return start if start == end else f"{start} – {end}"
+
+
+def describe_line(row: dict, grouping: str) -> str:
+    """Human-readable line description for a grouped row."""
+    rate = row["rate_name"]
+    if grouping == InvoiceLineGrouping.PROJECT_RATE:
+        return f"{row['project_name']} – {rate} ({_span(row)})"
+    if grouping == InvoiceLineGrouping.DAY:
+        return f"{_day(row['date_from'])}: {row['project_name']} (Rate: {rate})"
+    # Per entry / per work item: same wording as the original per-entry lines
+    return f"{_day(row['date_from'])}: {row['work_item_name']} (Rate: {rate})"
+
+
+async def build_line_items(
+    db: AsyncIOMotorDatabase,
+    *,
+    user_id: str,
+    work_item_ids: List[UUID],
+    grouping: str,
+) -> Tuple[List[InvoiceLineItem], Optional[date], Optional[date]]:
+    """Grouped, sorted invoice line items plus the first and last work day."""
+    rows = await line_items_pipeline(
+        user_id=user_id, work_item_ids=work_item_ids, grouping=grouping
+    ).execute(db)
+
+    # Items created before names were denormalized: resolve project names once
+    missing = {row["project_id"] for row in rows if not row.get("project_name")}
+    if missing:
+        names = {
+            doc["_id"]: doc.get("name")
+            async for doc in db[PROJECTS_COLLECTION].find(
+                {"_id": {"$in": list(missing)}, "user_id": user_id},
+                projection={"name": 1},
+            )
+        }
+        for row in rows:
+            if not row.get("project_name"):
+                row["project_name"] = names.get(row["project_id"], "")
+
+    line_items = [
+        InvoiceLineItem(
+            description=describe_line(row, grouping)[:500],
+            quantity=round(row["quantity"], 2),
+            unit_price=row["unit_price"],
+            amount=from_cents(row["amount_cents"]),
+            time_entry_ids=sorted(row["work_item_ids"], key=str),
+            entry_count=row["entry_count"],
+        )
+        for row in rows
+    ]
+    logger.info(
+        f"InvoiceLines: {len(line_items)} '{grouping}' lines from "
+        f"{sum(row['entry_count'] for row in rows)} time entries of {len(work_item_ids)} work items"
+    )
+    work_days = [
+        row[key] for row in rows for key in ("date_from", "date_to") if row[key]
+    ]
+    if not work_days:
+        return line_items, None, None
+    return line_items, min(work_days).date(), max(work_days).date()
+
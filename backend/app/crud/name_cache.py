@@ -0,0 +1,122 @@
+# backend/app/crud/name_cache.py
+import logging
+import time
+from typing import Dict, Optional, Tuple
+from uuid import UUID
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+PROJECTS_COLLECTION = "projects"
+CLIENTS_COLLECTION = "clients"
+
+
+class UserNames:
+    """Snapshot of one user's project and client names."""
+
+    def __init__(
+        self,
+        projects: Dict[UUID, Tuple[str, Optional[UUID]]],
+        clients: Dict[UUID, str],
+    ):
+        self.projects = projects  # {project_id: (project_name, client_id)}
+        self.clients = clients  # {client_id: client_name}
+        self.loaded_at = time.monotonic()
+        self.generation = 0  # NameCache generation it was loaded at
+
+    def project_name(self, project_id: Optional[UUID]) -> Optional[str]:
+        entry = self.projects.get(project_id)
+        return entry[0] if entry else None
+
+    def client_id(self, project_id: Optional[UUID]) -> Optional[UUID]:
+        entry = self.projects.get(project_id)
+        return entry[1] if entry else None
+
+    def client_name(self, project_id: Optional[UUID]) -> Optional[str]:
+        return self.clients.get(self.client_id(project_id))
+
+
+class NameCache:
+    """
+    Per-user in-process cache of project -> (name, client_id) and client -> name.
+
+    Used to resolve `project_name`/`client_name` on work item listings without a
+    `$lookup`. Entries are dropped by the project/client CRUD write methods via
+    a per-user generation: in this process, or in `name_cache_generations` when
+    `shared` (several workers, see app/server.py), so every worker sees the
+    write on its next read. The TTL is a safety net for other writers.
+    """
+
+    GENERATIONS = "name_cache_generations"
+
+    def __init__(self, ttl_seconds: int, shared: bool = False):
+        self.ttl_seconds = ttl_seconds
+        self.shared = shared
+        self._entries: Dict[str, UserNames] = {}
+        # Bumped on every invalidation; an entry is only used while the
+        # generation it was loaded at is current (also covers loads that
+        # raced with a write)
+        self._generations: Dict[str, int] = {}
+
+    async def _generation(self, db: AsyncIOMotorDatabase, user_id: str) -> int:
+        if not self.shared:
+            return self._generations.get(user_id, 0)
+        doc = await db[self.GENERATIONS].find_one({"_id": user_id})
+        return doc["generation"] if doc else 0
+
+    async def get(self, db: AsyncIOMotorDatabase, user_id: str) -> UserNames:
+        generation = await self._generation(db, user_id)
+        entry = self._entries.get(user_id)
+        if (
+            entry
+            and entry.generation == generation
+            and time.monotonic() - entry.loaded_at < self.ttl_seconds
+        ):
+            return entry
+
+        entry = await self._load(db, user_id)
+        entry.generation = generation
+        self._entries[user_id] = entry
+        return entry
+
+    async def _load(self, db: AsyncIOMotorDatabase, user_id: str) -> UserNames:
+        logger.debug(f"NameCache: Loading project/client names for user {user_id}")
+        project_docs = await (
+            db[PROJECTS_COLLECTION]
+            .find({"user_id": user_id}, projection={"name": 1, "client_id": 1})
+            .to_list(length=None)
+        )
+        client_docs = await (
+            db[CLIENTS_COLLECTION]
+            .find({"user_id": user_id}, projection={"name": 1})
+            .to_list(length=None)
+        )
+        return UserNames(
+            projects={
+                doc["_id"]: (doc.get("name"), doc.get("client_id"))
+                for doc in project_docs
+            },
+            clients={doc["_id"]: doc.get("name") for doc in client_docs},
+        )
+
+    async def invalidate(self, db: AsyncIOMotorDatabase, user_id: str) -> None:
+        self._generations[user_id] = self._generations.get(user_id, 0) + 1
+        self._entries.pop(user_id, None)
+        if self.shared:
+            await db[self.GENERATIONS].update_one(
+                {"_id": user_id}, {"$inc": {"generation": 1}}, upsert=True
+            )
+        logger.debug(f"NameCache: Invalidated names for user {user_id}")
+
+    def clear(self) -> None:
+        """Drops this process's entries (shared generations are kept)."""
+        for user_id in list(self._generations):
+            self._generations[user_id] += 1
+        self._entries.clear()
+
+
+name_cache = NameCache(
+    ttl_seconds=settings.NAME_CACHE_TTL_SECONDS, shared=settings.NAME_CACHE_SHARED
+)
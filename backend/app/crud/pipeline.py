@@ -0,0 +1,255 @@
+# backend/app/crud/pipeline.py
+import asyncio
+import logging
+import time
+from typing import Any, Dict, List, Optional, Tuple
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+from app.core.config import settings
+from app.core.db import ENSURED_INDEXES
+
+logger = logging.getLogger(__name__)
+
+IndexKeys = List[Tuple[str, int]]
+
+# Keeps fire-and-forget explain tasks alive until they finish
+_explain_tasks = set()
+
+
+class Pipeline:
+    """
+    Small composable builder for the aggregation pipelines of the CRUD layer.
+
+    Usage:
+        pipeline = (
+            Pipeline("workItems")
+            .match({"user_id": user_id})
+            .paginate({"created_at": -1}, skip, limit)
+            .lookup("projects", "project_id", "project_data")
+        )
+        results = await pipeline.execute(db, length=limit)
+    """
+
+    def __init__(self, collection_name: Optional[str] = None):
+        self.collection_name = collection_name
+        self.stages: List[dict] = []
+        self._hint: Optional[IndexKeys] = None
+
+    # --- Stages ---
+    def stage(self, stage: dict) -> "Pipeline":
+        self.stages.append(stage)
+        return self
+
+    def extend(self, other: "Pipeline") -> "Pipeline":
+        self.stages.extend(other.stages)
+        return self
+
+    def match(self, conditions: Optional[dict]) -> "Pipeline":
+        if conditions:
+            self.stages.append({"$match": conditions})
+        return self
+
+    def lookup(
+        self,
+        from_collection: str,
+        local_field: str,
+        as_field: str,
+        foreign_field: str = "_id",
+        unwind: bool = True,
+    ) -> "Pipeline":
+        """$lookup, by default unwound to a single (optional) object."""
+        self.stages.append(
+            {
+                "$lookup": {
+                    "from": from_collection,
+                    "localField": local_field,
+                    "foreignField": foreign_field,
+                    "as": as_field,
+                }
+            }
+        )
+        if unwind:
+            self.stages.append(
+                {
+                    "$unwind": {
+                        "path": f"${as_field}",
+                        "preserveNullAndEmptyArrays": True,  # Keep doc if the join misses
+                    }
+                }
+            )
+        return self
+
+    def paginate(self, sort: Dict[str, int], skip: int, limit: int) -> "Pipeline":
+        self.stages.append({"$sort": sort})
+        if skip:
+            self.stages.append({"$skip": skip})
+        self.stages.append({"$limit": limit})
+        return self
+
+    def paginated_join(
+        self,
+        join: "Pipeline",
+        *,
+        sort: Dict[str, int],
+        skip: int,
+        limit: int,
+        search_match: Optional[dict] = None,
+    ) -> "Pipeline":
+        """
+        Joins only the requested page. The join stays ahead of pagination only
+        when `search_match` filters on joined fields.
+        """
+        if search_match:
+            return self.extend(join).match(search_match).paginate(sort, skip, limit)
+        return self.paginate(sort, skip, limit).extend(join)
+
+    def add_fields(self, fields: dict) -> "Pipeline":
+        self.stages.append({"$addFields": fields})
+        return self
+
+    def project(self, fields: dict) -> "Pipeline":
+        self.stages.append({"$project": fields})
+        return self
+
+    def limit(self, limit: int) -> "Pipeline":
+        self.stages.append({"$limit": limit})
+        return self
+
+    def hint(self, index: IndexKeys) -> "Pipeline":
+        self._hint = index
+        return self
+
+    def build(self) -> List[dict]:
+        return list(self.stages)
+
+    # --- Index hints ---
+    def select_index_hint(self) -> Optional[IndexKeys]:
+        """
+        Picks the ensured index whose leading keys cover the most equality
+        fields of the first $match (then the first $sort key). No hint when
+        the match has a range on a field the picked index doesn't cover but
+        another index does (e.g. a work_date range sorted by created_at):
+        the planner can use the more selective index there.
+        """
+        if self._hint is not None:
+            return self._hint
+        if not settings.QUERY_INDEX_HINTS or not self.stages:
+            return None
+        first_match = self.stages[0].get("$match")
+        if not first_match:
+            return None
+        equality_fields, range_fields = set(), set()
+        for field, value in first_match.items():
+            if field.startswith("$"):
+                continue
+            if isinstance(value, dict) and any(k.startswith("$") for k in value):
+                range_fields.add(field)
+            else:
+                equality_fields.add(field)
+        sort_fields = [
+            field
+            for stage in self.stages[1:2]
+            for field in stage.get("$sort", {})
+        ]
+
+        best, best_score = None, 0
+        for keys in ENSURED_INDEXES.get(self.collection_name, []):
+            score = 0
+            for field, _ in keys:
+                if field in equality_fields:
+                    score += 2
+                    continue
+                if sort_fields and field == sort_fields[0]:
+                    score += 1
+                break
+            # Only hint indexes whose leading key is an equality match
+            if score >= 2 and score > best_score:
+                best, best_score = keys, score
+        if best is not None:
+            covered = {field for field, _ in best}
+            indexed_elsewhere = {
+                field
+                for keys in ENSURED_INDEXES.get(self.collection_name, [])
+                for field, _ in keys
+            } - covered
+            if range_fields & indexed_elsewhere:
+                return None
+        return best
+
+    # --- Execution ---
+    async def execute(
+        self, db: AsyncIOMotorDatabase, length: Optional[int] = None
+    ) -> List[dict]:
+        collection = db[self.collection_name]
+        pipeline = self.build()
+        kwargs: Dict[str, Any] = {}
+        hint = self.select_index_hint()
+        if hint:
+            kwargs["hint"] = hint
+        logger.debug(
+            f"Pipeline ({self.collection_name}) hint={hint}, stages={pipeline}"
+        )
+
+        start = time.perf_counter()
+        results = await collection.aggregate(pipeline, **kwargs).to_list(length=length)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+
+        threshold = settings.QUERY_EXPLAIN_SLOW_MS
+        if threshold is not None and elapsed_ms >= threshold:
+            task = asyncio.create_task(
+                self._log_explain(db, pipeline, kwargs, elapsed_ms, len(results))
+            )
+            _explain_tasks.add(task)
+            task.add_done_callback(_explain_tasks.discard)
+        return results
+
+    async def _log_explain(
+        self,
+        db: AsyncIOMotorDatabase,
+        pipeline: List[dict],
+        kwargs: Dict[str, Any],
+        elapsed_ms: float,
+        returned: int,
+    ):
+        command = {
+            "explain": {
+                "aggregate": self.collection_name,
+                "pipeline": pipeline,
+                "cursor": {},
+                **({"hint": dict(kwargs["hint"])} if "hint" in kwargs else {}),
+            },
+            "verbosity": "executionStats",
+        }
+        try:
+            explain = await db.command(command)
+        except Exception as e:
+            logger.warning(f"Pipeline ({self.collection_name}): explain failed: {e}")
+            return
+        stats = summarize_execution_stats(explain)
+        logger.warning(
+            f"Slow aggregation on '{self.collection_name}' ({elapsed_ms:.1f} ms): "
+            f"docsExamined={stats['docs_examined']}, keysExamined={stats['keys_examined']}, "
+            f"returned={returned}, hint={kwargs.get('hint')}, "
+            f"stages={[next(iter(stage)) for stage in pipeline]}"
+        )
+
+
+def summarize_execution_stats(explain: dict) -> Dict[str, int]:
+    """Sums totalDocsExamined/totalKeysExamined over every executionStats in an explain."""
+    totals = {"docs_examined": 0, "keys_examined": 0}
+
+    def walk(node):
+        if isinstance(node, dict):
+            stats = node.get("executionStats")
+            if isinstance(stats, dict):
+                totals["docs_examined"] += stats.get("totalDocsExamined", 0)
+                totals["keys_examined"] += stats.get("totalKeysExamined", 0)
+            for key, value in node.items():
+                if key != "executionStats":
+                    walk(value)
+        elif isinstance(node, list):
+            for item in node:
+                walk(item)
+
+    walk(explain)
+    return totals
@@ -0,0 +1,183 @@
+# backend/app/crud/rate_propagation.py
+import logging
+from typing import Dict, Iterable, List, Optional
+from uuid import UUID
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+from app.core.response_cache import response_cache
+from app.crud.billable import UNINVOICED
+from app.crud.work_item_totals import TOTALS_STAGE, entry_cents_expression
+from app.models.project import RatePropagationResult
+from app.utils.money import from_cents, line_cents_expression, units_expression
+
+logger = logging.getLogger(__name__)
+
+# Collection names are used directly (same reason as in denormalize.py)
+WORK_ITEMS_COLLECTION = "workItems"
+PROJECTS_COLLECTION = "projects"
+
+
+def changed_rates(old_rates: Iterable[dict], new_rates: Iterable[dict]) -> Dict[str, float]:
+    """Rates that are new or have a different price_per_hour: {rate_name: price}."""
+    old = {rate["name"]: rate["price_per_hour"] for rate in old_rates}
+    return {
+        rate["name"]: rate["price_per_hour"]
+        for rate in new_rates
+        if old.get(rate["name"]) != rate["price_per_hour"]
+    }
+
+
+def uninvoiced_filter(user_id: str, project_id: UUID, rate_names: List[str]) -> dict:
+    """Uninvoiced work items of the project with at least one entry at the rates."""
+    return {
+        "user_id": user_id,
+        "project_id": project_id,
+        **UNINVOICED,  # Set to invoiced by crud_invoice.create_from_request
+        "timeEntries.rate_name": {"$in": rate_names},
+    }
+
+
+def _price_expression(rates: Dict[str, float], entry: str):
+    """New price_per_hour of an entry, or None if its rate did not change."""
+    return {
+        "$switch": {
+            "branches": [
+                {"case": {"$eq": [f"{entry}.rate_name", name]}, "then": price}
+                for name, price in rates.items()
+            ],
+            "default": None,
+        }
+    }
+
+
+# New amount of an entry inside rate_change_pipeline's $map/$let
+_NEW_CENTS = line_cents_expression("$$price", "$$te.duration")
+
+
+def rate_change_pipeline(rates: Dict[str, float]) -> List[dict]:
+    """
+    Update pipeline rewriting price_per_hour and calculatedAmount of the
+    entries at the given rates; other entries are left untouched.
+    Amounts are rounded to cents like CRUDWorkItem.create does, and the
+    stored totals are re-derived in the same update.
+    """
+    return [
+        {
+            "$set": {
+                "timeEntries": {
+                    "$map": {
+                        "input": "$timeEntries",
+                        "as": "te",
+                        "in": {
+                            "$let": {
+                                "vars": {"price": _price_expression(rates, "$$te")},
+                                "in": {
+                                    "$cond": [
+                                        {"$eq": ["$$price", None]},
+                                        "$$te",
+                                        {
+                                            "$mergeObjects": [
+                                                "$$te",
+                                                {
+                                                    "price_per_hour": "$$price",
+                                                    "amount_cents": _NEW_CENTS,
+                                                    "calculatedAmount": units_expression(
+                                                        _NEW_CENTS
+                                                    ),
+                                                },
+                                            ]
+                                        },
+                                    ]
+                                },
+                            }
+                        },
+                    }
+                },
+                "updated_at": "$$NOW",
+            }
+        },
+        TOTALS_STAGE,
+    ]
+
+
+def amount_delta_pipeline(match: dict, rates: Dict[str, float]) -> List[dict]:
+    """Per-month change of the summed calculatedAmount the update will cause."""
+    return [
+        {"$match": match},
+        {"$unwind": "$timeEntries"},
+        {"$match": {"timeEntries.rate_name": {"$in": list(rates)}}},
+        {
+            "$project": {
+                "month": {
+                    "$dateToString": {"format": "%Y-%m", "date": "$work_date"}
+                },
+                # In cents, so the per-month sums are exact
+                "delta": {
+                    "$subtract": [
+                        line_cents_expression(
+                            _price_expression(rates, "$timeEntries"),
+                            "$timeEntries.duration",
+                        ),
+                        entry_cents_expression("$timeEntries"),
+                    ]
+                },
+            }
+        },
+        {
+            "$group": {
+                "_id": "$month",
+                "entries": {"$sum": 1},
+                "delta": {"$sum": "$delta"},
+            }
+        },
+    ]
+
+
+async def propagate_rate_changes(
+    db: AsyncIOMotorDatabase,
+    *,
+    user_id: str,
+    project_id: UUID,
+    rates: Optional[Dict[str, float]] = None,
+) -> RatePropagationResult:
+    """
+    Recomputes the amounts of uninvoiced work items after a rate change.
+
+    `rates` ({rate_name: price_per_hour}) defaults to all current rates of the
+    project. Invoiced items keep the price they were billed at. The per-month
+    amount deltas are computed before the update so dashboard/report rollups
+    can be adjusted incrementally instead of being rebuilt.
+    """
+    if rates is None:
+        project_doc = await db[PROJECTS_COLLECTION].find_one(
+            {"_id": project_id, "user_id": user_id}, projection={"rates": 1}
+        )
+        rates = {
+            rate["name"]: rate["price_per_hour"]
+            for rate in (project_doc or {}).get("rates", [])
+        }
+    result = RatePropagationResult(project_id=project_id, rates=rates)
+    if not rates:
+        return result
+
+    collection = db[WORK_ITEMS_COLLECTION]
+    match = uninvoiced_filter(user_id, project_id, list(rates))
+
+    delta_cents = 0
+    async for doc in collection.aggregate(amount_delta_pipeline(match, rates)):
+        result.time_entries_recalculated += doc["entries"]
+        delta_cents += doc["delta"]
+        if doc["_id"] and doc["delta"]:
+            result.amount_delta_by_month[doc["_id"]] = from_cents(doc["delta"])
+    result.amount_delta = from_cents(delta_cents)
+
+    update = await collection.update_many(match, rate_change_pipeline(rates))
+    await response_cache.invalidate(user_id, WORK_ITEMS_COLLECTION)
+    result.work_items_matched = update.matched_count
+    result.work_items_updated = update.modified_count
+    logger.info(
+        f"RatePropagation: Project {project_id} rates {rates}: recalculated "
+        f"{result.time_entries_recalculated} entries on {update.modified_count} work items, "
+        f"amount delta {result.amount_delta}"
+    )
+    return result
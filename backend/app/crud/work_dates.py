@@ -0,0 +1,78 @@
+# backend/app/crud/work_dates.py
+import logging
+from datetime import datetime
+from typing import Optional
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+from app.utils.date_utils import to_utc_midnight
+
+logger = logging.getLogger(__name__)
+
+# Collection name used directly (same reason as in denormalize.py)
+WORK_ITEMS_COLLECTION = "workItems"
+
+# Work items carry several optional dates; work_date is the first one set,
+# in this order, truncated to UTC midnight. It is always populated (created_at
+# is the last resort) and indexed, so every date range query uses it.
+WORK_DATE_SOURCES = ("date", "start_date", "date_from", "created_at")
+
+# Update/aggregation stage deriving work_date server side (MongoDB 5.0+)
+WORK_DATE_STAGE = {
+    "$set": {
+        "work_date": {
+            "$dateTrunc": {
+                "date": {"$ifNull": [f"${field}" for field in WORK_DATE_SOURCES]},
+                "unit": "day",
+                "timezone": "UTC",
+            }
+        }
+    }
+}
+
+
+def resolve_work_date(source) -> Optional[datetime]:
+    """work_date (UTC midnight) of a work item model or document dict."""
+    for field in WORK_DATE_SOURCES:
+        if isinstance(source, dict):
+            value = source.get(field)
+        else:
+            value = getattr(source, field, None)
+        if value is not None:
+            return to_utc_midnight(value)
+    return None
+
+
+async def backfill_work_dates(
+    db: AsyncIOMotorDatabase,
+    *,
+    user_id: Optional[str] = None,
+    only_missing: bool = True,
+) -> int:
+    """
+    Writes work_date on existing work items with one update_many (server-side
+    pipeline). Returns the number of documents changed.
+    """
+    query = {}
+    if user_id:
+        query["user_id"] = user_id
+    if only_missing:
+        query["work_date"] = None  # Missing or null
+    result = await db[WORK_ITEMS_COLLECTION].update_many(query, [WORK_DATE_STAGE])
+    logger.info(
+        f"WorkDates: Backfilled work_date on {result.modified_count} of {result.matched_count} work items"
+    )
+    return result.modified_count
+
+
+def work_date_range(
+    date_from: Optional[datetime] = None, date_to: Optional[datetime] = None
+) -> dict:
+    """Match condition for work items on days date_from..date_to (inclusive)."""
+    if not (date_from or date_to):
+        return {}
+    condition = {}
+    if date_from:
+        condition["$gte"] = to_utc_midnight(date_from)
+    if date_to:
+        condition["$lte"] = to_utc_midnight(date_to)
+    return {"work_date": condition}
@@ -0,0 +1,124 @@
+# backend/app/crud/work_item_totals.py
+import logging
+from typing import Iterable, Optional, Tuple
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+from app.utils.money import cents_expression, from_cents, to_cents, units_expression
+
+logger = logging.getLogger(__name__)
+
+# Collection name used directly (same reason as in denormalize.py)
+WORK_ITEMS_COLLECTION = "workItems"
+
+
+def entry_cents_expression(entry: str) -> dict:
+    """Expression for an entry's amount_cents (older entries: from calculatedAmount)."""
+    return {
+        "$ifNull": [
+            f"{entry}.amount_cents",
+            cents_expression({"$ifNull": [f"{entry}.calculatedAmount", 0]}),
+        ]
+    }
+
+
+# Update stage filling amount_cents on entries written before it existed
+ENTRY_CENTS_STAGE = {
+    "$set": {
+        "timeEntries": {
+            "$map": {
+                "input": "$timeEntries",
+                "as": "te",
+                "in": {
+                    "$mergeObjects": [
+                        "$$te",
+                        {"amount_cents": entry_cents_expression("$$te")},
+                    ]
+                },
+            }
+        }
+    }
+}
+
+_TOTAL_CENTS = {
+    "$sum": {
+        "$map": {
+            "input": "$timeEntries",
+            "as": "te",
+            "in": entry_cents_expression("$$te"),
+        }
+    }
+}
+
+# Update/aggregation stage deriving the totals from the timeEntries array.
+# $sum over an array path adds its elements, so no $unwind is needed. Amounts
+# are summed as integer cents (app/utils/money.py), total_amount follows.
+TOTALS_STAGE = {
+    "$set": {
+        "total_hours": {"$round": [{"$sum": "$timeEntries.duration"}, 2]},
+        "total_amount_cents": _TOTAL_CENTS,
+        "total_amount": units_expression(_TOTAL_CENTS),
+    }
+}
+
+# A work item's stored total in cents, for reports (not yet backfilled: from total_amount)
+ITEM_TOTAL_CENTS = {
+    "$ifNull": [
+        "$total_amount_cents",
+        cents_expression({"$ifNull": ["$total_amount", 0]}),
+    ]
+}
+
+
+def entry_cents(entry) -> int:
+    """amount_cents of a TimeEntry model or dict (older entries: from calculatedAmount)."""
+    if isinstance(entry, dict):
+        cents, amount = entry.get("amount_cents"), entry.get("calculatedAmount")
+    else:
+        cents, amount = entry.amount_cents, entry.calculatedAmount
+    return cents if cents is not None else to_cents(amount or 0)
+
+
+def compute_amount_cents(time_entries: Iterable) -> int:
+    """Exact sum of the entries' amounts in cents."""
+    return sum(entry_cents(entry) for entry in time_entries)
+
+
+def compute_totals(time_entries: Iterable) -> Tuple[float, float]:
+    """(total_hours, total_amount) of TimeEntry models or dicts."""
+    time_entries = list(time_entries)
+    hours = 0.0
+    for entry in time_entries:
+        if isinstance(entry, dict):
+            hours += entry.get("duration") or 0
+        else:
+            hours += entry.duration or 0
+    return round(hours, 2), from_cents(compute_amount_cents(time_entries))
+
+
+async def backfill_totals(
+    db: AsyncIOMotorDatabase,
+    *,
+    user_id: Optional[str] = None,
+    only_missing: bool = True,
+) -> int:
+    """
+    Writes amount_cents on the entries and total_hours/total_amount(_cents)
+    on existing work items with one update_many (server-side pipeline).
+    Returns the number of documents changed.
+    """
+    query = {}
+    if user_id:
+        query["user_id"] = user_id
+    if only_missing:
+        query["$or"] = [
+            {"total_hours": {"$exists": False}},
+            {"total_amount": {"$exists": False}},
+            {"total_amount_cents": {"$exists": False}},
+        ]
+    result = await db[WORK_ITEMS_COLLECTION].update_many(
+        query, [ENTRY_CENTS_STAGE, TOTALS_STAGE]
+    )
+    logger.info(
+        f"WorkItemTotals: Backfilled totals on {result.modified_count} of {result.matched_count} work items"
+    )
+    return result.modified_count
@@ -1,4 +1,5 @@
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI, Response, status
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 import logging
@@ -6,9 +7,19 @@ import logging
 
 
 from fastapi.openapi.utils import get_openapi
-from app.core.config import settings
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from app.api import deps
+from app.core.config import settings, log_settings_summary
 from app.api.v1.api import api_router
 from app.core.db import connect_to_mongo, close_mongo_connection
+from app.core.health import startup_state
+from app.core.metrics import MetricsMiddleware, mark_worker_stopped, render_metrics
+from app.core.process_state import reset_process_state
+from app.core.profiling import ProfilingMiddleware
+from app.services import pdf_generator
+from app.services.health_checks import health_checks
+from app.services.live_updates import live_update_watcher
+from prometheus_client import CONTENT_TYPE_LATEST
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -19,11 +30,25 @@ logger = logging.getLogger(__name__)
 async def lifespan(app: FastAPI):
     # Startup
     logger.info("Application startup...")
+    startup_state.begin()
+    log_settings_summary()
+    # Each worker builds its own clients/caches, even if the app was imported
+    # before the fork (see core/process_state.py)
+    reset_process_state()
     await connect_to_mongo()
+    if settings.LIVE_UPDATES_ENABLED:
+        live_update_watcher.start()
+    if settings.PDF_WARMUP_ON_STARTUP:
+        startup_state.warm_up("pdf", pdf_generator.warm_up)
+    startup_state.mark_ready()
     yield
     # Shutdown
     logger.info("Application shutdown...")
+    startup_state.mark_stopping()
+    await startup_state.cancel_warmups()
+    await live_update_watcher.stop()
     await close_mongo_connection()
+    mark_worker_stopped()
 
 
 app = FastAPI(
@@ -53,6 +78,14 @@ else:
     )
 
 
+# Opt-in request profiling / slow-request traces
+if settings.PROFILING_ENABLED:
+    app.add_middleware(ProfilingMiddleware)
+
+# Request latency per route template (outermost, so it also times CORS handling)
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
 app.include_router(api_router, prefix=settings.API_V1_STR)
 
 
@@ -76,6 +109,53 @@ def custom_openapi():
 app.openapi = custom_openapi
 
 
+if settings.METRICS_ENABLED:
+
+    @app.get(
+        "/metrics",
+        include_in_schema=False,
+        dependencies=[Depends(deps.require_metrics_access)],
+    )
+    async def read_metrics():
+        """
+        Prometheus scrape endpoint (request, Mongo command, pool and app
+        metrics), aggregated over all workers in multiprocess mode.
+        Needs METRICS_TOKEN as a bearer token, or a local client without one.
+        """
+        return Response(content=render_metrics(), media_type=CONTENT_TYPE_LATEST)
+
+
+@app.get("/healthz", include_in_schema=False)
+async def liveness(db: AsyncIOMotorDatabase = Depends(deps.get_db)):
+    """
+    Liveness: 200 whenever the worker answers requests. Includes the (cached)
+    dependency checks for humans and dashboards, but never fails on them:
+    restarting a worker doesn't fix a slow database.
+    """
+    body = {"status": "alive", **startup_state.report()}
+    if startup_state.ready:
+        body["health"] = await health_checks.report(db)
+    return body
+
+
+@app.get("/readyz", include_in_schema=False)
+async def readiness(db: AsyncIOMotorDatabase = Depends(deps.get_db)):
+    """
+    Readiness: 503 until startup has finished (core/health.py), then while a
+    dependency check fails, e.g. Mongo unreachable or the pool saturated
+    (services/health_checks.py), so load balancers shed this worker's traffic.
+    """
+    body = startup_state.report()
+    ready = startup_state.ready
+    if ready:
+        body["health"] = await health_checks.report(db)
+        if not body["health"]["ok"]:
+            ready = False
+            body["status"] = "unavailable"
+    code = status.HTTP_200_OK if ready else status.HTTP_503_SERVICE_UNAVAILABLE
+    return JSONResponse(body, status_code=code)
+
+
 @app.get("/", tags=["Root"])
 async def read_root():
     return {"message": f"Welcome to {settings.PROJECT_NAME}"}
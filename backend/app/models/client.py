@@ -5,6 +5,7 @@ from pydantic import (
     Field,
     ConfigDict,
 )  # Import ConfigDict for Pydantic v2
+from datetime import datetime
 from typing import Optional
 from uuid import UUID, uuid4
 
@@ -82,6 +83,8 @@ class ClientUpdate(BaseModel):
 class ClientInDBBase(ClientBase):
     id: UUID = Field(default_factory=uuid4, alias="_id")
     user_id: str  # Store the user's ID (e.g., Authentik 'sub' claim)
+    # Set by CRUDBase on every write; None for clients written before that
+    updated_at: Optional[datetime] = None
 
     # Pydantic v2 config
     model_config = ConfigDict(
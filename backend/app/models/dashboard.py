@@ -1,6 +1,6 @@
 # backend/app/models/dashboard.py
 from pydantic import BaseModel, Field
-from typing import List, Dict, Union
+from typing import List, Dict, Optional, Union
 from datetime import date  # Use date for daily summary keys if preferred
 
 
@@ -23,3 +23,46 @@ class HoursSummaryResponse(BaseModel):
     active_work_dates_current_month: List[date] = Field(
         default_factory=list
     )  # Option 2: List of objects (often better for charts)
+
+
+# --- Invoice analytics (served from the store in crud/invoice_analytics.py) ---
+class RevenueBucket(BaseModel):
+    key: str  # "YYYY-MM", client ID or project ID
+    name: Optional[str] = None  # Client/project name, if grouped by one
+    net_amount: float = Field(..., description="Invoiced net amount (subtotal)")
+    invoices: int = Field(..., ge=0)
+
+
+class RevenueReport(BaseModel):
+    group_by: str
+    from_month: str
+    to_month: str
+    total_net_amount: float
+    buckets: List[RevenueBucket] = Field(default_factory=list)
+
+
+class ReceivablesBucket(BaseModel):
+    bucket: str  # "current" (not yet due), "1-30", "31-60", "61-90", "90+"
+    amount: float = Field(..., description="Open gross amount")
+    invoices: int = Field(..., ge=0)
+
+
+class ReceivablesReport(BaseModel):
+    as_of: date
+    total_amount: float
+    buckets: List[ReceivablesBucket] = Field(default_factory=list)
+
+
+class PaymentTimeMonth(BaseModel):
+    month: str  # "YYYY-MM" of the payment
+    paid_amount: float
+    invoices: int = Field(..., ge=0)
+    average_days_to_payment: float
+
+
+class PaymentTimeReport(BaseModel):
+    from_month: str
+    to_month: str
+    paid_invoices: int = Field(..., ge=0)
+    average_days_to_payment: Optional[float] = None  # None if nothing was paid
+    months: List[PaymentTimeMonth] = Field(default_factory=list)
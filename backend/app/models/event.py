@@ -10,6 +10,7 @@ class EventType:
     WORK_ITEM_CREATED = "work_item.created"
     WORK_ITEM_UPDATED = "work_item.updated"
     WORK_ITEM_DELETED = "work_item.deleted"
+    WORK_ITEMS_IMPORTED = "work_items.imported"  # One event per bulk import
     INVOICE_CREATED = "invoice.created"
     INVOICE_STATUS_UPDATED = "invoice.status.updated"  # e.g., sent, paid
     INVOICE_PDF_GENERATED = "invoice.pdf.generated"
@@ -1,6 +1,6 @@
 # backend/app/models/invoice.py
 from pydantic import BaseModel, Field, ConfigDict, EmailStr
-from typing import Optional, List
+from typing import Optional, List, Literal
 from uuid import UUID, uuid4
 from datetime import date, datetime
 
@@ -35,13 +35,40 @@ class InvoiceLineItem(BaseModel):
     )  # Often hours, but could be units
     unit_price: float = Field(..., ge=0, examples=[80.0])  # Price per unit/hour
     # Optional: Link back to TimeEntry IDs covered by this line item
+    # (the work item IDs; grouped lines list each source work item once)
     time_entry_ids: Optional[List[UUID]] = Field(default=None)
+    entry_count: Optional[int] = Field(
+        default=None, description="Number of time entries summed into this line"
+    )
     # Calculated amount = quantity * unit_price (calculated on backend)
     amount: float = Field(..., ge=0, examples=[840.0])
 
     model_config = ConfigDict(from_attributes=True)
 
 
+# --- Net Amount per Project ---
+# Subtotal share of each project, recorded at creation for revenue reports
+class InvoiceProjectAmount(BaseModel):
+    project_id: UUID
+    amount_cents: int = Field(..., ge=0)
+
+
+# --- Line Item Grouping ---
+# How time entries are summarized into line items (see crud/invoice_lines.py).
+# Every strategy also splits by rate and price, so quantity x unit_price = amount.
+class InvoiceLineGrouping:
+    ENTRY = "entry"  # One line per time entry
+    WORK_ITEM = "work_item"  # One line per work item
+    PROJECT_RATE = "project_rate"  # One line per project and rate
+    DAY = "day"  # One line per work day
+
+    ALL = (ENTRY, WORK_ITEM, PROJECT_RATE, DAY)
+
+
+# Type of an InvoiceLineGrouping value (settings, requests)
+LineGrouping = Literal["entry", "work_item", "project_rate", "day"]
+
+
 # --- Invoice Status ---
 class InvoiceStatus:
     DRAFT = "draft"
@@ -50,6 +77,9 @@ class InvoiceStatus:
     OVERDUE = "overdue"
     VOID = "void"  # Optional: For canceled invoices
 
+    # Invoices that no longer count as receivables
+    CLOSED = (PAID, VOID)
+
 
 # --- Base Invoice Schema ---
 class InvoiceBase(BaseModel):
@@ -68,11 +98,17 @@ class InvoiceBase(BaseModel):
     )  # Default German VAT
     tax_amount: float = Field(..., ge=0)
     total_amount: float = Field(..., ge=0)
+    # total_amount in cents, exact for sums in reports (app/utils/money.py)
+    total_amount_cents: Optional[int] = Field(default=None, ge=0)
     # Status and payment tracking
     status: str = Field(default=InvoiceStatus.DRAFT)
     payment_date: Optional[date] = None
     # Template/Notes
     notes: Optional[str] = Field(default=None, max_length=5000)
+    # Net amount per project (feeds the analytics store, crud/invoice_analytics.py)
+    project_amounts: List[InvoiceProjectAmount] = Field(default_factory=list)
+    # Grouping the line items were built with (InvoiceLineGrouping)
+    line_grouping: Optional[str] = None
     # Reference to the PDF template used (optional)
     template_id: Optional[str] = Field(
         default="default"
@@ -100,6 +136,8 @@ class InvoiceCreateRequest(BaseModel):
     service_date_to: Optional[date] = None  # Auto-calculate if possible, allow override
     tax_rate: Optional[float] = Field(default=19.0, ge=0)  # Allow override
     notes: Optional[str] = None
+    # InvoiceLineGrouping value; defaults to settings.INVOICE_LINE_GROUPING
+    line_grouping: Optional[LineGrouping] = None
     # Manual line items could be added here if needed
 
 
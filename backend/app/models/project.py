@@ -1,6 +1,6 @@
 # backend/app/models/project.py
 from pydantic import BaseModel, Field, ConfigDict
-from typing import Optional, List
+from typing import Optional, List, Dict
 from uuid import UUID, uuid4
 from datetime import datetime
 
@@ -91,3 +91,19 @@ class Project(ProjectInDBBase):
 # Internal DB representation
 class ProjectInDB(ProjectInDBBase):
     pass
+
+
+# Returned by POST /projects/{id}/rates/recalculate (see crud/rate_propagation.py)
+class RatePropagationResult(BaseModel):
+    project_id: UUID
+    rates: Dict[str, float] = Field(
+        default_factory=dict, description="Rates applied: {rate_name: price_per_hour}"
+    )
+    work_items_matched: int = 0  # Uninvoiced items using one of the rates
+    work_items_updated: int = 0
+    time_entries_recalculated: int = 0
+    amount_delta: float = Field(
+        default=0.0, description="Change of the summed calculatedAmount"
+    )
+    # "YYYY-MM" of the work_date -> change of that month's revenue
+    amount_delta_by_month: Dict[str, float] = Field(default_factory=dict)
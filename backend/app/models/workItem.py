@@ -24,6 +24,10 @@ class TimeEntry(BaseModel):
         default=0, description="Calculated amount based on other fields"
     )
     price_per_hour: float = Field(default=0, description="Price per hour for this item")
+    # Exact amount in cents; calculatedAmount is its float form (app/utils/money.py)
+    amount_cents: Optional[int] = Field(
+        default=None, description="calculatedAmount in cents, set by the backend"
+    )
     date: Optional[datetime] = None
     model_config = ConfigDict(from_attributes=True)
 
@@ -102,6 +106,17 @@ class WorkItemUpdate(BaseModel):
 class WorkItemInDBBase(WorkItemBase):
     id: UUID = Field(default_factory=uuid4, alias="_id")
     user_id: str  # Belongs to this user
+    # Canonical, indexed day of the work (UTC midnight), maintained by
+    # CRUDWorkItem from date/start_date/date_from/created_at (crud/work_dates.py)
+    work_date: Optional[datetime] = None
+    # Sums over timeEntries, maintained by CRUDWorkItem (see crud/work_item_totals.py)
+    total_hours: float = Field(default=0.0, description="Sum of timeEntries durations")
+    total_amount: float = Field(
+        default=0.0, description="Sum of timeEntries calculatedAmounts"
+    )
+    total_amount_cents: int = Field(
+        default=0, description="Sum of timeEntries amounts in cents (exact)"
+    )
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
 
@@ -136,3 +151,42 @@ class WorkItemWithProjectName(WorkItemInDBBase):  # Inherit common DB fields
 # Internal DB representation
 class WorkItemInDB(WorkItemInDBBase):
     pass
+
+
+# Returned by POST /workItems/bulk
+class WorkItemBulkResult(BaseModel):
+    created: int = Field(..., description="Number of work items inserted")
+    time_entries: int = Field(..., description="Number of time entries inserted")
+    total_amount: float = Field(..., description="Sum of all calculatedAmounts")
+    ids: List[UUID] = Field(default_factory=list, description="IDs in input order")
+
+
+# Returned by GET /workItems/billable-summary (crud/billable.py)
+class BillableProject(BaseModel):
+    project_id: Optional[UUID] = None
+    project_name: Optional[str] = None
+    hours: float = Field(default=0.0, description="Uninvoiced hours")
+    amount: float = Field(default=0.0, description="Uninvoiced net amount")
+    amount_cents: int = Field(default=0, description="amount in cents (exact)")
+    work_items: int = Field(default=0, ge=0)
+    first_date: Optional[datetime] = None  # Oldest uninvoiced work_date
+    last_date: Optional[datetime] = None
+
+
+class BillableClient(BaseModel):
+    client_id: Optional[UUID] = None
+    client_name: Optional[str] = None
+    hours: float = 0.0
+    amount: float = 0.0
+    amount_cents: int = 0
+    work_items: int = Field(default=0, ge=0)
+    projects: List[BillableProject] = Field(default_factory=list)
+
+
+class BillableSummary(BaseModel):
+    total_hours: float = 0.0
+    total_amount: float = 0.0
+    work_items: int = Field(default=0, ge=0)
+    clients: List[BillableClient] = Field(
+        default_factory=list, description="Largest uninvoiced amount first"
+    )
@@ -0,0 +1,114 @@
+# backend/app/server.py
+"""
+Production entry point: serves the app with several uvicorn worker processes.
+
+    python -m app.server                  # WEB_CONCURRENCY workers (default: CPUs)
+    python -m app.server --workers 4 --port 8000
+
+Every worker is a separate process with its own event loop, MongoDB client,
+JWKS keys and template/font environments, all set up in the app lifespan
+(core/process_state.py), so inline PDF rendering and request handling use
+all cores. The same holds under gunicorn, including with --preload:
+
+    gunicorn app.main:app -k uvicorn.workers.UvicornWorker -w 4 -b 0.0.0.0:8000
+
+With more than one worker, state that would otherwise stay per worker is
+made shared before the workers start (multi_worker_environment):
+  - the memory response cache and rate limit buckets switch to the mongo
+    backends, so a write invalidates every worker's cached responses
+  - the name cache keeps its invalidations in Mongo (NAME_CACHE_SHARED)
+  - Prometheus metrics use multiprocess mode (PROMETHEUS_MULTIPROC_DIR), so a
+    scrape of /metrics aggregates all workers
+Under gunicorn, set these variables yourself (and clear the metrics directory
+before each start). Stored request profiles and live update streams stay per
+worker. Throughput scaling is measured with benchmarks/worker_scaling.py.
+"""
+import argparse
+import glob
+import logging
+import os
+import tempfile
+from typing import Dict
+
+import uvicorn
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def available_cpus() -> int:
+    """CPUs this process may use: its affinity mask, capped by a cgroup v2 quota."""
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:  # Not on Linux
+        cpus = os.cpu_count() or 1
+    try:
+        with open("/sys/fs/cgroup/cpu.max") as f:
+            quota, period = f.read().split()
+        if quota != "max":
+            cpus = min(cpus, max(1, int(int(quota) / int(period))))
+    except (OSError, ValueError):
+        pass
+    return cpus
+
+
+def worker_count(requested: int = None) -> int:
+    return max(1, requested or settings.WEB_CONCURRENCY or available_cpus())
+
+
+def multi_worker_environment(workers: int) -> Dict[str, str]:
+    """
+    Environment the workers need to share state; applied to os.environ before
+    they start (they read it through Settings / prometheus_client on import).
+    """
+    if workers <= 1:
+        return {}
+    env = {"NAME_CACHE_SHARED": "true"}
+    if settings.RESPONSE_CACHE_BACKEND == "memory":
+        env["RESPONSE_CACHE_BACKEND"] = "mongo"
+    if settings.RATE_LIMIT_BACKEND == "memory":
+        env["RATE_LIMIT_BACKEND"] = "mongo"
+    if settings.METRICS_ENABLED:
+        env["PROMETHEUS_MULTIPROC_DIR"] = os.environ.get(
+            "PROMETHEUS_MULTIPROC_DIR"
+        ) or tempfile.mkdtemp(prefix="prometheus-")
+    return env
+
+
+def prepare_metrics_dir(path: str) -> None:
+    """Multiprocess metric files of a previous run must not be aggregated."""
+    os.makedirs(path, exist_ok=True)
+    for stale in glob.glob(os.path.join(path, "*.db")):
+        os.remove(stale)
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--app", default="app.main:app", help="ASGI app import path")
+    parser.add_argument("--host", default=settings.SERVER_HOST)
+    parser.add_argument("--port", type=int, default=settings.SERVER_PORT)
+    parser.add_argument("--workers", type=int, help="Default: WEB_CONCURRENCY")
+    args = parser.parse_args(argv)
+
+    workers = worker_count(args.workers)
+    env = multi_worker_environment(workers)
+    if "PROMETHEUS_MULTIPROC_DIR" in env:
+        prepare_metrics_dir(env["PROMETHEUS_MULTIPROC_DIR"])
+    for name, value in env.items():
+        if os.environ.get(name) != value:
+            logger.info(f"{workers} workers: {name}={value}")
+        os.environ[name] = value
+    logger.info(f"Starting {workers} worker(s) on {args.host}:{args.port}")
+    uvicorn.run(
+        args.app,
+        host=args.host,
+        port=args.port,
+        workers=workers,
+        proxy_headers=True,  # Behind the frontend's nginx
+    )
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    main()
@@ -2,23 +2,32 @@
 import logging
 from jinja2 import Environment, BaseLoader  # Use BaseLoader for string templates
 from typing import Dict, Any
+from app.core.process_state import ProcessLocal
 from app.models.invoice import InvoiceInDB, InvoiceEmailRequest  # Import models
 
 from datetime import date, datetime
 
 logger = logging.getLogger(__name__)
 
-# Setup Jinja2 environment for string templates
-string_template_env = Environment(loader=BaseLoader())
-string_template_env.filters["date"] = (
-    lambda d, fmt="%d.%m.%Y": d.strftime(fmt) if isinstance(d, (date, datetime)) else d
-)
-string_template_env.filters["currency"] = (
-    lambda v, curr="€": f"{v:,.2f}".replace(",", "X")
-    .replace(".", ",")
-    .replace("X", ".")
-    + f" {curr}"
-)
+
+# Setup Jinja2 environment for string templates (per worker process)
+def build_string_template_env() -> Environment:
+    env = Environment(loader=BaseLoader())
+    env.filters["date"] = (
+        lambda d, fmt="%d.%m.%Y": d.strftime(fmt)
+        if isinstance(d, (date, datetime))
+        else d
+    )
+    env.filters["currency"] = (
+        lambda v, curr="€": f"{v:,.2f}".replace(",", "X")
+        .replace(".", ",")
+        .replace("X", ".")
+        + f" {curr}"
+    )
+    return env
+
+
+string_template_env = ProcessLocal(build_string_template_env, name="email_templates")
 
 
 async def generate_invoice_email_content(
@@ -55,7 +64,7 @@ Bank: {your_details.get("bank_name", "")}
 
     try:
         # Render Subject
-        subject_template = string_template_env.from_string(
+        subject_template = string_template_env.get().from_string(
             email_request.subject or "Invoice " + invoice.invoice_number
         )
         logger.info(f"Rendered subject template: {subject_template}")
@@ -63,7 +72,7 @@ Bank: {your_details.get("bank_name", "")}
         logger.info(f"Rendered subject: {subject}")
 
         # Render Body
-        body_template = string_template_env.from_string(
+        body_template = string_template_env.get().from_string(
             email_request.body_template or "Error: Body template missing."
         )
         body = body_template.render(context)
@@ -5,6 +5,7 @@ from typing import Optional, Dict, Any
 from motor.motor_asyncio import AsyncIOMotorDatabase
 from datetime import date, datetime  # Ensure datetime is imported if not already
 
+from app.core.metrics import EVENT_FLUSHES
 from app.models.event import (
     EventInDB,
     EventType,
@@ -72,6 +73,7 @@ async def log_event(
             )
 
         result = await event_collection.insert_one(insert_data)
+        EVENT_FLUSHES.labels("success").inc()
         logger.info(
             f"Logged event: Type='{event_type}', User='{user_id}', RelevantDate='{relevant_date}', ID='{result.inserted_id}'"
         )
@@ -81,6 +83,7 @@ async def log_event(
             return EventInDB(**created_event_doc)
         return None  # Should not happen if insert was successful
     except Exception as e:
+        EVENT_FLUSHES.labels("error").inc()
         logger.error(
             f"Failed to log event: Type='{event_type}', User='{user_id}'. Error: {e}",
             exc_info=True,
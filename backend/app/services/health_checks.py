@@ -0,0 +1,132 @@
+# backend/app/services/health_checks.py
+"""
+Dependency probes behind GET /healthz and GET /readyz (see main.py).
+
+A worker probes at most once per HEALTH_CHECK_CACHE_SECONDS: requests in
+between, or arriving while a probe runs, get the cached result, so frequent
+polling by orchestrators and load balancers adds no load on Mongo.
+
+Failing checks (readiness 503, the worker should get no new traffic):
+  mongo -> no ping reply within HEALTH_MONGO_TIMEOUT_SECONDS
+  pool  -> a server's pool has HEALTH_POOL_SATURATION of maxPoolSize checked out
+  pdf   -> more than HEALTH_PDF_BACKLOG_LIMIT background PDF jobs pending
+Reported only: JWKS freshness and the live update stream buffers.
+"""
+import asyncio
+import logging
+import time
+from datetime import datetime, UTC
+from typing import Any, Dict, Optional
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo.errors import PyMongoError
+
+from app.core.config import settings
+from app.core.db_metrics import pool_metrics
+from app.core.security import jwks_keys
+from app.services.live_updates import live_update_hub, live_update_watcher
+from app.services.pdf_generator import pdf_job_backlog
+
+logger = logging.getLogger(__name__)
+
+
+async def check_mongo(db: AsyncIOMotorDatabase) -> Dict[str, Any]:
+    start = time.perf_counter()
+    try:
+        await asyncio.wait_for(
+            db.command("ping"), timeout=settings.HEALTH_MONGO_TIMEOUT_SECONDS
+        )
+    except asyncio.TimeoutError:
+        return {
+            "ok": False,
+            "error": f"No ping reply within {settings.HEALTH_MONGO_TIMEOUT_SECONDS}s",
+        }
+    except PyMongoError as e:
+        return {"ok": False, "error": str(e)}
+    return {"ok": True, "latency_ms": round((time.perf_counter() - start) * 1000, 1)}
+
+
+def check_pool() -> Dict[str, Any]:
+    servers = {
+        address: {
+            "checked_out": stats["checked_out"],
+            "waiting": stats["waiting"],
+            "max_pool_size": stats["max_pool_size"],
+            "utilization": round(stats["utilization"], 3),
+        }
+        for address, stats in pool_metrics.snapshot().items()
+    }
+    saturated = [
+        address
+        for address, stats in servers.items()
+        if stats["utilization"] >= settings.HEALTH_POOL_SATURATION
+    ]
+    return {"ok": not saturated, "saturated": saturated, "servers": servers}
+
+
+def check_pdf_jobs() -> Dict[str, Any]:
+    backlog = pdf_job_backlog()
+    return {
+        "ok": backlog["jobs"] <= settings.HEALTH_PDF_BACKLOG_LIMIT,
+        "limit": settings.HEALTH_PDF_BACKLOG_LIMIT,
+        **backlog,
+    }
+
+
+def check_jwks() -> Dict[str, Any]:
+    # Fetched on the first authenticated request, then kept for the process
+    if not jwks_keys.is_set:
+        return {"fetched": False}
+    return {
+        "fetched": True,
+        "age_seconds": round(time.time() - jwks_keys.built_at, 1),
+        "keys": len(jwks_keys.get().get("keys", [])),
+    }
+
+
+def check_live_updates() -> Dict[str, Any]:
+    return {"mode": live_update_watcher.active_mode, **live_update_hub.buffer_depth()}
+
+
+class HealthChecks:
+    def __init__(self, cache_seconds: float):
+        self.cache_seconds = cache_seconds
+        self._result: Optional[Dict[str, Any]] = None
+        self._checked_at = 0.0  # time.monotonic() of the cached result
+        self._lock = asyncio.Lock()
+
+    def _fresh(self) -> bool:
+        return (
+            self._result is not None
+            and time.monotonic() - self._checked_at < self.cache_seconds
+        )
+
+    async def report(self, db: AsyncIOMotorDatabase) -> Dict[str, Any]:
+        """Cached probe results; {"ok": False, ...} if any check fails."""
+        if not self._fresh():
+            async with self._lock:
+                if not self._fresh():  # Another request probed while we waited
+                    self._result = await self.probe(db)
+                    self._checked_at = time.monotonic()
+        return self._result
+
+    async def probe(self, db: AsyncIOMotorDatabase) -> Dict[str, Any]:
+        checks = {
+            "mongo": await check_mongo(db),
+            "pool": check_pool(),
+            "pdf_jobs": check_pdf_jobs(),
+            "jwks": check_jwks(),
+            "live_updates": check_live_updates(),
+        }
+        failing = [name for name, check in checks.items() if check.get("ok") is False]
+        if failing:
+            logger.warning(f"Health: Failing checks {failing}")
+        return {
+            "ok": not failing,
+            "failing": failing,
+            "checked_at": datetime.now(UTC).isoformat(),
+            "checks": checks,
+        }
+
+
+health_checks = HealthChecks(cache_seconds=settings.HEALTH_CHECK_CACHE_SECONDS)
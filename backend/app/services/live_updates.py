@@ -0,0 +1,291 @@
+# backend/app/services/live_updates.py
+"""
+Server push of data changes to the frontend (GET /live/stream, SSE).
+
+One watcher per process follows `workItems`, `invoices` and `events` and
+hands each change to the open streams of the document's owner, so the
+frontend refetches what changed instead of polling lists and the dashboard.
+
+Sources (LIVE_UPDATES_MODE):
+  "change_stream" -> a MongoDB change stream (replica sets / Atlas)
+  "polling"       -> queries on updated_at/timestamp every
+                     LIVE_UPDATES_POLL_SECONDS, only for users with an open
+                     stream (standalone mongod); deletes are not seen
+  "auto"          -> change stream, falling back to polling if unsupported
+"""
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime, UTC
+from typing import Dict, List, Optional, Set, Tuple
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo.errors import OperationFailure, PyMongoError
+
+from app.core.config import settings
+from app.core.db import get_database
+from app.core.metrics import LIVE_UPDATE_MESSAGES, LIVE_UPDATE_SUBSCRIBERS
+
+logger = logging.getLogger(__name__)
+
+# Watched collection -> field that moves on every write (polling watermark)
+WATCHED_COLLECTIONS = {
+    "workItems": "updated_at",
+    "invoices": "updated_at",
+    "events": "timestamp",
+}
+
+
+def stamp_now() -> datetime:
+    """Now as stored by Mongo: naive UTC, millisecond precision."""
+    now = datetime.now(UTC).replace(tzinfo=None)
+    return now.replace(microsecond=now.microsecond // 1000 * 1000)
+
+
+@dataclass(eq=False)  # Hashed by identity, kept in sets
+class Subscriber:
+    user_id: str
+    queue: asyncio.Queue
+    # Set when messages were dropped; the stream then tells the client to resync
+    overflowed: bool = False
+    # Polled writes older than the stream are not replayed to it
+    since: datetime = field(default_factory=stamp_now)
+
+
+class LiveUpdateHub:
+    """Open streams per user; publish() fans a message out to them."""
+
+    def __init__(self, queue_size: int):
+        self.queue_size = queue_size
+        self._subscribers: Dict[str, Set[Subscriber]] = {}
+
+    @property
+    def user_ids(self) -> List[str]:
+        return list(self._subscribers)
+
+    def subscribe(self, user_id: str) -> Subscriber:
+        subscriber = Subscriber(user_id, asyncio.Queue(maxsize=self.queue_size))
+        self._subscribers.setdefault(user_id, set()).add(subscriber)
+        LIVE_UPDATE_SUBSCRIBERS.inc()
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber) -> None:
+        streams = self._subscribers.get(subscriber.user_id, set())
+        if subscriber in streams:
+            streams.discard(subscriber)
+            LIVE_UPDATE_SUBSCRIBERS.dec()
+        if not streams:
+            self._subscribers.pop(subscriber.user_id, None)
+
+    def buffer_depth(self) -> dict:
+        """Messages waiting in the open streams' queues (GET /readyz)."""
+        streams = [s for subs in self._subscribers.values() for s in subs]
+        queued = [s.queue.qsize() for s in streams]
+        return {
+            "streams": len(streams),
+            "queued": sum(queued),
+            "max_queued": max(queued, default=0),
+            "queue_size": self.queue_size,
+            "overflowed": sum(1 for s in streams if s.overflowed),
+        }
+
+    def publish(
+        self,
+        user_id: Optional[str],
+        message: dict,
+        written_at: Optional[datetime] = None,
+    ) -> int:
+        """Queues the message on the owner's streams; returns how many got it."""
+        delivered = 0
+        for subscriber in self._subscribers.get(user_id, ()):
+            if written_at is not None and written_at < subscriber.since:
+                continue  # Written before this stream opened
+            try:
+                subscriber.queue.put_nowait(message)
+                delivered += 1
+            except asyncio.QueueFull:
+                subscriber.overflowed = True
+        LIVE_UPDATE_MESSAGES.labels(message["collection"]).inc()
+        return delivered
+
+
+def change_stream_pipeline() -> List[dict]:
+    """
+    Only writes to the watched collections, trimmed to owner, id and the
+    names of the changed fields (the full documents, e.g. invoice PDFs,
+    never leave the server).
+    """
+    return [
+        {
+            "$match": {
+                "ns.coll": {"$in": list(WATCHED_COLLECTIONS)},
+                "operationType": {"$in": ["insert", "update", "replace"]},
+            }
+        },
+        {
+            "$project": {
+                "operationType": 1,
+                "ns": 1,
+                "documentKey": 1,
+                "user_id": "$fullDocument.user_id",
+                "fields": {
+                    "$map": {
+                        "input": {
+                            "$objectToArray": {
+                                "$ifNull": ["$updateDescription.updatedFields", {}]
+                            }
+                        },
+                        "in": "$$this.k",
+                    }
+                },
+            }
+        },
+    ]
+
+
+def change_message(change: dict) -> dict:
+    """Stream message of a (projected) change event."""
+    return {
+        "collection": change["ns"]["coll"],
+        "operation": change["operationType"],
+        "id": str(change["documentKey"]["_id"]),
+        # Top-level names only ("timeEntries.0.duration" -> "timeEntries")
+        "fields": sorted({name.split(".")[0] for name in change.get("fields", [])}),
+    }
+
+
+class LiveUpdateWatcher:
+    """Background task feeding the hub from a change stream or by polling."""
+
+    def __init__(self, hub: LiveUpdateHub, mode: str, poll_seconds: float):
+        self.hub = hub
+        self.mode = mode
+        self.poll_seconds = poll_seconds
+        # Mode actually in use ("change_stream"/"polling"), reported to clients
+        self.active_mode: Optional[str] = None
+        self._task: Optional[asyncio.Task] = None
+        self._resume_token: Optional[dict] = None
+        # Polling: per collection, the newest stamp published and its ids
+        self._watermarks: Dict[str, Tuple[datetime, Set]] = {}
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        try:
+            db = await get_database()
+            if self.mode != "polling":
+                try:
+                    await self.watch_changes(db)
+                except OperationFailure as e:
+                    if self.mode == "change_stream":
+                        raise
+                    # e.g. "$changeStream is only supported on replica sets"
+                    logger.warning(
+                        f"LiveUpdates: Change streams unavailable ({e}), "
+                        "polling instead"
+                    )
+            await self.poll_changes(db)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self.active_mode = None
+            logger.error(f"LiveUpdates: Watcher stopped: {e}", exc_info=True)
+
+    async def watch_changes(self, db: AsyncIOMotorDatabase) -> None:
+        """Follows the change stream, resuming after transient errors."""
+        while True:
+            try:
+                async with db.watch(
+                    change_stream_pipeline(),
+                    full_document="updateLookup",
+                    resume_after=self._resume_token,
+                ) as stream:
+                    logger.info("LiveUpdates: Watching change stream")
+                    self.active_mode = "change_stream"
+                    async for change in stream:
+                        self._resume_token = stream.resume_token
+                        message = change_message(change)
+                        self.hub.publish(change.get("user_id"), message)
+            except OperationFailure as e:
+                if self.active_mode != "change_stream":
+                    raise  # Never worked (standalone, no privileges): let _run decide
+                # e.g. the resume token fell off the oplog: start from now
+                logger.warning(f"LiveUpdates: Change stream failed ({e}), restarting")
+                self._resume_token = None
+                await asyncio.sleep(self.poll_seconds)
+            except PyMongoError as e:
+                logger.warning(
+                    f"LiveUpdates: Change stream interrupted ({e}), resuming"
+                )
+                await asyncio.sleep(self.poll_seconds)
+
+    async def poll_changes(self, db: AsyncIOMotorDatabase) -> None:
+        self.active_mode = "polling"
+        logger.info(f"LiveUpdates: Polling every {self.poll_seconds}s")
+        while True:
+            try:
+                await self.poll_once(db)
+            except PyMongoError as e:
+                logger.warning(f"LiveUpdates: Poll failed ({e})")
+            await asyncio.sleep(self.poll_seconds)
+
+    async def poll_once(self, db: AsyncIOMotorDatabase) -> int:
+        """
+        Publishes documents written since the last poll, for users with an
+        open stream only. Returns the number of messages queued on streams.
+
+        Stamps are stored with millisecond precision, so several writes can
+        share one: the query is inclusive and the ids already published at
+        the newest stamp are skipped.
+        """
+        user_ids = self.hub.user_ids
+        published = 0
+        for collection_name, stamp in WATCHED_COLLECTIONS.items():
+            if collection_name not in self._watermarks or not user_ids:
+                # Nobody listening: the next stream starts from now, not from
+                # every write made while idle
+                self._watermarks[collection_name] = (stamp_now(), set())
+                continue
+            since, seen = self._watermarks[collection_name]
+            cursor = db[collection_name].find(
+                {"user_id": {"$in": user_ids}, stamp: {"$gte": since}},
+                projection={"user_id": 1, stamp: 1},
+            ).sort(stamp, 1)
+            async for doc in cursor:
+                written = doc[stamp].replace(tzinfo=None)
+                if written == since and doc["_id"] in seen:
+                    continue
+                if written > since:
+                    since, seen = written, set()
+                seen.add(doc["_id"])
+                published += self.hub.publish(
+                    doc["user_id"],
+                    {
+                        "collection": collection_name,
+                        "operation": "write",  # Polling can't tell which
+                        "id": str(doc["_id"]),
+                        "fields": [],
+                    },
+                    written_at=written,
+                )
+            self._watermarks[collection_name] = (since, seen)
+        return published
+
+
+live_update_hub = LiveUpdateHub(queue_size=settings.LIVE_UPDATES_QUEUE_SIZE)
+live_update_watcher = LiveUpdateWatcher(
+    hub=live_update_hub,
+    mode=settings.LIVE_UPDATES_MODE,
+    poll_seconds=settings.LIVE_UPDATES_POLL_SECONDS,
+)
@@ -1,17 +1,21 @@
 # backend/app/services/pdf_generator.py
 import logging
-from weasyprint import HTML, CSS
-from weasyprint.text.fonts import FontConfiguration
 from jinja2 import Environment, FileSystemLoader, select_autoescape
 import os
+import time
 from datetime import date, datetime
-from typing import Dict, Any
+from typing import Dict, Any, Optional
+
+from fastapi import BackgroundTasks
 
 from uuid import UUID
 from motor.motor_asyncio import AsyncIOMotorDatabase  # Need DB type hint
 from app.crud.crud_invoice import crud_invoice  # Need CRUD to fetch/update
 from app.services import pdf_generator  # Import the actual generator function
 from app.core.config import settings  # To get your details
+from app.core.metrics import PDF_RENDERS, PDF_RENDER_DURATION
+from app.core.process_state import ProcessLocal
+from app.core.request_context import RequestContext
 from app.models.invoice import InvoiceInDB  # Import the Invoice model
 
 logger = logging.getLogger(__name__)
@@ -23,29 +27,91 @@ TEMPLATE_DIR = os.path.join(
 DEFAULT_TEMPLATE = "invoice_default.html"
 DEFAULT_CSS = "invoice_style.css"
 
-# Setup Jinja2 environment
-jinja_env = Environment(
-    loader=FileSystemLoader(TEMPLATE_DIR),
-    autoescape=select_autoescape(["html", "xml"]),
-    enable_async=False,  # Jinja2 rendering is typically synchronous
-)
-jinja_env.filters["date"] = (
-    lambda d, fmt="%d.%m.%Y": d.strftime(fmt) if isinstance(d, (date, datetime)) else d
-)
-jinja_env.filters["currency"] = (
-    lambda v, curr="€": f"{v:,.2f}".replace(",", "X")
-    .replace(".", ",")
-    .replace("X", ".")
-    + f" {curr}"
-)  # Basic German currency format
+
+# Setup Jinja2 environment (built per worker process, see core/process_state.py)
+def build_jinja_env() -> Environment:
+    env = Environment(
+        loader=FileSystemLoader(TEMPLATE_DIR),
+        autoescape=select_autoescape(["html", "xml"]),
+        enable_async=False,  # Jinja2 rendering is typically synchronous
+    )
+    env.filters["date"] = (
+        lambda d, fmt="%d.%m.%Y": d.strftime(fmt)
+        if isinstance(d, (date, datetime))
+        else d
+    )
+    env.filters["currency"] = (
+        lambda v, curr="€": f"{v:,.2f}".replace(",", "X")
+        .replace(".", ",")
+        .replace("X", ".")
+        + f" {curr}"
+    )  # Basic German currency format
+    return env
+
+
+jinja_env = ProcessLocal(build_jinja_env, name="pdf_templates")
 
 
 # --- Font Configuration (Optional but Recommended for Complex Scripts/Custom Fonts) ---
-font_config = FontConfiguration()
+# WeasyPrint (cairo/pango/fontconfig) is imported on first render or by
+# warm_up(), never when the app is imported
+def build_font_config():
+    from weasyprint.text.fonts import FontConfiguration
+
+    return FontConfiguration()
+
+
+# fontconfig/cairo state must not be shared across a fork: one per worker
+font_config = ProcessLocal(build_font_config, name="pdf_fonts")
 # Example: Add custom font if needed
 # css_fonts = CSS(string='@font-face { font-family: MyCustomFont; src: url(/path/to/font.ttf); }', font_config=font_config)
 
 
+# Background PDF jobs of this process: invoice id -> time.monotonic() when queued
+pdf_jobs: Dict[UUID, float] = {}
+
+
+def schedule_invoice_pdf(
+    background_tasks: BackgroundTasks, *, context: RequestContext, invoice_id: UUID
+) -> None:
+    """
+    Queues generate_and_store_invoice_pdf, counted in the PDF job backlog. The
+    job reuses the invoice if the request already loaded it into `context`.
+    """
+    pdf_jobs[invoice_id] = time.monotonic()
+    background_tasks.add_task(
+        generate_and_store_invoice_pdf,
+        db=context.db,
+        invoice_id=invoice_id,
+        user_id=context.user_id,
+        context=context,
+    )
+
+
+def pdf_job_backlog() -> Dict[str, float]:
+    """Queued or running PDF jobs and the age of the oldest (GET /readyz)."""
+    oldest = min(pdf_jobs.values(), default=None)
+    return {
+        "jobs": len(pdf_jobs),
+        "oldest_seconds": (
+            round(time.monotonic() - oldest, 3) if oldest is not None else 0.0
+        ),
+    }
+
+
+def warm_up() -> None:
+    """
+    Imports WeasyPrint and builds this worker's fonts and templates (blocking;
+    run in a thread at startup, see PDF_WARMUP_ON_STARTUP).
+    """
+    from weasyprint import HTML
+
+    font_config.get()
+    jinja_env.get().get_template(DEFAULT_TEMPLATE)
+    # The first layout also loads pango/harfbuzz and the fontconfig cache
+    HTML(string="<p>warm-up</p>").write_pdf(font_config=font_config.get())
+
+
 async def generate_invoice_pdf(
     invoice_data: InvoiceInDB, your_details: Dict[str, Any]
 ) -> bytes:
@@ -61,16 +127,19 @@ async def generate_invoice_pdf(
         PDF content as bytes.
     """
     logger.info(f"Generating PDF for invoice: {invoice_data.invoice_number}")
+    start = time.perf_counter()
     try:
+        from weasyprint import CSS, HTML  # Cached after the first render
+
         # 1. Load Template
         template_name = f"invoice_{invoice_data.template_id or 'default'}.html"
         try:
-            template = jinja_env.get_template(template_name)
+            template = jinja_env.get().get_template(template_name)
         except Exception:
             logger.warning(
                 f"Template '{template_name}' not found, falling back to default."
             )
-            template = jinja_env.get_template(DEFAULT_TEMPLATE)
+            template = jinja_env.get().get_template(DEFAULT_TEMPLATE)
 
         # 2. Prepare Context Data for Jinja
         context = {
@@ -94,7 +163,7 @@ async def generate_invoice_pdf(
             TEMPLATE_DIR  # Base URL for relative paths in HTML/CSS (e.g., images)
         )
         stylesheets = (
-            [CSS(filename=css_path, font_config=font_config)]
+            [CSS(filename=css_path, font_config=font_config.get())]
             if os.path.exists(css_path)
             else []
         )
@@ -104,14 +173,19 @@ async def generate_invoice_pdf(
 
         # 5. Generate PDF using WeasyPrint
         html = HTML(string=html_content, base_url=base_url)
-        pdf_bytes = html.write_pdf(stylesheets=stylesheets, font_config=font_config)
+        pdf_bytes = html.write_pdf(
+            stylesheets=stylesheets, font_config=font_config.get()
+        )
 
         logger.info(
             f"PDF generated successfully for invoice {invoice_data.invoice_number} ({len(pdf_bytes)} bytes)"
         )
+        PDF_RENDERS.labels("success").inc()
+        PDF_RENDER_DURATION.observe(time.perf_counter() - start)
         return pdf_bytes
 
     except Exception as e:
+        PDF_RENDERS.labels("error").inc()
         logger.error(
             f"Failed to generate PDF for invoice {invoice_data.invoice_number}: {e}",
             exc_info=True,
@@ -121,20 +195,25 @@ async def generate_invoice_pdf(
 
 
 async def generate_and_store_invoice_pdf(
-    db: AsyncIOMotorDatabase, invoice_id: UUID, user_id: str
+    db: AsyncIOMotorDatabase,
+    invoice_id: UUID,
+    user_id: str,
+    context: Optional[RequestContext] = None,
 ):
     """
     Background task to generate PDF for an invoice and store it in the DB.
     """
     logger.info(f"[BackgroundTask] Starting PDF generation for invoice {invoice_id}")
+    pdf_jobs.setdefault(invoice_id, time.monotonic())
     # Note: If 'db' passed from endpoint isn't usable here,
     # you might need to establish a new connection or use a dependency injection system.
     # For simplicity, assume 'db' is usable or call get_database() again.
     # db = await get_database() # Example if needing new connection
 
     try:
-        # 1. Fetch the full invoice data again
-        invoice_db = await crud_invoice.get(db=db, id=invoice_id, user_id=user_id)
+        # 1. The invoice, unless the scheduling request already loaded it
+        context = context or RequestContext.for_user(db, user_id)
+        invoice_db = await context.get(crud_invoice, invoice_id)
         if not invoice_db:
             logger.error(
                 f"[BackgroundTask] Invoice {invoice_id} not found for PDF generation."
@@ -172,6 +251,7 @@ async def generate_and_store_invoice_pdf(
                 {"_id": invoice_id, "user_id": user_id},
                 {"$set": {"pdf_content": pdf_bytes, "updated_at": datetime.utcnow()}},
             )
+            context.forget(crud_invoice, invoice_id)  # Loaded before the PDF was stored
             if update_result.modified_count == 1:
                 logger.info(
                     f"[BackgroundTask] Successfully stored PDF content for invoice {invoice_id}."
@@ -190,5 +270,6 @@ async def generate_and_store_invoice_pdf(
             f"[BackgroundTask] Error generating/storing PDF for invoice {invoice_id}: {e}",
             exc_info=True,
         )
-    # finally:
-    # Close DB connection here if you opened a new one for the task
+    finally:
+        pdf_jobs.pop(invoice_id, None)
+        # Close DB connection here if you opened a new one for the task
@@ -0,0 +1,301 @@
+# backend/app/services/work_item_import.py
+"""
+Parsing for the bulk work item import (POST /workItems/bulk).
+
+JSON bodies are an array of WorkItemCreate objects. CSV bodies have one row
+per time entry; rows with the same item_ref (or, without that column, the
+same name, project_id and date) become one work item:
+
+    name,project_id,date,description,entry_description,rate_name,duration
+    Sprint 12,<uuid>,2025-03-03,,Backend,Standard,4
+    Sprint 12,<uuid>,2025-03-03,,Review,Senior,1.5
+
+Bodies are parsed while they are received, so an import over
+WORK_ITEM_IMPORT_MAX_ITEMS, or with an item that is still incomplete after
+WORK_ITEM_IMPORT_MAX_ITEM_SIZE characters, is rejected without reading it to
+the end. Errors carry the source row: the array index (JSON) or the line of
+the item's first row (CSV). Nothing here touches the database; project and
+rate checks happen in CRUDWorkItem.create_many so the rates of each project
+are fetched once.
+"""
+import codecs
+import csv
+from abc import ABC, abstractmethod
+import json
+import re
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from pydantic import ValidationError
+
+from app.core.config import settings
+from app.models.workItem import WorkItemCreate
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+CSV_REQUIRED_COLUMNS = {"name", "project_id", "rate_name", "duration"}
+# Work item fields a CSV row may set; everything else describes the time entry
+CSV_ITEM_COLUMNS = ("name", "project_id", "date", "description", "status")
+_WHITESPACE = re.compile(r"\s*")
+
+
+class WorkItemImportError(ValueError):
+    """Raised when any row of an import is invalid; nothing is written."""
+
+    def __init__(self, errors: List[dict]):
+        super().__init__(f"{len(errors)} invalid work item rows")
+        self.errors = errors
+
+
+def _validation_messages(error: ValidationError) -> List[str]:
+    return [
+        f"{'.'.join(str(part) for part in e['loc']) or 'row'}: {e['msg']}"
+        for e in error.errors()
+    ]
+
+
+def _too_many(max_items: int) -> WorkItemImportError:
+    return WorkItemImportError(
+        [{"row": None, "errors": [f"Too many work items, the limit is {max_items}"]}]
+    )
+
+
+def _invalid_json(message: str) -> WorkItemImportError:
+    return WorkItemImportError([{"row": None, "errors": [f"Invalid JSON: {message}"]}])
+
+
+class _ItemParser(ABC):
+    """
+    Incremental parser: feed() the body text as it arrives, then finish().
+    Stops with WorkItemImportError as soon as more than `max_items` work items
+    have been read, or once one item (JSON) or row (CSV) is still incomplete
+    after `max_item_size` characters, so an oversized or malformed body is
+    never buffered to the end.
+    """
+
+    def __init__(self, max_items: int, max_item_size: int):
+        self.max_items = max_items
+        self.max_item_size = max_item_size
+        self.items: List[WorkItemCreate] = []
+        # Source row of each item, reported in create_many's errors
+        self.rows: List[int] = []
+        self.errors: List[dict] = []
+
+    def _check_limit(self, count: int):
+        if count > self.max_items:
+            raise _too_many(self.max_items)
+
+    def _add(self, row: int, raw: Any):
+        try:
+            self.items.append(WorkItemCreate.model_validate(raw))
+            self.rows.append(row)
+        except ValidationError as e:
+            self.errors.append({"row": row, "errors": _validation_messages(e)})
+
+    @abstractmethod
+    def feed(self, text: str):
+        """Parses what is complete of the text received so far."""
+
+    @abstractmethod
+    def finish(self):
+        """Parses the rest once the whole body has been received."""
+
+
+class _JsonItemParser(_ItemParser):
+    """A JSON array of work items; rows are numbered by array index."""
+
+    def __init__(self, max_items: int, max_item_size: int):
+        super().__init__(max_items, max_item_size)
+        self.pending = ""  # Text not parsed yet
+        self.expect = "start"  # start, value_or_end, value, comma_or_end, done
+        self.count = 0
+        self.decoder = json.JSONDecoder()
+
+    def feed(self, text: str):
+        self.pending += text
+        self._parse(final=False)
+
+    def finish(self):
+        self._parse(final=True)
+        if self.expect != "done":
+            raise _invalid_json("Expecting value")
+
+    def _parse(self, *, final: bool):
+        text, position = self.pending, 0
+        while True:
+            position = _WHITESPACE.match(text, position).end()
+            if position == len(text):
+                break
+            char = text[position]
+            if self.expect == "done":
+                raise _invalid_json("Extra data")
+            if self.expect == "start":
+                if char != "[":
+                    raise WorkItemImportError(
+                        [{"row": None, "errors": ["Expected a JSON array of work items"]}]
+                    )
+                self.expect, position = "value_or_end", position + 1
+                continue
+            if char == "]" and self.expect in ("value_or_end", "comma_or_end"):
+                self.expect, position = "done", position + 1
+                continue
+            if self.expect == "comma_or_end":
+                if char != ",":
+                    raise _invalid_json("Expecting ',' delimiter")
+                self.expect, position = "value", position + 1
+                continue
+            try:
+                value, end = self.decoder.raw_decode(text, position)
+            except json.JSONDecodeError as e:
+                if final:
+                    raise _invalid_json(e.msg)
+                # Malformed, or larger than any work item: stop buffering
+                if len(text) - position > self.max_item_size:
+                    raise _invalid_json(
+                        f"{e.msg} (work items are limited to "
+                        f"{self.max_item_size} characters)"
+                    )
+                break  # Probably cut off: wait for the next chunk
+            if end == len(text) and not final:
+                break  # A number at the end may continue in the next chunk
+            self.count += 1
+            self._check_limit(self.count)
+            self._add(self.count - 1, value)
+            self.expect, position = "comma_or_end", end
+        self.pending = text[position:]
+
+
+class _CsvItemParser(_ItemParser):
+    """Groups CSV time entry rows into work items; rows are numbered by line."""
+
+    def __init__(self, max_items: int, max_item_size: int):
+        super().__init__(max_items, max_item_size)
+        self.pending = ""  # Text after the last complete record
+        self.line = 0  # Lines consumed
+        self.columns: Optional[List[str]] = None
+        # Group key -> first line number, work item fields, entries
+        self.groups: Dict[tuple, dict] = {}
+
+    def feed(self, text: str):
+        self.pending += text
+        record_start, search_from = 0, 0
+        while (end := self.pending.find("\n", search_from)) != -1:
+            search_from = end + 1
+            if self.pending.count('"', record_start, end) % 2:
+                continue  # Line break inside a quoted field
+            self._record(self.pending[record_start : end + 1])
+            record_start = end + 1
+        self.pending = self.pending[record_start:]
+        # An unclosed quote would otherwise buffer the rest of the body
+        if len(self.pending) > self.max_item_size:
+            raise WorkItemImportError(
+                [
+                    {
+                        "row": self.line + 1,
+                        "errors": [
+                            f"Row longer than {self.max_item_size} characters "
+                            "(unclosed quote?)"
+                        ],
+                    }
+                ]
+            )
+
+    def finish(self):
+        if self.pending:
+            self._record(self.pending)
+            self.pending = ""
+        if self.columns is None:
+            self._header([])
+        for group in self.groups.values():
+            self._add(
+                group["line"], {**group["item"], "timeEntries": group["timeEntries"]}
+            )
+
+    def _header(self, values: List[str]):
+        self.columns = [value.strip() for value in values]
+        missing = CSV_REQUIRED_COLUMNS - set(self.columns)
+        if missing:
+            raise WorkItemImportError(
+                [{"row": 1, "errors": [f"Missing CSV columns: {sorted(missing)}"]}]
+            )
+
+    def _record(self, text: str):
+        line = self.line + 1
+        self.line += max(1, text.count("\n"))
+        values = next(csv.reader([text]), [])
+        if self.columns is None:
+            self._header(values)
+            return
+        # Missing trailing values are empty, extra ones are ignored
+        row = dict.fromkeys(self.columns, "")
+        row.update(zip(self.columns, (value.strip() for value in values)))
+        if not any(row.values()):
+            return  # Blank line
+        key = (
+            ("ref", row["item_ref"])
+            if row.get("item_ref")
+            else tuple(row.get(column, "") for column in CSV_ITEM_COLUMNS[:3])
+        )
+        group = self.groups.get(key)
+        if group is None:
+            self._check_limit(len(self.groups) + 1)
+            group = self.groups[key] = {
+                "line": line,
+                "item": {
+                    column: row[column]
+                    for column in CSV_ITEM_COLUMNS
+                    if row.get(column)
+                },
+                "timeEntries": [],
+            }
+        group["timeEntries"].append(
+            {
+                "description": row.get("entry_description") or row.get("name"),
+                "rate_name": row["rate_name"],
+                "duration": row["duration"],
+            }
+        )
+
+
+def _decode_error() -> WorkItemImportError:
+    return WorkItemImportError([{"row": None, "errors": ["Body is not UTF-8"]}])
+
+
+async def parse_import_stream(
+    chunks: AsyncIterator[bytes],
+    content_type: str,
+    *,
+    max_items: Optional[int] = None,
+    max_item_size: Optional[int] = None,
+) -> Tuple[List[WorkItemCreate], List[int]]:
+    """
+    Parses a CSV or JSON request body while it is received (Request.stream()).
+    Returns the work items and the source row of each (array index / CSV
+    line); raises WorkItemImportError on bad rows, once the body holds more
+    than `max_items` work items or an item or row runs past `max_item_size`
+    characters (defaults: WORK_ITEM_IMPORT_MAX_ITEMS / _MAX_ITEM_SIZE).
+    """
+    if max_items is None:
+        max_items = settings.WORK_ITEM_IMPORT_MAX_ITEMS
+    if max_item_size is None:
+        max_item_size = settings.WORK_ITEM_IMPORT_MAX_ITEM_SIZE
+    media_type = content_type.split(";")[0].strip().lower()
+    if media_type in ("text/csv", "application/csv"):
+        parser: _ItemParser = _CsvItemParser(max_items, max_item_size)
+    else:
+        parser = _JsonItemParser(max_items, max_item_size)
+    # Spreadsheet exports often carry a BOM
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    try:
+        async for chunk in chunks:
+            parser.feed(decoder.decode(chunk))
+        parser.feed(decoder.decode(b"", final=True))
+    except UnicodeDecodeError:
+        raise _decode_error()
+    parser.finish()
+
+    if parser.errors:
+        raise WorkItemImportError(parser.errors)
+    logger.debug(f"WorkItemImport: Parsed {len(parser.items)} work items from {media_type}")
+    return parser.items, parser.rows
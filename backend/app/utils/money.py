@@ -0,0 +1,105 @@
+# backend/app/utils/money.py
+"""
+Money arithmetic in integer cents (minor units).
+
+Every amount is rounded exactly once, to whole cents, with ROUNDING (half up,
+"kaufmännisch"); sums, taxes and totals are then plain integer arithmetic, so
+invoices and reports cannot drift apart by a cent. Floats are converted via
+their shortest repr (Decimal(str(x))), i.e. 1.005 is 1.005, not 1.00499...
+
+The *_expression helpers build the same computation as MongoDB aggregation
+expressions (Decimal128 on the server), for update pipelines and reports.
+"""
+from decimal import Decimal, ROUND_HALF_UP
+from typing import Dict, Iterable, List, Tuple, Union
+
+Number = Union[int, float, Decimal, str]
+
+ROUNDING = ROUND_HALF_UP
+CENTS_PER_UNIT = 100
+_CENTS = Decimal(CENTS_PER_UNIT)
+
+
+def to_decimal(value: Number) -> Decimal:
+    """Exact Decimal of a number; floats via their shortest repr."""
+    if isinstance(value, Decimal):
+        return value
+    if isinstance(value, float):
+        return Decimal(repr(value))
+    return Decimal(value)
+
+
+def to_cents(value: Number) -> int:
+    """Amount in currency units -> whole cents, rounded with ROUNDING."""
+    return int((to_decimal(value) * _CENTS).quantize(Decimal(1), rounding=ROUNDING))
+
+
+def from_cents(cents: int) -> float:
+    """Whole cents -> amount in currency units (for the float API fields)."""
+    return float(Decimal(cents) / _CENTS)
+
+
+def round_money(value: Number) -> float:
+    """Rounds an amount to cents with the money rounding policy."""
+    return from_cents(to_cents(value))
+
+
+def line_amount_cents(price_per_hour: Number, duration: Number) -> int:
+    """price x duration in cents, rounded once."""
+    product = to_decimal(price_per_hour) * to_decimal(duration) * _CENTS
+    return int(product.quantize(Decimal(1), rounding=ROUNDING))
+
+
+def line_amounts_cents(pairs: Iterable[Tuple[Number, Number]]) -> List[int]:
+    """
+    Batch form of line_amount_cents for bulk paths: (price, duration) pairs
+    in, cents out. Prices repeat (a handful of project rates), so their
+    Decimal conversion is done once per distinct value.
+    """
+    prices: Dict[Number, Decimal] = {}
+    result = []
+    for price, duration in pairs:
+        if price not in prices:
+            prices[price] = to_decimal(price) * _CENTS
+        product = prices[price] * to_decimal(duration)
+        result.append(int(product.quantize(Decimal(1), rounding=ROUNDING)))
+    return result
+
+
+def percentage_cents(cents: int, percent: Number) -> int:
+    """percent % of an amount in cents (e.g. tax), rounded once."""
+    share = Decimal(cents) * to_decimal(percent) / Decimal(100)
+    return int(share.quantize(Decimal(1), rounding=ROUNDING))
+
+
+# --- MongoDB aggregation expressions ---
+
+
+def cents_expression(amount) -> dict:
+    """
+    Expression rounding an amount (in units) to whole cents as a long, half
+    away from zero like ROUNDING ($round would round half to even).
+    $toDecimal keeps 15 significant digits of a double, which matches repr().
+    """
+    scaled = {"$multiply": [{"$toDecimal": amount}, CENTS_PER_UNIT]}
+    return {
+        "$toLong": {
+            "$cond": [
+                {"$gte": [scaled, 0]},
+                {"$floor": {"$add": [scaled, 0.5]}},
+                {"$ceil": {"$subtract": [scaled, 0.5]}},
+            ]
+        }
+    }
+
+
+def line_cents_expression(price, duration) -> dict:
+    """Expression for line_amount_cents(price, duration)."""
+    return cents_expression(
+        {"$multiply": [{"$toDecimal": price}, {"$toDecimal": duration}]}
+    )
+
+
+def units_expression(cents) -> dict:
+    """Expression turning cents back into a double amount (for float fields)."""
+    return {"$toDouble": {"$divide": [{"$toDecimal": cents}, CENTS_PER_UNIT]}}
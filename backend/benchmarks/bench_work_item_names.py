@@ -0,0 +1,118 @@
+# backend/benchmarks/bench_work_item_names.py
+"""
+Compares work item listing latency with and without the projects/clients join.
+
+Runs against a local mongod (uses a throwaway database) and times one page of
+work items resolved via $lookup versus the per-user name cache.
+
+    cd backend
+    python -m benchmarks.bench_work_item_names --items 1000 --repeat 50
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from datetime import datetime, timedelta, UTC
+from uuid import uuid4
+
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from app.crud.crud_workItem import crud_workItem
+from app.crud.name_cache import name_cache
+from app.models.client import ClientInDB
+from app.models.project import ProjectInDB, Rate
+from app.models.workItem import TimeEntry, WorkItemInDB
+
+BENCH_DB_URL = "mongodb://localhost:27017"
+BENCH_DB_NAME = "bench_rechnung_db"
+
+
+async def seed(db, user_id: str, items: int, projects: int):
+    clients = [
+        ClientInDB(name=f"Bench Client {i}", user_id=user_id) for i in range(projects)
+    ]
+    project_models = [
+        ProjectInDB(
+            name=f"Bench Project {i}",
+            client_id=clients[i].id,
+            rates=[Rate(name="Standard", price_per_hour=100.0)],
+            user_id=user_id,
+        )
+        for i in range(projects)
+    ]
+    now = datetime.now(UTC)
+    work_items = [
+        WorkItemInDB(
+            name=f"Bench Work Item {i}",
+            project_id=project_models[i % projects].id,
+            user_id=user_id,
+            timeEntries=[
+                TimeEntry(
+                    description="Bench task",
+                    rate_name="Standard",
+                    duration=2.0,
+                    price_per_hour=100.0,
+                    calculatedAmount=200.0,
+                )
+            ],
+            created_at=now - timedelta(minutes=i),
+        )
+        for i in range(items)
+    ]
+    await db["clients"].insert_many([c.model_dump(by_alias=True) for c in clients])
+    await db["projects"].insert_many(
+        [p.model_dump(by_alias=True) for p in project_models]
+    )
+    await db["workItems"].insert_many(
+        [w.model_dump(by_alias=True) for w in work_items]
+    )
+
+
+async def time_calls(label: str, call, repeat: int):
+    await call()  # Warm-up (also fills the name cache)
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        results = await call()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    p95 = samples[max(0, int(len(samples) * 0.95) - 1)]
+    print(
+        f"{label:<10} items={len(results):>5}  "
+        f"median={statistics.median(samples):8.2f} ms  p95={p95:8.2f} ms"
+    )
+
+
+async def main(items: int, projects: int, repeat: int):
+    client = AsyncIOMotorClient(BENCH_DB_URL, uuidRepresentation="standard")
+    db = client[BENCH_DB_NAME]
+    user_id = f"bench-{uuid4()}"
+    try:
+        await seed(db, user_id, items, projects)
+
+        async def with_lookup():
+            return await crud_workItem._get_multi_with_project_name_lookup(
+                db, user_id=user_id, limit=items
+            )
+
+        async def with_cache():
+            return await crud_workItem._get_multi_with_project_name_cached(
+                db, user_id=user_id, limit=items
+            )
+
+        print(f"Page size {items}, {projects} projects, {repeat} runs each")
+        await time_calls("lookup", with_lookup, repeat)
+        await time_calls("cache", with_cache, repeat)
+    finally:
+        await name_cache.invalidate(db, user_id)
+        await client.drop_database(BENCH_DB_NAME)
+        client.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--items", type=int, default=1000)
+    parser.add_argument("--projects", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+    asyncio.run(main(args.items, args.projects, args.repeat))
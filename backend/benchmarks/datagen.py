@@ -0,0 +1,223 @@
+# backend/benchmarks/datagen.py
+"""
+Seeded synthetic dataset for the benchmarks:
+users x clients x projects x work items, plus invoices built from work items.
+
+IDs come from the seeded generator, so the same spec and seed produce the
+same clients, projects and work items (IDs, amounts, dates) as long as the
+dates are anchored too (DatasetSpec.end_date; by default they end today).
+Invoices go through crud_invoice, which assigns their IDs, numbers and
+timestamps itself.
+"""
+import random
+from dataclasses import dataclass, asdict
+from datetime import datetime, timedelta, UTC
+from typing import Callable, Dict, List, Optional
+from uuid import UUID
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+from app.crud.crud_invoice import crud_invoice
+from app.crud.work_dates import resolve_work_date
+from app.crud.work_item_totals import compute_amount_cents, compute_totals
+from app.models.client import ClientInDB
+from app.models.invoice import InvoiceCreateRequest
+from app.models.project import ProjectInDB, Rate
+from app.models.workItem import TimeEntry, WorkItemInDB
+from app.utils.money import from_cents, line_amount_cents
+
+INSERT_CHUNK_SIZE = 1000
+# Every project gets "Standard" plus a few of the others, at varying prices
+BASE_RATES = {
+    "Standard": 95.0,
+    "Senior": 120.0,
+    "Support": 70.0,
+    "Consulting": 140.0,
+    "Travel": 50.0,
+}
+
+
+@dataclass
+class DatasetSpec:
+    users: int = 3
+    clients_per_user: int = 5
+    projects_per_client: int = 3
+    work_items_per_project: int = 40
+    entries_per_work_item: int = 2
+    invoices_per_user: int = 5
+    items_per_invoice: int = 5
+    days: int = 120  # Work item dates are spread over the last N days (years: N*365)
+    seed: int = 42
+    # Last day of the date spread; None: now (not reproducible across runs)
+    end_date: Optional[datetime] = None
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+
+@dataclass
+class UserDataset:
+    user_id: str
+    client_ids: List[UUID]
+    project_ids: List[UUID]
+    project_clients: Dict[UUID, UUID]
+    work_item_ids: List[UUID]
+    uninvoiced_ids: List[UUID]
+    invoice_ids: List[UUID]
+
+
+async def _insert_chunked(db: AsyncIOMotorDatabase, collection: str, docs: List[dict]):
+    for start in range(0, len(docs), INSERT_CHUNK_SIZE):
+        await db[collection].insert_many(docs[start : start + INSERT_CHUNK_SIZE])
+
+
+def _uuid(rng: random.Random) -> UUID:
+    """A UUID drawn from the seeded generator (uuid4 would differ on every run)."""
+    return UUID(int=rng.getrandbits(128), version=4)
+
+
+def _project_rates(rng: random.Random) -> List[Rate]:
+    extras = [name for name in BASE_RATES if name != "Standard"]
+    names = ["Standard"] + rng.sample(extras, rng.randint(0, 3))
+    return [
+        Rate(name=name, price_per_hour=round(BASE_RATES[name] * rng.uniform(0.8, 1.3)))
+        for name in names
+    ]
+
+
+def _work_item(rng: random.Random, *, spec, user_id, project, client, index, now):
+    day = now - timedelta(days=rng.randrange(spec.days))
+    entries = []
+    for _ in range(spec.entries_per_work_item):
+        rate = rng.choice(project.rates)
+        duration = rng.choice([0.5, 1.0, 1.5, 2.0, 3.0, 4.0, 8.0])
+        amount_cents = line_amount_cents(rate.price_per_hour, duration)
+        entries.append(
+            TimeEntry(
+                description=f"Task {index}",
+                rate_name=rate.name,
+                duration=duration,
+                price_per_hour=rate.price_per_hour,
+                calculatedAmount=from_cents(amount_cents),
+                amount_cents=amount_cents,
+                date=day,
+            )
+        )
+    total_hours, total_amount = compute_totals(entries)
+    doc = WorkItemInDB(
+        id=_uuid(rng),
+        name=f"{project.name} item {index}",
+        project_id=project.id,
+        user_id=user_id,
+        description=f"Synthetic work item {index}",
+        date=day,
+        timeEntries=entries,
+        total_hours=total_hours,
+        total_amount=total_amount,
+        total_amount_cents=compute_amount_cents(entries),
+        created_at=day,
+        updated_at=day,
+    ).model_dump(by_alias=True)
+    # Same derived fields as CRUDWorkItem.create writes
+    doc["work_date"] = resolve_work_date(doc)
+    doc["project_name"] = project.name
+    doc["client_name"] = client.name
+    return doc
+
+
+async def seed_user(
+    db: AsyncIOMotorDatabase, spec: DatasetSpec, user_id: str, rng: random.Random
+) -> UserDataset:
+    now = spec.end_date or datetime.now(UTC)
+    clients = [
+        ClientInDB(id=_uuid(rng), name=f"Client {c:03d} of {user_id}", user_id=user_id)
+        for c in range(spec.clients_per_user)
+    ]
+    projects, project_clients = [], {}
+    for client in clients:
+        for p in range(spec.projects_per_client):
+            project = ProjectInDB(
+                id=_uuid(rng),
+                name=f"{client.name} / Project {p:02d}",
+                client_id=client.id,
+                rates=_project_rates(rng),
+                user_id=user_id,
+                created_at=now,
+                updated_at=now,
+            )
+            projects.append((project, client))
+            project_clients[project.id] = client.id
+
+    work_items = []
+    for project, client in projects:
+        for _ in range(spec.work_items_per_project):
+            work_items.append(
+                _work_item(
+                    rng,
+                    spec=spec,
+                    user_id=user_id,
+                    project=project,
+                    client=client,
+                    index=len(work_items),
+                    now=now,
+                )
+            )
+
+    await _insert_chunked(db, "clients", [c.model_dump(by_alias=True) for c in clients])
+    await _insert_chunked(
+        db, "projects", [p.model_dump(by_alias=True) for p, _ in projects]
+    )
+    await _insert_chunked(db, "workItems", work_items)
+
+    # Invoices go through the real code path (numbering, events, invoiced marks)
+    invoice_ids = []
+    uninvoiced = list(work_items)
+    rng.shuffle(uninvoiced)
+    for _ in range(spec.invoices_per_user):
+        if not uninvoiced:
+            break
+        first = uninvoiced[0]
+        client_id = project_clients[first["project_id"]]
+        batch = [
+            doc
+            for doc in uninvoiced
+            if project_clients[doc["project_id"]] == client_id
+        ][: spec.items_per_invoice]
+        batch_ids = {doc["_id"] for doc in batch}
+        uninvoiced = [doc for doc in uninvoiced if doc["_id"] not in batch_ids]
+        invoice = await crud_invoice.create_from_request(
+            db,
+            user_id=user_id,
+            request=InvoiceCreateRequest(
+                client_id=client_id,
+                project_ids=sorted({doc["project_id"] for doc in batch}, key=str),
+                time_entry_ids=list(batch_ids),
+            ),
+        )
+        invoice_ids.append(invoice.id)
+
+    return UserDataset(
+        user_id=user_id,
+        client_ids=[c.id for c in clients],
+        project_ids=[p.id for p, _ in projects],
+        project_clients=project_clients,
+        work_item_ids=[doc["_id"] for doc in work_items],
+        uninvoiced_ids=[doc["_id"] for doc in uninvoiced],
+        invoice_ids=invoice_ids,
+    )
+
+
+async def seed_dataset(
+    db: AsyncIOMotorDatabase,
+    spec: DatasetSpec,
+    user_prefix: str = "bench-user",
+    on_user: Optional[Callable[[int, UserDataset], None]] = None,
+) -> List[UserDataset]:
+    """Seeds spec.users tenants and returns the generated IDs per user."""
+    rng = random.Random(spec.seed)
+    users = []
+    for u in range(spec.users):
+        users.append(await seed_user(db, spec, f"{user_prefix}-{u:04d}", rng))
+        if on_user:
+            on_user(u, users[-1])
+    return users
@@ -0,0 +1,11 @@
+# backend/benchmarks/load_app.py
+"""
+The real application for out-of-process load tests (benchmarks/worker_scaling.py):
+only authentication is replaced by the X-Load-User header. The database is
+the one in MONGODB_URL, connected per worker in the normal lifespan.
+"""
+from app.api import deps
+from app.main import app
+from benchmarks.load_harness import load_user
+
+app.dependency_overrides[deps.get_current_active_user] = load_user
@@ -0,0 +1,317 @@
+# backend/benchmarks/load_harness.py
+"""
+In-process load harness: replays a weighted mix of API calls against the ASGI
+app at fixed target rates and reports where the process saturates.
+
+Requests go through httpx's ASGITransport (no network, no uvicorn), with the
+auth dependency replaced by an "X-Load-User" header and get_db pointed at the
+load database. Arrivals are open-loop: requests are launched on schedule
+whether or not earlier ones finished, so queueing shows up as latency.
+
+Client and server share one event loop, so the numbers describe a single
+worker process. A step is marked saturated when the achieved rate falls below
+95% of the target, p99 exceeds --slo-p99-ms, or more than 1% of calls fail.
+
+    cd backend
+    python -m scripts.generate_data --database loadtest --drop --users 20
+    python -m benchmarks.load_harness --database loadtest --rps 25,50,100,200 \\
+        --duration 20 --mix list_work_items=40,get_work_item=20,dashboard=15,create_work_item=10
+"""
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+
+from fastapi import Request
+from httpx import ASGITransport, AsyncClient
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from app.api import deps
+from app.core.config import settings
+from benchmarks.run_suite import percentile
+
+DEFAULT_MIX = (
+    "list_work_items=35,search_work_items=5,get_work_item=20,dashboard=15,"
+    "list_projects=10,list_invoices=5,create_work_item=10"
+)
+SATURATION_RATE_RATIO = 0.95
+SATURATION_ERROR_RATIO = 0.01
+API = settings.API_V1_STR
+
+
+@dataclass
+class Tenant:
+    user_id: str
+    project_ids: list
+    work_item_ids: list
+
+
+# name -> builder(tenant, rng) -> (method, url, request kwargs)
+CallBuilder = Callable[[Tenant, random.Random], Tuple[str, str, dict]]
+CALLS: Dict[str, CallBuilder] = {
+    "list_work_items": lambda t, rng: (
+        "GET",
+        f"{API}/workItems/",
+        {"params": {"limit": 50}},
+    ),
+    "search_work_items": lambda t, rng: (
+        "GET",
+        f"{API}/workItems/",
+        {"params": {"limit": 50, "search": "Project 0"}},
+    ),
+    "get_work_item": lambda t, rng: (
+        "GET",
+        f"{API}/workItems/{rng.choice(t.work_item_ids)}",
+        {},
+    ),
+    "create_work_item": lambda t, rng: (
+        "POST",
+        f"{API}/workItems/",
+        {
+            "json": {
+                "name": "Load test item",
+                "project_id": str(rng.choice(t.project_ids)),
+                "timeEntries": [
+                    {"description": "Load", "rate_name": "Standard", "duration": 1.0}
+                ],
+            }
+        },
+    ),
+    "dashboard": lambda t, rng: (
+        "GET",
+        f"{API}/dashboard/summary/hours-this-month",
+        {},
+    ),
+    "list_projects": lambda t, rng: ("GET", f"{API}/projects/", {}),
+    "list_invoices": lambda t, rng: ("GET", f"{API}/invoices/", {}),
+}
+
+
+def parse_mix(mix: str) -> Dict[str, float]:
+    weights = {}
+    for part in mix.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in CALLS:
+            raise ValueError(f"Unknown call '{name}', choose from {sorted(CALLS)}")
+        weights[name] = float(weight or 1)
+    return weights
+
+
+async def load_tenants(db, max_users: int, sample_size: int = 200) -> List[Tenant]:
+    """Picks tenants (and some of their IDs) from an existing dataset."""
+    tenants = []
+    for user_id in (await db["projects"].distinct("user_id"))[:max_users]:
+        project_ids = await db["projects"].distinct("_id", {"user_id": user_id})
+        work_items = await (
+            db["workItems"]
+            .find({"user_id": user_id}, projection={"_id": 1})
+            .limit(sample_size)
+            .to_list(length=sample_size)
+        )
+        if project_ids and work_items:
+            tenants.append(
+                Tenant(user_id, project_ids, [doc["_id"] for doc in work_items])
+            )
+    return tenants
+
+
+async def load_user(request: Request) -> dict:
+    """Auth dependency replacement: the user is named by the X-Load-User header."""
+    return {"sub": request.headers["x-load-user"]}
+
+
+def install_overrides(app, db):
+    """Authenticates via the X-Load-User header and serves the load database."""
+
+    async def load_db():
+        return db
+
+    app.dependency_overrides[deps.get_current_active_user] = load_user
+    app.dependency_overrides[deps.get_db] = load_db
+
+
+async def run_step(
+    client: AsyncClient,
+    tenants: List[Tenant],
+    weights: Dict[str, float],
+    *,
+    rps: float,
+    duration: float,
+    max_in_flight: int,
+    rng: random.Random,
+) -> dict:
+    names, name_weights = list(weights), list(weights.values())
+    latencies: Dict[str, List[float]] = {name: [] for name in names}
+    errors: Dict[str, int] = {name: 0 for name in names}
+    lateness: List[float] = []  # How late each launch was (event loop lag)
+    in_flight = set()
+    dropped = 0
+
+    async def fire(name: str):
+        tenant = rng.choice(tenants)
+        method, url, kwargs = CALLS[name](tenant, rng)
+        start = time.perf_counter()
+        try:
+            response = await client.request(
+                method, url, headers={"X-Load-User": tenant.user_id}, **kwargs
+            )
+            failed = response.status_code >= 500
+        except Exception:
+            failed = True
+        latencies[name].append((time.perf_counter() - start) * 1000)
+        if failed:
+            errors[name] += 1
+
+    total = int(rps * duration)
+    step_start = time.perf_counter()
+    for i in range(total):
+        scheduled = step_start + i / rps
+        delay = scheduled - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        lateness.append(max(0.0, time.perf_counter() - scheduled) * 1000)
+        if len(in_flight) >= max_in_flight:
+            dropped += 1  # Client-side backlog limit reached
+            continue
+        task = asyncio.create_task(fire(rng.choices(names, name_weights)[0]))
+        in_flight.add(task)
+        task.add_done_callback(in_flight.discard)
+    if in_flight:
+        await asyncio.wait(in_flight)
+    elapsed = time.perf_counter() - step_start
+
+    all_latencies = sorted(value for values in latencies.values() for value in values)
+    completed = len(all_latencies)
+    error_count = sum(errors.values())
+    lateness.sort()
+    return {
+        "target_rps": rps,
+        "achieved_rps": round(completed / elapsed, 2) if elapsed else 0.0,
+        "completed": completed,
+        "dropped": dropped,
+        "errors": error_count,
+        "p50_ms": round(percentile(all_latencies, 50), 2),
+        "p99_ms": round(percentile(all_latencies, 99), 2),
+        "loop_lag_p99_ms": round(percentile(lateness, 99), 2),
+        "per_call": {
+            name: {
+                "count": len(values),
+                "errors": errors[name],
+                "p50_ms": round(percentile(sorted(values), 50), 2),
+                "p99_ms": round(percentile(sorted(values), 99), 2),
+            }
+            for name, values in latencies.items()
+            if values
+        },
+    }
+
+
+def saturation_reasons(step: dict, slo_p99_ms: float) -> List[str]:
+    reasons = []
+    if step["achieved_rps"] < step["target_rps"] * SATURATION_RATE_RATIO:
+        reasons.append("throughput")
+    if step["p99_ms"] > slo_p99_ms:
+        reasons.append("p99")
+    issued = step["completed"] + step["dropped"]
+    if issued and (step["errors"] + step["dropped"]) / issued > SATURATION_ERROR_RATIO:
+        reasons.append("errors")
+    return reasons
+
+
+async def main(args) -> int:
+    from app.main import app  # Imported late: pulls in the whole application
+
+    weights = parse_mix(args.mix)
+    mongo = AsyncIOMotorClient(args.url, uuidRepresentation="standard")
+    db = mongo[args.database]
+    try:
+        tenants = await load_tenants(db, args.users)
+        if not tenants:
+            print(
+                f"No tenants found in '{args.database}'; run scripts.generate_data first",
+                file=sys.stderr,
+            )
+            return 2
+        install_overrides(app, db)
+        rng = random.Random(args.seed)
+        steps = []
+        saturated_at: Optional[float] = None
+        async with AsyncClient(
+            transport=ASGITransport(app=app), base_url="http://loadtest"
+        ) as client:
+            for rps in [float(value) for value in args.rps.split(",")]:
+                step = await run_step(
+                    client,
+                    tenants,
+                    weights,
+                    rps=rps,
+                    duration=args.duration,
+                    max_in_flight=args.max_in_flight,
+                    rng=rng,
+                )
+                step["saturated"] = saturation_reasons(step, args.slo_p99_ms)
+                steps.append(step)
+                flag = ""
+                if step["saturated"]:
+                    flag = f"  SATURATED ({', '.join(step['saturated'])})"
+                print(
+                    f"target {rps:7.1f} rps -> {step['achieved_rps']:7.1f} rps  "
+                    f"p50={step['p50_ms']:8.1f} ms  p99={step['p99_ms']:8.1f} ms  "
+                    f"lag p99={step['loop_lag_p99_ms']:6.1f} ms  "
+                    f"errors={step['errors']} dropped={step['dropped']}{flag}"
+                )
+                if step["saturated"] and saturated_at is None:
+                    saturated_at = rps
+                    if not args.keep_going:
+                        break
+
+        sustained = [s["target_rps"] for s in steps if not s["saturated"]]
+        print(
+            f"Highest sustained rate: {f'{max(sustained)} rps' if sustained else 'none'}; "
+            f"saturated at: {f'{saturated_at} rps' if saturated_at else 'not reached'}"
+        )
+        if args.output:
+            with open(args.output, "w") as f:
+                json.dump(
+                    {
+                        "mix": weights,
+                        "tenants": len(tenants),
+                        "duration_s": args.duration,
+                        "slo_p99_ms": args.slo_p99_ms,
+                        "saturated_at_rps": saturated_at,
+                        "steps": steps,
+                    },
+                    f,
+                    indent=2,
+                )
+        return 0
+    finally:
+        app.dependency_overrides.clear()
+        mongo.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--url", default="mongodb://localhost:27017")
+    parser.add_argument("--database", default="loadtest")
+    parser.add_argument(
+        "--users", type=int, default=50, help="Tenants to spread load over"
+    )
+    parser.add_argument(
+        "--rps", default="10,25,50,100,200", help="Comma-separated target rates"
+    )
+    parser.add_argument("--duration", type=float, default=15.0, help="Seconds per step")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="name=weight,...")
+    parser.add_argument("--slo-p99-ms", type=float, default=500.0)
+    parser.add_argument("--max-in-flight", type=int, default=1000)
+    parser.add_argument("--keep-going", action="store_true", help="Run all steps")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", help="Write the step results as JSON")
+    sys.exit(asyncio.run(main(parser.parse_args())))
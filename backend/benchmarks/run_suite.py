@@ -0,0 +1,321 @@
+# backend/benchmarks/run_suite.py
+"""
+Benchmarks the API hot paths against a local mongod.
+
+Seeds a throwaway database with benchmarks.datagen, then measures throughput
+and latency percentiles for: work item create, work item listing with project
+names, dashboard summary, invoice creation and PDF rendering. Results are
+written as JSON so runs on different commits can be compared.
+
+    cd backend
+    python -m benchmarks.run_suite --iterations 200 --concurrency 4
+    python -m benchmarks.run_suite --compare benchmarks/results/<previous>.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime, UTC
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from app.api.v1.endpoints.dashboard import _build_hours_summary
+from app.core.config import settings
+from app.core.db import ensure_indexes
+from app.crud.crud_invoice import crud_invoice
+from app.crud.crud_workItem import crud_workItem
+from app.crud.name_cache import name_cache
+from app.models.invoice import InvoiceCreateRequest
+from app.models.workItem import TimeEntry, WorkItemCreate
+from benchmarks.datagen import DatasetSpec, seed_dataset
+
+BENCH_DB_URL = os.getenv("BENCH_MONGODB_URL", "mongodb://localhost:27017")
+BENCH_DB_NAME = "bench_rechnung_suite"
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+# Relative change of p50/p99 reported as a regression by --compare
+REGRESSION_THRESHOLD = 0.10
+
+SCENARIOS = [
+    "work_item_create",
+    "work_item_list",
+    "dashboard_summary",
+    "invoice_create",
+    "pdf_render",
+]
+
+Operation = Callable[[int], Awaitable[object]]
+
+
+def percentile(sorted_samples: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an ascending list."""
+    if not sorted_samples:
+        return 0.0
+    rank = max(1, round(pct / 100 * len(sorted_samples)))
+    return sorted_samples[min(rank, len(sorted_samples)) - 1]
+
+
+async def measure(
+    operation: Operation, *, iterations: int, concurrency: int, warmup: int
+) -> Dict[str, float]:
+    """Runs operation(i) `iterations` times over `concurrency` workers."""
+    for i in range(warmup):
+        await operation(-1 - i)
+
+    samples: List[float] = []
+    next_index = iter(range(iterations))
+
+    async def worker():
+        for i in next_index:
+            start = time.perf_counter()
+            await operation(i)
+            samples.append((time.perf_counter() - start) * 1000)
+
+    wall_start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    wall = time.perf_counter() - wall_start
+
+    samples.sort()
+    return {
+        "iterations": len(samples),
+        "concurrency": concurrency,
+        "throughput_ops_s": round(len(samples) / wall, 2) if wall else 0.0,
+        "mean_ms": round(sum(samples) / len(samples), 3),
+        "min_ms": round(samples[0], 3),
+        "p50_ms": round(percentile(samples, 50), 3),
+        "p90_ms": round(percentile(samples, 90), 3),
+        "p99_ms": round(percentile(samples, 99), 3),
+        "max_ms": round(samples[-1], 3),
+    }
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except Exception:
+        return None
+
+
+async def build_scenarios(db, users, args, selected) -> Dict[str, Operation]:
+    # Enough fresh uninvoiced work items for every invoice creation
+    invoice_batches = []
+    for _ in range(args.iterations if "invoice_create" in selected else 0):
+        user = users[len(invoice_batches) % len(users)]
+        project_id = user.project_ids[len(invoice_batches) % len(user.project_ids)]
+        items = [
+            await crud_workItem.create(
+                db, obj_in=_work_item_in(project_id), user_id=user.user_id
+            )
+            for _ in range(args.items_per_invoice)
+        ]
+        invoice_batches.append((user, project_id, [item.id for item in items]))
+
+    async def work_item_create(i: int):
+        user = users[i % len(users)]
+        project_id = user.project_ids[i % len(user.project_ids)]
+        return await crud_workItem.create(
+            db, obj_in=_work_item_in(project_id), user_id=user.user_id
+        )
+
+    async def work_item_list(i: int):
+        return await crud_workItem.get_multi_with_project_name(
+            db, user_id=users[i % len(users)].user_id, limit=args.page_size
+        )
+
+    async def dashboard_summary(i: int):
+        # The aggregations behind the endpoint, without its response cache
+        return await _build_hours_summary(
+            db, users[i % len(users)].user_id, datetime.now(UTC)
+        )
+
+    async def invoice_create(i: int):
+        user, project_id, item_ids = invoice_batches.pop()
+        return await crud_invoice.create_from_request(
+            db,
+            user_id=user.user_id,
+            request=InvoiceCreateRequest(
+                client_id=user.project_clients[project_id],
+                project_ids=[project_id],
+                time_entry_ids=item_ids,
+            ),
+        )
+
+    scenarios = {
+        "work_item_create": work_item_create,
+        "work_item_list": work_item_list,
+        "dashboard_summary": dashboard_summary,
+        "invoice_create": invoice_create,
+    }
+
+    if "pdf_render" not in selected:
+        return scenarios
+    try:  # WeasyPrint needs system libraries (pango); skip rendering without them
+        from app.services.pdf_generator import generate_invoice_pdf
+    except Exception as e:
+        print(f"Skipping pdf_render: {e}", file=sys.stderr)
+        return scenarios
+
+    invoices = [
+        await crud_invoice.get(db, id=invoice_id, user_id=user.user_id)
+        for user in users
+        for invoice_id in user.invoice_ids
+    ]
+    your_details = {  # Same fields the invoice PDF endpoint passes
+        "name": settings.YOUR_COMPANY_NAME,
+        "address_line1": settings.YOUR_ADDRESS_LINE1,
+        "zip_city": settings.YOUR_ZIP_CITY,
+        "tax_id": settings.YOUR_TAX_ID,
+        "vat_id": settings.YOUR_VAT_ID,
+        "bank_account_holder": settings.YOUR_BANK_HOLDER,
+        "bank_iban": settings.YOUR_BANK_IBAN,
+        "bank_bic": settings.YOUR_BANK_BIC,
+        "bank_name": settings.YOUR_BANK_NAME,
+    }
+
+    async def pdf_render(i: int):
+        return await generate_invoice_pdf(invoices[i % len(invoices)], your_details)
+
+    if invoices:
+        scenarios["pdf_render"] = pdf_render
+    return scenarios
+
+
+def _work_item_in(project_id) -> WorkItemCreate:
+    return WorkItemCreate(
+        name="Benchmark work item",
+        project_id=project_id,
+        date=datetime.now(UTC),
+        timeEntries=[
+            TimeEntry(description="Benchmark", rate_name="Standard", duration=1.5)
+        ],
+    )
+
+
+def compare(current: dict, previous: dict) -> int:
+    """Prints p50/p99 deltas against a previous result file; 1 on regression."""
+    regressions = 0
+    meta = previous["meta"]
+    print(f"\nCompared with {meta.get('commit')} ({meta['timestamp']}):")
+    for name, stats in current["results"].items():
+        before = previous["results"].get(name)
+        if not before:
+            continue
+        for key in ("p50_ms", "p99_ms"):
+            change = (stats[key] - before[key]) / before[key] if before[key] else 0.0
+            flag = ""
+            if change > REGRESSION_THRESHOLD:
+                flag = "  <-- regression"
+                regressions += 1
+            print(
+                f"  {name:<18} {key:<7} {before[key]:9.2f} -> {stats[key]:9.2f} ms "
+                f"({change:+.1%}){flag}"
+            )
+    return 1 if regressions else 0
+
+
+async def main(args) -> int:
+    spec = DatasetSpec(
+        users=args.users,
+        clients_per_user=args.clients,
+        projects_per_client=args.projects,
+        work_items_per_project=args.work_items,
+        invoices_per_user=args.invoices,
+        items_per_invoice=args.items_per_invoice,
+        seed=args.seed,
+    )
+    client = AsyncIOMotorClient(BENCH_DB_URL, uuidRepresentation="standard")
+    db = client[BENCH_DB_NAME]
+    users = []
+    try:
+        await client.drop_database(BENCH_DB_NAME)
+        await ensure_indexes(db)
+        seed_start = time.perf_counter()
+        users = await seed_dataset(db, spec)
+        print(f"Seeded {spec.as_dict()} in {time.perf_counter() - seed_start:.1f} s")
+
+        selected = args.only or SCENARIOS
+        scenarios = await build_scenarios(db, users, args, selected)
+        results = {}
+        for name in selected:
+            if name not in scenarios:
+                print(f"Unknown or unavailable scenario: {name}", file=sys.stderr)
+                continue
+            iterations = args.iterations
+            if name == "pdf_render":
+                iterations = min(iterations, args.pdf_iterations)
+            results[name] = await measure(
+                scenarios[name],
+                iterations=iterations,
+                concurrency=args.concurrency,
+                # Each invoice consumes its work items, so no warm-up runs
+                warmup=0 if name == "invoice_create" else args.warmup,
+            )
+            stats = results[name]
+            print(
+                f"{name:<18} {stats['throughput_ops_s']:8.1f} ops/s  "
+                f"p50={stats['p50_ms']:8.2f} ms  p99={stats['p99_ms']:8.2f} ms"
+            )
+
+        server_info = await client.server_info()
+        output = {
+            "meta": {
+                "commit": git_commit(),
+                "timestamp": datetime.now(UTC).isoformat(),
+                "python": platform.python_version(),
+                "mongodb": server_info.get("version"),
+                "name_resolution": settings.WORK_ITEM_NAME_RESOLUTION,
+                "dataset": spec.as_dict(),
+                "iterations": args.iterations,
+                "concurrency": args.concurrency,
+            },
+            "results": results,
+        }
+        file_name = f"{datetime.now(UTC):%Y%m%dT%H%M%S}-{git_commit() or 'nogit'}.json"
+        path = args.output or os.path.join(RESULTS_DIR, file_name)
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(output, f, indent=2)
+        print(f"Results written to {path}")
+
+        if args.compare:
+            with open(args.compare) as f:
+                return compare(output, json.load(f))
+        return 0
+    finally:
+        for user in users:
+            await name_cache.invalidate(db, user.user_id)
+        await client.drop_database(BENCH_DB_NAME)
+        client.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--users", type=int, default=3)
+    parser.add_argument("--clients", type=int, default=5, help="Clients per user")
+    parser.add_argument("--projects", type=int, default=3, help="Projects per client")
+    parser.add_argument(
+        "--work-items", type=int, default=40, help="Work items per project"
+    )
+    parser.add_argument("--invoices", type=int, default=5, help="Invoices per user")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--pdf-iterations", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--warmup", type=int, default=5)
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--items-per-invoice", type=int, default=5)
+    parser.add_argument("--only", nargs="*", choices=SCENARIOS, help="Scenarios to run")
+    parser.add_argument("--output", help="Result file (default: benchmarks/results/)")
+    parser.add_argument("--compare", help="Previous result file to diff against")
+    sys.exit(asyncio.run(main(parser.parse_args())))
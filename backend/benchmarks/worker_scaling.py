@@ -0,0 +1,201 @@
+# backend/benchmarks/worker_scaling.py
+"""
+Throughput scaling from 1 to N worker processes (python -m app.server).
+
+For each worker count, starts the server over real HTTP on localhost, serving
+benchmarks.load_app (the app with X-Load-User auth) against the load
+database. It then climbs the load_harness rate ladder until the step saturates
+(rate < 95% of target, p99 over --slo-p99-ms or > 1% errors). Reported per
+worker count: the highest sustained rate and the speedup over one worker.
+
+    cd backend
+    python -m scripts.generate_data --database loadtest --drop --users 20
+    python -m benchmarks.worker_scaling --database loadtest --workers 1,2,4 \\
+        --rps 25,50,100,200,400,800 --duration 15 --output scaling.json
+
+Reading the results: CPU-bound calls (PDF rendering, Pydantic validation of
+large lists) should scale close to linearly up to the number of cores;
+Mongo-bound calls flatten out once mongod is the bottleneck. The load
+generator is a single asyncio process. If its loop lag p99 grows into the
+tens of milliseconds, the client is saturating, not the server. In that case
+run it from another machine or cut the mix down.
+Run with the same env (e.g. RESPONSE_CACHE_BACKEND) you deploy with, except
+that per-user rate limits are off unless RATE_LIMIT_ENABLED is set: they would
+turn the ladder's top steps into 429s instead of measuring capacity.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+from typing import List, Optional
+
+import httpx
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from benchmarks.load_harness import (
+    DEFAULT_MIX,
+    load_tenants,
+    parse_mix,
+    run_step,
+    saturation_reasons,
+)
+
+
+def database_url(url: str, database: str) -> str:
+    """MongoDB URL with the path replaced by /<database> (app.core.db reads it)."""
+    base, _, query = url.partition("?")
+    scheme, _, rest = base.partition("://")
+    hosts = rest.split("/", 1)[0]
+    return f"{scheme}://{hosts}/{database}" + (f"?{query}" if query else "")
+
+
+def start_server(workers: int, port: int, mongo_url: str) -> subprocess.Popen:
+    env = {"RATE_LIMIT_ENABLED": "false", **os.environ, "MONGODB_URL": mongo_url}
+    return subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "app.server",
+            "--app",
+            "benchmarks.load_app:app",
+            "--workers",
+            str(workers),
+            "--host",
+            "127.0.0.1",
+            "--port",
+            str(port),
+        ],
+        env=env,
+    )
+
+
+async def wait_until_up(base_url: str, timeout: float = 60.0) -> None:
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        while time.monotonic() < deadline:
+            try:
+                if (await client.get("/")).status_code == 200:
+                    return
+            except httpx.TransportError:
+                pass
+            await asyncio.sleep(0.5)
+    raise TimeoutError(f"Server at {base_url} did not come up")
+
+
+async def measure_workers(workers: int, tenants, weights, args) -> dict:
+    base_url = f"http://127.0.0.1:{args.port}"
+    server = start_server(workers, args.port, database_url(args.url, args.database))
+    try:
+        await wait_until_up(base_url)
+        await asyncio.sleep(args.warmup)  # Let every worker finish its lifespan
+        steps = []
+        limits = httpx.Limits(max_connections=args.max_in_flight)
+        async with httpx.AsyncClient(
+            base_url=base_url, limits=limits, timeout=60.0
+        ) as client:
+            for rps in [float(value) for value in args.rps.split(",")]:
+                step = await run_step(
+                    client,
+                    tenants,
+                    weights,
+                    rps=rps,
+                    duration=args.duration,
+                    max_in_flight=args.max_in_flight,
+                    rng=random.Random(args.seed),
+                )
+                step["saturated"] = saturation_reasons(step, args.slo_p99_ms)
+                steps.append(step)
+                flag = ""
+                if step["saturated"]:
+                    flag = f"  SATURATED ({', '.join(step['saturated'])})"
+                print(
+                    f"  {workers} worker(s) target {rps:7.1f} rps -> "
+                    f"{step['achieved_rps']:7.1f} rps  p99={step['p99_ms']:8.1f} ms  "
+                    f"lag p99={step['loop_lag_p99_ms']:6.1f} ms{flag}"
+                )
+                if step["saturated"]:
+                    break
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+    sustained = [step for step in steps if not step["saturated"]]
+    best: Optional[dict] = max(
+        sustained, key=lambda step: step["achieved_rps"], default=None
+    )
+    return {
+        "workers": workers,
+        "sustained_rps": best["achieved_rps"] if best else 0.0,
+        "p99_ms_at_sustained": best["p99_ms"] if best else None,
+        "steps": steps,
+    }
+
+
+async def main(args) -> int:
+    weights = parse_mix(args.mix)
+    mongo = AsyncIOMotorClient(args.url, uuidRepresentation="standard")
+    try:
+        tenants = await load_tenants(mongo[args.database], args.users)
+    finally:
+        mongo.close()
+    if not tenants:
+        print(
+            f"No tenants found in '{args.database}'; run scripts.generate_data first",
+            file=sys.stderr,
+        )
+        return 2
+
+    results: List[dict] = []
+    for workers in [int(value) for value in args.workers.split(",")]:
+        results.append(await measure_workers(workers, tenants, weights, args))
+
+    baseline = results[0]["sustained_rps"] or None
+    print(f"\n{'workers':>7}  {'sustained rps':>13}  {'speedup':>7}  {'p99 ms':>8}")
+    for result in results:
+        result["speedup"] = (
+            round(result["sustained_rps"] / baseline, 2) if baseline else None
+        )
+        print(
+            f"{result['workers']:>7}  {result['sustained_rps']:>13.1f}  "
+            f"{result['speedup'] or 0:>6.2f}x  "
+            f"{result['p99_ms_at_sustained'] or 0:>8.1f}"
+        )
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(
+                {
+                    "mix": weights,
+                    "tenants": len(tenants),
+                    "cpus": os.cpu_count(),
+                    "duration_s": args.duration,
+                    "slo_p99_ms": args.slo_p99_ms,
+                    "results": results,
+                },
+                f,
+                indent=2,
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--url", default="mongodb://localhost:27017")
+    parser.add_argument("--database", default="loadtest")
+    parser.add_argument("--workers", default="1,2,4", help="Worker counts to compare")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--rps", default="25,50,100,200,400,800")
+    parser.add_argument("--duration", type=float, default=15.0, help="Seconds per step")
+    parser.add_argument("--warmup", type=float, default=2.0)
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="name=weight,...")
+    parser.add_argument("--slo-p99-ms", type=float, default=500.0)
+    parser.add_argument("--max-in-flight", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", help="Write the results as JSON")
+    sys.exit(asyncio.run(main(parser.parse_args())))
@@ -0,0 +1,44 @@
+# backend/scripts/backfill_work_dates.py
+"""
+Migration: writes the canonical work_date (UTC midnight of date, start_date,
+date_from or created_at, first one set) on work items created before
+CRUDWorkItem maintained it; its index is created on connect. Safe to re-run;
+by default only documents without work_date are touched, --all recomputes
+every document.
+
+    cd backend
+    python -m scripts.backfill_work_dates [--user-id SUB] [--all]
+"""
+import argparse
+import asyncio
+import logging
+import sys
+
+from app.core.db import connect_to_mongo, close_mongo_connection, get_database
+from app.crud.work_dates import backfill_work_dates
+
+logger = logging.getLogger(__name__)
+
+
+async def main(user_id: str = None, recompute_all: bool = False) -> int:
+    await connect_to_mongo()
+    try:
+        db = await get_database()
+        modified = await backfill_work_dates(
+            db, user_id=user_id, only_missing=not recompute_all
+        )
+        print(f"Wrote work_date on {modified} work items.")
+        return 0
+    finally:
+        await close_mongo_connection()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.WARNING)
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--user-id", default=None, help="Only migrate this user")
+    parser.add_argument(
+        "--all", action="store_true", help="Recompute work_date on every work item"
+    )
+    args = parser.parse_args()
+    sys.exit(asyncio.run(main(user_id=args.user_id, recompute_all=args.all)))
@@ -0,0 +1,43 @@
+# backend/scripts/backfill_work_item_totals.py
+"""
+Migration: writes total_hours/total_amount(_cents) and the entries'
+amount_cents on work items created before CRUDWorkItem maintained them.
+Safe to re-run; by default only documents without the fields are touched,
+--all recomputes every document.
+
+    cd backend
+    python -m scripts.backfill_work_item_totals [--user-id SUB] [--all]
+"""
+import argparse
+import asyncio
+import logging
+import sys
+
+from app.core.db import connect_to_mongo, close_mongo_connection, get_database
+from app.crud.work_item_totals import backfill_totals
+
+logger = logging.getLogger(__name__)
+
+
+async def main(user_id: str = None, recompute_all: bool = False) -> int:
+    await connect_to_mongo()
+    try:
+        db = await get_database()
+        modified = await backfill_totals(
+            db, user_id=user_id, only_missing=not recompute_all
+        )
+        print(f"Wrote totals on {modified} work items.")
+        return 0
+    finally:
+        await close_mongo_connection()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.WARNING)
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--user-id", default=None, help="Only migrate this user")
+    parser.add_argument(
+        "--all", action="store_true", help="Recompute totals on every work item"
+    )
+    args = parser.parse_args()
+    sys.exit(asyncio.run(main(user_id=args.user_id, recompute_all=args.all)))
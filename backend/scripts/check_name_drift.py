@@ -0,0 +1,52 @@
+# backend/scripts/check_name_drift.py
+"""
+Consistency check for the project_name/client_name fields stored on work items.
+
+Reports work items whose denormalized names differ from the referenced project
+and client documents, and optionally rewrites them.
+
+    cd backend
+    python -m scripts.check_name_drift [--user-id SUB] [--fix]
+"""
+import argparse
+import asyncio
+import logging
+import sys
+
+from app.core.db import connect_to_mongo, close_mongo_connection, get_database
+from app.crud.denormalize import find_name_drift, repair_name_drift
+
+logger = logging.getLogger(__name__)
+
+
+async def main(user_id: str = None, fix: bool = False) -> int:
+    await connect_to_mongo()
+    try:
+        db = await get_database()
+        drift = await find_name_drift(db, user_id=user_id)
+        print(f"Work items with drifted names: {len(drift)}")
+        for row in drift[:20]:
+            print(
+                f"  {row['_id']} (user {row['user_id']}): "
+                f"project_name={row['project_name']!r} expected={row['expected_project_name']!r}, "
+                f"client_name={row['client_name']!r} expected={row['expected_client_name']!r}"
+            )
+        if len(drift) > 20:
+            print(f"  ... and {len(drift) - 20} more")
+
+        if drift and fix:
+            modified = await repair_name_drift(db, drift)
+            print(f"Rewrote names on {modified} work items.")
+            return 0
+        return 1 if drift else 0
+    finally:
+        await close_mongo_connection()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.WARNING)
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--user-id", default=None, help="Only check this user")
+    parser.add_argument("--fix", action="store_true", help="Rewrite drifted names")
+    args = parser.parse_args()
+    sys.exit(asyncio.run(main(user_id=args.user_id, fix=args.fix)))
@@ -0,0 +1,111 @@
+# backend/scripts/generate_data.py
+"""
+Generates a seeded multi-tenant dataset for sizing and load tests.
+
+Writes users x clients x projects (with rates) x work items (with timeEntries
+spread over the given number of years), plus invoices, into the database of
+MONGODB_URL or --url/--database. Work item dates end today unless --end-date
+anchors them; with --end-date the same arguments produce the same clients,
+projects and work items (IDs, amounts, dates). Invoice IDs, numbers and
+timestamps are assigned by the invoicing code on every run.
+
+    cd backend
+    python -m scripts.generate_data --users 50 --clients 10 --projects 4 \\
+        --work-items 250 --years 3 --invoices 24 --end-date 2025-06-30 \\
+        --url mongodb://localhost:27017 --database loadtest --drop
+"""
+import argparse
+import asyncio
+import logging
+import sys
+import time
+from datetime import datetime, UTC
+
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from app.core.config import settings
+from app.core.db import ensure_indexes
+from benchmarks.datagen import DatasetSpec, seed_dataset
+
+logger = logging.getLogger(__name__)
+
+
+async def main(args) -> int:
+    spec = DatasetSpec(
+        users=args.users,
+        clients_per_user=args.clients,
+        projects_per_client=args.projects,
+        work_items_per_project=args.work_items,
+        entries_per_work_item=args.entries,
+        invoices_per_user=args.invoices,
+        items_per_invoice=args.items_per_invoice,
+        days=max(1, round(args.years * 365)),
+        seed=args.seed,
+        end_date=args.end_date,
+    )
+    client = AsyncIOMotorClient(
+        args.url or settings.MONGODB_URL, uuidRepresentation="standard"
+    )
+    try:
+        if args.database:
+            db = client[args.database]
+        else:
+            db = client.get_default_database(default="rechnungmeister")
+        if args.drop:
+            print(f"Dropping database '{db.name}'")
+            await client.drop_database(db.name)
+        await ensure_indexes(db)
+
+        items_per_user = (
+            spec.clients_per_user * spec.projects_per_client * spec.work_items_per_project
+        )
+        print(
+            f"Generating {spec.users} users x {items_per_user} work items "
+            f"into '{db.name}' (seed {spec.seed})"
+        )
+        start = time.perf_counter()
+
+        def progress(index, user):
+            print(
+                f"  [{index + 1}/{spec.users}] {user.user_id}: "
+                f"{len(user.work_item_ids)} work items, {len(user.invoice_ids)} invoices "
+                f"({time.perf_counter() - start:.1f} s)"
+            )
+
+        await seed_dataset(db, spec, user_prefix=args.user_prefix, on_user=progress)
+        print(f"Done in {time.perf_counter() - start:.1f} s")
+        return 0
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.WARNING)
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--clients", type=int, default=5, help="Clients per user")
+    parser.add_argument("--projects", type=int, default=3, help="Projects per client")
+    parser.add_argument(
+        "--work-items", type=int, default=100, help="Work items per project"
+    )
+    parser.add_argument(
+        "--entries", type=int, default=2, help="Time entries per work item"
+    )
+    parser.add_argument(
+        "--years", type=float, default=2.0, help="Spread of work item dates"
+    )
+    parser.add_argument("--invoices", type=int, default=12, help="Invoices per user")
+    parser.add_argument("--items-per-invoice", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument(
+        "--end-date",
+        type=lambda value: datetime.strptime(value, "%Y-%m-%d").replace(tzinfo=UTC),
+        help="Last day of the work item dates, YYYY-MM-DD (default: today)",
+    )
+    parser.add_argument("--user-prefix", default="load-user", help="JWT sub prefix")
+    parser.add_argument("--url", help="MongoDB URL (default: MONGODB_URL)")
+    parser.add_argument("--database", help="Database name (default: from the URL)")
+    parser.add_argument("--drop", action="store_true", help="Drop the database first")
+    sys.exit(asyncio.run(main(parser.parse_args())))
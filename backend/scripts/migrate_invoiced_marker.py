@@ -0,0 +1,39 @@
+# backend/scripts/migrate_invoiced_marker.py
+"""
+Migration: makes `is_invoiced` the consistent invoiced marker on work items
+(True where an invoice reference is stored, False everywhere else) and moves
+references stored as `invoice_id` to `invoiceId`. Run it before relying on
+the uninvoiced partial index (GET /workItems/billable-summary, invoicing):
+documents without the marker are not in it. Safe to re-run.
+
+    cd backend
+    python -m scripts.migrate_invoiced_marker [--user-id SUB]
+"""
+import argparse
+import asyncio
+import logging
+import sys
+
+from app.core.db import connect_to_mongo, close_mongo_connection, get_database
+from app.crud.billable import migrate_invoiced_marker
+
+logger = logging.getLogger(__name__)
+
+
+async def main(user_id: str = None) -> int:
+    await connect_to_mongo()
+    try:
+        db = await get_database()
+        modified = await migrate_invoiced_marker(db, user_id=user_id)
+        print(f"Migrated the invoiced marker on {modified} work items.")
+        return 0
+    finally:
+        await close_mongo_connection()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.WARNING)
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--user-id", default=None, help="Only migrate this user")
+    args = parser.parse_args()
+    sys.exit(asyncio.run(main(user_id=args.user_id)))
@@ -0,0 +1,38 @@
+# backend/scripts/rebuild_invoice_analytics.py
+"""
+Migration: (re)builds the invoice analytics store (analytics_revenue,
+analytics_receivables, analytics_payments) from the invoices collection.
+Run once after deploying it, and whenever the store may have drifted
+(e.g. invoices edited directly in the database). Safe to re-run.
+
+    cd backend
+    python -m scripts.rebuild_invoice_analytics [--user-id SUB]
+"""
+import argparse
+import asyncio
+import logging
+import sys
+
+from app.core.db import connect_to_mongo, close_mongo_connection, get_database
+from app.crud.invoice_analytics import rebuild_invoice_analytics
+
+logger = logging.getLogger(__name__)
+
+
+async def main(user_id: str = None) -> int:
+    await connect_to_mongo()
+    try:
+        db = await get_database()
+        count = await rebuild_invoice_analytics(db, user_id=user_id)
+        print(f"Rebuilt invoice analytics from {count} invoices.")
+        return 0
+    finally:
+        await close_mongo_connection()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.WARNING)
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--user-id", default=None, help="Only rebuild this user")
+    args = parser.parse_args()
+    sys.exit(asyncio.run(main(user_id=args.user_id)))
@@ -31,6 +31,8 @@ from app.crud.crud_workItem import crud_workItem
 from app.crud.crud_project import crud_project
 from app.main import app
 from app.core.config import settings
+from app.core.rate_limit import rate_limiter
+from app.core.response_cache import response_cache
 from app.api import deps  # Import the 'deps' module
 
 # --- Mocked User Constants ---
@@ -249,6 +251,10 @@ async def clear_collections(
     ]
     for collection_name in collections_to_clear:
         await db_conn[collection_name].delete_many({})
+    # The collections were cleared behind the CRUD layer, so are cached responses
+    await response_cache.backend.clear()
+    # Every test starts with full token buckets
+    await rate_limiter.buckets.clear()
     yield
     # print(f"[clear_collections ({id(db_conn)})] Running AFTER test.")
 
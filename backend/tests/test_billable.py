@@ -0,0 +1,348 @@
+# tests/test_billable.py
+import pytest
+from httpx import AsyncClient
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from uuid import uuid4
+from datetime import datetime, UTC
+
+from app.core.db import ensure_indexes
+from app.crud import crud_invoice as crud_invoice_module
+from app.crud.billable import (
+    UNINVOICED,
+    UNINVOICED_INDEX_NAME,
+    billable_summary,
+    claim_for_invoice,
+    migrate_invoiced_marker,
+)
+from app.crud.crud_invoice import crud_invoice
+from app.crud.crud_workItem import crud_workItem
+from app.models.client import ClientInDB
+from app.models.invoice import InvoiceCreateRequest
+from app.models.project import ProjectInDB
+from app.models.workItem import WorkItemCreate, TimeEntry as TimeEntryData
+
+
+def project_row(summary, project_id):
+    for client in summary.clients:
+        for project in client.projects:
+            if project.project_id == project_id:
+                return client, project
+    return None, None
+
+
+@pytest.mark.asyncio
+async def test_summary_drops_invoiced_items_and_they_are_not_billed_twice(
+    db_conn_session: AsyncIOMotorDatabase,
+    mock_user_id: str,
+    default_test_client: ClientInDB,  # <<< USE SESSION-SCOPED FIXTURE
+    default_test_project: ProjectInDB,  # <<< USE SESSION-SCOPED FIXTURE
+):
+    user_id = mock_user_id
+    before = await billable_summary(db_conn_session, user_id=user_id)
+    _, project_before = project_row(before, default_test_project.id)
+    cents_before = project_before.amount_cents if project_before else 0
+
+    item = await crud_workItem.create(
+        db=db_conn_session,
+        obj_in=WorkItemCreate(
+            name="Billable item",
+            project_id=default_test_project.id,
+            date=datetime(2025, 4, 2, tzinfo=UTC),
+            # Clients can't create items that look invoiced
+            is_invoiced=True,
+            invoiceId=uuid4(),
+            timeEntries=[
+                TimeEntryData(
+                    description="Dev", rate_name="Session Standard Rate", duration=2.0
+                )
+            ],
+        ),
+        user_id=user_id,
+    )
+    assert item.is_invoiced is False and item.invoice_id is None
+
+    summary = await billable_summary(
+        db_conn_session, user_id=user_id, client_id=default_test_client.id
+    )
+    client, project = project_row(summary, default_test_project.id)
+    assert client.client_id == default_test_client.id
+    assert project.project_name == default_test_project.name
+    assert project.amount_cents == cents_before + item.total_amount_cents
+    assert summary.work_items >= 1
+
+    request = InvoiceCreateRequest(
+        client_id=default_test_client.id,
+        project_ids=[default_test_project.id],
+        time_entry_ids=[item.id],
+    )
+    invoice = await crud_invoice.create_from_request(
+        db=db_conn_session, user_id=user_id, request=request
+    )
+    billed = await crud_workItem.get(db=db_conn_session, id=item.id, user_id=user_id)
+    assert billed.is_invoiced is True and billed.invoice_id == invoice.id
+
+    after = await billable_summary(db_conn_session, user_id=user_id)
+    _, project_after = project_row(after, default_test_project.id)
+    assert (project_after.amount_cents if project_after else 0) == cents_before
+
+    with pytest.raises(ValueError):
+        await crud_invoice.create_from_request(
+            db=db_conn_session, user_id=user_id, request=request
+        )
+
+    # Another client's filter doesn't see this project
+    other = await billable_summary(db_conn_session, user_id=user_id, client_id=uuid4())
+    assert other.clients == []
+
+
+@pytest.mark.asyncio
+async def test_migration_makes_the_marker_consistent(
+    db_conn_session: AsyncIOMotorDatabase,
+    default_test_project: ProjectInDB,  # <<< USE SESSION-SCOPED FIXTURE
+):
+    user_id = f"migration-{uuid4()}"  # Isolated from the session's documents
+    invoice_id = uuid4()
+    base = {"user_id": user_id, "project_id": default_test_project.id, "name": "Old"}
+    missing, legacy, referenced = uuid4(), uuid4(), uuid4()
+    await db_conn_session["workItems"].insert_many(
+        [
+            {**base, "_id": missing},
+            {**base, "_id": legacy, "invoice_id": invoice_id},
+            {**base, "_id": referenced, "invoiceId": invoice_id, "is_invoiced": None},
+        ]
+    )
+
+    assert await migrate_invoiced_marker(db_conn_session, user_id=user_id) >= 3
+    docs = {
+        doc["_id"]: doc
+        async for doc in db_conn_session["workItems"].find({"user_id": user_id})
+    }
+    assert docs[missing]["is_invoiced"] is False
+    assert docs[legacy]["is_invoiced"] is True
+    assert docs[legacy]["invoiceId"] == invoice_id
+    assert "invoice_id" not in docs[legacy]
+    assert docs[referenced]["is_invoiced"] is True
+
+    assert await migrate_invoiced_marker(db_conn_session, user_id=user_id) == 0
+
+
+@pytest.mark.asyncio
+async def test_billable_summary_endpoint(
+    async_client: AsyncClient,
+    mock_user_id: str,
+    db_conn_session: AsyncIOMotorDatabase,
+    default_test_client: ClientInDB,  # <<< USE SESSION-SCOPED FIXTURE
+    default_test_project: ProjectInDB,  # <<< USE SESSION-SCOPED FIXTURE
+):
+    url = "/api/v1/workItems/billable-summary"
+    params = {"client_id": str(default_test_client.id)}
+    before = (await async_client.get(url, params=params)).json()
+    item = await crud_workItem.create(
+        db=db_conn_session,
+        obj_in=WorkItemCreate(
+            name="Billable via the API",
+            project_id=default_test_project.id,
+            timeEntries=[
+                TimeEntryData(
+                    description="Dev", rate_name="Session Standard Rate", duration=1.5
+                )
+            ],
+        ),
+        user_id=mock_user_id,
+    )
+
+    response = await async_client.get(url, params=params)
+    assert response.status_code == 200
+    body = response.json()
+    # The new item shows up under its client and project
+    assert [client["client_id"] for client in body["clients"]] == [
+        str(default_test_client.id)
+    ]
+    # Current names: other tests rename the session's client and project
+    client_doc = await db_conn_session["clients"].find_one(
+        {"_id": default_test_client.id}
+    )
+    project_doc = await db_conn_session["projects"].find_one(
+        {"_id": default_test_project.id}
+    )
+    client = body["clients"][0]
+    assert client["client_name"] == client_doc["name"]
+    project = next(
+        row
+        for row in client["projects"]
+        if row["project_id"] == str(default_test_project.id)
+    )
+    assert project["project_name"] == project_doc["name"]
+    assert body["work_items"] == before["work_items"] + 1
+    assert body["total_amount"] == pytest.approx(
+        before["total_amount"] + item.total_amount
+    )
+    assert body["total_hours"] == round(
+        sum(client["hours"] for client in body["clients"]), 2
+    )
+
+
+@pytest.mark.asyncio
+async def test_items_claimed_concurrently_abort_the_invoice(
+    db_conn_session: AsyncIOMotorDatabase,
+    mock_user_id: str,
+    default_test_client: ClientInDB,  # <<< USE SESSION-SCOPED FIXTURE
+    default_test_project: ProjectInDB,  # <<< USE SESSION-SCOPED FIXTURE
+    monkeypatch,
+):
+    user_id = mock_user_id
+    items = [
+        await crud_workItem.create(
+            db=db_conn_session,
+            obj_in=WorkItemCreate(
+                name=f"Contested {i}",
+                project_id=default_test_project.id,
+                timeEntries=[
+                    TimeEntryData(
+                        description="Dev",
+                        rate_name="Session Standard Rate",
+                        duration=1.0,
+                    )
+                ],
+            ),
+            user_id=user_id,
+        )
+        for i in range(2)
+    ]
+    other_invoice_id = uuid4()
+
+    async def claim_after_another_request(db, *, user_id, work_item_ids, invoice_id):
+        # Another request bills the first item between the find and the claim
+        await claim_for_invoice(
+            db,
+            user_id=user_id,
+            work_item_ids=[items[0].id],
+            invoice_id=other_invoice_id,
+        )
+        return await claim_for_invoice(
+            db, user_id=user_id, work_item_ids=work_item_ids, invoice_id=invoice_id
+        )
+
+    monkeypatch.setattr(
+        crud_invoice_module, "claim_for_invoice", claim_after_another_request
+    )
+    invoices_before = await db_conn_session["invoices"].count_documents({})
+    with pytest.raises(ValueError):
+        await crud_invoice.create_from_request(
+            db=db_conn_session,
+            user_id=user_id,
+            request=InvoiceCreateRequest(
+                client_id=default_test_client.id,
+                project_ids=[default_test_project.id],
+                time_entry_ids=[item.id for item in items],
+            ),
+        )
+    assert await db_conn_session["invoices"].count_documents({}) == invoices_before
+    first, second = [
+        await crud_workItem.get(db=db_conn_session, id=item.id, user_id=user_id)
+        for item in items
+    ]
+    assert first.invoice_id == other_invoice_id
+    # Released: still billable
+    assert second.is_invoiced is False and second.invoice_id is None
+
+
+@pytest.mark.asyncio
+async def test_deleting_an_invoice_makes_its_items_billable_again(
+    db_conn_session: AsyncIOMotorDatabase,
+    mock_user_id: str,
+    default_test_client: ClientInDB,  # <<< USE SESSION-SCOPED FIXTURE
+    default_test_project: ProjectInDB,  # <<< USE SESSION-SCOPED FIXTURE
+):
+    user_id = mock_user_id
+    item = await crud_workItem.create(
+        db=db_conn_session,
+        obj_in=WorkItemCreate(
+            name="Billed then deleted",
+            project_id=default_test_project.id,
+            timeEntries=[
+                TimeEntryData(
+                    description="Dev", rate_name="Session Standard Rate", duration=1.0
+                )
+            ],
+        ),
+        user_id=user_id,
+    )
+    request = InvoiceCreateRequest(
+        client_id=default_test_client.id,
+        project_ids=[default_test_project.id],
+        time_entry_ids=[item.id],
+    )
+    invoice = await crud_invoice.create_from_request(
+        db=db_conn_session, user_id=user_id, request=request
+    )
+    billed = await billable_summary(db_conn_session, user_id=user_id)
+
+    assert await crud_invoice.remove(db=db_conn_session, id=invoice.id, user_id=user_id)
+    released = await crud_workItem.get(db=db_conn_session, id=item.id, user_id=user_id)
+    assert released.is_invoiced is False and released.invoice_id is None
+    _, project = project_row(
+        await billable_summary(db_conn_session, user_id=user_id),
+        default_test_project.id,
+    )
+    _, project_billed = project_row(billed, default_test_project.id)
+    assert project.amount_cents == (
+        (project_billed.amount_cents if project_billed else 0) + item.total_amount_cents
+    )
+
+    # And can be invoiced again
+    again = await crud_invoice.create_from_request(
+        db=db_conn_session, user_id=user_id, request=request
+    )
+    assert again.id != invoice.id
+
+
+@pytest.mark.asyncio
+async def test_summary_runs_with_and_without_the_partial_index(
+    db_conn_session: AsyncIOMotorDatabase,
+    mock_user_id: str,
+    default_test_client: ClientInDB,  # <<< USE SESSION-SCOPED FIXTURE
+    default_test_project: ProjectInDB,  # <<< USE SESSION-SCOPED FIXTURE
+):
+    user_id = mock_user_id
+    collection = db_conn_session["workItems"]
+    await crud_workItem.create(
+        db=db_conn_session,
+        obj_in=WorkItemCreate(
+            name="Indexed or not",
+            project_id=default_test_project.id,
+            timeEntries=[
+                TimeEntryData(
+                    description="Dev", rate_name="Session Standard Rate", duration=1.0
+                )
+            ],
+        ),
+        user_id=user_id,
+    )
+
+    # Deployments that haven't run ensure_indexes yet
+    if UNINVOICED_INDEX_NAME in await collection.index_information():
+        await collection.drop_index(UNINVOICED_INDEX_NAME)
+    without_index = await billable_summary(
+        db_conn_session, user_id=user_id, client_id=default_test_client.id
+    )
+    assert without_index.work_items >= 1
+
+    await ensure_indexes(db_conn_session)
+    assert UNINVOICED_INDEX_NAME in await collection.index_information()
+    with_index = await billable_summary(
+        db_conn_session, user_id=user_id, client_id=default_test_client.id
+    )
+    assert with_index == without_index
+    # The match makes the partial index a candidate for the planner
+    explain = await db_conn_session.command(
+        {
+            "aggregate": "workItems",
+            "pipeline": [
+                {"$match": {"user_id": user_id, **UNINVOICED}},
+                {"$group": {"_id": "$project_id"}},
+            ],
+            "explain": True,
+        }
+    )
+    assert UNINVOICED_INDEX_NAME in str(explain)
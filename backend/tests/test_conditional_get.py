@@ -0,0 +1,55 @@
+# tests/test_conditional_get.py
+import pytest
+from httpx import AsyncClient
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from datetime import datetime
+from uuid import uuid4
+
+from app.api.conditional import etag_matches, weak_etag
+from app.crud.crud_client import crud_client
+from app.models.client import ClientCreate, ClientUpdate
+
+
+def test_weak_etags_compare_weakly():
+    item_id = uuid4()
+    etag = weak_etag(item_id, datetime(2025, 1, 2, 3, 4, 5, 678900))
+    assert etag == f'W/"{item_id}-1735787045678"'
+    assert etag_matches(f'"other", {etag}', etag)
+    assert etag_matches(etag.removeprefix("W/"), etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches('W/"other"', etag)
+    assert weak_etag(item_id, None) == f'W/"{item_id}-0"'
+
+
+@pytest.mark.asyncio
+async def test_client_detail_answers_304_until_updated(
+    db_conn_session: AsyncIOMotorDatabase,
+    async_client: AsyncClient,
+    mock_user_id: str,
+):
+    client = await crud_client.create(
+        db=db_conn_session,
+        obj_in=ClientCreate(name="Conditional GmbH"),
+        user_id=mock_user_id,
+    )
+    url = f"/api/v1/clients/{client.id}"
+    first = await async_client.get(url)
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+    assert etag.startswith(f'W/"{client.id}-')
+
+    unchanged = await async_client.get(url, headers={"If-None-Match": etag})
+    assert unchanged.status_code == 304
+    assert unchanged.headers["etag"] == etag
+    assert unchanged.content == b""
+
+    await crud_client.update(
+        db=db_conn_session,
+        item_id=client.id,
+        user_id=mock_user_id,
+        obj_in=ClientUpdate(notes="Changed"),
+    )
+    changed = await async_client.get(url, headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["etag"] != etag
+    assert changed.json()["notes"] == "Changed"
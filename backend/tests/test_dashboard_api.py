@@ -15,6 +15,9 @@ from app.models.workItem import (
     WorkItemInDB,
 )
 from app.crud.crud_workItem import CRUDWorkItem  # Assuming this is your class
+from app.api import deps
+from app.core.config import settings
+from app.main import app
 
 import logging
 
@@ -229,3 +232,12 @@ async def test_get_hours_summary_no_data(
     assert parsed_summary.current_month_total_hours == 0.0
     assert parsed_summary.previous_month_total_hours == 0.0
     assert len(parsed_summary.daily_hours_current_month) == 0
+
+
+def test_cached_hours_summary_is_built_from_the_primary():
+    # A rebuild after an invalidation must see the write that invalidated it
+    path = f"{settings.API_V1_STR}/dashboard/summary/hours-this-month"
+    route = next(route for route in app.routes if getattr(route, "path", "") == path)
+    dependencies = {dependency.call for dependency in route.dependant.dependencies}
+    assert deps.get_db in dependencies
+    assert deps.get_analytics_db not in dependencies
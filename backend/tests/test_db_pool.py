@@ -0,0 +1,56 @@
+# tests/test_db_pool.py
+import pytest
+from httpx import AsyncClient
+from pymongo import monitoring
+from pymongo.read_preferences import SecondaryPreferred
+
+from app.core import db as core_db
+from app.core.config import settings
+from app.core.db_metrics import PoolMetrics
+
+ADDRESS = ("localhost", 27017)
+
+
+def test_pool_metrics_track_checkouts():
+    metrics = PoolMetrics(max_pool_size=4)
+    metrics.pool_created(monitoring.PoolCreatedEvent(ADDRESS, {}))
+    for connection_id in (1, 2):
+        metrics.connection_created(monitoring.ConnectionCreatedEvent(ADDRESS, connection_id))
+        metrics.connection_check_out_started(monitoring.ConnectionCheckOutStartedEvent(ADDRESS))
+        metrics.connection_checked_out(
+            monitoring.ConnectionCheckedOutEvent(ADDRESS, connection_id, 0.002)
+        )
+    metrics.connection_checked_in(monitoring.ConnectionCheckedInEvent(ADDRESS, 2))
+    metrics.connection_check_out_started(monitoring.ConnectionCheckOutStartedEvent(ADDRESS))
+
+    stats = metrics.snapshot()["localhost:27017"]
+    assert stats["open"] == 2
+    assert stats["checked_out"] == 1
+    assert stats["waiting"] == 1
+    assert stats["utilization"] == 0.25
+    assert stats["checkouts"] == 2
+    assert round(stats["avg_checkout_wait_ms"], 3) == 2.0
+
+
+def test_mongo_client_options_from_settings(monkeypatch):
+    monkeypatch.setattr(settings, "MONGODB_MAX_POOL_SIZE", 20)
+    monkeypatch.setattr(settings, "MONGODB_COMPRESSORS", "zstd, zlib")
+    monkeypatch.setattr(settings, "MONGODB_MAX_IDLE_TIME_MS", None)
+    options = core_db.mongo_client_options()
+    assert options["maxPoolSize"] == 20
+    assert options["compressors"] == ["zstd", "zlib"]
+    assert "maxIdleTimeMS" not in options
+    assert isinstance(core_db.read_preference("secondaryPreferred"), SecondaryPreferred)
+
+
+@pytest.mark.asyncio
+async def test_system_endpoints_are_admin_only(
+    async_client: AsyncClient, mock_user_id: str, monkeypatch
+):
+    monkeypatch.setattr(settings, "ADMIN_USER_IDS", "")
+    for url in ("/api/v1/system/db-pool", "/api/v1/system/response-cache"):
+        assert (await async_client.get(url)).status_code == 403
+
+    monkeypatch.setattr(settings, "ADMIN_USER_IDS", mock_user_id)
+    for url in ("/api/v1/system/db-pool", "/api/v1/system/response-cache"):
+        assert (await async_client.get(url)).status_code == 200
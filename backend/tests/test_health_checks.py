@@ -0,0 +1,49 @@
+# tests/test_health_checks.py
+import uuid
+
+import pytest
+from httpx import AsyncClient
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+from app.core.config import settings
+from app.core.health import startup_state
+from app.services import pdf_generator
+from app.services.health_checks import HealthChecks, health_checks
+
+
+@pytest.mark.asyncio
+async def test_probes_are_cached(db_conn_session: AsyncIOMotorDatabase):
+    checks = HealthChecks(cache_seconds=60)
+    report = await checks.report(db_conn_session)
+    assert report["ok"], report["failing"]
+    assert report["checks"]["mongo"]["latency_ms"] >= 0
+    assert "queued" in report["checks"]["live_updates"]
+    # Within the interval nothing is probed again
+    assert await checks.report(db_conn_session) is report
+
+    checks.cache_seconds = 0
+    assert await checks.report(db_conn_session) is not report
+
+
+@pytest.mark.asyncio
+async def test_pdf_backlog_makes_the_worker_unready(
+    async_client: AsyncClient, monkeypatch
+):
+    monkeypatch.setattr(health_checks, "cache_seconds", 0)
+    monkeypatch.setattr(startup_state, "ready_at", startup_state.started_at)
+
+    response = await async_client.get("/readyz")
+    assert response.status_code == 200
+    assert response.json()["health"]["ok"]
+
+    monkeypatch.setattr(settings, "HEALTH_PDF_BACKLOG_LIMIT", 1)
+    for _ in range(2):
+        monkeypatch.setitem(pdf_generator.pdf_jobs, uuid.uuid4(), 0.0)
+    response = await async_client.get("/readyz")
+    assert response.status_code == 503
+    assert response.json()["health"]["failing"] == ["pdf_jobs"]
+    assert response.json()["health"]["checks"]["pdf_jobs"]["jobs"] >= 2
+    # Still alive: liveness doesn't fail on dependencies
+    response = await async_client.get("/healthz")
+    assert response.status_code == 200
+    assert response.json()["health"]["failing"] == ["pdf_jobs"]
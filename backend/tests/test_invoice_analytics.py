@@ -0,0 +1,139 @@
+# tests/test_invoice_analytics.py
+import pytest
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from datetime import datetime, date, UTC
+
+from app.models.client import ClientInDB
+from app.models.project import ProjectInDB
+from app.models.invoice import InvoiceCreateRequest, InvoiceStatus
+from app.models.workItem import WorkItemCreate, TimeEntry as TimeEntryData
+from app.crud.crud_workItem import crud_workItem
+from app.crud.crud_invoice import crud_invoice, InvoiceUpdate
+from app.crud.invoice_analytics import (
+    contributions,
+    overdue_bucket,
+    payment_time_report,
+    rebuild_invoice_analytics,
+    receivables_report,
+    revenue_report,
+)
+
+
+def test_contributions_follow_the_invoice_state():
+    invoice = {
+        "_id": "inv",
+        "user_id": "u",
+        "client_id": "c",
+        "project_ids": ["p"],
+        "issue_date": datetime(2025, 3, 3),
+        "due_date": datetime(2025, 3, 17),
+        "subtotal": 100.0,
+        "total_amount": 119.0,
+        "status": "processed",
+    }
+    collections = [collection for collection, _, _ in contributions(invoice)]
+    assert collections.count("analytics_revenue") == 2  # Client rollup + project
+    assert "analytics_receivables" in collections
+
+    paid = {
+        **invoice,
+        "status": InvoiceStatus.PAID,
+        "payment_date": datetime(2025, 3, 13),
+    }
+    payment = [c for c in contributions(paid) if c[0] == "analytics_payments"]
+    assert payment[0][2] == {"paid_cents": 11900, "invoices": 1, "days_to_payment": 10}
+    assert contributions({**invoice, "status": InvoiceStatus.VOID}) == []
+
+    assert overdue_bucket(-3) == "current"
+    assert overdue_bucket(30) == "1-30"
+    assert overdue_bucket(120) == "90+"
+
+
+@pytest.mark.asyncio
+async def test_reports_track_invoice_status_changes(
+    db_conn_session: AsyncIOMotorDatabase,
+    mock_user_id: str,
+    default_test_client: ClientInDB,
+    default_test_project: ProjectInDB,  # <<< USE SESSION-SCOPED FIXTURE
+):
+    user_id = mock_user_id
+    as_of = date(2024, 12, 1)
+    # Other tests' invoices of the same user stay open
+    open_before = await receivables_report(
+        db_conn_session, user_id=user_id, as_of=as_of
+    )
+    invoices = []
+    for day in (2, 9):
+        work_item = await crud_workItem.create(
+            db=db_conn_session,
+            obj_in=WorkItemCreate(
+                name=f"Analytics {day}",
+                project_id=default_test_project.id,
+                date=datetime(2024, 11, day, tzinfo=UTC),
+                timeEntries=[
+                    TimeEntryData(
+                        description="Dev",
+                        rate_name="Session Standard Rate",
+                        duration=2.5,
+                    )
+                ],
+            ),
+            user_id=user_id,
+        )
+        invoices.append(
+            await crud_invoice.create_from_request(
+                db_conn_session,
+                user_id=user_id,
+                request=InvoiceCreateRequest(
+                    client_id=default_test_client.id,
+                    project_ids=[default_test_project.id],
+                    time_entry_ids=[work_item.id],
+                    issue_date=date(2024, 11, day),
+                ),
+            )
+        )
+    paid, voided = invoices
+    assert paid.project_amounts[0].amount_cents == 30000  # 2.5h x 120.0
+
+    await crud_invoice.update(
+        db_conn_session,
+        item_id=paid.id,
+        user_id=user_id,
+        obj_in=InvoiceUpdate(
+            status=InvoiceStatus.PAID, payment_date=date(2024, 11, 20)
+        ),
+    )
+    await crud_invoice.update(
+        db_conn_session,
+        item_id=voided.id,
+        user_id=user_id,
+        obj_in=InvoiceUpdate(status=InvoiceStatus.VOID),
+    )
+
+    async def reports():
+        revenue = await revenue_report(
+            db_conn_session,
+            user_id=user_id,
+            group_by="project",
+            from_month="2024-11",
+            to_month="2024-11",
+        )
+        receivables = await receivables_report(
+            db_conn_session, user_id=user_id, as_of=as_of
+        )
+        payments = await payment_time_report(
+            db_conn_session, user_id=user_id, from_month="2024-11", to_month="2024-11"
+        )
+        return revenue, receivables, payments
+
+    revenue, receivables, payments = await reports()
+    # The void invoice no longer counts as revenue or receivable
+    assert [bucket.net_amount for bucket in revenue.buckets] == [300.0]
+    assert revenue.buckets[0].name == default_test_project.name
+    assert receivables.total_amount == open_before.total_amount
+    assert payments.paid_invoices == 1
+    assert payments.average_days_to_payment == 18.0
+
+    # Rebuilding from the invoices gives the same numbers
+    await rebuild_invoice_analytics(db_conn_session, user_id=user_id)
+    assert await reports() == (revenue, receivables, payments)
@@ -0,0 +1,147 @@
+# tests/test_invoice_lines.py
+import pytest
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from datetime import datetime, UTC
+
+from app.models.client import ClientInDB
+from app.models.project import ProjectCreate, ProjectInDB, Rate as ProjectRate
+from app.models.invoice import InvoiceCreateRequest, InvoiceLineGrouping
+from app.models.workItem import WorkItemCreate, TimeEntry as TimeEntryData
+from app.crud.crud_workItem import crud_workItem
+from app.crud.crud_invoice import crud_invoice
+from app.crud.crud_project import crud_project
+from app.crud.invoice_lines import describe_line, line_items_pipeline
+
+
+def test_describe_line_per_grouping():
+    row = {
+        "rate_name": "Dev",
+        "work_item_name": "Sprint review",
+        "project_name": "Website",
+        "date_from": datetime(2025, 3, 1),
+        "date_to": datetime(2025, 3, 7),
+    }
+    assert (
+        describe_line(row, InvoiceLineGrouping.PROJECT_RATE)
+        == "Website – Dev (2025-03-01 – 2025-03-07)"
+    )
+    assert describe_line(row, InvoiceLineGrouping.DAY) == "2025-03-01: Website (Rate: Dev)"
+    assert (
+        describe_line(row, InvoiceLineGrouping.WORK_ITEM)
+        == "2025-03-01: Sprint review (Rate: Dev)"
+    )
+    with pytest.raises(ValueError):
+        line_items_pipeline(user_id="u", work_item_ids=[], grouping="weekly")
+
+
+@pytest.mark.asyncio
+async def test_project_rate_grouping_collapses_entries(
+    db_conn_session: AsyncIOMotorDatabase,
+    mock_user_id: str,
+    default_test_client: ClientInDB,
+    default_test_project: ProjectInDB,  # <<< USE SESSION-SCOPED FIXTURE
+):
+    user_id = mock_user_id
+    work_item_ids = []
+    for day in (3, 4, 5):
+        work_item = await crud_workItem.create(
+            db=db_conn_session,
+            obj_in=WorkItemCreate(
+                name=f"Grouping {day}",
+                project_id=default_test_project.id,
+                date=datetime(2025, 3, day, tzinfo=UTC),
+                timeEntries=[
+                    TimeEntryData(
+                        description="Dev",
+                        rate_name="Session Standard Rate",
+                        duration=1.5,
+                    ),
+                    TimeEntryData(
+                        description="Review",
+                        rate_name="Session Standard Rate",
+                        duration=0.25,
+                    ),
+                ],
+            ),
+            user_id=user_id,
+        )
+        work_item_ids.append(work_item.id)
+
+    invoice = await crud_invoice.create_from_request(
+        db_conn_session,
+        user_id=user_id,
+        request=InvoiceCreateRequest(
+            client_id=default_test_client.id,
+            project_ids=[default_test_project.id],
+            time_entry_ids=work_item_ids,
+            line_grouping=InvoiceLineGrouping.PROJECT_RATE,
+        ),
+    )
+
+    # Six entries, one project, one rate -> one line referencing all items
+    assert invoice.line_grouping == InvoiceLineGrouping.PROJECT_RATE
+    assert len(invoice.line_items) == 1
+    line = invoice.line_items[0]
+    assert line.entry_count == 6
+    assert line.quantity == pytest.approx(5.25)
+    assert line.amount == pytest.approx(5.25 * 120.0)
+    assert sorted(line.time_entry_ids, key=str) == sorted(work_item_ids, key=str)
+    assert invoice.subtotal == pytest.approx(line.amount)
+    assert invoice.service_date_from.isoformat() == "2025-03-03"
+    assert invoice.service_date_to.isoformat() == "2025-03-05"
+
+
+@pytest.mark.asyncio
+async def test_day_grouping_splits_projects_worked_on_the_same_day(
+    db_conn_session: AsyncIOMotorDatabase,
+    mock_user_id: str,
+    default_test_client: ClientInDB,
+    default_test_project: ProjectInDB,  # <<< USE SESSION-SCOPED FIXTURE
+):
+    user_id = mock_user_id
+    other_project = await crud_project.create(
+        db=db_conn_session,
+        obj_in=ProjectCreate(
+            name="Day Grouping Other Project",
+            client_id=default_test_client.id,
+            rates=[ProjectRate(name="Session Standard Rate", price_per_hour=120.0)],
+        ),
+        user_id=user_id,
+    )
+    work_item_ids = []
+    for project in (default_test_project, other_project):
+        work_item = await crud_workItem.create(
+            db=db_conn_session,
+            obj_in=WorkItemCreate(
+                name=f"Same day in {project.name}",
+                project_id=project.id,
+                date=datetime(2025, 3, 10, tzinfo=UTC),
+                timeEntries=[
+                    TimeEntryData(
+                        description="Dev",
+                        rate_name="Session Standard Rate",
+                        duration=2.0,
+                    )
+                ],
+            ),
+            user_id=user_id,
+        )
+        work_item_ids.append(work_item.id)
+
+    invoice = await crud_invoice.create_from_request(
+        db_conn_session,
+        user_id=user_id,
+        request=InvoiceCreateRequest(
+            client_id=default_test_client.id,
+            project_ids=[default_test_project.id, other_project.id],
+            time_entry_ids=work_item_ids,
+            line_grouping=InvoiceLineGrouping.DAY,
+        ),
+    )
+
+    # Same day and rate, two projects -> one line each, named after its project
+    assert sorted(line.description for line in invoice.line_items) == sorted(
+        f"2025-03-10: {project.name} (Rate: Session Standard Rate)"
+        for project in (default_test_project, other_project)
+    )
+    assert all(line.quantity == pytest.approx(2.0) for line in invoice.line_items)
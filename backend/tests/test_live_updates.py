@@ -0,0 +1,115 @@
+# tests/test_live_updates.py
+import asyncio
+
+import pytest
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from datetime import datetime, UTC
+
+from app.models.project import ProjectInDB
+from app.models.workItem import WorkItemCreate, TimeEntry as TimeEntryData
+from app.crud.crud_workItem import crud_workItem
+from app.services.live_updates import (
+    LiveUpdateHub,
+    LiveUpdateWatcher,
+    change_message,
+)
+
+
+def test_hub_delivers_to_the_owners_streams_only():
+    hub = LiveUpdateHub(queue_size=1)
+    mine, other = hub.subscribe("me"), hub.subscribe("other")
+    hub.publish("me", {"collection": "invoices", "id": "1"})
+    hub.publish("me", {"collection": "invoices", "id": "2"})  # Queue full
+    assert mine.queue.get_nowait()["id"] == "1"
+    assert mine.overflowed
+    assert other.queue.empty()
+
+    hub.unsubscribe(mine)
+    hub.unsubscribe(other)
+    assert hub.user_ids == []
+
+
+def test_change_message_lists_top_level_fields():
+    change = {
+        "operationType": "update",
+        "ns": {"db": "app", "coll": "invoices"},
+        "documentKey": {"_id": "inv"},
+        "user_id": "me",
+        "fields": ["pdf_content", "updated_at", "timeEntries.0.duration"],
+    }
+    assert change_message(change) == {
+        "collection": "invoices",
+        "operation": "update",
+        "id": "inv",
+        "fields": ["pdf_content", "timeEntries", "updated_at"],
+    }
+
+
+@pytest.mark.asyncio
+async def test_polling_publishes_new_work_items_once(
+    db_conn_session: AsyncIOMotorDatabase,
+    mock_user_id: str,
+    default_test_project: ProjectInDB,  # <<< USE SESSION-SCOPED FIXTURE
+):
+    hub = LiveUpdateHub(queue_size=100)
+    stream = hub.subscribe(mock_user_id)
+    watcher = LiveUpdateWatcher(hub, mode="polling", poll_seconds=1)
+    await watcher.poll_once(db_conn_session)  # Sets the watermarks to now
+    assert stream.queue.empty()
+
+    work_item = await crud_workItem.create(
+        db=db_conn_session,
+        obj_in=WorkItemCreate(
+            name="Live",
+            project_id=default_test_project.id,
+            date=datetime.now(UTC),
+            timeEntries=[
+                TimeEntryData(
+                    description="Dev", rate_name="Session Standard Rate", duration=1
+                )
+            ],
+        ),
+        user_id=mock_user_id,
+    )
+    await watcher.poll_once(db_conn_session)
+    messages = []
+    while not stream.queue.empty():
+        messages.append(stream.queue.get_nowait())
+    assert {"collection": "workItems", "operation": "write"}.items() <= next(
+        m for m in messages if m["collection"] == "workItems"
+    ).items()
+    assert str(work_item.id) in [m["id"] for m in messages]
+    assert "events" in [m["collection"] for m in messages]  # WORK_ITEM_CREATED
+
+    assert await watcher.poll_once(db_conn_session) == 0
+
+
+@pytest.mark.asyncio
+async def test_writes_made_while_nobody_listens_are_not_replayed(
+    db_conn_session: AsyncIOMotorDatabase,
+    mock_user_id: str,
+    default_test_project: ProjectInDB,  # <<< USE SESSION-SCOPED FIXTURE
+):
+    hub = LiveUpdateHub(queue_size=100)
+    watcher = LiveUpdateWatcher(hub, mode="polling", poll_seconds=1)
+    await watcher.poll_once(db_conn_session)  # Idle: no streams open
+
+    await crud_workItem.create(
+        db=db_conn_session,
+        obj_in=WorkItemCreate(
+            name="Before the stream",
+            project_id=default_test_project.id,
+            date=datetime.now(UTC),
+            timeEntries=[
+                TimeEntryData(
+                    description="Dev", rate_name="Session Standard Rate", duration=1
+                )
+            ],
+        ),
+        user_id=mock_user_id,
+    )
+    await watcher.poll_once(db_conn_session)  # Still idle: watermark moves on
+    await asyncio.sleep(0.005)  # Stamps have millisecond precision
+    stream = hub.subscribe(mock_user_id)
+    assert await watcher.poll_once(db_conn_session) == 0
+    assert stream.queue.empty()
@@ -0,0 +1,126 @@
+# tests/test_metrics.py
+import pytest
+from datetime import timedelta
+from httpx import ASGITransport, AsyncClient
+from prometheus_client import REGISTRY
+from pymongo import monitoring
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse, StreamingResponse
+from starlette.routing import Route
+
+from app.core.config import settings
+from app.core.metrics import CommandMetrics, MetricsMiddleware, reply_document_count
+from app.main import app
+from app.models.workItem import WorkItemInDB
+
+ADDRESS = ("localhost", 27017)
+
+
+def test_reply_document_count():
+    assert reply_document_count({"cursor": {"firstBatch": [{}, {}], "id": 0}}) == 2
+    assert reply_document_count({"cursor": {"nextBatch": [{}], "id": 0}}) == 1
+    assert reply_document_count({"n": 3, "ok": 1}) == 3
+    assert reply_document_count({"ok": 1}) == 0
+
+
+def test_command_metrics_label_by_collection():
+    listener = CommandMetrics()
+    labels = {"collection": "metricsTest", "command": "find"}
+
+    def documents():
+        return REGISTRY.get_sample_value("mongo_command_documents_total", labels) or 0
+
+    before = documents()
+    listener.started(
+        monitoring.CommandStartedEvent(
+            {"find": "metricsTest", "filter": {}}, "test_db", 7, ADDRESS, 1
+        )
+    )
+    listener.succeeded(
+        monitoring.CommandSucceededEvent(
+            timedelta(microseconds=1500),
+            {"cursor": {"firstBatch": [{}, {}, {}], "id": 0}, "ok": 1},
+            "find",
+            7,
+            ADDRESS,
+            1,
+        )
+    )
+    assert documents() - before == 3
+
+
+@pytest.mark.asyncio
+async def test_metrics_endpoint_reports_route_templates(
+    async_client: AsyncClient,
+    default_test_workItem: WorkItemInDB,  # <<< USE SESSION-SCOPED FIXTURE
+):
+    response = await async_client.get(f"/api/v1/workItems/{default_test_workItem.id}")
+    assert response.status_code == 200
+
+    response = await async_client.get("/metrics")
+    assert response.status_code == 200
+    body = response.text
+    # Latency is labelled with the route template, not the concrete ID
+    assert 'route="/api/v1/workItems/{workItem_id}"' in body
+    assert str(default_test_workItem.id) not in body
+
+
+@pytest.mark.asyncio
+async def test_metrics_endpoint_requires_the_token(
+    async_client: AsyncClient, monkeypatch
+):
+    monkeypatch.setattr(settings, "METRICS_TOKEN", "scrape-secret")
+    assert (await async_client.get("/metrics")).status_code == 401
+    response = await async_client.get(
+        "/metrics", headers={"Authorization": "Bearer wrong"}
+    )
+    assert response.status_code == 401
+    response = await async_client.get(
+        "/metrics", headers={"Authorization": "Bearer scrape-secret"}
+    )
+    assert response.status_code == 200
+
+    # Without a token only local clients are answered
+    monkeypatch.setattr(settings, "METRICS_TOKEN", "")
+    transport = ASGITransport(app=app, client=("203.0.113.7", 40000))
+    async with AsyncClient(transport=transport, base_url="http://testserver") as remote:
+        assert (await remote.get("/metrics")).status_code == 403
+
+
+@pytest.mark.asyncio
+async def test_event_streams_stay_out_of_the_latency_histogram():
+    async def events(request):
+        async def body():
+            yield "event: ready\ndata: {}\n\n"
+
+        return StreamingResponse(body(), media_type="text/event-stream")
+
+    async def plain(request):
+        return PlainTextResponse("ok")
+
+    app = MetricsMiddleware(
+        Starlette(
+            routes=[
+                Route("/metrics-test/stream", events),
+                Route("/metrics-test/plain", plain),
+            ]
+        )
+    )
+
+    def requests(route):
+        labels = {"method": "GET", "route": route, "status": "200"}
+        return (
+            REGISTRY.get_sample_value("http_request_duration_seconds_count", labels)
+            or 0
+        )
+
+    routes = ("/metrics-test/stream", "/metrics-test/plain")
+    before = {route: requests(route) for route in routes}
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://testserver"
+    ) as client:
+        assert (await client.get("/metrics-test/stream")).status_code == 200
+        assert (await client.get("/metrics-test/plain")).status_code == 200
+
+    assert requests("/metrics-test/stream") == before["/metrics-test/stream"]
+    assert requests("/metrics-test/plain") == before["/metrics-test/plain"] + 1
@@ -0,0 +1,71 @@
+# tests/test_money.py
+import pytest
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from datetime import datetime, UTC
+
+from app.models.project import ProjectInDB
+from app.models.workItem import WorkItemCreate, TimeEntry as TimeEntryData
+from app.crud.crud_workItem import crud_workItem
+from app.crud.work_item_totals import compute_totals
+from app.utils.money import (
+    from_cents,
+    line_amount_cents,
+    line_amounts_cents,
+    percentage_cents,
+    round_money,
+    to_cents,
+)
+
+
+def test_rounding_is_half_up_on_the_decimal_value():
+    # round() on floats gives 1.0 and 0.12 here (binary repr / half to even)
+    assert to_cents(1.005) == 101
+    assert to_cents(0.125) == 13
+    assert round_money(2.675) == 2.68
+    assert line_amount_cents(33.33, 0.25) == 833  # 8.3325
+    assert percentage_cents(1050, 19) == 200  # 199.5
+    assert from_cents(833) == 8.33
+
+
+def test_batch_matches_single_computation():
+    pairs = [(33.33, 0.25), (33.33, 1.5), (80, 0.1), (120.0, 7.75)]
+    assert line_amounts_cents(pairs) == [
+        line_amount_cents(price, duration) for price, duration in pairs
+    ]
+
+
+def test_totals_are_summed_in_cents():
+    # 0.1 + 0.2 style float drift cannot leak into the totals
+    entries = [{"duration": 0.1, "calculatedAmount": 0.1, "amount_cents": 10}] * 3
+    assert compute_totals(entries) == (0.3, 0.3)
+    # Entries written before amount_cents existed
+    assert compute_totals([{"duration": 1, "calculatedAmount": 2.675}]) == (1, 2.68)
+
+
+@pytest.mark.asyncio
+async def test_work_item_amounts_are_stored_in_cents(
+    db_conn_session: AsyncIOMotorDatabase,
+    mock_user_id: str,
+    default_test_project: ProjectInDB,  # <<< USE SESSION-SCOPED FIXTURE
+):
+    # 120.0/h: three entries of 0.33h are 39.60 each, 118.80 in total
+    created = await crud_workItem.create(
+        db=db_conn_session,
+        obj_in=WorkItemCreate(
+            name="Money",
+            project_id=default_test_project.id,
+            date=datetime(2025, 4, 1, tzinfo=UTC),
+            timeEntries=[
+                TimeEntryData(
+                    description="Call",
+                    rate_name="Session Standard Rate",
+                    duration=0.33,
+                )
+            ]
+            * 3,
+        ),
+        user_id=mock_user_id,
+    )
+    assert [entry.amount_cents for entry in created.timeEntries] == [3960] * 3
+    assert created.total_amount_cents == 11880
+    assert created.total_amount == 118.8
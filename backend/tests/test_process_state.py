@@ -0,0 +1,43 @@
+# tests/test_process_state.py
+import pytest
+
+from app.core import process_state
+from app.core.process_state import ProcessLocal, reset_process_state
+from app.services.pdf_generator import jinja_env
+
+
+def test_value_is_built_once_per_process(monkeypatch):
+    built = []
+    local = ProcessLocal(lambda: built.append(1) or len(built), name="test")
+    assert local.get() == 1
+    assert local.get() == 1
+
+    # Used from a forked worker: rebuilt there
+    monkeypatch.setattr(process_state.os, "getpid", lambda: -1)
+    assert not local.is_set
+    assert local.get() == 2
+
+    reset_process_state()
+    assert local.get() == 3
+
+
+def test_failed_builds_are_not_cached():
+    calls = []
+
+    def flaky():
+        calls.append(1)
+        if len(calls) == 1:
+            raise ConnectionError("JWKS endpoint down")
+        return {"keys": []}
+
+    local = ProcessLocal(flaky, name="flaky")
+    with pytest.raises(ConnectionError):
+        local.get()
+    assert local.get() == {"keys": []}
+
+
+def test_template_environment_is_process_local():
+    env = jinja_env.get()
+    assert env.filters["currency"](1234.5) == "1.234,50 €"
+    reset_process_state()
+    assert jinja_env.get() is not env
@@ -0,0 +1,112 @@
+# tests/test_profiling.py
+import asyncio
+import pytest
+from datetime import timedelta
+from httpx import ASGITransport, AsyncClient
+from pymongo import monitoring
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.routing import Route
+
+from app.core import profiling
+from app.core.config import settings
+from app.core.profiling import ProfilingMiddleware, profile_store
+
+ADDRESS = ("localhost", 27017)
+
+
+async def fake_endpoint(request):
+    # Simulates a request issuing one Mongo command
+    recorder = profiling.CommandRecorder()
+    recorder.started(
+        monitoring.CommandStartedEvent({"find": "workItems"}, "test_db", 1, ADDRESS, 1)
+    )
+    await asyncio.sleep(0.02)
+    recorder.succeeded(
+        monitoring.CommandSucceededEvent(
+            timedelta(milliseconds=20),
+            {"cursor": {"firstBatch": [{}], "id": 0}},
+            "find",
+            1,
+            ADDRESS,
+            1,
+        )
+    )
+    return JSONResponse({"item_id": request.path_params["item_id"]})
+
+
+async def fake_stream(request):
+    async def events():
+        # The response has started: the profiler must be free again
+        profiler_free.append(not profiling._RequestProfiler._busy.locked())
+        yield "event: ready\ndata: {}\n\n"
+        await asyncio.sleep(0.02)
+        yield ": keep-alive\n\n"
+
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+
+profiler_free = []
+
+
+def profiled_app():
+    app = Starlette(
+        routes=[
+            Route("/items/{item_id}", fake_endpoint),
+            Route("/stream", fake_stream),
+        ]
+    )
+    return ProfilingMiddleware(app)
+
+
+@pytest.mark.asyncio
+async def test_header_flagged_request_is_profiled(monkeypatch):
+    monkeypatch.setattr(settings, "PROFILING_SLOW_REQUEST_MS", None)
+    profile_store.clear()
+    async with AsyncClient(
+        transport=ASGITransport(app=profiled_app()), base_url="http://testserver"
+    ) as client:
+        plain = await client.get("/items/1")
+        flagged = await client.get("/items/2", headers={"X-Profile": "1"})
+
+    assert "x-profile-id" not in plain.headers
+    artifact = profile_store.get(flagged.headers["x-profile-id"])
+    assert artifact["reason"] == "header"
+    assert artifact["status"] == 200
+    assert artifact["mongo_commands"][0]["collection"] == "workItems"
+    assert artifact["mongo_commands"][0]["documents"] == 1
+    assert artifact["profile"]
+    assert len(profile_store.list()) == 1
+
+
+@pytest.mark.asyncio
+async def test_slow_requests_are_kept_without_profile(monkeypatch):
+    monkeypatch.setattr(settings, "PROFILING_SLOW_REQUEST_MS", 10)
+    profile_store.clear()
+    async with AsyncClient(
+        transport=ASGITransport(app=profiled_app()), base_url="http://testserver"
+    ) as client:
+        await client.get("/items/3")
+
+    [summary] = profile_store.list()
+    assert summary["reason"] == "slow"
+    assert summary["mongo_commands"] == 1
+    assert profile_store.get(summary["id"])["profile"] is None
+
+
+@pytest.mark.asyncio
+async def test_event_streams_are_not_kept(monkeypatch):
+    monkeypatch.setattr(settings, "PROFILING_SLOW_REQUEST_MS", 10)
+    profile_store.clear()
+    profiler_free.clear()
+    async with AsyncClient(
+        transport=ASGITransport(app=profiled_app()), base_url="http://testserver"
+    ) as client:
+        flagged = await client.get("/stream", headers={"X-Profile": "1"})
+        await client.get("/stream")
+
+    assert flagged.text.startswith("event: ready")
+    assert "x-profile-id" not in flagged.headers
+    assert profiler_free == [True, True]
+    # Longer than PROFILING_SLOW_REQUEST_MS, but not a slow request
+    assert profile_store.list() == []
@@ -0,0 +1,68 @@
+# tests/test_rate_limit.py
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+from httpx import AsyncClient
+
+from app.core.config import settings
+from app.core.rate_limit import (
+    MemoryBuckets,
+    RateLimiter,
+    RateLimitPolicy,
+    rate_limiter,
+)
+
+
+@pytest.mark.asyncio
+async def test_token_bucket_and_concurrency_cap():
+    limiter = RateLimiter(
+        MemoryBuckets(),
+        {"report": RateLimitPolicy(per_minute=6, burst=2, concurrency=1)},
+    )
+    release = asyncio.Event()
+
+    async def hold_slot():
+        async with limiter.limit("report", "user-a"):
+            await release.wait()
+
+    holder = asyncio.create_task(hold_slot())
+    await asyncio.sleep(0)
+    # Second request of the same user while the first is in flight
+    with pytest.raises(HTTPException) as exc:
+        async with limiter.limit("report", "user-a"):
+            pass
+    assert exc.value.status_code == 429
+    assert exc.value.headers["Retry-After"] == "1"
+    # Other users and unlimited routes are unaffected
+    async with limiter.limit("report", "user-b"):
+        pass
+    async with limiter.limit("other", "user-a"):
+        pass
+    release.set()
+    await holder
+
+    async with limiter.limit("report", "user-a"):  # Second (last) token
+        pass
+    with pytest.raises(HTTPException) as exc:
+        async with limiter.limit("report", "user-a"):
+            pass
+    # One token per 10s
+    assert 1 <= int(exc.value.headers["Retry-After"]) <= 10
+
+
+@pytest.mark.asyncio
+async def test_dashboard_returns_429_with_retry_after(
+    async_client: AsyncClient, monkeypatch
+):
+    monkeypatch.setitem(
+        rate_limiter.policies,
+        "dashboard",
+        RateLimitPolicy(per_minute=1, burst=1, concurrency=2),
+    )
+    url = f"{settings.API_V1_STR}/dashboard/summary/hours-this-month"
+    assert (await async_client.get(url)).status_code == 200
+
+    response = await async_client.get(url)
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) > 1
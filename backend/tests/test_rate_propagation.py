@@ -0,0 +1,99 @@
+# tests/test_rate_propagation.py
+import pytest
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from uuid import uuid4
+from datetime import datetime, UTC
+
+from app.models.project import ProjectInDB, ProjectUpdate, Rate as ProjectRate
+from app.models.workItem import WorkItemCreate, TimeEntry as TimeEntryData
+from app.crud.crud_project import crud_project
+from app.crud.crud_workItem import crud_workItem
+from app.crud.rate_propagation import changed_rates, propagate_rate_changes
+
+
+def test_changed_rates_lists_new_and_repriced_rates():
+    old = [
+        {"name": "Dev", "price_per_hour": 100.0},
+        {"name": "Ops", "price_per_hour": 80.0},
+    ]
+    new = [
+        {"name": "Dev", "price_per_hour": 100.0},
+        {"name": "Ops", "price_per_hour": 90.0},
+        {"name": "QA", "price_per_hour": 60.0},
+    ]
+    assert changed_rates(old, new) == {"Ops": 90.0, "QA": 60.0}
+
+
+@pytest.mark.asyncio
+async def test_rate_update_reprices_only_uninvoiced_items(
+    db_conn_session: AsyncIOMotorDatabase,
+    mock_user_id: str,
+    default_test_project: ProjectInDB,  # <<< USE SESSION-SCOPED FIXTURE
+):
+    user_id = mock_user_id
+    work_date = datetime(2025, 3, 10, tzinfo=UTC)
+
+    def work_item(name):
+        return WorkItemCreate(
+            name=name,
+            project_id=default_test_project.id,
+            date=work_date,
+            timeEntries=[
+                TimeEntryData(
+                    description="Dev", rate_name="Session Standard Rate", duration=2.0
+                )
+            ],
+        )
+
+    open_item = await crud_workItem.create(
+        db=db_conn_session, obj_in=work_item("Open"), user_id=user_id
+    )
+    billed_item = await crud_workItem.create(
+        db=db_conn_session, obj_in=work_item("Billed"), user_id=user_id
+    )
+    await db_conn_session["workItems"].update_one(
+        {"_id": billed_item.id},
+        {"$set": {"invoiceId": uuid4(), "is_invoiced": True}},
+    )
+
+    # Unchanged rates: the uninvoiced entry is recalculated at the same price
+    # (the billed one is skipped) and the amounts don't move
+    result = await propagate_rate_changes(
+        db_conn_session, user_id=user_id, project_id=default_test_project.id
+    )
+    assert result.time_entries_recalculated == 1
+    assert result.amount_delta == 0
+
+    await crud_project.update(
+        db=db_conn_session,
+        item_id=default_test_project.id,
+        user_id=user_id,
+        obj_in=ProjectUpdate(
+            rates=[ProjectRate(name="Session Standard Rate", price_per_hour=150.0)]
+        ),
+    )
+
+    repriced = await crud_workItem.get(
+        db=db_conn_session, id=open_item.id, user_id=user_id
+    )
+    assert repriced.timeEntries[0].price_per_hour == 150
+    assert repriced.timeEntries[0].calculatedAmount == 300
+    billed = await crud_workItem.get(
+        db=db_conn_session, id=billed_item.id, user_id=user_id
+    )
+    assert billed.timeEntries[0].calculatedAmount == 240
+
+    # Another price change reaches the uninvoiced item only: 2 h x (160 - 150)
+    result = await propagate_rate_changes(
+        db_conn_session,
+        user_id=user_id,
+        project_id=default_test_project.id,
+        rates={"Session Standard Rate": 160.0},
+    )
+    assert result.work_items_matched == 1
+    assert result.amount_delta == 40
+    assert result.amount_delta_by_month == {"2025-03": 40}
+    repriced = await crud_workItem.get(
+        db=db_conn_session, id=open_item.id, user_id=user_id
+    )
+    assert repriced.timeEntries[0].calculatedAmount == 320
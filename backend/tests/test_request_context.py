@@ -0,0 +1,90 @@
+# tests/test_request_context.py
+import pytest
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+from app.core.request_context import RequestContext
+from app.crud.crud_client import crud_client
+from app.crud.crud_invoice import crud_invoice
+from app.crud.crud_workItem import crud_workItem
+from app.models.client import ClientInDB
+from app.models.invoice import InvoiceCreateRequest
+from app.models.project import ProjectInDB
+from app.models.workItem import TimeEntry, WorkItemCreate
+from app.services import pdf_generator
+
+
+@pytest.mark.asyncio
+async def test_documents_are_loaded_once_per_request(
+    db_conn_session: AsyncIOMotorDatabase,
+    mock_user_id: str,
+    default_test_client: ClientInDB,
+):
+    context = RequestContext.for_user(db_conn_session, mock_user_id)
+    first = await context.get(crud_client, default_test_client.id)
+    assert first.name == default_test_client.name
+    assert await context.get(crud_client, default_test_client.id) is first
+    assert context.lookups == 1
+
+    context.forget(crud_client, default_test_client.id)
+    await context.get(crud_client, default_test_client.id)
+    assert context.lookups == 2
+
+    # Other users' documents stay invisible
+    other = RequestContext.for_user(db_conn_session, "someone-else")
+    assert await other.get(crud_client, default_test_client.id) is None
+
+
+@pytest.mark.asyncio
+async def test_pdf_job_reuses_the_created_invoice(
+    db_conn_session: AsyncIOMotorDatabase,
+    mock_user_id: str,
+    default_test_client: ClientInDB,
+    default_test_project: ProjectInDB,
+    monkeypatch,
+):
+    rendered = []
+    # Own work item: the session one may already be invoiced
+    work_item = await crud_workItem.create(
+        db=db_conn_session,
+        obj_in=WorkItemCreate(
+            name="Context work item",
+            project_id=default_test_project.id,
+            timeEntries=[
+                TimeEntry(
+                    description="Dev", rate_name="Session Standard Rate", duration=1.0
+                )
+            ],
+        ),
+        user_id=mock_user_id,
+    )
+
+    async def fake_render(invoice, your_details):
+        rendered.append(invoice)
+        return b"%PDF-1.7 test"
+
+    monkeypatch.setattr(pdf_generator, "generate_invoice_pdf", fake_render)
+    invoice = await crud_invoice.create_from_request(
+        db=db_conn_session,
+        user_id=mock_user_id,
+        request=InvoiceCreateRequest(
+            client_id=default_test_client.id,
+            project_ids=[default_test_project.id],
+            time_entry_ids=[work_item.id],
+        ),
+    )
+    context = RequestContext.for_user(db_conn_session, mock_user_id)
+    context.remember(crud_invoice, invoice)
+
+    await pdf_generator.generate_and_store_invoice_pdf(
+        db=db_conn_session,
+        invoice_id=invoice.id,
+        user_id=mock_user_id,
+        context=context,
+    )
+    assert rendered == [invoice]
+    assert context.lookups == 0  # No second find_one for the invoice
+    assert pdf_generator.pdf_job_backlog()["jobs"] == 0
+
+    # The stored PDF isn't hidden by the model loaded before it was written
+    stored = await context.get(crud_invoice, invoice.id)
+    assert stored.pdf_content == b"%PDF-1.7 test"
@@ -0,0 +1,55 @@
+# tests/test_response_cache.py
+import pytest
+from httpx import AsyncClient
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+from app.core.response_cache import CachedResponse, MemoryBackend
+from app.crud.crud_client import crud_client
+from app.models.client import ClientCreate
+
+
+@pytest.mark.asyncio
+async def test_memory_backend_evicts_least_recently_used():
+    backend = MemoryBackend(max_entries=2)
+    for key in ("a", "b"):
+        await backend.set(key, CachedResponse(body=key.encode(), etag=key), 60)
+    await backend.get("a")  # "b" is now the least recently used
+    await backend.set("c", CachedResponse(body=b"c", etag="c"), 60)
+    assert await backend.get("b") is None
+    assert (await backend.get("a")).body == b"a"
+
+    await backend.bump("u", ["clients"])
+    assert await backend.generations("u", ["clients", "projects"]) == (1, 0)
+    assert await backend.generations("other", ["clients"]) == (0,)
+
+
+@pytest.mark.asyncio
+async def test_client_list_is_cached_until_a_client_is_written(
+    db_conn_session: AsyncIOMotorDatabase,
+    async_client: AsyncClient,
+    mock_user_id: str,
+):
+    url = "/api/v1/clients/?limit=500"
+    first = await async_client.get(url)
+    assert first.status_code == 200
+    assert first.headers["x-cache"] == "MISS"
+
+    second = await async_client.get(url)
+    assert second.headers["x-cache"] == "HIT"
+    assert second.content == first.content
+    assert second.headers["etag"] == first.headers["etag"]
+
+    revalidated = await async_client.get(
+        url, headers={"If-None-Match": first.headers["etag"]}
+    )
+    assert revalidated.status_code == 304
+
+    created = await crud_client.create(
+        db=db_conn_session,
+        obj_in=ClientCreate(name="Cached Client Ltd."),
+        user_id=mock_user_id,
+    )
+    third = await async_client.get(url)
+    assert third.headers["x-cache"] == "MISS"
+    assert third.headers["etag"] != first.headers["etag"]
+    assert str(created.id) in [client["_id"] for client in third.json()]
@@ -0,0 +1,86 @@
+# tests/test_server.py
+import os
+import subprocess
+import sys
+from uuid import uuid4
+
+import pytest
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+from app import server
+from app.core.config import settings
+from app.crud.name_cache import NameCache
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+RECORD_RENDER = """
+from app.core.metrics import PDF_RENDERS
+PDF_RENDERS.labels("ok").inc()
+"""
+SCRAPE = """
+from app.core.metrics import render_metrics
+print(render_metrics().decode())
+"""
+
+
+def test_several_workers_share_their_state(monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "RESPONSE_CACHE_BACKEND", "memory")
+    monkeypatch.setattr(settings, "RATE_LIMIT_BACKEND", "memory")
+    monkeypatch.setattr(settings, "METRICS_ENABLED", True)
+    monkeypatch.setenv("PROMETHEUS_MULTIPROC_DIR", str(tmp_path))
+
+    assert server.multi_worker_environment(1) == {}
+    assert server.multi_worker_environment(4) == {
+        "NAME_CACHE_SHARED": "true",
+        "RESPONSE_CACHE_BACKEND": "mongo",
+        "RATE_LIMIT_BACKEND": "mongo",
+        "PROMETHEUS_MULTIPROC_DIR": str(tmp_path),
+    }
+
+
+def test_worker_count_follows_the_cpus_this_process_may_use(monkeypatch):
+    monkeypatch.setattr(settings, "WEB_CONCURRENCY", None)
+    monkeypatch.setattr(
+        server.os, "sched_getaffinity", lambda pid: {0, 1}, raising=False
+    )
+    assert 1 <= server.worker_count() <= 2
+    assert server.worker_count(3) == 3
+
+
+def test_metrics_are_aggregated_over_workers(tmp_path):
+    server.prepare_metrics_dir(str(tmp_path))
+    env = {**os.environ, "PROMETHEUS_MULTIPROC_DIR": str(tmp_path)}
+
+    def run(code):
+        return subprocess.run(
+            [sys.executable, "-c", code],
+            cwd=BACKEND_DIR,
+            env=env,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+
+    for _ in range(2):  # Two worker processes
+        run(RECORD_RENDER)
+    assert 'pdf_renders_total{outcome="ok"} 2.0' in run(SCRAPE)
+
+
+@pytest.mark.asyncio
+async def test_shared_name_cache_sees_writes_of_other_workers(
+    db_conn_session: AsyncIOMotorDatabase,
+):
+    user_id = f"names-{uuid4()}"
+    worker_a = NameCache(ttl_seconds=300, shared=True)
+    worker_b = NameCache(ttl_seconds=300, shared=True)
+    assert (await worker_b.get(db_conn_session, user_id)).projects == {}
+
+    # Worker A creates a project (CRUDProject.create invalidates like this)
+    project_id = uuid4()
+    await db_conn_session["projects"].insert_one(
+        {"_id": project_id, "user_id": user_id, "name": "New", "client_id": None}
+    )
+    await worker_a.invalidate(db_conn_session, user_id)
+
+    names = await worker_b.get(db_conn_session, user_id)
+    assert names.project_name(project_id) == "New"
@@ -0,0 +1,56 @@
+# tests/test_startup.py
+import os
+import subprocess
+import sys
+
+import pytest
+from httpx import AsyncClient
+
+from app.core.health import startup_state
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Generous for slow CI machines; WeasyPrint alone used to take about this long
+IMPORT_TIME_BUDGET_SECONDS = 3.0
+# Must only be imported on first use (PDF rendering, JWKS/token requests)
+LAZY_MODULES = ("weasyprint", "httpx")
+
+IMPORT_PROBE = f"""
+import sys, time
+start = time.perf_counter()
+import app.main
+print(time.perf_counter() - start)
+print(",".join(name for name in {LAZY_MODULES!r} if name in sys.modules))
+"""
+
+
+def test_importing_the_app_stays_light():
+    # Fresh interpreter: this one has imported everything already
+    result = subprocess.run(
+        [sys.executable, "-c", IMPORT_PROBE],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    seconds, eager = result.stdout.splitlines()[-2:]
+    assert eager == ""
+    assert float(seconds) < IMPORT_TIME_BUDGET_SECONDS
+
+
+@pytest.mark.asyncio
+async def test_readiness_is_separate_from_liveness(async_client: AsyncClient):
+    was_ready_at = startup_state.ready_at
+    startup_state.begin()
+    try:
+        response = await async_client.get("/readyz")
+        assert response.status_code == 503
+        assert response.json()["status"] == "starting"
+        # Alive while starting
+        assert (await async_client.get("/healthz")).status_code == 200
+
+        startup_state.mark_ready()
+        response = await async_client.get("/readyz")
+        assert response.status_code == 200
+        assert response.json()["status"] == "ready"
+    finally:
+        startup_state.ready_at = was_ready_at
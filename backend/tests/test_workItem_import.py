@@ -0,0 +1,214 @@
+# tests/test_workItem_import.py
+import pytest
+from httpx import AsyncClient
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from uuid import uuid4
+
+from app.models.project import ProjectInDB
+from app.models.workItem import WorkItemCreate, TimeEntry as TimeEntryData
+from app.crud.crud_workItem import crud_workItem
+from app.services.work_item_import import WorkItemImportError, parse_import_stream
+
+
+async def chunked(body: bytes, size: int = 64, *, stop_after: int = None):
+    for index, start in enumerate(range(0, len(body), size)):
+        # Reading past this chunk means the import wasn't stopped while streaming
+        assert stop_after is None or index <= stop_after
+        yield body[start : start + size]
+
+
+@pytest.mark.asyncio
+async def test_csv_rows_are_grouped_into_work_items():
+    project_id = uuid4()
+    body = (
+        "name,project_id,date,entry_description,rate_name,duration\n"
+        f"Sprint 1,{project_id},2025-03-03,Backend,Standard,4\n"
+        f"Sprint 1,{project_id},2025-03-03,Review,Senior,1.5\n"
+        "\n"
+        f"Sprint 2,{project_id},2025-03-04,,Standard,2\n"
+    ).encode()
+    items, rows = await parse_import_stream(chunked(body), "text/csv")
+    assert [item.name for item in items] == ["Sprint 1", "Sprint 2"]
+    assert rows == [2, 5]  # Lines of each item's first row
+    assert [te.duration for te in items[0].timeEntries] == [4.0, 1.5]
+    # Without entry_description the work item name is used
+    assert items[1].timeEntries[0].description == "Sprint 2"
+
+
+@pytest.mark.asyncio
+async def test_import_reports_every_invalid_row():
+    body = (
+        b'[{"name": "ok", "project_id": "%s", "timeEntries": []},'
+        b' {"name": "", "project_id": "not-a-uuid"}]' % str(uuid4()).encode()
+    )
+    with pytest.raises(WorkItemImportError) as exc_info:
+        await parse_import_stream(chunked(body), "application/json")
+    assert [e["row"] for e in exc_info.value.errors] == [1]
+    assert len(exc_info.value.errors[0]["errors"]) == 2
+
+    with pytest.raises(WorkItemImportError) as exc_info:
+        await parse_import_stream(
+            chunked(b"name,duration\nx,1\n"), "text/csv; charset=utf-8"
+        )
+    assert "Missing CSV columns" in exc_info.value.errors[0]["errors"][0]
+
+
+@pytest.mark.asyncio
+async def test_chunk_borders_do_not_change_the_result():
+    project_id = uuid4()
+    json_body = (
+        '\ufeff[{"name": "A", "project_id": "%s", "timeEntries": '
+        '[{"description": "Dev", "rate_name": "Standard", "duration": 1.25}]},'
+        ' {"name": "Zoë", "project_id": "%s"}]' % (project_id, project_id)
+    ).encode()
+    csv_body = (
+        "name,project_id,date,description,rate_name,duration\n"
+        f'Sprint 1,{project_id},2025-03-03,"Two\nlines",Standard,4\r\n'
+        f"Sprint 2,{project_id},2025-03-04,,Standard,2\n"
+    ).encode()
+    for body, content_type in ((json_body, "application/json"), (csv_body, "text/csv")):
+        expected = await parse_import_stream(chunked(body, len(body)), content_type)
+        # Chunk borders inside numbers, strings and multi-byte characters
+        for size in (1, 3, 7, 64):
+            assert await parse_import_stream(chunked(body, size), content_type) == expected
+
+    items, rows = await parse_import_stream(chunked(csv_body), "text/csv")
+    assert items[0].description == "Two\nlines"
+    assert rows == [2, 4]  # The quoted line break takes a line
+
+
+@pytest.mark.asyncio
+async def test_stream_stops_reading_at_the_item_limit():
+    project_id = uuid4()
+    rows = "".join(
+        f"Item {i},{project_id},2025-03-03,Standard,1\n" for i in range(1000)
+    )
+    body = f"name,project_id,date,rate_name,duration\n{rows}".encode()
+    with pytest.raises(WorkItemImportError) as exc_info:
+        await parse_import_stream(
+            chunked(body, 100, stop_after=20), "text/csv", max_items=10
+        )
+    assert "the limit is 10" in exc_info.value.errors[0]["errors"][0]
+
+    body = b"[" + b",".join(b'{"name": "x"}' for _ in range(1000)) + b"]"
+    with pytest.raises(WorkItemImportError):
+        await parse_import_stream(
+            chunked(body, 100, stop_after=20), "application/json", max_items=10
+        )
+
+
+@pytest.mark.asyncio
+async def test_stream_stops_buffering_a_malformed_or_oversized_item():
+    # A bad first item must not make the parser wait for the rest of the body
+    items = b",".join(b'{"name": "x"}' for _ in range(1000))
+    body = b'[{"name": "x" "oops": 1},' + items + b"]"
+    with pytest.raises(WorkItemImportError) as exc_info:
+        await parse_import_stream(
+            chunked(body, 100, stop_after=20), "application/json", max_item_size=1000
+        )
+    assert "Invalid JSON" in exc_info.value.errors[0]["errors"][0]
+
+    body = b'[{"name": "' + b"x" * 100_000 + b'"}]'
+    with pytest.raises(WorkItemImportError):
+        await parse_import_stream(
+            chunked(body, 100, stop_after=20), "application/json", max_item_size=1000
+        )
+
+    # CSV: an unclosed quote
+    body = b'name,project_id,rate_name,duration\n"Unclosed,' + b"x,1\n" * 10_000
+    with pytest.raises(WorkItemImportError) as exc_info:
+        await parse_import_stream(
+            chunked(body, 100, stop_after=20), "text/csv", max_item_size=1000
+        )
+    assert exc_info.value.errors[0]["row"] == 2
+
+
+@pytest.mark.asyncio
+async def test_create_many_validates_before_writing(
+    db_conn_session: AsyncIOMotorDatabase,
+    mock_user_id: str,
+    default_test_project: ProjectInDB,  # <<< USE SESSION-SCOPED FIXTURE
+):
+    user_id = mock_user_id
+    good = WorkItemCreate(
+        name="Imported item",
+        project_id=default_test_project.id,
+        timeEntries=[
+            TimeEntryData(
+                description="Imported", rate_name="Session Standard Rate", duration=2.5
+            )
+        ],
+    )
+    bad_rate = WorkItemCreate(
+        name="Imported item with unknown rate",
+        project_id=default_test_project.id,
+        timeEntries=[TimeEntryData(description="x", rate_name="Nope", duration=1)],
+    )
+    unknown_project = WorkItemCreate(name="Orphan", project_id=uuid4())
+
+    with pytest.raises(WorkItemImportError) as exc_info:
+        await crud_workItem.create_many(
+            db=db_conn_session,
+            objs_in=[good, bad_rate, unknown_project],
+            user_id=user_id,
+        )
+    assert [e["row"] for e in exc_info.value.errors] == [1, 2]
+    assert await db_conn_session["workItems"].count_documents({"user_id": user_id}) == 0
+
+    result = await crud_workItem.create_many(
+        db=db_conn_session, objs_in=[good] * 5, user_id=user_id, chunk_size=2
+    )
+    assert result.created == 5
+    assert result.total_amount == 5 * 2.5 * 120
+    stored = await db_conn_session["workItems"].find_one({"_id": result.ids[0]})
+    assert stored["timeEntries"][0]["calculatedAmount"] == 300
+    assert stored["project_name"] == default_test_project.name
+    assert (
+        await db_conn_session["events"].count_documents(
+            {"user_id": user_id, "event_type": "work_items.imported"}
+        )
+        == 1
+    )
+
+
+@pytest.mark.asyncio
+async def test_bulk_endpoint_accepts_csv(
+    async_client: AsyncClient,
+    db_conn_session: AsyncIOMotorDatabase,
+    mock_user_id: str,
+    default_test_project: ProjectInDB,  # <<< USE SESSION-SCOPED FIXTURE
+):
+    csv_body = (
+        "name,project_id,date,entry_description,rate_name,duration\n"
+        f"March,{default_test_project.id},2025-03-03,Dev,Session Standard Rate,3\n"
+        f"March,{default_test_project.id},2025-03-03,Ops,Session Standard Rate,1\n"
+    )
+    response = await async_client.post(
+        "/api/v1/workItems/bulk",
+        content=csv_body,
+        headers={"Content-Type": "text/csv"},
+    )
+    assert response.status_code == 201, response.text
+    assert response.json()["created"] == 1
+    assert response.json()["time_entries"] == 2
+
+    response = await async_client.post(
+        "/api/v1/workItems/bulk",
+        json=[{"name": "x", "project_id": str(uuid4()), "timeEntries": []}],
+    )
+    assert response.status_code == 422
+    assert response.json()["detail"][0]["row"] == 0
+
+    # CSV errors point at the line of the offending work item
+    response = await async_client.post(
+        "/api/v1/workItems/bulk",
+        content=(
+            "name,project_id,date,entry_description,rate_name,duration\n"
+            f"Good,{default_test_project.id},2025-03-03,Dev,Session Standard Rate,1\n"
+            "\n"
+            f"Bad,{default_test_project.id},2025-03-03,Dev,No Such Rate,1\n"
+        ),
+        headers={"Content-Type": "text/csv"},
+    )
+    assert response.status_code == 422
+    assert [error["row"] for error in response.json()["detail"]] == [4]
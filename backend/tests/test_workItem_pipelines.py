@@ -0,0 +1,188 @@
+# tests/test_workItem_pipelines.py
+import pytest
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from typing import List
+
+from app.models.project import ProjectInDB
+from app.models.workItem import WorkItemInDB
+from app.crud.crud_workItem import crud_workItem
+from app.crud.pipeline import Pipeline, summarize_execution_stats
+from app.core import db as core_db
+from app.core.config import settings
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+LOOKUP_STAGES = {"$lookup", "EQ_LOOKUP"}
+# $sort+$skip+$limit are coalesced by the optimizer, so any of them marks pagination
+PAGINATION_STAGES = {"$sort", "$skip", "$limit", "SORT", "SKIP", "LIMIT"}
+
+
+def stage_names(pipeline: List[dict]) -> List[str]:
+    return [next(iter(stage)) for stage in pipeline]
+
+
+def execution_order(explain: dict) -> List[str]:
+    """Flattens an aggregate explain into stage names, in execution order."""
+    names = []
+
+    def walk(node):
+        if not isinstance(node, dict):
+            return
+        if "inputStage" in node:
+            walk(node["inputStage"])
+        for child in node.get("inputStages", []):
+            walk(child)
+        if "stage" in node:
+            names.append(node["stage"])
+
+    def walk_winning_plan(query_planner):
+        winning_plan = query_planner["winningPlan"]
+        walk(winning_plan.get("queryPlan", winning_plan))
+
+    if "stages" in explain:
+        for stage in explain["stages"]:
+            name = next(iter(stage))
+            if name == "$cursor":
+                walk_winning_plan(stage["$cursor"]["queryPlanner"])
+            else:
+                names.append(name)
+    else:
+        walk_winning_plan(explain["queryPlanner"])
+    return names
+
+
+def first_index(names: List[str], wanted: set) -> int:
+    return next(i for i, name in enumerate(names) if name in wanted)
+
+
+async def explain_aggregate(db: AsyncIOMotorDatabase, pipeline: List[dict]) -> dict:
+    return await db.command(
+        {
+            "explain": {"aggregate": "workItems", "pipeline": pipeline, "cursor": {}},
+            "verbosity": "queryPlanner",
+        }
+    )
+
+
+def test_project_name_pipeline_joins_only_the_page():
+    pipeline = crud_workItem._build_project_name_pipeline(
+        match_conditions={"user_id": "user"}, search=None, skip=20, limit=10
+    )
+    names = stage_names(pipeline.build())
+    assert names.index("$limit") < names.index("$lookup")
+    assert names[:4] == ["$match", "$sort", "$skip", "$limit"]
+
+
+def test_project_name_pipeline_joins_first_when_searching_project_name():
+    pipeline = crud_workItem._build_project_name_pipeline(
+        match_conditions={"user_id": "user"}, search="relaunch", skip=0, limit=10
+    )
+    names = stage_names(pipeline.build())
+    # The search matches project_data.name, so the join must precede pagination
+    assert names.index("$lookup") < names.index("$match", 1) < names.index("$limit")
+
+
+def test_project_info_pipeline_joins_only_the_page():
+    pipeline = crud_workItem._build_project_info_pipeline(
+        match_conditions={"user_id": "user"}, search=None, skip=0, limit=10
+    )
+    names = stage_names(pipeline.build())
+    assert names.index("$limit") < names.index("$lookup")
+
+
+def test_pipeline_hints_the_user_scoped_index(monkeypatch):
+    monkeypatch.setattr(settings, "QUERY_INDEX_HINTS", True)
+    monkeypatch.setitem(
+        core_db.ENSURED_INDEXES,
+        "workItems",
+        [[("project_id", 1)], [("user_id", 1), ("created_at", -1)]],
+    )
+    pipeline = Pipeline("workItems").match({"user_id": "user"}).paginate(
+        {"created_at": -1}, 0, 10
+    )
+    assert pipeline.select_index_hint() == [("user_id", 1), ("created_at", -1)]
+    # Range-only matches have no equality prefix to hint
+    pipeline = Pipeline("workItems").match({"created_at": {"$gte": 0}})
+    assert pipeline.select_index_hint() is None
+
+
+def test_pipeline_leaves_selective_ranges_to_the_planner(monkeypatch):
+    monkeypatch.setattr(settings, "QUERY_INDEX_HINTS", True)
+    monkeypatch.setitem(
+        core_db.ENSURED_INDEXES,
+        "workItems",
+        [[("user_id", 1), ("created_at", -1)], [("user_id", 1), ("work_date", 1)]],
+    )
+    # A work_date range sorted by created_at: (user_id, work_date) may be better
+    pipeline = (
+        Pipeline("workItems")
+        .match({"user_id": "user", "work_date": {"$gte": 0, "$lt": 10}})
+        .paginate({"created_at": -1}, 0, 10)
+    )
+    assert pipeline.select_index_hint() is None
+    # A range on a key of the picked index itself is fine
+    pipeline = (
+        Pipeline("workItems")
+        .match({"user_id": "user", "created_at": {"$gte": 0}})
+        .paginate({"created_at": -1}, 0, 10)
+    )
+    assert pipeline.select_index_hint() == [("user_id", 1), ("created_at", -1)]
+
+    monkeypatch.setattr(settings, "QUERY_INDEX_HINTS", False)  # Default
+    assert pipeline.select_index_hint() is None
+
+
+def test_summarize_execution_stats_sums_nested_stages():
+    explain = {
+        "stages": [
+            {"$cursor": {"executionStats": {"totalDocsExamined": 10, "totalKeysExamined": 12}}},
+            {"$lookup": {}, "executionStats": {"totalDocsExamined": 3}},
+        ]
+    }
+    assert summarize_execution_stats(explain) == {"docs_examined": 13, "keys_examined": 12}
+
+
+@pytest.mark.asyncio
+async def test_explain_paginates_before_lookup(
+    db_conn_session: AsyncIOMotorDatabase,
+    mock_user_id: str,
+    default_test_project: ProjectInDB,  # <<< USE SESSION-SCOPED FIXTURE
+    default_test_workItem: WorkItemInDB,  # <<< USE SESSION-SCOPED FIXTURE
+):
+    """
+    Regression test on the server's plan: without a project-name search no
+    $lookup may run before the page is cut.
+    """
+    pipeline = crud_workItem._build_project_name_pipeline(
+        match_conditions={"user_id": mock_user_id}, search=None, skip=0, limit=10
+    )
+    explain = await explain_aggregate(db_conn_session, pipeline.build())
+    names = execution_order(explain)
+    logger.info(f"Explain stage order: {names}")
+    assert first_index(names, PAGINATION_STAGES) < first_index(names, LOOKUP_STAGES)
+
+
+@pytest.mark.asyncio
+async def test_explain_searching_project_name_looks_up_before_limit(
+    db_conn_session: AsyncIOMotorDatabase,
+    mock_user_id: str,
+    default_test_project: ProjectInDB,  # <<< USE SESSION-SCOPED FIXTURE
+    default_test_workItem: WorkItemInDB,  # <<< USE SESSION-SCOPED FIXTURE
+):
+    pipeline = crud_workItem._build_project_name_pipeline(
+        match_conditions={"user_id": mock_user_id},
+        search=default_test_project.name,
+        skip=0,
+        limit=10,
+    )
+    explain = await explain_aggregate(db_conn_session, pipeline.build())
+    names = execution_order(explain)
+    logger.info(f"Explain stage order: {names}")
+    assert first_index(names, LOOKUP_STAGES) < first_index(names, PAGINATION_STAGES)
+
+    results = await crud_workItem._get_multi_with_project_name_lookup(
+        db=db_conn_session, user_id=mock_user_id, search=default_test_project.name
+    )
+    assert [item.id for item in results] == [default_test_workItem.id]
@@ -6,18 +6,26 @@ from uuid import UUID, uuid4
 from datetime import datetime, date, timedelta, timezone, UTC
 
 # Import models and CRUD functions
-from app.models.client import ClientCreate, ClientInDB
-from app.models.project import ProjectCreate, ProjectInDB, Rate as ProjectRate
+from app.models.client import ClientCreate, ClientInDB, ClientUpdate
+from app.models.project import (
+    ProjectCreate,
+    ProjectInDB,
+    ProjectUpdate,
+    Rate as ProjectRate,
+)
 from app.models.invoice import InvoiceCreateRequest, InvoiceInDB
 from app.crud.crud_invoice import crud_invoice  # The instance
 from app.models.workItem import (
     WorkItemInDB,
     WorkItemCreate,
+    WorkItemUpdate,
     TimeEntry as TimeEntryData,
     ItemStatus,
 )  # Renamed TimeEntryCreate to TimeEntryData
 
 from app.crud.crud_workItem import crud_workItem
+from app.crud.denormalize import find_name_drift
+from app.crud.work_item_totals import backfill_totals
 from app.crud import (
     crud_client,
     crud_project,
@@ -405,3 +413,177 @@ async def test_single_item_create_and_retrieve_with_aggregated_field(
     assert result_from_crud.timeEntries[0].price_per_hour == 120
     assert result_from_crud.timeEntries[0].duration == 2.0
     assert result_from_crud.timeEntries[0].rate_name == "Session Standard Rate"
+
+
+@pytest.mark.asyncio
+async def test_work_item_listing_reflects_project_rename(
+    db_conn_session: AsyncIOMotorDatabase,
+    mock_user_id: str,
+    default_test_client: ClientInDB,  # <<< USE SESSION-SCOPED FIXTURE
+    default_test_project: ProjectInDB,  # <<< USE SESSION-SCOPED FIXTURE
+    default_test_workItem: WorkItemInDB,  # <<< USE SESSION-SCOPED FIXTURE
+):
+    """
+    Tests that the cached project/client names are dropped on project writes
+    """
+    user_id = mock_user_id
+
+    results_from_crud = await crud_workItem.get_multi_with_project_name(
+        db=db_conn_session, user_id=user_id, project_id=default_test_project.id
+    )
+    assert results_from_crud[0].project_name == default_test_project.name
+    assert results_from_crud[0].client_name == default_test_client.name
+
+    await crud_project.crud_project.update(
+        db=db_conn_session,
+        item_id=default_test_project.id,
+        user_id=user_id,
+        obj_in=ProjectUpdate(name="Renamed Session Project"),
+    )
+
+    results_from_crud = await crud_workItem.get_multi_with_project_name(
+        db=db_conn_session, user_id=user_id, search="Renamed Session"
+    )
+    assert len(results_from_crud) == 1
+    assert results_from_crud[0].project_name == "Renamed Session Project"
+
+
+@pytest.mark.asyncio
+async def test_work_item_denormalized_names_follow_client_rename(
+    db_conn_session: AsyncIOMotorDatabase,
+    mock_user_id: str,
+    default_test_client: ClientInDB,  # <<< USE SESSION-SCOPED FIXTURE
+    default_test_project: ProjectInDB,  # <<< USE SESSION-SCOPED FIXTURE
+    default_test_workItem: WorkItemInDB,  # <<< USE SESSION-SCOPED FIXTURE
+):
+    """
+    Tests that names stored on work items are written at create time and
+    propagated when the client is renamed
+    """
+    user_id = mock_user_id
+
+    stored = await db_conn_session["workItems"].find_one(
+        {"_id": default_test_workItem.id}
+    )
+    assert stored["project_name"] == default_test_project.name
+    assert stored["client_name"] == default_test_client.name
+
+    await crud_client.crud_client.update(
+        db=db_conn_session,
+        item_id=default_test_client.id,
+        user_id=user_id,
+        obj_in=ClientUpdate(name="Renamed Session Client"),
+    )
+
+    stored = await db_conn_session["workItems"].find_one(
+        {"_id": default_test_workItem.id}
+    )
+    assert stored["client_name"] == "Renamed Session Client"
+    assert await find_name_drift(db_conn_session, user_id=user_id) == []
+
+
+@pytest.mark.asyncio
+async def test_moved_work_item_gets_its_names_and_deleted_projects_clear_them(
+    db_conn_session: AsyncIOMotorDatabase,
+    mock_user_id: str,
+    default_test_client: ClientInDB,  # <<< USE SESSION-SCOPED FIXTURE
+    default_test_project: ProjectInDB,  # <<< USE SESSION-SCOPED FIXTURE
+):
+    """
+    Tests that moving a work item writes the target project's names on that
+    item only, and that deleting the project clears them
+    """
+    user_id = mock_user_id
+    target = await crud_project.crud_project.create(
+        db=db_conn_session,
+        obj_in=ProjectCreate(
+            name="Move Target Project",
+            client_id=default_test_client.id,
+            rates=[ProjectRate(name="Session Standard Rate", price_per_hour=120.0)],
+        ),
+        user_id=user_id,
+    )
+    items = [
+        await crud_workItem.create(
+            db=db_conn_session,
+            obj_in=WorkItemCreate(name=name, project_id=project_id),
+            user_id=user_id,
+        )
+        for name, project_id in (
+            ("Already in target", target.id),
+            ("Moved", default_test_project.id),
+        )
+    ]
+    resident = await db_conn_session["workItems"].find_one({"_id": items[0].id})
+
+    await crud_workItem.update(
+        db=db_conn_session,
+        item_id=items[1].id,
+        user_id=user_id,
+        obj_in=WorkItemUpdate(project_id=target.id),
+    )
+    moved = await db_conn_session["workItems"].find_one({"_id": items[1].id})
+    assert moved["project_name"] == "Move Target Project"
+    assert moved["client_name"] == resident["client_name"]
+    # The target's other items are not rewritten
+    assert (
+        await db_conn_session["workItems"].find_one({"_id": items[0].id})
+    )["updated_at"] == resident["updated_at"]
+
+    assert await crud_project.crud_project.remove(
+        db=db_conn_session, id=target.id, user_id=user_id
+    )
+    for item in items:
+        stored = await db_conn_session["workItems"].find_one({"_id": item.id})
+        assert stored["project_name"] is None and stored["client_name"] is None
+    drifted = {row["_id"] for row in await find_name_drift(db_conn_session, user_id=user_id)}
+    assert not drifted & {item.id for item in items}
+
+
+@pytest.mark.asyncio
+async def test_work_item_totals_follow_time_entries(
+    db_conn_session: AsyncIOMotorDatabase,
+    mock_user_id: str,
+    default_test_project: ProjectInDB,  # <<< USE SESSION-SCOPED FIXTURE
+    default_test_workItem: WorkItemInDB,  # <<< USE SESSION-SCOPED FIXTURE
+):
+    """
+    Tests that total_hours/total_amount are stored on create, re-derived on
+    update and written by the backfill for documents that lack them
+    """
+    user_id = mock_user_id
+    assert default_test_workItem.total_hours == sum(
+        te.duration for te in default_test_workItem.timeEntries
+    )
+    assert default_test_workItem.total_amount == sum(
+        te.calculatedAmount for te in default_test_workItem.timeEntries
+    )
+
+    updated = await crud_workItem.update(
+        db=db_conn_session,
+        item_id=default_test_workItem.id,
+        user_id=user_id,
+        obj_in=WorkItemUpdate(
+            timeEntries=[
+                TimeEntryData(
+                    description="Only entry",
+                    rate_name="Session Standard Rate",
+                    duration=1.5,
+                    price_per_hour=120.0,
+                    calculatedAmount=180.0,
+                )
+            ]
+        ),
+    )
+    assert updated.total_hours == 1.5
+    assert updated.total_amount == 180.0
+
+    await db_conn_session["workItems"].update_one(
+        {"_id": default_test_workItem.id},
+        {"$unset": {"total_hours": "", "total_amount": ""}},
+    )
+    assert await backfill_totals(db_conn_session, user_id=user_id) == 1
+    stored = await db_conn_session["workItems"].find_one(
+        {"_id": default_test_workItem.id}
+    )
+    assert (stored["total_hours"], stored["total_amount"]) == (1.5, 180.0)
@@ -0,0 +1,77 @@
+# tests/test_work_dates.py
+import pytest
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from datetime import datetime, date, timedelta, timezone, UTC
+
+from app.models.project import ProjectInDB
+from app.models.workItem import WorkItemCreate, TimeEntry as TimeEntryData
+from app.crud.crud_workItem import crud_workItem
+from app.crud.work_dates import resolve_work_date, work_date_range
+from app.utils.date_utils import get_month_range, to_utc_midnight
+
+
+def test_to_utc_midnight_uses_the_utc_day():
+    assert to_utc_midnight(date(2025, 3, 3)) == datetime(2025, 3, 3, tzinfo=UTC)
+    # 00:30 in Berlin is still the previous day in UTC
+    berlin = timezone(timedelta(hours=1))
+    assert to_utc_midnight(datetime(2025, 3, 3, 0, 30, tzinfo=berlin)) == datetime(
+        2025, 3, 2, tzinfo=UTC
+    )
+    # Naive datetimes (as returned by MongoDB) are UTC
+    assert to_utc_midnight(datetime(2025, 3, 3, 23, 59)) == datetime(
+        2025, 3, 3, tzinfo=UTC
+    )
+    assert get_month_range(2024, 12) == (
+        datetime(2024, 12, 1, tzinfo=UTC),
+        datetime(2025, 1, 1, tzinfo=UTC),
+    )
+
+
+def test_resolve_work_date_prefers_the_work_item_date():
+    created = datetime(2025, 5, 20, 15, 0)
+    assert resolve_work_date(
+        {"date": None, "start_date": datetime(2025, 5, 2, 9, 0), "created_at": created}
+    ) == datetime(2025, 5, 2, tzinfo=UTC)
+    assert resolve_work_date({"created_at": created}) == datetime(2025, 5, 20, tzinfo=UTC)
+    assert work_date_range(None, None) == {}
+    assert work_date_range(date_to=datetime(2025, 5, 31, 18, 0)) == {
+        "work_date": {"$lte": datetime(2025, 5, 31, tzinfo=UTC)}
+    }
+
+
+@pytest.mark.asyncio
+async def test_listing_filters_on_work_date(
+    db_conn_session: AsyncIOMotorDatabase,
+    mock_user_id: str,
+    default_test_project: ProjectInDB,  # <<< USE SESSION-SCOPED FIXTURE
+):
+    user_id = mock_user_id
+    for day in (1, 15, 28):
+        await crud_workItem.create(
+            db=db_conn_session,
+            obj_in=WorkItemCreate(
+                name=f"Feb {day}",
+                project_id=default_test_project.id,
+                date=datetime(2025, 2, day, 17, 45, tzinfo=UTC),
+                timeEntries=[
+                    TimeEntryData(
+                        description="Dev",
+                        rate_name="Session Standard Rate",
+                        duration=1.0,
+                    )
+                ],
+            ),
+            user_id=user_id,
+        )
+
+    stored = await db_conn_session["workItems"].find_one({"name": "Feb 15"})
+    assert stored["work_date"] == datetime(2025, 2, 15)  # Naive UTC from MongoDB
+
+    # date_to is inclusive of the whole day
+    results = await crud_workItem.get_multi_with_project_name(
+        db=db_conn_session,
+        user_id=user_id,
+        date_from=datetime(2025, 2, 15, tzinfo=UTC),
+        date_to=datetime(2025, 2, 28, tzinfo=UTC),
+    )
+    assert sorted(item.name for item in results) == ["Feb 15", "Feb 28"]